@@ -1,39 +1,39 @@
+import time
+_APP_IMPORT_START = time.perf_counter()
+
 import os
 import pandas as pd
 import streamlit as st
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import matplotlib.pyplot as plt
 import io
 from datetime import datetime
-import base64
 import tempfile
-from PIL import Image
-import plotly.io as pio
-import plotly.figure_factory as ff
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image as ReportLabImage, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.lib.units import inch, mm
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
+
+# 重いライブラリは初回使用時に読み込む（起動時間短縮。plotlyはグラフ作成モジュール内で読み込む）
+from utils_lazy_import import print_startup_report
 
 # 外部モジュールimport
 from causal_impact_translator import translate_causal_impact_report
 from utils_step1 import get_csv_files, load_and_clean_csv, make_period_key, aggregate_df, create_full_period_range, format_stats_with_japanese
 from utils_step2 import get_period_defaults, validate_periods, calc_period_days, build_analysis_params
-from utils_step3 import run_causal_impact_analysis, build_summary_dataframe, build_enhanced_summary_table, get_analysis_summary_message, get_comprehensive_pdf_download_link, get_comprehensive_csv_download_link
+from utils_step3 import run_causal_impact_analysis, build_summary_dataframe, build_enhanced_summary_table, get_analysis_summary_message, build_comprehensive_pdf, build_comprehensive_csv
 from utils_step3_single_group import (
     run_single_group_causal_impact_analysis, 
     validate_single_group_data, 
     suggest_intervention_point,
     build_single_group_summary_dataframe,
     get_single_group_interpretation,
-    get_single_group_comprehensive_pdf_download_link,
-    get_single_group_comprehensive_csv_download_link
+    build_single_group_comprehensive_pdf,
+    build_single_group_comprehensive_csv
 )
+from utils_download import render_lazy_download_button, PDF_MIME, HTML_MIME
+from utils_csv import CSV_MIMES
+from utils_export import get_export_manager, get_export_language
+from utils_columnar import build_columnar_export, is_columnar_export_available, COLUMNAR_FORMATS
+from utils_html_report import build_html_report
+from utils_figure import render_analysis_figure
+from utils_result_chart import build_interactive_result_chart
+from utils_preview_chart import build_preview_figure, get_dataset_version
+from utils_result import get_analysis_result
 
 # リファクタリング後の外部モジュール
 from config.constants import PAGE_CONFIG, CUSTOM_CSS_PATH, SESSION_KEYS
@@ -54,6 +54,18 @@ except ImportError:
 except Exception as e:
     print(f"グラフフォント設定エラー: {e}")
 
+# 起動時のインポートコストを出力（プロセスごとに1回）
+print_startup_report(time.perf_counter() - _APP_IMPORT_START)
+
+# 分析用ワーカープールを起動（サーバー全体で1つ、起動済みなら再利用）
+try:
+    from utils_worker_pool import get_worker_pool, run_analysis_in_pool
+    get_worker_pool()
+except Exception as e:
+    print(f"ワーカープール起動エラー（同一プロセスで分析を実行します）: {e}")
+    def run_analysis_in_pool(func, *args, **kwargs):
+        return func(*args, **kwargs)
+
 # --- ユーティリティ関数の定義 ---
 def truncate_text_for_display(text, max_length=20):
     """
@@ -957,6 +969,7 @@ if st.session_state.get('data_loaded', False):
             if dataset is not None:
                 # セッションに保存
                 st.session_state['dataset'] = dataset
+                st.session_state['dataset_version'] = get_dataset_version(dataset)
                 st.session_state['dataset_created'] = True
                 
                 # 分析期間のデフォルト値を設定
@@ -1122,75 +1135,11 @@ if st.session_state.get('data_loaded', False):
                 treatment_col = [col for col in dataset.columns if col != 'ymd' and '処置群' in col][0]
                 control_col = [col for col in dataset.columns if col != 'ymd' and '対照群' in col][0]
                 
-                # プロットの作成
-                fig = make_subplots(specs=[[{"secondary_y": True}]])
-                
-                # 処置群のトレース追加
-                fig.add_trace(
-                    go.Scatter(
-                        x=dataset['ymd'], 
-                        y=dataset[treatment_col], 
-                        name=truncate_text_for_display(treatment_col, max_length=25), 
-                        line=dict(color="#1976d2", width=2), 
-                        mode='lines+markers', 
-                        marker=dict(size=4),
-                        hovertemplate='日付: %{x|%Y-%m-%d}<br>数量: %{y}<extra></extra>'
-                    ),
-                    secondary_y=False
-                )
-                
-                # 対照群のトレース追加
-                fig.add_trace(
-                    go.Scatter(
-                        x=dataset['ymd'], 
-                        y=dataset[control_col], 
-                        name=truncate_text_for_display(control_col, max_length=25), 
-                        line=dict(color="#ef5350", width=2), 
-                        mode='lines+markers', 
-                        marker=dict(size=4),
-                        hovertemplate='日付: %{x|%Y-%m-%d}<br>数量: %{y}<extra></extra>'
-                    ),
-                    secondary_y=True
-                )
-                
-                # X軸の設定
-                fig.update_xaxes(
-                    title_text="日付", 
-                    type="date", 
-                    tickformat="%Y-%m", 
-                    showgrid=True, 
-                    tickangle=-30
-                )
-                
-                # 左Y軸の設定（処置群）
-                fig.update_yaxes(
-                    title_text="処置群の数量", 
-                    secondary_y=False, 
-                    title_font=dict(color="#1976d2"), 
-                    tickfont=dict(color="#1976d2")
-                )
-                
-                # 右Y軸の設定（対照群）
-                fig.update_yaxes(
-                    title_text="対照群の数量", 
-                    secondary_y=True, 
-                    title_font=dict(color="#ef5350"), 
-                    tickfont=dict(color="#ef5350")
-                )
-                
-                # レイアウトの設定（凡例を中央に配置、range sliderを追加）
-                fig.update_layout(
-                    height=500,
-                    hovermode='x unified',
-                    legend=dict(
-                        orientation="h",
-                        yanchor="bottom",
-                        y=1.02,
-                        xanchor="center",
-                        x=0.5
-                    ),
-                    xaxis_rangeslider_visible=True,
-                    dragmode="zoom"
+                # プロットの作成（表示幅に応じて間引き、データセットごとにメモ）
+                fig = build_preview_figure(
+                    dataset, treatment_col, truncate_text_for_display(treatment_col, max_length=25),
+                    control_col=control_col, control_label=truncate_text_for_display(control_col, max_length=25),
+                    dataset_version=st.session_state.get('dataset_version')
                 )
                 
                 st.plotly_chart(fig, use_container_width=True)
@@ -1202,55 +1151,10 @@ if st.session_state.get('data_loaded', False):
                 # 列名を動的に取得
                 treatment_col = [col for col in dataset.columns if col != 'ymd'][0]
                 
-                # プロットの作成
-                fig = go.Figure()
-                
-                # 処置群のトレース追加（凡例を明示）
-                fig.add_trace(
-                    go.Scatter(
-                        x=dataset['ymd'], 
-                        y=dataset[treatment_col], 
-                        name=f"処置群（{truncate_text_for_display(treatment_name, max_length=20)}）", 
-                        line=dict(color="#1976d2", width=2), 
-                        mode='lines', 
-                        hovertemplate='日付: %{x|%Y-%m-%d}<br>数量: %{y}<extra></extra>'
-                    )
-                )
-                
-                # レイアウトの設定（凡例表示、range slider追加）
-                fig.update_layout(
-                    showlegend=True,  # 凡例を明示的に表示
-                    legend=dict(
-                        orientation="h", 
-                        yanchor="bottom", 
-                        y=1.02, 
-                        xanchor="center", 
-                        x=0.5
-                    ),
-                    hovermode="x unified",
-                    plot_bgcolor='white',
-                    margin=dict(t=50, l=60, r=60, b=60),
-                    height=500,
-                    autosize=True,
-                    xaxis_rangeslider_visible=True,
-                    dragmode="zoom"
-                )
-                
-                # X軸の設定
-                fig.update_xaxes(
-                    title_text="日付", 
-                    type="date", 
-                    tickformat="%Y-%m", 
-                    showgrid=True, 
-                    tickangle=-30
-                )
-                
-                # Y軸の設定（左軸ラベルを青文字で明示）
-                fig.update_yaxes(
-                    title_text="処置群の数量",
-                    title_font=dict(color="#1976d2"),
-                    tickfont=dict(color="#1976d2"),
-                    showgrid=True
+                # プロットの作成（表示幅に応じて間引き、データセットごとにメモ）
+                fig = build_preview_figure(
+                    dataset, treatment_col, f"処置群（{truncate_text_for_display(treatment_name, max_length=20)}）",
+                    dataset_version=st.session_state.get('dataset_version')
                 )
                 
                 st.plotly_chart(fig, use_container_width=True)
@@ -1475,7 +1379,63 @@ if st.session_state.get('data_loaded', False):
                     'post_start': post_start_date,
                     'post_end': post_end_date
                 }
-                
+
+                # --- 検出力シミュレーション（事前検証） ---
+                with st.expander("検出力シミュレーション（この期間設定で効果を検出できるかの事前確認）"):
+                    st.markdown("""
+<div style="line-height:1.7;">
+介入期間に仮想的な効果（+1%、+3%など）を加えたデータを繰り返し生成し、現在の期間設定で効果が有意に検出される割合（検出力）を推定します。<br>
+検出力が80%に達する最小の効果量（MDE：最小検出効果）が、期待する施策効果より大きい場合は、介入前期間を長くするなど期間設定の見直しをおすすめします。
+</div>
+                    """, unsafe_allow_html=True)
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        power_n_simulations = st.selectbox(
+                            "シミュレーション回数",
+                            options=[500, 1000, 2000, 5000],
+                            index=1,
+                            key="power_n_simulations"
+                        )
+                    with col2:
+                        power_effect_text = st.text_input(
+                            "検証する効果量（%、カンマ区切り）",
+                            value="1, 2, 3, 5, 10",
+                            key="power_effect_sizes"
+                        )
+                    if st.button("検出力を計算", key="run_power_simulation"):
+                        from utils_power_analysis import (
+                            run_power_simulation, estimate_minimum_detectable_effect, parse_effect_sizes
+                        )
+                        try:
+                            effect_sizes = parse_effect_sizes(power_effect_text)
+                        except ValueError as e:
+                            st.error(str(e))
+                            effect_sizes = None
+                        if effect_sizes is not None:
+                            try:
+                                with st.spinner("シミュレーション実行中..."):
+                                    power_df = run_power_simulation(
+                                        dataset,
+                                        [pre_start_date, pre_end_date],
+                                        [post_start_date, post_end_date],
+                                        effect_sizes=effect_sizes,
+                                        n_simulations=power_n_simulations,
+                                        use_worker_pool=True
+                                    )
+                                mde = estimate_minimum_detectable_effect(power_df)
+                                display_df = power_df.copy()
+                                display_df['効果量'] = display_df['効果量'].map(lambda v: f"{v:+.1f}%")
+                                display_df['検出率'] = display_df['検出率'].map(lambda v: f"{v * 100:.1f}%")
+                                display_df['平均推定相対効果'] = display_df['平均推定相対効果'].map(lambda v: f"{v:+.2f}%")
+                                st.dataframe(display_df, use_container_width=True, hide_index=True)
+                                if mde is not None:
+                                    st.success(f"最小検出効果（検出力80%）：約 {mde:.1f}%")
+                                else:
+                                    st.warning("指定した効果量の範囲では検出力80%に達しませんでした。より大きな効果量を指定するか、期間設定を見直してください。")
+                                st.caption("※ 効果量0%の行は、効果がない場合に誤って有意と判定される割合（偽陽性率）の目安です")
+                            except Exception as e:
+                                st.error(f"検出力シミュレーションでエラーが発生しました: {str(e)}")
+
                 # --- モデル・パラメータ設定 ---
                 st.markdown('<div class="section-title">モデルの基本パラメータの設定</div>', unsafe_allow_html=True)
                 
@@ -1747,7 +1707,8 @@ if st.session_state.get('data_loaded', False):
                                         season_duration = 1
                                     
                                     # 処置群のみ分析実行
-                                    ci, summary, report, fig = run_single_group_causal_impact_analysis(
+                                    ci, summary, report, fig = run_analysis_in_pool(
+                                        run_single_group_causal_impact_analysis,
                                         single_group_data, 
                                         pre_period_converted, 
                                         post_period_converted,
@@ -1759,7 +1720,7 @@ if st.session_state.get('data_loaded', False):
                                     st.session_state['causal_impact_result'] = ci
                                     st.session_state['analysis_summary'] = summary
                                     st.session_state['analysis_report'] = report
-                                    st.session_state['analysis_figure'] = fig
+                                    st.session_state['analysis_figure'] = render_analysis_figure(fig, get_analysis_result(ci, post_period_converted))
                                     st.session_state[SESSION_KEYS['ANALYSIS_COMPLETED']] = True
                                     
                                 else:
@@ -1777,7 +1738,8 @@ if st.session_state.get('data_loaded', False):
                                     analysis_dataset = analysis_dataset.set_index('ymd')
                                     
                                     # 既存の二群比較分析を実行（引数を3つに修正）
-                                    ci, summary, report, fig = run_causal_impact_analysis(
+                                    ci, summary, report, fig = run_analysis_in_pool(
+                                        run_causal_impact_analysis,
                                         analysis_dataset, 
                                         pre_period_converted, 
                                         post_period_converted
@@ -1787,7 +1749,7 @@ if st.session_state.get('data_loaded', False):
                                     st.session_state['causal_impact_result'] = ci
                                     st.session_state['analysis_summary'] = summary
                                     st.session_state['analysis_report'] = report
-                                    st.session_state['analysis_figure'] = fig
+                                    st.session_state['analysis_figure'] = render_analysis_figure(fig, get_analysis_result(ci, post_period_converted))
                                     st.session_state[SESSION_KEYS['ANALYSIS_COMPLETED']] = True
                                 
                                 # 分析完了メッセージ
@@ -1818,10 +1780,24 @@ if st.session_state.get(SESSION_KEYS['ANALYSIS_COMPLETED'], False) and st.sessio
     ci = st.session_state.get('causal_impact_result')
     summary = st.session_state.get('analysis_summary')
     report = st.session_state.get('analysis_report')
-    fig = st.session_state.get('analysis_figure')
+    # 分析結果のグラフ（描画済みのPNG・PDF。グラフ自体は分析直後に解放済み）
+    fig = render_analysis_figure(st.session_state.get('analysis_figure'))
+    st.session_state['analysis_figure'] = fig
     current_analysis_type = st.session_state.get('analysis_type', analysis_type)
     
     if ci is not None:
+        # 分析結果を一度だけ抽出し、サマリー・メッセージ・ダウンロードで共有する
+        try:
+            analysis_period = st.session_state.get('analysis_period') or {}
+            post_period = None
+            if analysis_period.get('post_start') and analysis_period.get('post_end'):
+                post_period = (analysis_period['post_start'], analysis_period['post_end'])
+            analysis_result = get_analysis_result(ci, post_period)
+        except Exception as e:
+            print(f"分析結果の抽出に失敗しました: {str(e)}")
+            analysis_result = None
+        st.session_state['analysis_result'] = analysis_result
+        
         # --- 分析結果サマリー（改善版） ---
         st.markdown('<div class="section-title">分析結果サマリー</div>', unsafe_allow_html=True)
         
@@ -1893,10 +1869,10 @@ if st.session_state.get(SESSION_KEYS['ANALYSIS_COMPLETED'], False) and st.sessio
                 # 分析タイプに応じて適切なサマリー生成関数を使用
                 if current_analysis_type == "単群推定（処置群のみを使用）":
                     from utils_step3_single_group import build_single_group_summary_dataframe
-                    summary_df = build_single_group_summary_dataframe(ci, confidence_level)  # summaryではなくciを渡す
+                    summary_df = build_single_group_summary_dataframe(ci, confidence_level, result=analysis_result)  # summaryではなくciを渡す
                 else:
                     from utils_step3 import build_enhanced_summary_table
-                    summary_df = build_enhanced_summary_table(ci, confidence_level)
+                    summary_df = build_enhanced_summary_table(ci, confidence_level, result=analysis_result)
                 
                 # 共通の説明関数をインポート
                 from utils_step3 import get_metrics_explanation_table
@@ -1910,10 +1886,10 @@ if st.session_state.get(SESSION_KEYS['ANALYSIS_COMPLETED'], False) and st.sessio
                         if current_analysis_type == "単群推定（処置群のみを使用）":
                             # 単群推定用のサマリーメッセージ生成関数を使用（アプリ画面用）
                             from utils_step3_single_group import get_single_group_analysis_summary_message
-                            summary_message = get_single_group_analysis_summary_message(ci, confidence_level)
+                            summary_message = get_single_group_analysis_summary_message(ci, confidence_level, result=analysis_result)
                         else:
                             from utils_step3 import get_analysis_summary_message
-                            summary_message = get_analysis_summary_message(ci, confidence_level)
+                            summary_message = get_analysis_summary_message(ci, confidence_level, result=analysis_result)
                         
                         if summary_message:
                             st.success(summary_message)
@@ -1927,7 +1903,7 @@ if st.session_state.get(SESSION_KEYS['ANALYSIS_COMPLETED'], False) and st.sessio
                     
                     # --- 詳細レポート（実行結果メッセージの直下に配置） ---
                     with st.expander("詳細レポート", expanded=False):
-                        if report is not None:
+                        if report is not None or analysis_result is not None:
                             try:
                                 # レポートを日本語に翻訳
                                 st.markdown("**📋 Causal Impact分析の詳細レポート**")
@@ -1935,8 +1911,8 @@ if st.session_state.get(SESSION_KEYS['ANALYSIS_COMPLETED'], False) and st.sessio
                                 # 信頼水準を取得（デフォルト95%）
                                 confidence_level_alpha = confidence_level / 100 if confidence_level else 0.95
                                 
-                                # 翻訳処理を実行
-                                report_jp = translate_causal_impact_report(str(report), alpha=confidence_level_alpha)
+                                # 分析結果の数値から日本語レポートを作成（作成できない場合は英語レポートを翻訳）
+                                report_jp = translate_causal_impact_report(str(report), alpha=confidence_level_alpha, result=analysis_result)
                                 
                                 # 翻訳されたレポートを段落ごとに分割して表示
                                 report_paragraphs = report_jp.split('\n\n')
@@ -1973,7 +1949,7 @@ if st.session_state.get(SESSION_KEYS['ANALYSIS_COMPLETED'], False) and st.sessio
                     
                     # 詳細レポートは表示
                     with st.expander("詳細レポート", expanded=True):
-                        if report is not None:
+                        if report is not None or analysis_result is not None:
                             try:
                                 # レポートを日本語に翻訳
                                 st.markdown("**📋 Causal Impact分析の詳細レポート**")
@@ -1981,8 +1957,8 @@ if st.session_state.get(SESSION_KEYS['ANALYSIS_COMPLETED'], False) and st.sessio
                                 # 信頼水準を取得（デフォルト95%）
                                 confidence_level_alpha = confidence_level / 100 if confidence_level else 0.95
                                 
-                                # 翻訳処理を実行
-                                report_jp = translate_causal_impact_report(str(report), alpha=confidence_level_alpha)
+                                # 分析結果の数値から日本語レポートを作成（作成できない場合は英語レポートを翻訳）
+                                report_jp = translate_causal_impact_report(str(report), alpha=confidence_level_alpha, result=analysis_result)
                                 
                                 # 翻訳されたレポートを段落ごとに分割して表示
                                 report_paragraphs = report_jp.split('\n\n')
@@ -2017,7 +1993,7 @@ if st.session_state.get(SESSION_KEYS['ANALYSIS_COMPLETED'], False) and st.sessio
                 
                 # 詳細レポートは表示
                 with st.expander("詳細レポート", expanded=True):
-                    if report is not None:
+                    if report is not None or analysis_result is not None:
                         try:
                             # レポートを日本語に翻訳
                             st.markdown("**📋 Causal Impact分析の詳細レポート**")
@@ -2025,8 +2001,8 @@ if st.session_state.get(SESSION_KEYS['ANALYSIS_COMPLETED'], False) and st.sessio
                             # 信頼水準を取得（デフォルト95%）
                             confidence_level_alpha = confidence_level / 100 if confidence_level else 0.95
                             
-                            # 翻訳処理を実行
-                            report_jp = translate_causal_impact_report(str(report), alpha=confidence_level_alpha)
+                            # 分析結果の数値から日本語レポートを作成（作成できない場合は英語レポートを翻訳）
+                            report_jp = translate_causal_impact_report(str(report), alpha=confidence_level_alpha, result=analysis_result)
                             
                             # 翻訳されたレポートを段落ごとに分割して表示
                             report_paragraphs = report_jp.split('\n\n')
@@ -2072,55 +2048,27 @@ if st.session_state.get(SESSION_KEYS['ANALYSIS_COMPLETED'], False) and st.sessio
                     # 説明文（中項目スタイル）
                     st.markdown('<div style="margin-bottom:1em;font-size:1.05em;"><span style="font-weight:bold;">二群比較分析：</span><span style="font-weight:normal;">対照群との関係性による予測との比較</span></div>', unsafe_allow_html=True)
                 
-                # matplotlibのフォント設定を確認・修正してからグラフ表示
-                import matplotlib
-                import matplotlib.pyplot as plt
+                # 表示形式の選択（画像：分析直後に描画したPNG／インタラクティブ：拡大・値の確認ができるPlotlyのグラフ）
+                chart_mode = "画像"
+                if analysis_result is not None:
+                    chart_mode = st.radio("グラフの表示形式", ["画像", "インタラクティブ（拡大・値の確認）"],
+                                          horizontal=True, key='result_chart_mode')
                 
-                # Windows環境の日本語フォント設定
-                try:
-                    # Windows標準の日本語フォントを優先設定
-                    matplotlib.rcParams['font.family'] = ['Yu Gothic', 'Meiryo', 'MS Gothic', 'DejaVu Sans']
-                    matplotlib.rcParams['font.sans-serif'] = ['Yu Gothic', 'Meiryo', 'MS Gothic', 'DejaVu Sans']
-                    # 警告を抑制
-                    matplotlib.rcParams['axes.unicode_minus'] = False
-                except Exception as e:
-                    pass  # フォント設定に失敗してもエラーで止まらないように
-                
-                # グラフのタイトルを日本語で設定
-                try:
-                    axes = fig.get_axes()
-                    if len(axes) >= 3:
-                        # グラフタイトル設定（環境判定使用）
-                        try:
-                            from config.graph_config import get_graph_config
-                            use_japanese, labels = get_graph_config()
-                            axes[0].set_title(labels['actual_vs_predicted'], fontsize=12, weight='normal')
-                            axes[1].set_title(labels['point_effects'], fontsize=12, weight='normal')
-                            axes[2].set_title(labels['cumulative_effects'], fontsize=12, weight='normal')
-                        except Exception as e:
-                            print(f"グラフタイトル設定エラー: {e}")
-                            # フォールバック（英語固定）
-                            axes[0].set_title('Actual vs Predicted', fontsize=12, weight='normal')
-                            axes[1].set_title('Point Effects', fontsize=12, weight='normal')
-                            axes[2].set_title('Cumulative Effects', fontsize=12, weight='normal')
-                    
-                    # 下部の注釈メッセージを削除
-                    for ax in axes:
-                        texts = ax.texts[:]  # リストのコピーを作成
-                        for text in texts:
-                            text_content = text.get_text()
-                            if ("Note:" in text_content or 
-                                "observations were removed" in text_content or
-                                "diffuse initialization" in text_content):
-                                text.remove()  # テキストを完全に削除
-                    
-                    # 図全体のタイトルを削除
-                    fig.suptitle('')
-                except Exception as e:
-                    pass  # タイトル設定に失敗してもエラーで止まらないように
-                
-                # matplotlibの図をStreamlitに表示
-                st.pyplot(fig)
+                if chart_mode == "画像":
+                    # 分析直後に描画したPNGを表示（グラフのタイトル設定・注釈の削除は分析時に実施済み）
+                    st.image(fig.png, use_container_width=True)
+                else:
+                    # 全期間は間引いた点を表示し、期間を絞った場合はその期間の全データを表示
+                    chart_dates = pd.DatetimeIndex(analysis_result.dates)
+                    chart_min, chart_max = chart_dates[0].date(), chart_dates[-1].date()
+                    chart_range = (chart_min, chart_max)
+                    if chart_min < chart_max:
+                        chart_range = st.slider("表示期間（期間を絞ると全データで表示）", min_value=chart_min,
+                                                max_value=chart_max, value=(chart_min, chart_max),
+                                                format="YYYY/MM/DD", key='result_chart_range')
+                    x_range = None if tuple(chart_range) == (chart_min, chart_max) else tuple(chart_range)
+                    st.plotly_chart(build_interactive_result_chart(analysis_result, x_range=x_range),
+                                    use_container_width=True)
                 
                 # グラフの見方（常時表示・アプリ画面では日本語固定）
                 try:
@@ -2155,11 +2103,6 @@ if st.session_state.get(SESSION_KEYS['ANALYSIS_COMPLETED'], False) and st.sessio
             
             except Exception as e:
                 st.error(f"グラフ表示でエラーが発生しました: {str(e)}")
-                # フォールバック：元の図をそのまま表示
-                try:
-                    st.pyplot(fig)
-                except:
-                    st.error("グラフの表示に失敗しました。")
         
 
         
@@ -2190,51 +2133,24 @@ if st.session_state.get(SESSION_KEYS['ANALYSIS_COMPLETED'], False) and st.sessio
             alpha = analysis_params.get('alpha', 0.05)
             confidence_level = int((1 - alpha) * 100)  # 0.05 → 95%, 0.1 → 90%
             
+            # ファイルは作成ボタンが押されたときにだけ作成し、結果のハッシュ値ごとにメモする
+            export_manager = get_export_manager()
+            export_lang = get_export_language()
+            is_single_group = current_analysis_type == "単群推定（処置群のみを使用）"
+            
             # ボタンを横並びで配置
             col1, col2 = st.columns(2)
             
             # PDF形式でのダウンロード
             with col1:
                 try:
-                    if current_analysis_type == "単群推定（処置群のみを使用）":
-                        pdf_href, pdf_filename = get_single_group_comprehensive_pdf_download_link(
-                            ci, analysis_info, summary_df, fig, confidence_level=confidence_level
-                        )
-                    else:
-                        pdf_href, pdf_filename = get_comprehensive_pdf_download_link(
-                            ci, analysis_info, summary_df, fig, confidence_level=confidence_level
+                    build_pdf = build_single_group_comprehensive_pdf if is_single_group else build_comprehensive_pdf
+                    render_lazy_download_button(
+                        "分析結果サマリーとグラフ（PDF）", PDF_MIME, key="download_pdf",
+                        export_key=export_manager.make_key(analysis_result, 'pdf', export_lang, confidence_level, analysis_info),
+                        builder=lambda: build_pdf(
+                            ci, analysis_info, summary_df, fig, confidence_level=confidence_level, result=analysis_result
                         )
-                    
-                    st.markdown(
-                        f"""
-                        <a href="{pdf_href}" download="{pdf_filename}">
-                            <button style="
-                                background:linear-gradient(90deg,#ff6b6b,#ee5a52);
-                                border:1px solid transparent;
-                                border-radius:0.5rem;
-                                color:white;
-                                cursor:pointer;
-                                font-family:'Source Sans Pro',sans-serif;
-                                font-size:1rem;
-                                font-weight:400;
-                                line-height:1.6;
-                                margin:0;
-                                padding:0.5rem 0.75rem;
-                                text-align:center;
-                                text-decoration:none;
-                                user-select:none;
-                                vertical-align:middle;
-                                width:100%;
-                                box-sizing:border-box;
-                                transition:all 0.2s;
-                            " 
-                            onmouseover="this.style.background='linear-gradient(90deg,#ff5252,#e53935)';"
-                            onmouseout="this.style.background='linear-gradient(90deg,#ff6b6b,#ee5a52)';">
-                                分析結果サマリーとグラフ（PDF）
-                            </button>
-                        </a>
-                        """, 
-                        unsafe_allow_html=True
                     )
                 except Exception as e:
                     # PDF生成エラーの詳細情報を表示
@@ -2252,45 +2168,20 @@ if st.session_state.get(SESSION_KEYS['ANALYSIS_COMPLETED'], False) and st.sessio
             # CSV形式でのダウンロード
             with col2:
                 try:
-                    if current_analysis_type == "単群推定（処置群のみを使用）":
-                        csv_href, csv_filename = get_single_group_comprehensive_csv_download_link(
-                            ci, analysis_info, confidence_level=confidence_level
+                    build_csv = build_single_group_comprehensive_csv if is_single_group else build_comprehensive_csv
+                    # 長期間のデータではCSVが大きくなるため、gzip・zip形式での圧縮を選択可能
+                    csv_compression_labels = {'圧縮なし（.csv）': None, 'gzip形式（.csv.gz）': 'gzip', 'zip形式（.zip）': 'zip'}
+                    csv_compression = csv_compression_labels[st.selectbox(
+                        "CSVの圧縮形式", list(csv_compression_labels), key="download_csv_compression"
+                    )]
+                    csv_fmt = 'csv' if csv_compression is None else f'csv.{csv_compression}'
+                    render_lazy_download_button(
+                        "予測値・実測値の詳細データ（CSV）", CSV_MIMES[csv_compression], key=f"download_{csv_fmt}",
+                        export_key=export_manager.make_key(analysis_result, csv_fmt, 'ja', confidence_level, analysis_info),
+                        builder=lambda: build_csv(
+                            ci, analysis_info, confidence_level=confidence_level, result=analysis_result,
+                            compression=csv_compression
                         )
-                    else:
-                        csv_href, csv_filename = get_comprehensive_csv_download_link(
-                            ci, analysis_info, confidence_level=confidence_level
-                        )
-                    
-                    st.markdown(
-                        f"""
-                        <a href="{csv_href}" download="{csv_filename}">
-                            <button style="
-                                background:linear-gradient(90deg,#ff6b6b,#ee5a52);
-                                border:1px solid transparent;
-                                border-radius:0.5rem;
-                                color:white;
-                                cursor:pointer;
-                                font-family:'Source Sans Pro',sans-serif;
-                                font-size:1rem;
-                                font-weight:400;
-                                line-height:1.6;
-                                margin:0;
-                                padding:0.5rem 0.75rem;
-                                text-align:center;
-                                text-decoration:none;
-                                user-select:none;
-                                vertical-align:middle;
-                                width:100%;
-                                box-sizing:border-box;
-                                transition:all 0.2s;
-                            " 
-                            onmouseover="this.style.background='linear-gradient(90deg,#ff5252,#e53935)';"
-                            onmouseout="this.style.background='linear-gradient(90deg,#ff6b6b,#ee5a52)';">
-                                予測値・実測値の詳細データ（CSV）
-                            </button>
-                        </a>
-                        """, 
-                        unsafe_allow_html=True
                     )
                 except Exception as e:
                     # CSV生成エラーの詳細情報を表示
@@ -2304,6 +2195,44 @@ if st.session_state.get(SESSION_KEYS['ANALYSIS_COMPLETED'], False) and st.sessio
                     
                     # 代替手段を案内
                     st.info("💡 CSVダウンロードでエラーが発生しました。画面に表示されている結果表を手動でコピーするか、分析を再実行してください。")
+            
+            # インタラクティブなHTMLレポート（グラフの拡大・値の確認が可能、ブラウザだけで閲覧できる）
+            if analysis_result is not None:
+                try:
+                    render_lazy_download_button(
+                        "グラフを操作できるHTMLレポート", HTML_MIME, key="download_html",
+                        export_key=export_manager.make_key(analysis_result, 'html', 'ja', confidence_level, analysis_info),
+                        builder=lambda: build_html_report(
+                            analysis_result, analysis_info, summary_df, confidence_level=confidence_level,
+                            is_single_group=is_single_group
+                        ),
+                        help="サマリー表・詳細レポートと、拡大や値の確認ができるグラフを1つのHTMLファイルにまとめます"
+                    )
+                except Exception as e:
+                    st.error(f"🌐 HTML生成エラー：{str(e)}")
+            
+            # 列指向形式（Parquet・Arrow）・JSONでのダウンロード（BIツールなど下流の処理向け）
+            if analysis_result is not None:
+                with st.expander("その他の形式（Parquet・Arrow IPC・JSON）"):
+                    formats = ['parquet', 'arrow', 'json'] if is_columnar_export_available() else ['json']
+                    if len(formats) == 1:
+                        st.caption("Parquet・Arrow形式の出力には pyarrow のインストールが必要です。")
+                    export_format = st.selectbox(
+                        "出力形式",
+                        formats,
+                        format_func=lambda fmt: COLUMNAR_FORMATS[fmt]['label'],
+                        key="columnar_export_format"
+                    )
+                    try:
+                        render_lazy_download_button(
+                            f"分析結果（{COLUMNAR_FORMATS[export_format]['label']}）",
+                            COLUMNAR_FORMATS[export_format]['mime'],
+                            key=f"download_{export_format}",
+                            export_key=export_manager.make_key(analysis_result, export_format, 'ja', confidence_level, analysis_info),
+                            builder=lambda: build_columnar_export(analysis_result, analysis_info, export_format, confidence_level)
+                        )
+                    except Exception as e:
+                        st.error(f"📦 ファイル生成エラー：{str(e)}")
                     
         except Exception as e:
             st.error(f"ダウンロード機能でエラーが発生しました: {str(e)}")
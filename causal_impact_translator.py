@@ -1,11 +1,142 @@
+import hashlib
 import re
 
+from utils_cache import ByteLRU
+
+# 数値（負号・小数を含む）
+_NUM = r"-?[0-9]+(?:\.[0-9]+)?"
+
+# 段落内の数値を取り出すパターン（モジュール読み込み時に1回だけコンパイル）
+_AVG_VALUE = re.compile(rf"average value of approx\. ({_NUM})")
+_EXP_RESPONSE = re.compile(rf"expected an average response of ({_NUM})")
+_PRED_INTERVAL = re.compile(r"prediction is \[([0-9., -]+)\]")
+_EFFECT = re.compile(rf"This effect is ({_NUM}) with")
+_EFFECT_INTERVAL = re.compile(r"[0-9.]+% interval of\s+\[([0-9., -]+)\]")
+_OVERALL_VALUE = re.compile(rf"overall value of ({_NUM})")
+_SUM_EXPECTED = re.compile(rf"expected\s+a sum of ({_NUM})")
+_INCREASE = re.compile(rf"increase of \+?({_NUM}%)")
+_DECREASE = re.compile(rf"decrease of ({_NUM}%)")
+_PERCENT_INTERVAL = re.compile(r"percentage is \[([0-9.%, -]+)\]")
+_ABS_EFFECT = re.compile(rf"absolute effect \(({_NUM})\)")
+_P_PERCENT = re.compile(rf"p = ({_NUM}%)")
+_P_SMALL = re.compile(rf"probability p = ({_NUM})")
+_BLANK_LINES = re.compile(r"\n\s*\n\s*\n+")
+
+# 翻訳結果のメモ（(レポートのハッシュ値, alpha) → 日本語レポート）
+# Streamlitの再実行ごとに同じレポートを翻訳し直さないためのもの（全セッションのスレッドから参照するためロック付き）
+_TRANSLATION_CACHE_SIZE = 64
+_TRANSLATION_CACHE_MAX_CHARS = 4 * 1024 * 1024
+_TRANSLATION_CACHE = ByteLRU(_TRANSLATION_CACHE_MAX_CHARS, _TRANSLATION_CACHE_SIZE)
+
+
+def _first_paragraph_jp(text, alpha_percent):
+    # パターン1: 介入期間と予測値の比較（有意な場合は "By contrast" を含む）
+    avg_value = _AVG_VALUE.search(text)
+    exp_response = _EXP_RESPONSE.search(text)
+    interval_pred = _PRED_INTERVAL.search(text)
+    effect = _EFFECT.search(text)
+    effect_interval = _EFFECT_INTERVAL.search(text)
+    if not (avg_value and exp_response and interval_pred and effect and effect_interval):
+        return None
+    contrast = "対照的に、介入がなかった場合には" if "By contrast" in text else "もし介入がなかった場合、"
+    return f"""介入期間中、応答変数は平均値が約{avg_value.group(1)}でした。{contrast}予測される平均応答値は{exp_response.group(1)}でした。この反事実予測の{alpha_percent}%信頼区間は[{interval_pred.group(1)}]です。この予測値を観測値から引くことで、介入が応答変数に与えた因果効果の推定値が得られます。この効果は{effect.group(1)}であり、{alpha_percent}%信頼区間は[{effect_interval.group(1)}]です。この効果の有意性については以下を参照してください。"""
+
+
+def _second_paragraph_jp(text, alpha_percent):
+    # パターン2: 介入期間の合計値
+    overall_value = _OVERALL_VALUE.search(text)
+    sum_expected = _SUM_EXPECTED.search(text)
+    sum_interval = _PRED_INTERVAL.search(text)
+    if not (overall_value and sum_expected and sum_interval):
+        return None
+    return f"""介入期間中の個々のデータポイントを合計すると（これが意味を持つ場合のみ）、応答変数の全体値は{overall_value.group(1)}でした。介入がなかった場合、予測される合計値は{sum_expected.group(1)}でした。この予測の{alpha_percent}%信頼区間は[{sum_interval.group(1)}]です。"""
+
+
+def _third_paragraph_jp(text, alpha_percent):
+    # パターン3: 相対効果（増加・減少）
+    percentage_interval = _PERCENT_INTERVAL.search(text)
+    if not percentage_interval:
+        return None
+    increase = _INCREASE.search(text)
+    if increase:
+        change = f"{increase.group(1)}の増加"
+    else:
+        decrease = _DECREASE.search(text)
+        if not decrease:
+            return None
+        change = f"{decrease.group(1)}の減少"
+    return f"""上記の結果は絶対値で示されています。相対的には、応答変数は{change}を示しました。この割合の{alpha_percent}%信頼区間は[{percentage_interval.group(1)}]です。"""
+
+
+def _positive_significant_jp(text, alpha_percent):
+    # パターン4b: 正の効果があり、統計的に有意である場合
+    effect_value = _ABS_EFFECT.search(text)
+    effect_str = effect_value.group(1) if effect_value else "X"
+    return f"""これは、介入期間中に観察された正の効果が統計的に有意であり、ランダムな変動に起因する可能性が低いことを意味します。ただし、この増加が実質的な意味を持つかどうかという問題は、絶対効果（{effect_str}）を介入の本来の目標と比較することによってのみ答えることができることに注意すべきです。"""
+
+
+def _not_significant_p_jp(text, alpha_percent):
+    # パターン6: 有意でない場合のp値
+    p_value = _P_PERCENT.search(text)
+    if not p_value:
+        return None
+    return f"""この効果が偶然によって得られる確率はp = {p_value.group(1)}です。これは、この効果が見せかけのものである可能性があり、一般的には統計的に有意とはみなされないことを意味します。"""
+
+
+def _significant_p_jp(text, alpha_percent):
+    # パターン6b: 有意な場合のp値
+    p_value = _P_SMALL.search(text)
+    p_str = p_value.group(1) if p_value else "X"
+    return f"""この効果が偶然によって得られる確率は非常に小さいです（ベイズ単側尾部確率 p = {p_str}）。これは、因果効果が統計的に有意であると考えられることを意味します。"""
+
+
+def _fixed_text(translation):
+    return lambda text, alpha_percent: translation
+
+
+# 段落パターン表（英語の段落 → 日本語訳を作る関数）。上から順に適用する
+_PARAGRAPH_PATTERNS = [
+    (re.compile(r"During the post-intervention period.*?see below\.", re.DOTALL), _first_paragraph_jp),
+    (re.compile(r"Summing up the individual data points.*?this prediction is \[[0-9., -]+\]\.", re.DOTALL), _second_paragraph_jp),
+    (re.compile(r"The above results are given in terms of absolute numbers.*?this percentage is \[[0-9.%, -]+\]\.", re.DOTALL), _third_paragraph_jp),
+    # パターン4: 正の効果だが統計的に有意でない場合
+    (re.compile(r"This means that, although the intervention appears.*?was above zero\.", re.DOTALL), _fixed_text(
+        """これは、介入が正の効果をもたらしたように見えるものの、介入期間全体を考慮するとこの効果は統計的に有意ではないことを意味します。介入期間内の個々の日や短い期間については（効果の時系列グラフの下限が0より上にある場合に示されるように）依然として有意な効果があった可能性があります。""")),
+    (re.compile(r"This means that the positive effect observed during the intervention.*?of the underlying intervention\.", re.DOTALL), _positive_significant_jp),
+    # パターン4c: 統計的に有意な負の効果
+    (re.compile(r"This means that the negative effect observed during the intervention.*?in the absence of the intervention\.", re.DOTALL), _fixed_text(
+        """これは、介入期間中に観察された負の効果が統計的に有意であることを意味します。実験者が正の効果を期待していた場合は、制御変数の異常が、介入がない場合に応答変数で起こるはずだったことについて過度に楽観的な期待を引き起こした可能性があるかどうかを再確認することをお勧めします。""")),
+    # パターン4d: 統計的に有意でない負の効果
+    (re.compile(r"This means that, although it may look as though the intervention has.*?meaningfully interpreted\.", re.DOTALL), _fixed_text(
+        """これは、介入期間全体を考慮した場合、応答変数に対して介入が負の効果を及ぼしたように見えるかもしれませんが、この効果は統計的に有意ではないため、意味のある解釈はできないことを意味します。""")),
+    # パターン5: 有意でない場合の補足
+    (re.compile(r"The apparent effect could be the result of random fluctuations.*?during the learning period\.", re.DOTALL), _fixed_text(
+        """見かけ上の効果は、介入と無関係なランダムな変動の結果である可能性があります。これは、介入期間が非常に長く、効果が既に消失した時間の多くを含む場合によく起こります。また、介入期間が短すぎてシグナルとノイズを区別できない場合にも起こり得ます。最後に、有意な効果が見つからないのは、制御変数が十分でない場合や、これらの変数が学習期間中に応答変数とうまく相関していない場合にも起こることがあります。""")),
+    (re.compile(rf"The probability of obtaining this effect by chance is p = {_NUM}%.*?considered statistically\s+significant\.", re.DOTALL), _not_significant_p_jp),
+    (re.compile(r"The probability of obtaining this effect by chance is very small.*?considered statistically\s+significant\.", re.DOTALL), _significant_p_jp),
+    # サマリー形式の行
+    (re.compile(rf"Posterior tail-area probability p: {_NUM}"),
+     lambda text, alpha_percent: f"事後確率 p値: {text.rsplit(' ', 1)[-1]}"),
+    (re.compile(rf"Posterior prob(?:\.|ability) of a causal effect: {_NUM}%"),
+     lambda text, alpha_percent: f"因果効果の事後確率: {text.rsplit(' ', 1)[-1]}"),
+]
+
+
+def clear_translation_cache():
+    """
+    翻訳結果のメモを消去する
+    """
+    _TRANSLATION_CACHE.clear()
+
+
 class CausalImpactTranslator:
     """
     CausalImpactの分析レポートを日本語に翻訳するクラス
     
     英語の原文パターンを正規表現で検出し、対応する日本語訳に変換します。
-    新しいパターンを追加する場合は、translate_report メソッド内のパターンリストに追加してください。
+    パターンはモジュール読み込み時にコンパイル済みで、翻訳結果は (レポートのハッシュ値, alpha) ごとに
+    メモされるため、同じレポートの2回目以降の翻訳は辞書参照のみで済みます。
+    新しいパターンを追加する場合は、_PARAGRAPH_PATTERNS に追加してください。
     """
     
     def __init__(self):
@@ -27,165 +158,29 @@ class CausalImpactTranslator:
         str
             翻訳された日本語レポート
         """
+        key = ('report', hashlib.sha1(report.encode('utf-8')).hexdigest(), alpha)
+        return _TRANSLATION_CACHE.get_or_build(key, lambda: self._translate_report_uncached(report, alpha))
+    
+    def _translate_report_uncached(self, report, alpha):
         # 信頼区間をパーセント表示に変換（例：0.95 → 95%）
         alpha_percent = int(alpha * 100)
         
-        # 翻訳処理開始（元のレポートを複製して変換処理）
-        report_jp = report
-        
         # 先頭の「Analysis report {CausalImpact}」を置換
-        report_jp = report_jp.replace("Analysis report {CausalImpact}", "分析レポート {CausalImpact}")
-        
-        # パターン1: 最初の段落（介入期間と予測値の比較）
-        first_para_match = re.search(r"During the post-intervention period.*?see below\.", report_jp, re.DOTALL)
-        if first_para_match:
-            # 数値をキャプチャ
-            avg_value = re.search(r"average value of approx. ([0-9.]+)", first_para_match.group(0))
-            exp_response = re.search(r"expected an average response of ([0-9.]+)", first_para_match.group(0))
-            interval_pred = re.search(r"prediction is \[([0-9., -]+)\]", first_para_match.group(0))
-            effect = re.search(r"This effect is ([0-9.+\-]+) with", first_para_match.group(0))
-            effect_interval = re.search(r"95% interval of\s+\[([0-9., -]+)\]", first_para_match.group(0))
-            
-            if avg_value and exp_response and interval_pred and effect and effect_interval:
-                # 数値を保持して日本語化 - 信頼区間を動的に反映
-                first_para_jp = f"""介入期間中、応答変数は平均値が約{avg_value.group(1)}でした。もし介入がなかった場合、予測される平均応答値は{exp_response.group(1)}でした。この反事実予測の{alpha_percent}%信頼区間は[{interval_pred.group(1)}]です。この予測値を観測値から引くことで、介入が応答変数に与えた因果効果の推定値が得られます。この効果は{effect.group(1)}であり、{alpha_percent}%信頼区間は[{effect_interval.group(1)}]です。この効果の有意性については以下を参照してください。"""
-                
-                # 元のテキストを置換
-                report_jp = report_jp.replace(first_para_match.group(0), first_para_jp)
+        report_jp = report.replace("Analysis report {CausalImpact}", "分析レポート {CausalImpact}")
         
-        # パターン1b: 最初の段落の別パターン（"By contrast"を含む負の効果の場合）
-        alt_first_para_match = re.search(r"During the post-intervention period.*?By contrast.*?see below\.", report_jp, re.DOTALL)
-        if alt_first_para_match:
-            # 数値をキャプチャ
-            avg_value = re.search(r"average value of approx. ([0-9.]+)", alt_first_para_match.group(0))
-            exp_response = re.search(r"expected an average response of ([0-9.]+)", alt_first_para_match.group(0))
-            interval_pred = re.search(r"prediction is \[([0-9., -]+)\]", alt_first_para_match.group(0))
-            effect = re.search(r"This effect is (-[0-9.]+) with", alt_first_para_match.group(0))
-            effect_interval = re.search(r"95% interval of\s+\[([0-9., -]+)\]", alt_first_para_match.group(0))
-            
-            if avg_value and exp_response and interval_pred and effect and effect_interval:
-                # 数値を保持して日本語化 - 信頼区間を動的に反映
-                alt_first_para_jp = f"""介入期間中、応答変数は平均値が約{avg_value.group(1)}でした。対照的に、介入がなかった場合には、予測される平均応答値は{exp_response.group(1)}でした。この反事実予測の{alpha_percent}%信頼区間は[{interval_pred.group(1)}]です。この予測値を観測値から引くことで、介入が応答変数に与えた因果効果の推定値が得られます。この効果は{effect.group(1)}であり、{alpha_percent}%信頼区間は[{effect_interval.group(1)}]です。この効果の有意性については以下を参照してください。"""
-                
-                # 元のテキストを置換
-                report_jp = report_jp.replace(alt_first_para_match.group(0), alt_first_para_jp)
-        
-        # パターン2: 二番目の "Summing up the individual data points..." 段落
-        second_para_match = re.search(r"Summing up the individual data points.*?this prediction is \[[0-9., -]+\].", report_jp, re.DOTALL)
-        if second_para_match:
-            # 数値をキャプチャ
-            overall_value = re.search(r"overall value of ([0-9.]+)", second_para_match.group(0))
-            sum_expected = re.search(r"expected\s+a sum of ([0-9.]+)", second_para_match.group(0))
-            sum_interval = re.search(r"prediction is \[([0-9., -]+)\]", second_para_match.group(0))
-            
-            if overall_value and sum_expected and sum_interval:
-                # 数値を保持して日本語化 - 信頼区間を動的に反映
-                second_para_jp = f"""介入期間中の個々のデータポイントを合計すると（これが意味を持つ場合のみ）、応答変数の全体値は{overall_value.group(1)}でした。介入がなかった場合、予測される合計値は{sum_expected.group(1)}でした。この予測の{alpha_percent}%信頼区間は[{sum_interval.group(1)}]です。"""
-                
-                # 元のテキストを置換
-                report_jp = report_jp.replace(second_para_match.group(0), second_para_jp)
-        
-        # パターン3: 三番目の "The above results are given in terms of absolute numbers..." 段落（増加の場合）
-        third_para_match = re.search(r"The above results are given in terms of absolute numbers.*?this percentage is \[[0-9.%, -]+\].", report_jp, re.DOTALL)
-        if third_para_match:
-            # 数値をキャプチャ
-            increase = re.search(r"increase of \+?([0-9.%]+)", third_para_match.group(0))
-            percentage_interval = re.search(r"percentage is \[([0-9.%, -]+)\]", third_para_match.group(0))
-            
-            if increase and percentage_interval:
-                # 数値を保持して日本語化 - 信頼区間を動的に反映
-                third_para_jp = f"""上記の結果は絶対値で示されています。相対的には、応答変数は{increase.group(1)}の増加を示しました。この割合の{alpha_percent}%信頼区間は[{percentage_interval.group(1)}]です。"""
-                
-                # 元のテキストを置換
-                report_jp = report_jp.replace(third_para_match.group(0), third_para_jp)
-        
-        # パターン3b: 三番目の段落の別パターン（"decrease"を含む場合 - 負の効果）
-        alt_third_para_match = re.search(r"The above results are given in terms of absolute numbers.*?decrease of -[0-9.]+%.*?this percentage is \[[0-9.%, -]+\].", report_jp, re.DOTALL)
-        if alt_third_para_match:
-            # 数値をキャプチャ
-            decrease = re.search(r"decrease of (-[0-9.]+%)", alt_third_para_match.group(0))
-            percentage_interval = re.search(r"percentage is \[([0-9.%, -]+)\]", alt_third_para_match.group(0))
-            
-            if decrease and percentage_interval:
-                # 数値を保持して日本語化 - 信頼区間を動的に反映
-                alt_third_para_jp = f"""上記の結果は絶対値で示されています。相対的には、応答変数は{decrease.group(1)}の減少を示しました。この割合の{alpha_percent}%信頼区間は[{percentage_interval.group(1)}]です。"""
-                
-                # 元のテキストを置換
-                report_jp = report_jp.replace(alt_third_para_match.group(0), alt_third_para_jp)
-        
-        # パターン4: 四番目の "This means that, although the intervention appears..." 段落
-        fourth_para_match = re.search(r"This means that, although the intervention appears.*?was above zero.", report_jp, re.DOTALL)
-        if fourth_para_match:
-            fourth_para_jp = """これは、介入が正の効果をもたらしたように見えるものの、介入期間全体を考慮するとこの効果は統計的に有意ではないことを意味します。介入期間内の個々の日や短い期間については（効果の時系列グラフの下限が0より上にある場合に示されるように）依然として有意な効果があった可能性があります。"""
-            report_jp = report_jp.replace(fourth_para_match.group(0), fourth_para_jp)
-        
-        # パターン4b: 統計的に有意な場合の代替パターン（正の効果があり、統計的に有意である場合）
-        alt_fourth_para_match = re.search(r"This means that the positive effect observed during the intervention.*?of the underlying intervention\.", report_jp, re.DOTALL)
-        if alt_fourth_para_match:
-            # 効果値を抽出
-            effect_value = re.search(r"absolute effect \(([0-9.]+)\)", alt_fourth_para_match.group(0))
-            effect_str = effect_value.group(1) if effect_value else "X"
-            alt_fourth_para_jp = f"""これは、介入期間中に観察された正の効果が統計的に有意であり、ランダムな変動に起因する可能性が低いことを意味します。ただし、この増加が実質的な意味を持つかどうかという問題は、絶対効果（{effect_str}）を介入の本来の目標と比較することによってのみ答えることができることに注意すべきです。"""
-            report_jp = report_jp.replace(alt_fourth_para_match.group(0), alt_fourth_para_jp)
-        
-        # パターン4c: 統計的に有意な負の効果を持つ場合のパターン
-        negative_fourth_para_match = re.search(r"This means that the negative effect observed during the intervention.*?in the absence of the intervention\.", report_jp, re.DOTALL)
-        if negative_fourth_para_match:
-            negative_fourth_para_jp = """これは、介入期間中に観察された負の効果が統計的に有意であることを意味します。実験者が正の効果を期待していた場合は、制御変数の異常が、介入がない場合に応答変数で起こるはずだったことについて過度に楽観的な期待を引き起こした可能性があるかどうかを再確認することをお勧めします。"""
-            report_jp = report_jp.replace(negative_fourth_para_match.group(0), negative_fourth_para_jp)
-        
-        # パターン4d: 「It may look as though...」のパターン（統計的に有意でない負の効果）
-        alt_negative_para_match = re.search(r"This means that, although it may look as though the intervention has.*?meaningfully interpreted\.", report_jp, re.DOTALL)
-        if alt_negative_para_match:
-            alt_negative_para_jp = """これは、介入期間全体を考慮した場合、応答変数に対して介入が負の効果を及ぼしたように見えるかもしれませんが、この効果は統計的に有意ではないため、意味のある解釈はできないことを意味します。"""
-            report_jp = report_jp.replace(alt_negative_para_match.group(0), alt_negative_para_jp)
-        
-        # パターン5: 五番目の "The apparent effect could be the result of random fluctuations..." 段落
-        fifth_para_match = re.search(r"The apparent effect could be the result of random fluctuations.*?during the learning period.", report_jp, re.DOTALL)
-        if fifth_para_match:
-            fifth_para_jp = """見かけ上の効果は、介入と無関係なランダムな変動の結果である可能性があります。これは、介入期間が非常に長く、効果が既に消失した時間の多くを含む場合によく起こります。また、介入期間が短すぎてシグナルとノイズを区別できない場合にも起こり得ます。最後に、有意な効果が見つからないのは、制御変数が十分でない場合や、これらの変数が学習期間中に応答変数とうまく相関していない場合にも起こることがあります。"""
-            report_jp = report_jp.replace(fifth_para_match.group(0), fifth_para_jp)
-        
-        # パターン6: 最後の "The probability of obtaining this effect by chance..." 段落（有意でない場合）
-        sixth_para_match = re.search(r"The probability of obtaining this effect by chance is p = [0-9]+%.*?considered statistically significant.", report_jp, re.DOTALL)
-        if sixth_para_match:
-            p_value = re.search(r"p = ([0-9]+%)", sixth_para_match.group(0))
-            if p_value:
-                sixth_para_jp = f"""この効果が偶然によって得られる確率はp = {p_value.group(1)}です。これは、この効果が見せかけのものである可能性があり、一般的には統計的に有意とはみなされないことを意味します。"""
-                report_jp = report_jp.replace(sixth_para_match.group(0), sixth_para_jp)
-        
-        # パターン6b: 最後の段落の別パターン（効果が統計的に有意な場合）
-        alt_sixth_para_match = re.search(r"The probability of obtaining this effect by chance is very small.*?considered statistically\s+significant\.", report_jp, re.DOTALL)
-        if alt_sixth_para_match:
-            # p値を抽出
-            p_value = re.search(r"probability p = ([0-9.]+)", alt_sixth_para_match.group(0))
-            p_str = p_value.group(1) if p_value else "X"
-            alt_sixth_para_jp = f"""この効果が偶然によって得られる確率は非常に小さいです（ベイズ単側尾部確率 p = {p_str}）。これは、因果効果が統計的に有意であると考えられることを意味します。"""
-            report_jp = report_jp.replace(alt_sixth_para_match.group(0), alt_sixth_para_jp)
-        
-        # p値の行を日本語に置換
-        p_line_match = re.search(r"Posterior tail-area probability p: [0-9.]+", report_jp)
-        if p_line_match:
-            p_value = re.search(r"p: ([0-9.]+)", p_line_match.group(0))
-            if p_value:
-                p_line_jp = f"事後確率 p値: {p_value.group(1)}"
-                report_jp = report_jp.replace(p_line_match.group(0), p_line_jp)
-        
-        # 因果効果の確率の行を日本語に置換
-        prob_line_match = re.search(r"Posterior probability of a causal effect: [0-9.]+%", report_jp)
-        if prob_line_match:
-            prob_value = re.search(r": ([0-9.]+%)", prob_line_match.group(0))
-            if prob_value:
-                prob_line_jp = f"因果効果の事後確率: {prob_value.group(1)}"
-                report_jp = report_jp.replace(prob_line_match.group(0), prob_line_jp)
+        # 段落パターン表を順に適用（数値を保持して日本語化）
+        for pattern, build_translation in _PARAGRAPH_PATTERNS:
+            match = pattern.search(report_jp)
+            if match:
+                translation = build_translation(match.group(0), alpha_percent)
+                if translation is not None:
+                    report_jp = report_jp[:match.start()] + translation + report_jp[match.end():]
         
         # 改行の調整：連続する改行を1つに統一して段落間の余白を調整
-        report_jp = re.sub(r'\n\s*\n\s*\n+', '\n\n', report_jp)
-        
-        return report_jp
+        return _BLANK_LINES.sub('\n\n', report_jp)
 
 
-def translate_causal_impact_report(report, alpha=0.95):
+def translate_causal_impact_report(report, alpha=0.95, result=None):
     """
     CausalImpactレポートを日本語に翻訳する便利な関数
     
@@ -195,11 +190,22 @@ def translate_causal_impact_report(report, alpha=0.95):
         原文の英語レポート文字列
     alpha : float, optional (default=0.95)
         信頼区間の値（0〜1の間）
+    result : AnalysisResult, optional
+        分析結果オブジェクト。指定した場合は英語レポートを翻訳せず、
+        数値から日本語レポートを直接作成する（utils_report.generate_report）
         
     Returns:
     --------
     str
         翻訳された日本語レポート
     """
+    if result is not None:
+        try:
+            from utils_report import generate_report
+            report_jp = generate_report(result, confidence_level=int(round(alpha * 100)), use_japanese=True)
+            if report_jp is not None:
+                return report_jp
+        except Exception as e:
+            print(f"分析結果からのレポート作成に失敗したため英語レポートを翻訳します: {str(e)}")
     translator = CausalImpactTranslator()
-    return translator.translate_report(report, alpha) 
\ No newline at end of file
+    return translator.translate_report(report, alpha) 
@@ -44,6 +44,17 @@ def get_app_content():
         'comment_not_significant': '相対効果は {effect:+.1f}% ですが、統計的には有意ではありません（p = {p_value:.3f}）。詳しくは「詳細レポート」を参照ください。'
     }
 
+def get_app_report_templates():
+    """
+    アプリ画面の詳細レポート用の文面テンプレート（日本語固定）
+    
+    Returns:
+    --------
+    dict: 文面テンプレート辞書（config.pdf_templates と共通）
+    """
+    from config.pdf_templates import get_report_templates_japanese
+    return get_report_templates_japanese()
+
 def get_app_frequency_display_name(freq_option):
     """
     アプリ画面用データ頻度の表示名を取得（日本語固定）
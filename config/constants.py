@@ -14,6 +14,19 @@ CONFIG_DIR = os.path.join(PROJECT_ROOT, 'config')
 DATA_DIR = os.path.join(PROJECT_ROOT, 'data')
 DOCS_DIR = os.path.join(PROJECT_ROOT, 'docs')
 FONTS_DIR = os.path.join(PROJECT_ROOT, 'fonts')
+CACHE_DIR = os.path.join(PROJECT_ROOT, '.cache')
+FONT_CACHE_PATH = os.path.join(CACHE_DIR, 'font_cache.json')
+
+# === フォント設定 ===
+# 実行時のダウンロードは行わず、FONTS_DIR とシステムのフォントのみを使用する
+# （同梱フォントはビルド時に scripts/prepare_fonts.py で作成）
+BUNDLED_FONT_NAME = 'JapaneseSubset'
+BUNDLED_FONT_PATH = os.path.join(FONTS_DIR, 'JapaneseSubset.ttf')
+BUNDLED_FONT_EXTENSIONS = ('.ttf', '.ttc')
+FONT_NEGATIVE_CACHE_TTL = 3600  # フォントが見つからなかった結果を再利用する秒数
+FONT_SUBSET_DIR = os.path.join(CACHE_DIR, 'font_subsets')  # PDFごとのサブセットフォント
+FONT_SUBSET_CACHE_LIMIT = 128  # 保存しておくサブセットフォントの最大数
+FONT_SUBSET_MEMORY_LIMIT = 16  # reportlabに登録しておくサブセットフォントの最大数（古いものから登録を解除）
 
 CUSTOM_CSS_PATH = os.path.join(STYLES_DIR, 'custom.css')
 
@@ -44,7 +57,7 @@ PERIOD_DEFAULTS = {
 # === 削除対象のセッションキー ===
 RESET_SESSION_KEYS = [
     'df_treat', 'df_ctrl', 'treatment_name', 'control_name',
-    'dataset', 'analysis_period', 'analysis_params'
+    'dataset', 'dataset_version', 'analysis_period', 'analysis_params'
 ]
 
 # === UI設定 ===
@@ -63,6 +76,76 @@ DEFAULT_ANALYSIS_PARAMS = {
     'season_duration': 1
 }
 
+# === 分析ワーカープール設定 ===
+# 全セッションで共有する分析用プロセスプール（utils_worker_pool.py）
+WORKER_POOL_SETTINGS = {
+    'enabled': True,
+    'max_workers': max(1, min(4, (os.cpu_count() or 2) - 1)),  # CPUの過剰使用を防ぐ上限
+    'max_queue_size': 8,          # 実行中以外に待機できる分析数
+    'max_jobs_per_session': 1,    # 1セッションが同時に投入できる分析数
+    'queue_wait_seconds': 5,      # 待機枠が空くまで待つ時間（秒）
+    'timeout_seconds': 600        # 1分析あたりのタイムアウト（秒）
+}
+
+# === エクスポート（ダウンロード用ファイル）のメモ設定 ===
+EXPORT_CACHE_SETTINGS = {
+    'max_bytes': 64 * 1024 * 1024,  # メモするファイルの合計サイズの上限（超えた場合は古いものから破棄）
+    'max_entries': 256              # メモするファイル数の上限
+}
+
+# === CSV出力設定 ===
+CSV_EXPORT_SETTINGS = {
+    'chunk_rows': 5000,   # 一度にCSVへ変換する行数
+    'compresslevel': 6    # gzip・zip圧縮のレベル（1〜9）
+}
+
+# === 分析結果グラフの描画設定 ===
+# 分析直後に1回だけ描画してグラフを解放する（utils_figure.py）
+FIGURE_RENDER_SETTINGS = {
+    'formats': ('png', 'pdf'),  # 画面表示用のPNGとPDF埋め込み用のPDF
+    'png_dpi': 150              # PNGの解像度
+}
+
+# === 描画済みグラフのメモ設定 ===
+# 分析結果のグラフのファイル内容を分析結果・形式・サイズごとにメモする（utils_chart_cache.py）
+CHART_CACHE_SETTINGS = {
+    'max_bytes': 32 * 1024 * 1024,  # メモするファイルの合計サイズの上限（超えた場合は古いものから破棄）
+    'max_entries': 512              # メモするファイル数の上限
+}
+
+# === STEP1の時系列プロット設定 ===
+# 表示幅に応じて点数を間引き、グラフの定義をデータセットごとにメモする（utils_preview_chart.py）
+PREVIEW_CHART_SETTINGS = {
+    'chart_width': 1200,       # グラフの表示幅の目安（ピクセル。wideレイアウトの本文幅）
+    'points_per_pixel': 2,     # 1ピクセルあたりの点数（区間ごとの最小値・最大値）
+    'min_points': 200,         # 1系列あたりの点数の上限の最小値
+    'max_points': 4000,        # 1系列あたりの点数の上限の最大値
+    'cache_max_bytes': 16 * 1024 * 1024,  # メモするグラフの定義（JSON）の合計サイズの上限
+    'cache_max_entries': 64    # メモするグラフ数の上限
+}
+
+# === 分析結果のインタラクティブなグラフ設定 ===
+# STEP3の3段グラフをPlotlyで表示する（utils_result_chart.py）
+RESULT_CHART_SETTINGS = {
+    'max_points': 1500,  # 1系列あたりの点数の上限（超える場合はLTTBで間引き、期間を絞ると全件を表示）
+    'webgl': True,       # WebGL（scattergl）で描画する
+    'height': 760        # グラフの高さ（ピクセル）
+}
+
+# === HTMLレポート設定 ===
+HTML_REPORT_SETTINGS = {
+    'max_points': 2000,       # グラフ1系列あたりの点数の上限（超える場合はLTTBで間引く）
+    'inline_plotlyjs': True   # plotly.js をファイルに埋め込む（Falseの場合はCDNから読み込む）
+}
+
+# === 一括PDFレポート（複数系列）設定 ===
+# 系列ごとのグラフを共有ワーカープール（WORKER_POOL_SETTINGS）で並列に作成する（utils_batch_report.py）
+BATCH_REPORT_SETTINGS = {
+    'max_in_flight': 8,     # 同時に作成中・PDF反映待ちにできるグラフ数（メモリ使用量の上限）
+    'chart_width': 480,     # PDF上のグラフの幅（ポイント）
+    'chart_height': 300     # PDF上のグラフの高さ（ポイント）
+}
+
 # === ファイル名テンプレート ===
 FILENAME_TEMPLATES = {
     'summary_csv': 'causal_impact_summary_{treatment}_{start}_{end}.csv',
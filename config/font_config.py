@@ -1,16 +1,313 @@
 # フォント設定管理モジュール
 # Streamlit Cloud対応の日本語フォント設定
+#
+# フォントの探索結果はプロセス内とディスク（FONT_CACHE_PATH）にキャッシュし、
+# reportlabへのフォント登録（TTC/TTFの解析）はプロセスごとに1回だけ行う。
+#
+# 実行時のダウンロードは行わない（ネットワークのない環境でもPDF作成が待たされないように）。
+# フォントは同梱ディレクトリ（FONTS_DIR）とシステムのフォントパスからのみ探索する。
+# 同梱フォントはビルド時に scripts/prepare_fonts.py で日本語のサブセットとして作成する。
 
+import json
 import os
 import platform
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-import urllib.request
+import threading
+import time
+
+from config.constants import (
+    FONT_CACHE_PATH, FONTS_DIR, BUNDLED_FONT_NAME, BUNDLED_FONT_PATH,
+    BUNDLED_FONT_EXTENSIONS, FONT_NEGATIVE_CACHE_TTL
+)
+
+# 探索キー → (font_name, font_path) または None（プロセス内キャッシュ）
+_FONT_LOOKUP = {}
+
+# 登録済みのフォント名 → フォントファイルのパス
+_REGISTERED_FONTS = {}
+
+# システムの日本語フォント一覧（findSystemFonts の結果から抽出）
+_SYSTEM_JAPANESE_FONTS = None
+
+_FONT_LOCK = threading.RLock()
+
+# 日本語フォントとみなすファイル名のキーワード
+JAPANESE_FONT_KEYWORDS = ['gothic', 'mincho', 'hiragino', 'yu']
+
+
+# ディスクキャッシュ上の「見つからなかった」結果
+_NOT_FOUND = object()
+
+
+def _file_signature(font_path):
+    stat = os.stat(font_path)
+    return [stat.st_size, int(stat.st_mtime)]
+
+
+def _load_font_cache():
+    try:
+        with open(FONT_CACHE_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_font_cache(key, value):
+    cache = _load_font_cache()
+    cache[key] = value
+    try:
+        os.makedirs(os.path.dirname(FONT_CACHE_PATH), exist_ok=True)
+        tmp_path = f"{FONT_CACHE_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, FONT_CACHE_PATH)
+    except OSError as e:
+        print(f"フォントキャッシュを保存できません: {e}")
+
+
+def clear_font_cache():
+    """
+    フォント探索のキャッシュ（プロセス内・ディスク）を消去する
+    
+    同梱フォントを追加・更新した後に呼び出す。登録済みのフォントはそのまま残る。
+    """
+    global _SYSTEM_JAPANESE_FONTS
+    with _FONT_LOCK:
+        _FONT_LOOKUP.clear()
+        _SYSTEM_JAPANESE_FONTS = None
+        try:
+            os.remove(FONT_CACHE_PATH)
+        except OSError:
+            pass
+
+
+def _get_cached_font(key):
+    """
+    ディスクキャッシュの探索結果を検証して返す（ファイルが変更・削除されている場合はNone）
+    
+    見つからなかった結果は FONT_NEGATIVE_CACHE_TTL 秒の間 _NOT_FOUND を返す。
+    """
+    entry = _load_font_cache().get(key)
+    if not entry:
+        return None
+    if entry.get('name') is None:
+        if time.time() - entry.get('checked_at', 0) < FONT_NEGATIVE_CACHE_TTL:
+            return _NOT_FOUND
+        return None
+    font_path = entry.get('path')
+    if font_path is None:
+        return entry['name'], None
+    if os.path.exists(font_path) and _file_signature(font_path) == entry.get('signature'):
+        return entry['name'], font_path
+    return None
+
+
+def register_font(font_name, font_path):
+    """
+    reportlabにフォントを登録する（プロセスごとに1回だけ）
+    
+    Parameters:
+    -----------
+    font_name : str
+        フォント名
+    font_path : str or None
+        フォントファイルのパス（Noneの場合はreportlabのビルトインフォント）
+    """
+    if font_path is None:
+        return
+    with _FONT_LOCK:
+        if font_name in _REGISTERED_FONTS:
+            return
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+        if font_name not in pdfmetrics.getRegisteredFontNames():
+            pdfmetrics.registerFont(TTFont(font_name, font_path))
+            print(f"フォント登録完了: {font_name} ({font_path})")
+        _REGISTERED_FONTS[font_name] = font_path
+
+
+def unregister_font(font_name):
+    """
+    register_font で登録したフォントの登録を解除する（サブセットフォントの破棄用）
+
+    Parameters:
+    -----------
+    font_name : str
+        フォント名
+    """
+    with _FONT_LOCK:
+        if _REGISTERED_FONTS.pop(font_name, None) is None:
+            return
+        from reportlab.lib import fonts
+        from reportlab.pdfbase import pdfmetrics
+        font = pdfmetrics._fonts.get(font_name)
+        if font is not None and hasattr(font, 'unregister'):
+            font.unregister()
+        # registerFont が追加したフォントファミリーの対応表も削除
+        family = font_name.lower()
+        for bold in (0, 1):
+            for italic in (0, 1):
+                fonts._tt2ps_map.pop((family, bold, italic), None)
+        fonts._ps2tt_map.pop(family, None)
+
+
+def get_font_path(font_name):
+    """
+    登録済みのフォントのファイルパスを返す（ビルトインフォント・未登録の場合はNone）
+    """
+    return _REGISTERED_FONTS.get(font_name)
+
+
+def resolve_font(key, candidates):
+    """
+    候補リストから使用するフォントを決定し、reportlabに登録して返す
+    
+    結果はプロセス内とディスクにキャッシュされ、2回目以降は候補の探索・登録を行わない。
+    見つからなかった結果もキャッシュする（ディスク上は FONT_NEGATIVE_CACHE_TTL 秒間有効）。
+    
+    Parameters:
+    -----------
+    key : str
+        キャッシュのキー（用途・環境ごと）
+    candidates : list of dict
+        フォント候補 [{'name': str, 'path': str or None}, ...]（優先順）
+        
+    Returns:
+    --------
+    tuple or None: (font_name, font_path)。使用できるフォントがない場合はNone
+    """
+    with _FONT_LOCK:
+        if key in _FONT_LOOKUP:
+            return _FONT_LOOKUP[key]
+        
+        resolved = _get_cached_font(key)
+        if resolved is _NOT_FOUND:
+            _FONT_LOOKUP[key] = None
+            return None
+        if resolved is not None:
+            try:
+                register_font(*resolved)
+            except Exception as e:
+                print(f"フォント登録エラー ({resolved[0]}): {e}")
+                resolved = None
+        
+        if resolved is None:
+            for font_config in candidates:
+                font_name, font_path = font_config['name'], font_config.get('path')
+                if font_path is not None and not os.path.exists(font_path):
+                    continue
+                
+                try:
+                    register_font(font_name, font_path)
+                except Exception as e:
+                    print(f"フォント登録エラー ({font_name}): {e}")
+                    continue
+                
+                resolved = (font_name, font_path)
+                _save_font_cache(key, {
+                    'name': font_name,
+                    'path': font_path,
+                    'signature': _file_signature(font_path) if font_path else None
+                })
+                break
+            else:
+                print(f"フォントが見つかりません（{key}）")
+                _save_font_cache(key, {'name': None, 'checked_at': time.time()})
+        
+        _FONT_LOOKUP[key] = resolved
+        return resolved
+
+
+def lookup_font(key):
+    """
+    探索済みのフォントを返す（ファイルアクセスなし）
+    
+    Returns:
+    --------
+    tuple or None: (font_name, font_path)。未探索または使用できるフォントがない場合はNone
+    """
+    return _FONT_LOOKUP.get(key)
+
+
+def get_bundled_font_candidates():
+    """
+    同梱ディレクトリ（FONTS_DIR）のフォント候補を返す
+    
+    scripts/prepare_fonts.py で作成したサブセットフォントを最優先とし、
+    その他に配置された TTF/TTC ファイルをファイル名順に続ける。
+    
+    Returns:
+    --------
+    list of dict: フォント候補 [{'name': str, 'path': str}, ...]
+    """
+    candidates = [{'name': BUNDLED_FONT_NAME, 'path': BUNDLED_FONT_PATH}]
+    try:
+        file_names = sorted(os.listdir(FONTS_DIR))
+    except OSError:
+        return candidates
+    for file_name in file_names:
+        font_path = os.path.join(FONTS_DIR, file_name)
+        stem, ext = os.path.splitext(file_name)
+        if ext.lower() in BUNDLED_FONT_EXTENSIONS and font_path != BUNDLED_FONT_PATH:
+            candidates.append({'name': stem.replace(' ', ''), 'path': font_path})
+    return candidates
+
+
+def has_bundled_font():
+    """
+    同梱ディレクトリに日本語フォントが配置されているかどうかを判定
+    
+    Returns:
+    --------
+    bool: 同梱フォントがある場合True
+    """
+    return any(os.path.exists(font_config['path']) for font_config in get_bundled_font_candidates())
+
+
+def get_japanese_system_fonts():
+    """
+    システムにインストールされている日本語フォントのパス一覧を返す
+    
+    matplotlib の findSystemFonts() はフォントディレクトリ全体を走査するため、
+    結果をプロセス内とディスクにキャッシュする（ディスクの結果はファイルの存在を確認して使用）。
+    
+    Returns:
+    --------
+    list of str: フォントファイルのパス
+    """
+    global _SYSTEM_JAPANESE_FONTS
+    with _FONT_LOCK:
+        if _SYSTEM_JAPANESE_FONTS is not None:
+            return _SYSTEM_JAPANESE_FONTS
+        
+        cache_key = f'system_japanese_fonts_{platform.system()}'
+        entry = _load_font_cache().get(cache_key)
+        if entry:
+            cached_fonts = entry.get('fonts', [])
+            if cached_fonts and all(os.path.exists(font_path) for font_path in cached_fonts):
+                _SYSTEM_JAPANESE_FONTS = cached_fonts
+                return _SYSTEM_JAPANESE_FONTS
+            if not cached_fonts and time.time() - entry.get('checked_at', 0) < FONT_NEGATIVE_CACHE_TTL:
+                _SYSTEM_JAPANESE_FONTS = []
+                return _SYSTEM_JAPANESE_FONTS
+        
+        try:
+            from matplotlib import font_manager
+            fonts = font_manager.findSystemFonts()
+        except Exception as e:
+            print(f"システムフォントの探索エラー: {e}")
+            fonts = []
+        japanese_fonts = sorted(f for f in fonts if any(keyword in f.lower() for keyword in JAPANESE_FONT_KEYWORDS))
+        
+        _save_font_cache(cache_key, {'fonts': japanese_fonts, 'checked_at': time.time()})
+        _SYSTEM_JAPANESE_FONTS = japanese_fonts
+        return _SYSTEM_JAPANESE_FONTS
 
 
 def get_japanese_font_config():
     """
-    環境に応じて適切な日本語フォント設定を取得
+    環境に応じて適切な日本語フォント設定を取得（登録済みの場合はキャッシュを返す）
+    
+    同梱フォント、システムフォントの順に探索する（ダウンロードは行わない）。
     
     Returns:
     --------
@@ -18,56 +315,27 @@ def get_japanese_font_config():
         使用するフォント名とパス
     """
     
-    # フォント優先順位リスト
-    font_candidates = [
-        # 同梱フォント（最優先）
-        {
-            'name': 'NotoSansCJK',
-            'path': 'fonts/NotoSansCJK-Regular.ttc',
-            'url': 'https://github.com/googlefonts/noto-cjk/raw/main/Sans/OTC/NotoSansCJK-Regular.ttc'
-        },
+    # フォント優先順位リスト（同梱フォントが最優先）
+    font_candidates = get_bundled_font_candidates() + [
         # Windowsシステムフォント
         {
             'name': 'MSGothic',
-            'path': 'C:/Windows/Fonts/msgothic.ttc',
-            'url': None
+            'path': 'C:/Windows/Fonts/msgothic.ttc'
         },
         # Linuxシステムフォント候補
+        {
+            'name': 'IPAGothic',
+            'path': '/usr/share/fonts/opentype/ipafont-gothic/ipag.ttf'
+        },
         {
             'name': 'DejaVuSans',
-            'path': '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
-            'url': None
+            'path': '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
         }
     ]
     
-    for font_config in font_candidates:
-        font_path = font_config['path']
-        
-        # 同梱フォントの場合、存在しなければダウンロード
-        if font_config['name'] == 'NotoSansCJK' and font_config['url']:
-            if not os.path.exists(font_path):
-                try:
-                    # フォントディレクトリ作成
-                    os.makedirs(os.path.dirname(font_path), exist_ok=True)
-                    
-                    # フォントダウンロード（開発時のみ、本番では事前配置推奨）
-                    print(f"日本語フォントをダウンロード中: {font_config['url']}")
-                    urllib.request.urlretrieve(font_config['url'], font_path)
-                    print(f"フォントダウンロード完了: {font_path}")
-                except Exception as e:
-                    print(f"フォントダウンロードエラー: {e}")
-                    continue
-        
-        # フォントファイル存在確認
-        if os.path.exists(font_path):
-            try:
-                # フォント登録テスト
-                pdfmetrics.registerFont(TTFont(font_config['name'], font_path))
-                print(f"日本語フォント設定成功: {font_config['name']} ({font_path})")
-                return font_config['name'], font_path
-            except Exception as e:
-                print(f"フォント登録エラー ({font_config['name']}): {e}")
-                continue
+    resolved = resolve_font('japanese', font_candidates)
+    if resolved is not None:
+        return resolved
     
     # フォールバック: デフォルトフォント
     print("⚠️ 日本語フォントが見つかりません。デフォルトフォントを使用します。")
@@ -84,17 +352,6 @@ def setup_japanese_font():
     """
     try:
         font_name, font_path = get_japanese_font_config()
-        
-        # 既に登録済みの場合はスキップ
-        if font_name in pdfmetrics.getRegisteredFontNames():
-            print(f"フォントは既に登録済み: {font_name}")
-            return font_name
-        
-        # 新規フォント登録
-        if font_path and os.path.exists(font_path):
-            pdfmetrics.registerFont(TTFont(font_name, font_path))
-            print(f"日本語フォント登録完了: {font_name}")
-        
         return font_name
         
     except Exception as e:
@@ -120,53 +377,50 @@ def get_simple_japanese_font():
     システム既存フォントのみを使用する軽量版設定
     Streamlit Cloud環境での安全性を最大化
     
+    探索・登録はプロセスごとに1回だけ行い、以降はキャッシュしたフォント名を返す。
+    
     Returns:
     --------
     str: フォント名
     """
+    system = platform.system()
+    bundled = has_bundled_font()
+    cache_key = f'simple_{system}_bundled' if bundled else f'simple_{system}'
+    resolved = lookup_font(cache_key)
+    if resolved is not None:
+        return resolved[0]
     
     # デバッグ情報出力
-    system = platform.system()
     print(f"システム環境: {system}")
     
+    # 同梱フォントがあればどの環境でも最優先で使用
+    font_candidates = get_bundled_font_candidates() if bundled else []
+    
     if system == "Windows":
-        font_candidates = [
-            ('MSGothic', 'C:/Windows/Fonts/msgothic.ttc'),
-            ('MSPGothic', 'C:/Windows/Fonts/msgothic.ttc'),
-            ('YuGothic', 'C:/Windows/Fonts/YuGoth.ttf'),
+        font_candidates += [
+            {'name': 'MSGothic', 'path': 'C:/Windows/Fonts/msgothic.ttc'},
+            {'name': 'MSPGothic', 'path': 'C:/Windows/Fonts/msgothic.ttc'},
+            {'name': 'YuGothic', 'path': 'C:/Windows/Fonts/YuGoth.ttf'},
         ]
     elif system == "Darwin":  # macOS
-        font_candidates = [
-            ('HiraginoSans', '/System/Library/Fonts/Hiragino Sans GB.ttc'),
-            ('AppleGothic', '/System/Library/Fonts/AppleGothic.ttf'),
+        font_candidates += [
+            {'name': 'HiraginoSans', 'path': '/System/Library/Fonts/Hiragino Sans GB.ttc'},
+            {'name': 'AppleGothic', 'path': '/System/Library/Fonts/AppleGothic.ttf'},
         ]
     else:  # Linux (Streamlit Cloud)
         # Streamlit Cloud環境では日本語フォントが利用できないため
-        # 英語フォントのみを使用し、PDF内容も英語に切り替える
-        print("⚠️ Linux環境（Streamlit Cloud）を検出：英語レポート生成モードに切り替えます")
-        font_candidates = [
-            ('Helvetica', None),  # reportlabのビルトインフォント
-            ('Times-Roman', None),  # reportlabのビルトインフォント
+        # 同梱フォントがない場合は英語フォントのみを使用し、PDF内容も英語に切り替える
+        if not font_candidates:
+            print("⚠️ Linux環境（Streamlit Cloud）を検出：英語レポート生成モードに切り替えます")
+        font_candidates += [
+            {'name': 'Helvetica', 'path': None},  # reportlabのビルトインフォント
+            {'name': 'Times-Roman', 'path': None},  # reportlabのビルトインフォント
         ]
     
-    for font_name, font_path in font_candidates:
-        try:
-            # ビルトインフォントの場合はパス不要
-            if font_path is None:
-                print(f"ビルトインフォント使用: {font_name}")
-                return font_name
-            
-            # ファイルベースフォントの場合
-            if os.path.exists(font_path):
-                if font_name not in pdfmetrics.getRegisteredFontNames():
-                    pdfmetrics.registerFont(TTFont(font_name, font_path))
-                print(f"日本語フォント登録成功: {font_name}")
-                return font_name
-            else:
-                print(f"フォントファイル未発見: {font_path}")
-        except Exception as e:
-            print(f"フォント登録エラー ({font_name}): {e}")
-            continue
+    resolved = resolve_font(cache_key, font_candidates)
+    if resolved is not None:
+        print(f"使用フォント: {resolved[0]}")
+        return resolved[0]
     
     # 最終フォールバック
     print("デフォルトフォント (Helvetica) を使用")
@@ -190,6 +444,6 @@ def is_japanese_font_available():
     elif system == "Darwin":
         return True
     
-    # Linux（Streamlit Cloud）の場合は利用不可とみなす
+    # Linux（Streamlit Cloud）の場合は同梱フォントがあるときのみ利用可能
     else:
-        return False 
\ No newline at end of file
+        return has_bundled_font() 
\ No newline at end of file
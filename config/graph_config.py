@@ -85,12 +85,9 @@ def is_japanese_font_available_for_graphs():
         except ImportError:
             # japanize-matplotlibがない場合はシステムフォントをテスト
             try:
-                # フォントマネージャーから日本語フォントを検索
-                from matplotlib import font_manager
-                fonts = font_manager.findSystemFonts()
-                japanese_fonts = [f for f in fonts if any(keyword in f.lower() 
-                                 for keyword in ['gothic', 'mincho', 'hiragino', 'yu'])]
-                return len(japanese_fonts) > 0
+                # 日本語フォントを検索（探索結果はキャッシュ済み）
+                from config.font_config import get_japanese_system_fonts
+                return len(get_japanese_system_fonts()) > 0
             except:
                 return False
     
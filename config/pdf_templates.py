@@ -29,6 +29,17 @@ def get_pdf_content_japanese():
         'table_relative_effect': '相対効果',
         'table_p_value': 'p値',
         
+        # 一括レポート（複数系列）
+        'title_batch': 'Causal Impact分析レポート（複数系列）',
+        'section_batch_overview': '■系列別サマリー',
+        'label_series_count': '分析系列数：',
+        'batch_series_count': '{count}系列（うち統計的に有意 {significant}系列）',
+        'batch_table_note': '　表の数値は分析期間の累積値（相対効果は累積効果÷累積予測値）。各系列の詳細は次ページ以降を参照ください。',
+        'table_series': '系列',
+        'table_judgement': '判定',
+        'judgement_significant': '有意',
+        'judgement_not_significant': '有意差なし',
+        
         # コメント文テンプレート
         'comment_significant': '相対効果は {effect:+.1f}% で、統計的に有意です（p = {p_value:.3f}）。詳しくは「詳細レポート」を参照ください。',
         'comment_not_significant': '相対効果は {effect:+.1f}% ですが、統計的には有意ではありません（p = {p_value:.3f}）。詳しくは「詳細レポート」を参照ください。'
@@ -62,11 +73,82 @@ def get_pdf_content_english():
         'table_relative_effect': 'Relative Effect',
         'table_p_value': 'p-value',
         
+        # 一括レポート（複数系列）（英語版）
+        'title_batch': 'Causal Impact Analysis Report (Multiple Series)',
+        'section_batch_overview': 'Summary by Series',
+        'label_series_count': 'Number of Series: ',
+        'batch_series_count': '{count} series ({significant} statistically significant)',
+        'batch_table_note': '　Values are cumulative over the analysis period (relative effect = cumulative effect / cumulative prediction). See the following pages for details of each series.',
+        'table_series': 'Series',
+        'table_judgement': 'Result',
+        'judgement_significant': 'Significant',
+        'judgement_not_significant': 'Not significant',
+        
         # コメント文テンプレート（英語版）
         'comment_significant': 'Relative effect is {effect:+.1f}% and statistically significant (p = {p_value:.3f}). Please refer to "Detailed Report" for more information.',
         'comment_not_significant': 'Relative effect is {effect:+.1f}% but not statistically significant (p = {p_value:.3f}). Please refer to "Detailed Report" for more information.'
     }
 
+def get_report_templates_japanese():
+    """日本語版詳細レポートの文面テンプレート（数値は str.format で差し込む）"""
+    return {
+        'report_title': '分析レポート {{CausalImpact}}',
+        'report_average': '介入期間中、応答変数は平均値が約{actual}でした。{counterfactual_intro}予測される平均応答値は{predicted}でした。この反事実予測の{confidence_level}%信頼区間は[{predicted_lower}, {predicted_upper}]です。この予測値を観測値から引くことで、介入が応答変数に与えた因果効果の推定値が得られます。この効果は{abs_effect}であり、{confidence_level}%信頼区間は[{abs_effect_lower}, {abs_effect_upper}]です。この効果の有意性については以下を参照してください。',
+        'report_average_intro': 'もし介入がなかった場合、',
+        'report_average_intro_contrast': '対照的に、介入がなかった場合には',
+        'report_cumulative': '介入期間中の個々のデータポイントを合計すると（これが意味を持つ場合のみ）、応答変数の全体値は{actual}でした。{counterfactual_intro}予測される合計値は{predicted}でした。この予測の{confidence_level}%信頼区間は[{predicted_lower}, {predicted_upper}]です。',
+        'report_cumulative_intro': '介入がなかった場合、',
+        'report_cumulative_intro_contrast': '介入がなかった場合、',
+        'report_relative_increase': '上記の結果は絶対値で示されています。相対的には、応答変数は{rel_effect}%の増加を示しました。この割合の{confidence_level}%信頼区間は[{rel_effect_lower}%, {rel_effect_upper}%]です。',
+        'report_relative_decrease': '上記の結果は絶対値で示されています。相対的には、応答変数は{rel_effect}%の減少を示しました。この割合の{confidence_level}%信頼区間は[{rel_effect_lower}%, {rel_effect_upper}%]です。',
+        'report_positive_significant': 'これは、介入期間中に観察された正の効果が統計的に有意であり、ランダムな変動に起因する可能性が低いことを意味します。ただし、この増加が実質的な意味を持つかどうかという問題は、絶対効果（{abs_effect}）を介入の本来の目標と比較することによってのみ答えることができることに注意すべきです。',
+        'report_negative_significant': 'これは、介入期間中に観察された負の効果が統計的に有意であることを意味します。実験者が正の効果を期待していた場合は、制御変数の異常が、介入がない場合に応答変数で起こるはずだったことについて過度に楽観的な期待を引き起こした可能性があるかどうかを再確認することをお勧めします。',
+        'report_positive_not_significant': 'これは、介入が正の効果をもたらしたように見えるものの、介入期間全体を考慮するとこの効果は統計的に有意ではないことを意味します。介入期間内の個々の日や短い期間については（効果の時系列グラフの下限が0より上にある場合に示されるように）依然として有意な効果があった可能性があります。',
+        'report_negative_not_significant': 'これは、介入期間全体を考慮した場合、応答変数に対して介入が負の効果を及ぼしたように見えるかもしれませんが、この効果は統計的に有意ではないため、意味のある解釈はできないことを意味します。',
+        'report_not_significant_note': '見かけ上の効果は、介入と無関係なランダムな変動の結果である可能性があります。これは、介入期間が非常に長く、効果が既に消失した時間の多くを含む場合によく起こります。また、介入期間が短すぎてシグナルとノイズを区別できない場合にも起こり得ます。最後に、有意な効果が見つからないのは、制御変数が十分でない場合や、これらの変数が学習期間中に応答変数とうまく相関していない場合にも起こることがあります。',
+        'report_p_significant': 'この効果が偶然によって得られる確率は非常に小さいです（ベイズ単側尾部確率 p = {p_value}）。これは、因果効果が統計的に有意であると考えられることを意味します。',
+        'report_p_not_significant': 'この効果が偶然によって得られる確率はp = {p_percent}%です。これは、この効果が見せかけのものである可能性があり、一般的には統計的に有意とはみなされないことを意味します。'
+    }
+
+def get_report_templates_english():
+    """英語版詳細レポートの文面テンプレート（CausalImpactの英語レポートと同じ文面）"""
+    return {
+        'report_title': 'Analysis report {{CausalImpact}}',
+        'report_average': 'During the post-intervention period, the response variable had an average value of approx. {actual}. {counterfactual_intro} the absence of an intervention, we would have expected an average response of {predicted}. The {confidence_level}% interval of this counterfactual prediction is [{predicted_lower}, {predicted_upper}]. Subtracting this prediction from the observed response yields an estimate of the causal effect the intervention had on the response variable. This effect is {abs_effect} with a {confidence_level}% interval of [{abs_effect_lower}, {abs_effect_upper}]. For a discussion of the significance of this effect, see below.',
+        'report_average_intro': 'In',
+        'report_average_intro_contrast': 'By contrast, in',
+        'report_cumulative': 'Summing up the individual data points during the post-intervention period (which can only sometimes be meaningfully interpreted), the response variable had an overall value of {actual}. {counterfactual_intro} the intervention not taken place, we would have expected a sum of {predicted}. The {confidence_level}% interval of this prediction is [{predicted_lower}, {predicted_upper}].',
+        'report_cumulative_intro': 'Had',
+        'report_cumulative_intro_contrast': 'By contrast, had',
+        'report_relative_increase': 'The above results are given in terms of absolute numbers. In relative terms, the response variable showed an increase of +{rel_effect}%. The {confidence_level}% interval of this percentage is [{rel_effect_lower}%, {rel_effect_upper}%].',
+        'report_relative_decrease': 'The above results are given in terms of absolute numbers. In relative terms, the response variable showed a decrease of {rel_effect}%. The {confidence_level}% interval of this percentage is [{rel_effect_lower}%, {rel_effect_upper}%].',
+        'report_positive_significant': 'This means that the positive effect observed during the intervention period is statistically significant and unlikely to be due to random fluctuations. It should be noted, however, that the question of whether this increase also bears substantive significance can only be answered by comparing the absolute effect ({abs_effect}) to the original goal of the underlying intervention.',
+        'report_negative_significant': 'This means that the negative effect observed during the intervention period is statistically significant. If the experimenter had expected a positive effect, it is recommended to double-check whether anomalies in the control variables may have caused an overly optimistic expectation of what should have happened in the response variable in the absence of the intervention.',
+        'report_positive_not_significant': 'This means that, although the intervention appears to have caused a positive effect, this effect is not statistically significant when considering the entire post-intervention period as a whole. Individual days or shorter stretches within the intervention period may of course still have had a significant effect, as indicated whenever the lower limit of the impact time series (lower plot) was above zero.',
+        'report_negative_not_significant': 'This means that, although it may look as though the intervention has exerted a negative effect on the response variable when considering the intervention period as a whole, this effect is not statistically significant and so cannot be meaningfully interpreted.',
+        'report_not_significant_note': 'The apparent effect could be the result of random fluctuations that are unrelated to the intervention. This is often the case when the intervention period is very long and includes much of the time when the effect has already worn off. It can also be the case when the intervention period is too short to distinguish the signal from the noise. Finally, failing to find a significant effect can happen when there are not enough control variables or when these variables do not correlate well with the response variable during the learning period.',
+        'report_p_significant': 'The probability of obtaining this effect by chance is very small (Bayesian one-sided tail-area probability p = {p_value}). This means the causal effect can be considered statistically significant.',
+        'report_p_not_significant': 'The probability of obtaining this effect by chance is p = {p_percent}%. This means the effect may be spurious and would generally not be considered statistically significant.'
+    }
+
+def get_report_templates(use_japanese=True):
+    """
+    詳細レポートの文面テンプレートを取得
+    
+    Parameters:
+    -----------
+    use_japanese : bool
+        日本語版の場合True、英語版の場合False
+        
+    Returns:
+    --------
+    dict: 文面テンプレート辞書
+    """
+    if use_japanese:
+        return get_report_templates_japanese()
+    else:
+        return get_report_templates_english()
+
 def get_pdf_content(use_japanese=True):
     """
     PDF作成用コンテンツを取得
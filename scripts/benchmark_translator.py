@@ -0,0 +1,110 @@
+"""
+レポート翻訳のマイクロベンチマーク
+
+CausalImpactの英語レポートを日本語に翻訳する処理について、
+メモなしの翻訳（コンパイル済みパターン表の適用）と、メモ済みの翻訳
+（STEP3の再実行時に相当）の所要時間を比較する。
+
+使い方（リポジトリのルートで実行）:
+    python scripts/benchmark_translator.py [繰り返し回数]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from causal_impact_translator import CausalImpactTranslator, clear_translation_cache
+
+SAMPLE_REPORT = """Analysis report {CausalImpact}
+
+
+During the post-intervention period, the response variable had
+an average value of approx. 105.0. By contrast, in the absence of an
+intervention, we would have expected an average response of 99.97.
+The 95% interval of this counterfactual prediction is [97.97, 101.97].
+Subtracting this prediction from the observed response yields
+an estimate of the causal effect the intervention had on the
+response variable. This effect is 5.03 with a 95% interval of
+[3.03, 7.03]. For a discussion of the significance of this effect,
+see below.
+
+
+Summing up the individual data points during the post-intervention
+period (which can only sometimes be meaningfully interpreted), the
+response variable had an overall value of 1574.98.
+By contrast, had the intervention not taken place, we would have expected
+a sum of 1499.59. The 95% interval of this prediction is [1469.59, 1529.59].
+
+
+The above results are given in terms of absolute numbers. In relative
+terms, the response variable showed an increase of +5.03%. The 95%
+interval of this percentage is [3.03%, 7.03%].
+
+
+This means that the positive effect observed during the intervention
+period is statistically significant and unlikely to be due to random
+fluctuations. It should be noted, however, that the question of whether
+this increase also bears substantive significance can only be answered
+by comparing the absolute effect (5.03) to the original goal
+of the underlying intervention.
+
+
+The probability of obtaining this effect by chance is very small
+(Bayesian one-sided tail-area probability p = 0.0).
+This means the causal effect can be considered statistically
+significant."""
+
+
+def _measure(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def run_benchmark(report=SAMPLE_REPORT, alpha=0.95, repeat=1000):
+    """
+    翻訳処理の所要時間を計測する関数
+
+    Parameters:
+    -----------
+    report : str
+        英語レポート
+    alpha : float
+        信頼区間の値（0〜1の間）
+    repeat : int
+        繰り返し回数
+
+    Returns:
+    --------
+    dict : {'uncached_seconds', 'first_call_seconds', 'cached_seconds'}（1回あたりの秒数）
+    """
+    translator = CausalImpactTranslator()
+
+    uncached = _measure(lambda: translator._translate_report_uncached(report, alpha), repeat)
+
+    clear_translation_cache()
+    start = time.perf_counter()
+    translator.translate_report(report, alpha)
+    first_call = time.perf_counter() - start
+
+    cached = _measure(lambda: translator.translate_report(report, alpha), repeat)
+
+    return {
+        'uncached_seconds': uncached,
+        'first_call_seconds': first_call,
+        'cached_seconds': cached
+    }
+
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    timings = run_benchmark(repeat=repeat)
+    print(f"レポート翻訳ベンチマーク（{repeat}回平均）")
+    print(f"  メモなし（パターン表を適用）: {timings['uncached_seconds'] * 1e6:.1f}μs")
+    print(f"  初回（メモ登録を含む）　　　: {timings['first_call_seconds'] * 1e6:.1f}μs")
+    print(f"  メモ済み（再実行時）　　　　: {timings['cached_seconds'] * 1e6:.1f}μs")
+    if timings['cached_seconds'] > 0:
+        print(f"  高速化倍率: {timings['uncached_seconds'] / timings['cached_seconds']:.0f}倍")
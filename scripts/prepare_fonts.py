@@ -0,0 +1,215 @@
+"""
+同梱用の日本語サブセットフォント作成スクリプト（ビルド時に実行）
+
+PDFレポート作成時にフォントのダウンロードや探索で待たされないように、指定した日本語フォントから
+レポートで使う文字（英数字・記号・かな・JIS第1/第2水準漢字・テンプレートの文字）だけを取り出した
+TrueTypeフォントを同梱ディレクトリ（config.constants.BUNDLED_FONT_PATH）に作成する。
+CFF形式（OTF/OTC、Noto Sans CJK など）のフォントは、reportlabで読み込めるようにTrueType形式に変換する。
+
+使い方（リポジトリのルートで実行）:
+    python scripts/prepare_fonts.py <元フォントのパス> [--font-number N] [--text-file FILE ...] [--output PATH]
+
+例:
+    python scripts/prepare_fonts.py /usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc --font-number 0
+"""
+
+import argparse
+import glob
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.constants import BUNDLED_FONT_PATH, CONFIG_DIR
+
+# 常に含める文字の範囲（ASCII・Latin-1・一般句読点・CJK記号とかな・全角英数字と半角カナ）
+BASE_CHARACTER_RANGES = [
+    (0x0020, 0x007E),
+    (0x00A0, 0x00FF),
+    (0x2010, 0x2044),
+    (0x2190, 0x2199),
+    (0x2200, 0x22FF),
+    (0x25A0, 0x25FF),
+    (0x3000, 0x30FF),
+    (0xFF01, 0xFF9F),
+]
+
+# CFF形式をTrueType形式に変換するときの許容誤差（フォント単位）
+MAX_CONVERSION_ERROR = 1.0
+
+
+def _jis_characters():
+    # Shift_JIS（CP932）の2バイト文字をすべて復号して、JIS第1/第2水準漢字と記号を得る
+    characters = set()
+    for lead in list(range(0x81, 0xA0)) + list(range(0xE0, 0xF0)):
+        for trail in range(0x40, 0xFD):
+            if trail == 0x7F:
+                continue
+            try:
+                characters.add(bytes([lead, trail]).decode('cp932'))
+            except UnicodeDecodeError:
+                continue
+    return characters
+
+
+def _template_characters():
+    # PDF・アプリの文面テンプレートに含まれる文字
+    characters = set()
+    for path in glob.glob(os.path.join(CONFIG_DIR, '*.py')):
+        with open(path, encoding='utf-8') as f:
+            characters.update(f.read())
+    return characters
+
+
+def collect_characters(text_files=()):
+    """
+    サブセットに含める文字を集める関数
+
+    Parameters:
+    -----------
+    text_files : list of str
+        追加で含める文字を記載したテキストファイル（UTF-8）
+
+    Returns:
+    --------
+    set of int : Unicodeのコードポイント
+    """
+    characters = set()
+    for start, end in BASE_CHARACTER_RANGES:
+        characters.update(chr(code) for code in range(start, end + 1))
+    characters.update(_jis_characters())
+    characters.update(_template_characters())
+    for path in text_files:
+        with open(path, encoding='utf-8') as f:
+            characters.update(f.read())
+    return {ord(c) for c in characters if c.isprintable() or c == '　'}
+
+
+def _convert_cff_to_truetype(font):
+    # fontTools の otf2ttf と同じ手順で、3次ベジェ曲線（CFF）を2次ベジェ曲線（glyf）に変換する
+    from fontTools.pens.cu2quPen import Cu2QuPen
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+    from fontTools.ttLib import newTable
+
+    glyph_order = font.getGlyphOrder()
+    glyph_set = font.getGlyphSet()
+
+    font['loca'] = newTable('loca')
+    font['glyf'] = glyf = newTable('glyf')
+    glyf.glyphOrder = glyph_order
+    glyf.glyphs = {}
+    for glyph_name in glyph_order:
+        tt_pen = TTGlyphPen(glyph_set)
+        glyph_set[glyph_name].draw(Cu2QuPen(tt_pen, MAX_CONVERSION_ERROR, reverse_direction=True))
+        glyf.glyphs[glyph_name] = tt_pen.glyph()
+
+    del font['CFF ']
+    if 'VORG' in font:
+        del font['VORG']
+    glyf.compile(font)
+
+    hmtx = font['hmtx']
+    for glyph_name, glyph in glyf.glyphs.items():
+        if hasattr(glyph, 'xMin'):
+            hmtx[glyph_name] = (hmtx[glyph_name][0], glyph.xMin)
+
+    font['maxp'] = maxp = newTable('maxp')
+    maxp.tableVersion = 0x00010000
+    maxp.maxZones = 1
+    maxp.maxTwilightPoints = 0
+    maxp.maxStorage = 0
+    maxp.maxFunctionDefs = 0
+    maxp.maxInstructionDefs = 0
+    maxp.maxStackElements = 0
+    maxp.maxSizeOfInstructions = 0
+    maxp.maxComponentElements = 0
+    maxp.compile(font)
+
+    post = font['post']
+    post.formatType = 2.0
+    post.extraNames = []
+    post.mapping = {}
+    post.glyphOrder = glyph_order
+    try:
+        post.compile(font)
+    except OverflowError:
+        post.formatType = 3.0
+
+    font.sfntVersion = '\x00\x01\x00\x00'
+
+
+def prepare_font(source_path, output_path=BUNDLED_FONT_PATH, font_number=0, text_files=()):
+    """
+    日本語フォントからサブセットのTrueTypeフォントを作成する関数
+
+    Parameters:
+    -----------
+    source_path : str
+        元フォントのパス（TTF/OTF/TTC/OTC）
+    output_path : str
+        作成するフォントのパス
+    font_number : int
+        TTC/OTCの場合に使用するフォントの番号
+    text_files : list of str
+        追加で含める文字を記載したテキストファイル
+
+    Returns:
+    --------
+    dict : {'glyphs', 'characters', 'bytes'}（作成したフォントのグリフ数・文字数・ファイルサイズ）
+    """
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    font = TTFont(source_path, fontNumber=font_number, lazy=False)
+
+    options = subset.Options()
+    options.name_IDs = ['*']
+    options.name_languages = ['*']
+    options.notdef_outline = True
+    options.hinting = False
+    options.desubroutinize = True
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=collect_characters(text_files))
+    subsetter.subset(font)
+
+    if 'CFF ' in font:
+        _convert_cff_to_truetype(font)
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    font.save(output_path)
+
+    return {
+        'glyphs': len(font.getGlyphOrder()),
+        'characters': len(font.getBestCmap()),
+        'bytes': os.path.getsize(output_path)
+    }
+
+
+def _check_reportlab(output_path):
+    # reportlabで読み込めることを確認（未インストールの場合は確認しない）
+    try:
+        from reportlab.pdfbase.ttfonts import TTFont
+    except ImportError:
+        return None
+    TTFont('PrepareFontsCheck', output_path)
+    return True
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='同梱用の日本語サブセットフォントを作成する')
+    parser.add_argument('source', help='元フォントのパス（TTF/OTF/TTC/OTC）')
+    parser.add_argument('--font-number', type=int, default=0, help='TTC/OTCの場合に使用するフォントの番号')
+    parser.add_argument('--text-file', action='append', default=[], help='追加で含める文字を記載したテキストファイル')
+    parser.add_argument('--output', default=BUNDLED_FONT_PATH, help='作成するフォントのパス')
+    args = parser.parse_args()
+
+    stats = prepare_font(args.source, args.output, args.font_number, args.text_file)
+    print(f"サブセットフォントを作成しました: {args.output}")
+    print(f"  文字数: {stats['characters']}  グリフ数: {stats['glyphs']}  サイズ: {stats['bytes'] / 1024:.0f}KB")
+
+    if _check_reportlab(args.output):
+        print("  reportlabでの読み込みを確認しました")
+
+    # 探索結果のキャッシュを消去（次回のPDF作成時に同梱フォントが使われるように）
+    from config.font_config import clear_font_cache
+    clear_font_cache()
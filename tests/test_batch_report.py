@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils_result import AnalysisResult
+
+pytest.importorskip('reportlab')
+pytest.importorskip('matplotlib')
+
+
+def _make_result(seed, n=80, n_post=20, lift=5.0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2024-01-01', periods=n).values
+    preds = 100 + rng.normal(0, 0.5, n)
+    actual = preds + rng.normal(0, 1, n)
+    post_mask = np.zeros(n, dtype=bool)
+    post_mask[n - n_post:] = True
+    actual[post_mask] += lift
+    effects = actual - preds
+    return AnalysisResult(dates, actual, preds, preds - 2, preds + 2,
+                          effects, effects - 2, effects + 2, post_mask, p_value=0.01)
+
+
+def test_build_batch_report_pdf_for_several_series():
+    from utils_batch_report import build_batch_report_pdf
+
+    series = [(f'店舗{i}', _make_result(i)) for i in range(3)]
+    progress = []
+    pdf_bytes, filename = build_batch_report_pdf(
+        series, use_worker_pool=False, progress_callback=lambda done, total: progress.append((done, total))
+    )
+
+    assert pdf_bytes.startswith(b'%PDF')
+    assert filename.endswith('.pdf')
+    # 表紙 + 系列ごとのページ
+    assert pdf_bytes.count(b'/Type /Page') - pdf_bytes.count(b'/Type /Pages') == 4
+    assert progress[-1] == (3, 3)
+
+
+def test_build_batch_report_pdf_skips_series_without_post_period():
+    from utils_batch_report import build_batch_report_pdf
+
+    with pytest.raises(ValueError):
+        build_batch_report_pdf([('店舗0', _make_result(0, n_post=0))], use_worker_pool=False)
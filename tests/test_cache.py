@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from utils_cache import ByteLRU, shared_resource
+from utils_export import ExportManager
+
+
+def test_evicts_least_recently_used_by_size():
+    cache = ByteLRU(max_bytes=10, max_entries=10)
+    cache.put('a', b'1234')
+    cache.put('b', b'1234')
+    assert cache.get('a') == b'1234'
+    cache.put('c', b'1234')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == b'1234' and cache.get('c') == b'1234'
+    assert cache.get_status()['total_bytes'] == 8
+
+
+def test_skips_oversized_values_and_none_keys():
+    cache = ByteLRU(max_bytes=4, max_entries=10)
+    cache.put('big', b'12345')
+    cache.put(None, b'1')
+    assert cache.get('big') is None
+    assert cache.get(None) is None
+    assert cache.get_status()['entries'] == 0
+
+
+def test_get_or_build_runs_builder_once_for_concurrent_requests():
+    cache = ByteLRU(max_bytes=100, max_entries=10)
+    calls = []
+
+    def build():
+        calls.append(1)
+        time.sleep(0.05)
+        return b'chart'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_build('k', build))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [b'chart'] * 4
+    assert len(calls) == 1
+
+
+def test_export_manager_sizes_entries_by_data():
+    manager = ExportManager(max_bytes=10, max_entries=10)
+    manager.put('pdf', b'12345678', 'report.pdf')
+    manager.put('csv', b'1234', 'detail.csv')
+
+    assert manager.get('pdf') is None
+    assert manager.get('csv') == (b'1234', 'detail.csv')
+    assert manager.get_status()['total_bytes'] == 4
+
+
+def test_shared_resource_creates_once_and_retries_after_failure():
+    try:
+        import streamlit  # noqa: F401
+        pytest.skip('streamlit is installed; st.cache_resource is used instead')
+    except ImportError:
+        pass
+    attempts = []
+
+    def create():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError('startup failed')
+        return object()
+
+    get_resource = shared_resource(create)
+    with pytest.raises(RuntimeError):
+        get_resource()
+    first = get_resource()
+    assert get_resource() is first
+    assert len(attempts) == 2
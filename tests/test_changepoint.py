@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from utils_changepoint import detect_change_points, suggest_change_point_index
+
+
+def _series(values):
+    return pd.Series(values, index=pd.date_range('2020-01-01', periods=len(values)))
+
+
+def test_white_noise_has_no_change_points():
+    for seed in range(20):
+        values = 100 + np.random.default_rng(seed).normal(0, 5, 3650)
+        assert detect_change_points(_series(values)).empty
+
+
+def test_white_noise_suggests_no_intervention_point():
+    values = 100 + np.random.default_rng(0).normal(0, 5, 365)
+    date, index, candidates = suggest_change_point_index(_series(values))
+    assert date is None and index is None
+    assert candidates.empty
+
+
+def test_level_shift_is_detected():
+    rng = np.random.default_rng(0)
+    values = np.concatenate([100 + rng.normal(0, 5, 250), 110 + rng.normal(0, 5, 115)])
+    candidates = detect_change_points(_series(values))
+    assert not candidates.empty
+    assert abs(int(candidates.loc[0, 'index']) - 250) <= 5
+
+
+def _ar1(seed, n=730, rho=0.7):
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(0, 10, n)
+    values = np.zeros(n)
+    for i in range(1, n):
+        values[i] = rho * values[i - 1] + noise[i]
+    return 1000 + values
+
+
+def test_autocorrelated_series_without_change_has_no_change_points():
+    dates = pd.date_range('2020-01-01', periods=730)
+    detected = sum(
+        not detect_change_points(pd.DataFrame({'ymd': dates, 'v': _ar1(seed)})).empty
+        for seed in range(20)
+    )
+    assert detected <= 1
+
+
+def test_level_shift_is_detected_in_autocorrelated_series():
+    values = _ar1(0)
+    values[500:] += 40
+    candidates = detect_change_points(_series(values))
+    assert not candidates.empty
+    assert abs(int(candidates.loc[0, 'index']) - 500) <= 10
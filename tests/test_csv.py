@@ -0,0 +1,51 @@
+import gc
+import gzip
+import io
+import os
+import zipfile
+
+import pandas as pd
+import pytest
+
+from utils_csv import build_csv_file, iter_csv_chunks
+
+
+def _chunks():
+    df = pd.DataFrame({'a': range(12), 'b': [x * 0.5 for x in range(12)]})
+    return iter_csv_chunks(df, header_rows=[['a', 'b']], footer_lines=['', 'note'], chunk_rows=5)
+
+
+def _expected():
+    return b''.join(_chunks())
+
+
+@pytest.mark.parametrize('compression', [None, 'gzip', 'zip'])
+def test_build_csv_file_round_trip(compression):
+    data, filename = build_csv_file(_chunks(), 'detail.csv', compression)
+    raw = data.getvalue()
+    assert len(data) == len(raw) == os.path.getsize(data.path)
+    if compression == 'gzip':
+        assert filename == 'detail.csv.gz'
+        raw = gzip.decompress(raw)
+    elif compression == 'zip':
+        assert filename == 'detail.zip'
+        with zipfile.ZipFile(io.BytesIO(raw)) as zip_file:
+            raw = zip_file.read('detail.csv')
+    else:
+        assert filename == 'detail.csv'
+    assert raw == _expected()
+    assert raw.startswith(b'\xef\xbb\xbfa,b\n')
+
+
+def test_temp_file_removed_when_released():
+    data, _ = build_csv_file(_chunks(), 'detail.csv')
+    path = data.path
+    assert os.path.exists(path)
+    del data
+    gc.collect()
+    assert not os.path.exists(path)
+
+
+def test_unknown_compression_rejected():
+    with pytest.raises(ValueError):
+        build_csv_file(_chunks(), 'detail.csv', 'bz2')
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+sm = pytest.importorskip('statsmodels.api')
+
+from scipy import stats
+
+from utils_its_analysis import _its_critical_value, run_batched_its_analysis, scan_its_intervention_dates
+
+
+def _design(n, k):
+    time = np.arange(n, dtype=float)
+    after = (time >= k).astype(float)
+    return np.column_stack([np.ones(n), time, after, np.maximum(0, time - k)])
+
+
+@pytest.mark.parametrize('level', [1e6, 1e7])
+def test_scan_matches_statsmodels_at_large_magnitudes(level):
+    n = 3650
+    rng = np.random.default_rng(0)
+    values = level + 0.5 * np.arange(n) + rng.normal(0, 10, n)
+    data = pd.DataFrame({'date': pd.date_range('2010-01-01', periods=n), 'value': values})
+
+    profile = scan_its_intervention_dates(data)
+
+    assert (profile['sse'] > 0).all()
+    for k in (10, 1000, 2500, n - 5):
+        row = profile.loc[profile['index'] == k].iloc[0]
+        # statsmodels itself loses digits at this level; shifting y only moves the intercept
+        fit = sm.OLS(values - level, _design(n, k)).fit()
+        assert row['sse'] == pytest.approx(fit.ssr, rel=1e-6)
+        assert row['level_change'] == pytest.approx(fit.params[2], rel=1e-6, abs=1e-6)
+        assert row['level_se'] == pytest.approx(fit.bse[2], rel=1e-6)
+        assert row['slope_change'] == pytest.approx(fit.params[3], rel=1e-6, abs=1e-9)
+        assert row['slope_se'] == pytest.approx(fit.bse[3], rel=1e-6)
+
+
+def _wide_data(n=400, n_series=3, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = {'date': pd.date_range('2021-01-01', periods=n)}
+    for j in range(n_series):
+        noise = np.zeros(n)
+        shocks = rng.normal(0, 5 + j, n)
+        for i in range(1, n):
+            noise[i] = 0.6 * noise[i - 1] + shocks[i]
+        columns[f's{j}'] = 100 * (j + 1) + 0.1 * np.arange(n) + 20 * (np.arange(n) >= 300) + noise
+    return pd.DataFrame(columns)
+
+
+@pytest.mark.parametrize('maxlags', [None, 3, 10])
+def test_batched_hac_matches_statsmodels(maxlags):
+    data = _wide_data()
+    n = len(data)
+    result = run_batched_its_analysis(data, data['date'][300], cov_type='HAC', maxlags=maxlags)
+    lags = maxlags if maxlags is not None else int(np.floor(4 * (n / 100) ** (2 / 9)))
+
+    for i, name in enumerate(result['series_names']):
+        fit = sm.OLS(data[name].values, _design(n, 300)).fit(cov_type='HAC', cov_kwds={'maxlags': lags})
+        np.testing.assert_allclose(result['params'][i], fit.params, rtol=1e-8)
+        np.testing.assert_allclose(result['bse'][i], fit.bse, rtol=1e-8)
+        np.testing.assert_allclose(result['pvalues'][i], fit.pvalues, rtol=1e-6, atol=1e-12)
+        conf_int = fit.conf_int(0.05)
+        np.testing.assert_allclose(result['conf_int_lower'][i], conf_int[:, 0], rtol=1e-8)
+        np.testing.assert_allclose(result['conf_int_upper'][i], conf_int[:, 1], rtol=1e-8)
+
+
+def test_batched_ar1_matches_statsmodels_glsar():
+    data = _wide_data(seed=1)
+    n = len(data)
+    result = run_batched_its_analysis(data, data['date'][300], cov_type='AR1')
+
+    for i, name in enumerate(result['series_names']):
+        fit = sm.GLSAR(data[name].values, _design(n, 300), rho=1).iterative_fit(maxiter=10)
+        assert result['rho'][i] == pytest.approx(fit.model.rho[0], rel=1e-8)
+        np.testing.assert_allclose(result['params'][i], fit.params, rtol=1e-8)
+        np.testing.assert_allclose(result['bse'][i], fit.bse, rtol=1e-8)
+        np.testing.assert_allclose(result['pvalues'][i], fit.pvalues, rtol=1e-6, atol=1e-12)
+        assert result['df_resid'] == fit.df_resid
+        conf_int = fit.conf_int(0.05)
+        np.testing.assert_allclose(result['conf_int_lower'][i], conf_int[:, 0], rtol=1e-8)
+        np.testing.assert_allclose(result['conf_int_upper'][i], conf_int[:, 1], rtol=1e-8)
+
+
+@pytest.mark.parametrize('confidence_level', [0.8, 0.9, 0.95, 0.99])
+def test_its_critical_value(confidence_level):
+    alpha = 1 - confidence_level
+    assert _its_critical_value(confidence_level, 'AR1', 395) == pytest.approx(stats.t.ppf(1 - alpha / 2, 395))
+    assert _its_critical_value(confidence_level, 'nonrobust', 12) == pytest.approx(stats.t.ppf(1 - alpha / 2, 12))
+    assert _its_critical_value(confidence_level, 'HAC', 12) == pytest.approx(stats.norm.ppf(1 - alpha / 2))
@@ -0,0 +1,110 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import pytest
+
+pytest.importorskip('reportlab')
+pytest.importorskip('fontTools')
+
+import reportlab
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.pdfbase import pdfmetrics
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Table, TableStyle
+
+import utils_pdf
+from config.font_config import register_font
+
+FONT_NAME = 'SubsetTestVera'
+
+
+@pytest.fixture
+def font_name(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils_pdf, 'FONT_SUBSET_DIR', str(tmp_path))
+    monkeypatch.setattr(utils_pdf, '_SUBSET_FONTS', OrderedDict())
+    register_font(FONT_NAME, os.path.join(os.path.dirname(reportlab.__file__), 'fonts', 'Vera.ttf'))
+    return FONT_NAME
+
+
+def _fontnames(table):
+    return [[cell_style.fontname for cell_style in row] for row in table._cellStyles]
+
+
+def test_apply_subset_font_keeps_caller_table(font_name):
+    table = Table([['Header', 'Value'], ['alpha', '1.0'], ['beta', '2.0']])
+    table.setStyle(TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), font_name),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold')
+    ]))
+    paragraph = Paragraph('Summary', ParagraphStyle('body', fontName=font_name))
+    before = _fontnames(table)
+
+    story = utils_pdf.apply_subset_font([paragraph, table], font_name)
+
+    assert _fontnames(table) == before
+    subset_name = story[0].style.fontName
+    assert subset_name != font_name and subset_name.startswith(font_name)
+    assert _fontnames(story[1]) == [['Helvetica-Bold', 'Helvetica-Bold'],
+                                    [subset_name, subset_name],
+                                    [subset_name, subset_name]]
+
+
+def test_concurrent_requests_share_one_subset(font_name):
+    names = []
+
+    def request():
+        names.append(utils_pdf.get_subset_font(font_name, ['same text']))
+
+    threads = [threading.Thread(target=request) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(names)) == 1
+    assert utils_pdf._SUBSET_BUILD_LOCKS == {}
+    assert len(os.listdir(utils_pdf.FONT_SUBSET_DIR)) == 1
+
+
+def test_subset_font_is_not_aliased_to_the_full_font(font_name):
+    subset_name = utils_pdf.get_subset_font(font_name, ['abc'])
+    subset_font = pdfmetrics.getFont(subset_name)
+    assert subset_font is not pdfmetrics.getFont(font_name)
+    assert subset_font.face.name != pdfmetrics.getFont(font_name).face.name
+
+
+def test_registered_subsets_are_bounded(font_name, monkeypatch):
+    monkeypatch.setattr(utils_pdf, 'FONT_SUBSET_MEMORY_LIMIT', 2)
+    names = [utils_pdf.get_subset_font(font_name, [f'text {c}']) for c in 'éüñø']
+
+    registered = pdfmetrics.getRegisteredFontNames()
+    assert list(utils_pdf._SUBSET_FONTS.values()) == names[2:]
+    assert all(name not in registered for name in names[:2])
+    assert all(name in registered for name in names[2:])
+    # 登録を解除したサブセットも、再度要求されればディスクから登録し直す
+    assert utils_pdf.get_subset_font(font_name, ['text é']) == names[0]
+    assert names[0] in pdfmetrics.getRegisteredFontNames()
+
+
+def test_paragraph_and_nested_cells_are_subset(font_name):
+    style = ParagraphStyle('cell', fontName=font_name)
+    cell = Paragraph('Zebra', style)
+    inner = Table([['Quartz']])
+    inner.setStyle(TableStyle([('FONTNAME', (0, 0), (-1, -1), font_name)]))
+    table = Table([['Header', cell], [[inner], 'jump']])
+    table.setStyle(TableStyle([('FONTNAME', (0, 0), (-1, -1), font_name)]))
+
+    subset_table = utils_pdf.apply_subset_font([table], font_name)[0]
+    subset_name = subset_table._cellStyles[0][0].fontname
+    subset_cell = subset_table._cellvalues[0][1]
+    subset_inner = subset_table._cellvalues[1][0][0]
+
+    assert subset_name != font_name
+    assert subset_cell is not cell and subset_cell.style.fontName == subset_name
+    assert cell.style.fontName == font_name and table._cellvalues[0][1] is cell
+    assert subset_inner._cellStyles[0][0].fontname == subset_name
+    assert inner._cellStyles[0][0].fontname == font_name
+    face = pdfmetrics.getFont(subset_name).face
+    assert all(ord(c) in face.charToGlyph for c in 'ZebraQuartzjump')
+    SimpleDocTemplate(io.BytesIO()).build([subset_table])
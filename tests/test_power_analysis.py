@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils_power_analysis import parse_effect_sizes, run_power_simulation
+
+
+def _ar1_dataset(n=300, rho=0.7, seed=0):
+    rng = np.random.default_rng(seed)
+    noise = np.zeros(n)
+    shocks = rng.normal(0, 1, n)
+    for i in range(1, n):
+        noise[i] = rho * noise[i - 1] + shocks[i]
+    return pd.DataFrame({
+        'ymd': pd.date_range('2023-01-01', periods=n),
+        '処置群（A）': 100 + noise
+    })
+
+
+def test_false_positive_rate_at_zero_effect_is_near_alpha():
+    dataset = _ar1_dataset()
+    dates = dataset['ymd']
+    power_df = run_power_simulation(
+        dataset,
+        [dates.iloc[0], dates.iloc[209]],
+        [dates.iloc[210], dates.iloc[-1]],
+        effect_sizes=[0.0],
+        n_simulations=2000,
+        alpha=0.05,
+        random_state=1
+    )
+    assert power_df.loc[0, '検出率'] <= 0.08
+
+
+def test_detection_rate_increases_with_effect_size():
+    dataset = _ar1_dataset()
+    dates = dataset['ymd']
+    power_df = run_power_simulation(
+        dataset,
+        [dates.iloc[0], dates.iloc[209]],
+        [dates.iloc[210], dates.iloc[-1]],
+        effect_sizes=[0.0, 0.01, 0.05],
+        n_simulations=500,
+        random_state=1
+    )
+    rates = power_df['検出率'].values
+    assert rates[0] < rates[1] < rates[2]
+
+
+def test_parse_effect_sizes_deduplicates_and_sorts():
+    assert parse_effect_sizes('5, 0, 1,1, 3%') == [0.0, 0.01, 0.03, 0.05]
+    assert parse_effect_sizes('2，1、10％') == [0.0, 0.01, 0.02, 0.1]
+    assert parse_effect_sizes('') == [0.0]
+
+
+def test_parse_effect_sizes_reports_non_numeric_values():
+    with pytest.raises(ValueError, match='abc, nan'):
+        parse_effect_sizes('1, abc, nan, 3')
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils_result import AnalysisResult
+
+pytest.importorskip('scipy')
+
+
+def _make_result(alpha=0.05):
+    n, n_post = 60, 20
+    dates = pd.date_range('2024-01-01', periods=n).values
+    preds = np.full(n, 100.0)
+    actual = preds + 3.0
+    post_mask = np.zeros(n, dtype=bool)
+    post_mask[n - n_post:] = True
+    effects = actual - preds
+    return AnalysisResult(dates, actual, preds, preds - 1.96, preds + 1.96,
+                          effects, effects - 1.96, effects + 1.96, post_mask, p_value=0.01, alpha=alpha)
+
+
+@pytest.mark.parametrize('display_level', [90, 95, 99])
+def test_summary_sd_uses_model_alpha_not_display_level(display_level):
+    from utils_step3 import build_summary_dataframe
+
+    df = build_summary_dataframe(None, display_level, result=_make_result())
+    # 予測値の95%信頼区間の幅は 2 × 1.96 なので、標準偏差は 1.0
+    assert df.loc['予測値 (標準偏差)', '分析期間の平均値'] == '100.0 (1.0)'
+
+
+def test_fingerprint_depends_on_model_alpha():
+    assert _make_result(0.05).fingerprint() != _make_result(0.1).fingerprint()
+
+
+def test_generate_report_cache_is_thread_safe(monkeypatch):
+    import threading
+
+    import utils_report
+    from utils_cache import ByteLRU
+
+    monkeypatch.setattr(utils_report, '_REPORT_CACHE', ByteLRU(1 << 20, 2))
+    results = [_make_result(alpha) for alpha in (0.05, 0.1, 0.2)]
+    expected = [utils_report.generate_report(result, level) for result, level in zip(results, (95, 90, 80))]
+    errors = []
+
+    def worker(offset):
+        try:
+            for step in range(200):
+                i = (offset + step) % 3
+                assert utils_report.generate_report(results[i], (95, 90, 80)[i]) == expected[i]
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert all(report for report in expected)
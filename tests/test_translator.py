@@ -0,0 +1,35 @@
+import threading
+
+import causal_impact_translator
+from causal_impact_translator import CausalImpactTranslator
+from utils_cache import ByteLRU
+
+REPORT = """During the post-intervention period, the response variable had
+an average value of approx. {value}. By contrast, in the absence of an
+intervention, we would have expected an average response of 99.97."""
+
+
+def test_concurrent_translations_share_a_bounded_cache(monkeypatch):
+    monkeypatch.setattr(causal_impact_translator, '_TRANSLATION_CACHE', ByteLRU(1 << 20, 2))
+    translator = CausalImpactTranslator()
+    reports = [REPORT.format(value=100 + i) for i in range(6)]
+    expected = [translator.translate_report(report) for report in reports]
+    errors, mismatches = [], []
+
+    def worker(offset):
+        try:
+            for step in range(300):
+                i = (offset + step) % len(reports)
+                if translator.translate_report(reports[i]) != expected[i]:
+                    mismatches.append(i)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == [] and mismatches == []
+    assert causal_impact_translator._TRANSLATION_CACHE.get_status()['entries'] <= 2
@@ -0,0 +1,465 @@
+"""
+一括PDFレポート（複数系列）作成モジュール
+
+複数店舗・複数系列の分析結果を、表紙（系列別サマリー）と系列ごとのページからなる
+1つのPDFにまとめる。
+
+- 系列ごとのグラフは分析と同じ共有ワーカープールで並列に作成し、PDFの内容（bytes）として受け取る
+- 作成中・反映待ちのグラフ数を BATCH_REPORT_SETTINGS['max_in_flight'] までに制限し、
+  ページはでき次第キャンバスに描画して破棄するため、系列数が増えてもメモリ使用量はほぼ一定
+- フォントは文書全体で1つのサブセットフォントを共有する（ページごとに埋め込まない）
+- 作成したグラフは描画済みグラフのメモ（utils_chart_cache）に残し、再作成時は描画しない
+"""
+
+import io
+from collections import deque
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+from config.constants import BATCH_REPORT_SETTINGS
+from utils_chart_cache import get_chart_cache
+from utils_pdf import build_pdf_bytes_flowable, get_subset_font
+from utils_result import build_model_summary_rows, get_effect_summary
+
+# ページの余白（ポイント）
+PAGE_MARGIN = 42
+
+
+# このプロセスで設定済みのグラフ用フォント（None: 未設定, True: 日本語, False: 英語）
+_CHART_FONT_READY = None
+
+
+def _init_chart_worker(use_japanese):
+    """
+    グラフ作成プロセスの初期化処理（描画バックエンドと日本語フォントの設定。プロセスごとに1回）
+    """
+    global _CHART_FONT_READY
+    if _CHART_FONT_READY == use_japanese:
+        return
+    import matplotlib
+    matplotlib.use('Agg')
+    if use_japanese:
+        try:
+            from config.graph_config import setup_matplotlib_japanese_font
+            setup_matplotlib_japanese_font()
+        except Exception as e:
+            print(f"グラフ用日本語フォントの設定に失敗しました: {str(e)}")
+    _CHART_FONT_READY = use_japanese
+
+
+def _render_chart_task(payload):
+    # 共有ワーカープールで実行するグラフ作成処理（ワーカーは分析と共用のため、フォントはここで設定）
+    _init_chart_worker(payload['use_japanese'])
+    return render_series_chart(payload)
+
+
+def _post_cumsum(values, post_mask):
+    cumulative = np.full(len(values), np.nan)
+    cumulative[post_mask] = np.cumsum(values[post_mask])
+    return cumulative
+
+
+def render_series_chart(payload):
+    """
+    1系列分のグラフ（実測値 vs 予測値・時点効果・累積効果）を作成し、ファイルの内容を返す関数
+
+    ワーカープロセスで実行するため、分析結果オブジェクトではなく配列を受け取る。
+    pyplot を使わずに Figure を直接作成するため、作成後にグラフを閉じる必要はない。
+
+    Parameters:
+    -----------
+    payload : dict
+        {'dates', 'actual', 'preds', 'preds_lower', 'preds_upper', 'point_effects',
+         'point_effects_lower', 'point_effects_upper', 'post_mask', 'labels',
+         'format', 'width', 'height', 'dpi'}
+
+    Returns:
+    --------
+    bytes : グラフのファイルの内容（format が 'pdf' の場合はPDF、'png' の場合はPNG）
+    """
+    from matplotlib.figure import Figure
+
+    labels = payload['labels']
+    dates = pd.to_datetime(payload['dates'])
+    post_mask = payload['post_mask']
+    intervention_date = dates[post_mask][0] if post_mask.any() else None
+
+    fig = Figure(figsize=(payload['width'] / 72, payload['height'] / 72))
+    axes = fig.subplots(3, 1, sharex=True)
+
+    ax = axes[0]
+    ax.plot(dates, payload['actual'], color='black', linewidth=0.8, label=labels['actual'])
+    ax.plot(dates, payload['preds'], color='tab:blue', linestyle='--', linewidth=0.8, label=labels['predicted'])
+    ax.fill_between(dates, payload['preds_lower'], payload['preds_upper'], color='tab:blue', alpha=0.2, linewidth=0)
+    ax.set_title(labels['actual_vs_predicted'], fontsize=8)
+    ax.legend(fontsize=6, loc='upper left', frameon=False)
+
+    ax = axes[1]
+    ax.plot(dates, payload['point_effects'], color='tab:blue', linestyle='--', linewidth=0.8)
+    ax.fill_between(dates, payload['point_effects_lower'], payload['point_effects_upper'],
+                    color='tab:blue', alpha=0.2, linewidth=0)
+    ax.axhline(0, color='gray', linewidth=0.6)
+    ax.set_title(labels['point_effects'], fontsize=8)
+
+    ax = axes[2]
+    ax.plot(dates, _post_cumsum(payload['point_effects'], post_mask), color='tab:blue', linestyle='--', linewidth=0.8)
+    ax.fill_between(dates, _post_cumsum(payload['point_effects_lower'], post_mask),
+                    _post_cumsum(payload['point_effects_upper'], post_mask),
+                    color='tab:blue', alpha=0.2, linewidth=0)
+    ax.axhline(0, color='gray', linewidth=0.6)
+    ax.set_title(labels['cumulative_effects'], fontsize=8)
+
+    for ax in axes:
+        if intervention_date is not None:
+            ax.axvline(intervention_date, color='gray', linestyle=':', linewidth=0.8)
+        ax.tick_params(labelsize=6)
+    fig.autofmt_xdate()
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=payload['format'], dpi=payload['dpi'])
+    return buffer.getvalue()
+
+
+def _build_chart_payload(result, labels, chart_format, width, height):
+    return {
+        'dates': np.asarray(result.dates, dtype='datetime64[ns]'),
+        'actual': result.actual,
+        'preds': result.preds,
+        'preds_lower': result.preds_lower,
+        'preds_upper': result.preds_upper,
+        'point_effects': result.point_effects,
+        'point_effects_lower': result.point_effects_lower,
+        'point_effects_upper': result.point_effects_upper,
+        'post_mask': result.post_mask,
+        'labels': labels,
+        'format': chart_format,
+        'width': width,
+        'height': height,
+        'dpi': 150
+    }
+
+
+def _render_in_process(payload):
+    try:
+        return _render_chart_task(payload)
+    except Exception as e:
+        print(f"グラフの作成に失敗しました: {str(e)}")
+        return None
+
+
+def iter_series_charts(payloads, max_in_flight, cache=None, use_worker_pool=True):
+    """
+    系列ごとのグラフを作成し、payloads の順に返すジェネレーター
+
+    グラフは分析と同じ共有ワーカープール（utils_worker_pool）で作成し、CPUの上限・セッションごとの
+    上限に従う。作成中・受け取り待ちのグラフは max_in_flight 件までとし、受け取った分だけ次を投入する。
+    プールが無効・起動できない場合は同一プロセスで作成する。
+    描画済みグラフのメモ（cache）に payload['cache_key'] のグラフがある場合は作成しない。
+
+    Parameters:
+    -----------
+    payloads : iterable of dict
+        render_series_chart の引数（'use_japanese' を含める。メモを使う場合は 'cache_key' も含める）
+    max_in_flight : int
+        同時に作成中・受け取り待ちにできるグラフ数
+    cache : ChartCache, optional
+        描画済みグラフのメモ
+    use_worker_pool : bool
+        共有ワーカープールで作成する場合True（Falseの場合は同一プロセスで作成）
+
+    Yields:
+    -------
+    bytes or None : グラフのファイルの内容（作成に失敗した場合はNone）
+    """
+    from utils_worker_pool import get_session_id, get_shared_worker_pool
+
+    def get_cached(payload):
+        key = payload.get('cache_key')
+        return cache.get(key) if cache is not None else None
+
+    def store(payload, data):
+        key = payload.get('cache_key')
+        if cache is not None and data is not None:
+            cache.put(key, data)
+        return data
+
+    pool = get_shared_worker_pool() if use_worker_pool else None
+    if pool is None:
+        for payload in payloads:
+            cached = get_cached(payload)
+            yield cached if cached is not None else store(payload, _render_in_process(payload))
+        return
+
+    pending = deque()
+
+    def take_next():
+        payload, future, cached = pending.popleft()
+        if future is None:
+            return cached
+        try:
+            return store(payload, pool.result(future, pool.timeout_seconds))
+        except Exception as e:
+            # ワーカーの異常終了・タイムアウトを含め、サーバープロセスでは再作成しない
+            print(f"グラフの作成に失敗しました: {str(e)}")
+            return None
+
+    with pool.session_job(get_session_id()):
+        try:
+            for payload in payloads:
+                cached = get_cached(payload)
+                future = None
+                while cached is None:
+                    try:
+                        future = pool.submit(_render_chart_task, payload)
+                        break
+                    except RuntimeError:
+                        # 待機枠が空かない場合は、投入済みのグラフを受け取ってから再投入する
+                        if not pending:
+                            raise
+                        yield take_next()
+                pending.append((payload, future, cached))
+                if len(pending) >= max_in_flight:
+                    yield take_next()
+            while pending:
+                yield take_next()
+        finally:
+            for _, future, _ in pending:
+                if future is not None:
+                    future.cancel()
+
+
+def _chart_flowable(chart_bytes, chart_format, width, height):
+    if chart_bytes is None:
+        return None
+    try:
+        if chart_format == 'pdf':
+            return build_pdf_bytes_flowable(chart_bytes, width, height)
+        from reportlab.platypus import Image
+        return Image(io.BytesIO(chart_bytes), width=width, height=height)
+    except Exception as e:
+        print(f"グラフをPDFに埋め込めません: {str(e)}")
+        return None
+
+
+def _draw_flowables(canvas, flowables, font_name, pagesize):
+    """
+    Flowableのリストをページに描画する（収まらない分は次のページへ、各ページ末尾にページ番号）
+    """
+    from reportlab.platypus import Frame
+
+    page_width, page_height = pagesize
+    flowables = list(flowables)
+    while flowables:
+        frame = Frame(PAGE_MARGIN, PAGE_MARGIN, page_width - 2 * PAGE_MARGIN, page_height - 2 * PAGE_MARGIN,
+                      leftPadding=0, rightPadding=0, topPadding=0, bottomPadding=0)
+        remaining = len(flowables)
+        frame.addFromList(flowables, canvas)
+        if len(flowables) == remaining:
+            # 1ページに収まらない要素は省略（無限ループ防止）
+            print(f"ページに収まらない要素を省略しました: {type(flowables[0]).__name__}")
+            flowables.pop(0)
+        canvas.setFont(font_name, 8)
+        canvas.drawCentredString(page_width / 2, PAGE_MARGIN / 2, f"- {canvas.getPageNumber()} -")
+        canvas.showPage()
+
+
+def _get_post_period(result):
+    post_dates = pd.to_datetime(np.asarray(result.dates)[result.post_mask])
+    return post_dates[0], post_dates[-1]
+
+
+def build_batch_report_pdf(series_results, analysis_info=None, confidence_level=95, is_single_group=True,
+                           use_worker_pool=True, progress_callback=None):
+    """
+    複数系列の分析結果を1つのPDFレポート（表紙＋系列ごとのページ）にまとめる関数
+
+    Parameters:
+    -----------
+    series_results : iterable of (str, AnalysisResult)
+        系列名（店舗名など）と分析結果オブジェクトの組（介入期間のデータがない系列は除外）
+    analysis_info : dict or None
+        全系列に共通の分析情報（'freq_option'、二群比較の場合は 'control_name'）
+    confidence_level : int
+        信頼水準（%）
+    is_single_group : bool
+        単群推定の場合True、二群比較の場合False
+    use_worker_pool : bool
+        グラフを共有ワーカープールで作成する場合True（Falseの場合は同一プロセスで作成）
+    progress_callback : callable or None
+        系列ページを1つ描画するたびに (描画済みの系列数, 系列数) で呼び出す関数
+
+    Returns:
+    --------
+    tuple : (PDFの内容（bytes）, ファイル名)
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.pdfgen.canvas import Canvas
+    from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
+    from config.pdf_templates import format_analysis_info_section, get_pdf_comment_message, get_pdf_content
+
+    series = [(str(name), result) for name, result in series_results if result is not None and result.n_post > 0]
+    if not series:
+        raise ValueError("介入期間のデータがある分析結果がありません")
+
+    analysis_info = analysis_info or {}
+    settings = BATCH_REPORT_SETTINGS
+    chart_width, chart_height = settings['chart_width'], settings['chart_height']
+
+    # 日本語フォント設定
+    try:
+        from config.font_config import get_simple_japanese_font, is_japanese_font_available
+        font_name = get_simple_japanese_font()
+        use_japanese = is_japanese_font_available() and font_name != 'Helvetica'
+    except Exception as e:
+        print(f"フォント設定エラー: {e}")
+        font_name = 'Helvetica'
+        use_japanese = False
+    content = get_pdf_content(use_japanese)
+
+    try:
+        from config.graph_config import get_graph_labels, is_japanese_font_available_for_graphs
+        use_japanese_graph = use_japanese and is_japanese_font_available_for_graphs()
+    except Exception:
+        from config.graph_config import get_graph_labels
+        use_japanese_graph = False
+    graph_labels = get_graph_labels(use_japanese_graph)
+
+    try:
+        import pdfrw  # noqa: F401
+        chart_format = 'pdf'
+    except ImportError:
+        chart_format = 'png'
+
+    def series_info(name, result):
+        period_start, period_end = _get_post_period(result)
+        info = dict(analysis_info, treatment_name=escape(name), period_start=period_start, period_end=period_end)
+        return format_analysis_info_section(content, info, result.n_post, confidence_level, is_single_group)
+
+    # 表紙の系列別サマリー（累積値）
+    overview_rows = []
+    significant_count = 0
+    for name, result in series:
+        stats = result.post_stats
+        relative_effect, p_value, is_significant = get_effect_summary(result)
+        significant_count += int(is_significant)
+        overview_rows.append([
+            name,
+            f"{stats['actual_cum']:,.1f}",
+            f"{stats['preds_cum']:,.1f}",
+            f"{stats['point_effects_cum']:,.1f}",
+            f"{relative_effect:+.1f}%",
+            f"{p_value:.4f}" if p_value is not None else '-',
+            content['judgement_significant'] if is_significant else content['judgement_not_significant']
+        ])
+
+    # 文書全体で共有するサブセットフォント（全ページの文字をまとめて1回だけ作成）
+    texts = [str(value) for value in content.values()] + [str(value) for value in graph_labels.values()]
+    texts += [name for name, _ in series] + series_info(*series[0])
+    texts += [str(value) for row in overview_rows for value in row]
+    try:
+        font_name = get_subset_font(font_name, texts)
+    except Exception as e:
+        print(f"サブセットフォントを作成できません（元のフォントを使用）: {str(e)}")
+
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle('BatchTitle', parent=styles['Title'], fontName=font_name, fontSize=15,
+                                 alignment=1, spaceAfter=6)
+    heading_style = ParagraphStyle('BatchHeading', parent=styles['Heading1'], fontName=font_name, fontSize=11,
+                                   spaceAfter=2)
+    normal_style = ParagraphStyle('BatchNormal', parent=styles['Normal'], fontName=font_name, fontSize=8,
+                                  spaceAfter=1)
+    cell_style = ParagraphStyle('BatchCell', parent=normal_style, spaceAfter=0)
+
+    def table_style(header_color):
+        return TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), header_color),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('FONTNAME', (0, 0), (-1, -1), font_name),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+            ('TOPPADDING', (0, 0), (-1, -1), 3),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
+        ])
+
+    pdf_buffer = io.BytesIO()
+    canvas = Canvas(pdf_buffer, pagesize=A4)
+    canvas.setTitle(content['title_batch'])
+
+    # 表紙
+    period_starts, period_ends = zip(*(_get_post_period(result) for _, result in series))
+    period_start, period_end = min(period_starts), max(period_ends)
+    method = content['method_single_group'] if is_single_group else content['method_two_group']
+    batch_count = content['batch_series_count'].format(count=len(series), significant=significant_count)
+    cover = [
+        Paragraph(content['title_batch'], title_style),
+        Spacer(1, 6),
+        Paragraph(content['section_analysis_info'], heading_style),
+        Paragraph(f"　{content['label_series_count']}　{batch_count}", normal_style),
+        Paragraph(f"　{content['label_period']}　{period_start:%Y-%m-%d} ～ {period_end:%Y-%m-%d}", normal_style),
+        Paragraph(f"　{content['label_method']}　{method}（{content['confidence_level']}{confidence_level}%）", normal_style),
+        Spacer(1, 12),
+        Paragraph(content['section_batch_overview'], heading_style),
+        Paragraph(content['batch_table_note'], normal_style),
+        Spacer(1, 4)
+    ]
+    header = [content['table_series'], content['table_actual'], content['table_predicted'],
+              content['table_absolute_effect'], content['table_relative_effect'], content['table_p_value'],
+              content['table_judgement']]
+    table_rows = [header] + [[Paragraph(escape(row[0]), cell_style)] + row[1:] for row in overview_rows]
+    overview_table = Table(table_rows, repeatRows=1, colWidths=[130, 70, 70, 70, 55, 50, 65])
+    overview_table.setStyle(table_style(colors.lightblue))
+    cover.append(overview_table)
+    _draw_flowables(canvas, cover, font_name, A4)
+
+    # 系列ごとのページ（グラフはでき次第描画し、描画後は保持しない）
+    # 作成済みのグラフ（同じ分析結果・サイズ・ラベル）は描画済みグラフのメモから取り出す
+    chart_cache = get_chart_cache()
+    chart_dpi = 150 if chart_format == 'png' else None
+
+    def chart_payloads():
+        for _, result in series:
+            payload = _build_chart_payload(result, graph_labels, chart_format, chart_width, chart_height)
+            payload['use_japanese'] = use_japanese_graph
+            payload['cache_key'] = chart_cache.make_key(result, chart_format, (chart_width, chart_height),
+                                                        chart_dpi, graph_labels, source='batch')
+            yield payload
+
+    charts = iter_series_charts(chart_payloads(), settings['max_in_flight'], cache=chart_cache,
+                                use_worker_pool=use_worker_pool)
+    summary_header = [content['table_indicator'], content['table_avg_analysis_period'],
+                      content['table_total_analysis_period']]
+    explanation_key = 'graph_explanation_single_group' if is_single_group else 'graph_explanation_two_group'
+    for index, ((name, result), chart_bytes) in enumerate(zip(series, charts), start=1):
+        page = [Paragraph(escape(name), title_style), Spacer(1, 4),
+                Paragraph(content['section_analysis_info'], heading_style)]
+        page += [Paragraph(text, normal_style) for text in series_info(name, result)]
+        page += [Spacer(1, 8), Paragraph(content['section_summary'], heading_style)]
+
+        summary_table = Table([summary_header] + build_model_summary_rows(result, content, confidence_level),
+                              colWidths=[150, 150, 150])
+        summary_table.setStyle(table_style(colors.lightblue))
+        page += [summary_table, Spacer(1, 4)]
+
+        relative_effect, p_value, is_significant = get_effect_summary(result)
+        if p_value is not None:
+            page.append(Paragraph(get_pdf_comment_message(relative_effect, p_value, is_significant, use_japanese),
+                                  normal_style))
+
+        chart = _chart_flowable(chart_bytes, chart_format, chart_width, chart_height)
+        if chart is not None:
+            page += [Spacer(1, 8), Paragraph(content['section_graph'], heading_style), chart, Spacer(1, 4),
+                     Paragraph(f"　{content[explanation_key]}", normal_style)]
+
+        _draw_flowables(canvas, page, font_name, A4)
+        if progress_callback is not None:
+            progress_callback(index, len(series))
+
+    canvas.save()
+    filename = f"causal_impact_batch_report_{len(series)}series_{period_start:%Y%m%d}_{period_end:%Y%m%d}.pdf"
+    return pdf_buffer.getvalue(), filename
@@ -0,0 +1,166 @@
+"""
+サーバー全体で共有するメモの共通部品
+
+- ByteLRU: サイズ上限付きのメモ（LRU）。合計サイズ・件数が上限を超えた場合は、最も長く使われていないものから破棄する。
+  同じキーの作成が同時に要求された場合は、1回だけ作成して結果を共有する。
+  エクスポート（utils_export）・描画済みグラフ（utils_chart_cache）・時系列プロット（utils_preview_chart）で使用する。
+- shared_resource: サーバー全体で1つだけ作成するオブジェクト（ワーカープール・各メモ）の取得関数を作成する。
+  Streamlitがある場合は st.cache_resource、ない場合（テスト・バッチ実行）はプロセス内で1つだけ作成する。
+"""
+
+import functools
+import threading
+from collections import OrderedDict
+
+
+class ByteLRU:
+    """
+    値をサイズ上限付きでメモするクラス（LRU）
+
+    値のサイズは size_of（省略時は len）で計算する。
+    """
+
+    def __init__(self, max_bytes, max_entries, size_of=len):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._size_of = size_of
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._build_locks = {}
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key):
+        """
+        メモした値を返す
+
+        Returns:
+        --------
+        object or None : メモがない場合（key がNoneの場合を含む）はNone
+        """
+        if key is None:
+            return None
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        値をメモする（上限を超える場合は古いものから破棄。値だけで上限を超える場合はメモしない）
+        """
+        size = self._size_of(value)
+        if key is None or size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= self._size_of(old)
+            self._entries[key] = value
+            self._total_bytes += size
+            while self._entries and (self._total_bytes > self.max_bytes or len(self._entries) > self.max_entries):
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= self._size_of(evicted)
+
+    def get_or_build(self, key, builder):
+        """
+        メモした値を返し、なければ作成してメモする
+
+        同じキーの作成が同時に要求された場合は、1回だけ作成して結果を共有する。
+
+        Parameters:
+        -----------
+        key : hashable or None
+            メモのキー（Noneの場合はメモせずに作成する）
+        builder : callable
+            引数なしで呼び出し、値を返す関数
+
+        Returns:
+        --------
+        object : メモした値または作成した値
+        """
+        if key is None:
+            return builder()
+
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        with build_lock:
+            with self._lock:
+                cached = self._entries.get(key)
+            if cached is None:
+                cached = builder()
+                self.put(key, cached)
+        with self._lock:
+            self._build_locks.pop(key, None)
+        return cached
+
+    def clear(self):
+        """
+        メモをすべて破棄する
+        """
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def get_status(self):
+        """
+        メモの状態を返す
+
+        Returns:
+        --------
+        dict : {'entries', 'total_bytes', 'max_bytes', 'hits', 'misses'}
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'total_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses
+            }
+
+
+def shared_resource(factory):
+    """
+    サーバー全体で1つだけ作成するオブジェクトの取得関数を作成する
+
+    Streamlitがある場合は st.cache_resource で全セッションに共有し、
+    ない場合はプロセス内で最初の呼び出し時に1回だけ作成する。
+    作成に失敗した場合は保持せず、次の呼び出しで作成し直す。
+
+    Parameters:
+    -----------
+    factory : callable
+        引数なしで呼び出し、共有するオブジェクトを返すモジュールレベルの関数
+
+    Returns:
+    --------
+    callable : 引数なしで呼び出し、共有するオブジェクトを返す関数
+    """
+    try:
+        import streamlit as st
+    except ImportError:
+        st = None
+    if st is not None:
+        return st.cache_resource(show_spinner=False)(factory)
+
+    lock = threading.Lock()
+    instance = []
+
+    @functools.wraps(factory)
+    def get_resource():
+        with lock:
+            if not instance:
+                instance.append(factory())
+            return instance[0]
+
+    return get_resource
@@ -0,0 +1,76 @@
+"""
+描画済みグラフのメモ
+
+分析結果のグラフを描画したファイル内容（PNG・SVG・PDF）を
+(分析結果のハッシュ値, 描画元, 形式, サイズ, 解像度, グラフのラベル) をキーとしてサーバー全体でメモする。
+同じ分析結果を再度表示・出力する場合（同じデータでの再分析、別セッションでの同じ分析、
+一括レポートの再作成など）は、matplotlibで描画せずにメモを返す。
+メモの管理（サイズ上限・LRUでの破棄・同時作成の抑止）は utils_cache.ByteLRU を使用する。
+"""
+
+import hashlib
+
+from config.constants import CHART_CACHE_SETTINGS
+from utils_cache import ByteLRU, shared_resource
+
+
+class ChartCache(ByteLRU):
+    """
+    描画済みグラフのファイル内容をメモリ上限付きでメモするクラス（LRU）
+    """
+
+    @staticmethod
+    def make_key(result, fmt, size, dpi, labels, source='analysis'):
+        """
+        メモのキーを作成する
+
+        Parameters:
+        -----------
+        result : AnalysisResult or None
+            分析結果オブジェクト（Noneの場合はメモしない）
+        fmt : str
+            ファイル形式（'png', 'svg', 'pdf'）
+        size : tuple
+            グラフのサイズ (幅, 高さ)
+        dpi : int or None
+            解像度（ベクター形式の場合はNone）
+        labels : dict
+            グラフのラベル（表示言語の判定に使用）
+        source : str
+            描画元（'analysis': ci.plot() のグラフ、'batch': 一括レポート用のグラフ）
+
+        Returns:
+        --------
+        tuple or None
+        """
+        if result is None:
+            return None
+        labels_digest = hashlib.sha1(repr(sorted(labels.items())).encode('utf-8')).hexdigest()[:16]
+        size = tuple(round(float(value), 2) for value in size)
+        return (result.fingerprint(), source, fmt, size, dpi, labels_digest)
+
+
+def get_chart_labels():
+    """
+    現在の環境でグラフに使うラベルを返す（get_graph_config と同じ判定。フォント設定は変更しない）
+
+    Returns:
+    --------
+    dict : グラフのラベル
+    """
+    from config.graph_config import get_graph_labels, is_japanese_font_available_for_graphs
+    try:
+        use_japanese = is_japanese_font_available_for_graphs()
+    except Exception:
+        use_japanese = False
+    return get_graph_labels(use_japanese)
+
+
+def _create_chart_cache():
+    """
+    描画済みグラフのメモを作成する（サーバー全体で1つだけ）
+    """
+    return ChartCache(CHART_CACHE_SETTINGS['max_bytes'], CHART_CACHE_SETTINGS['max_entries'])
+
+
+get_chart_cache = shared_resource(_create_chart_cache)
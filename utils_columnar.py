@@ -0,0 +1,169 @@
+"""
+列指向形式（Parquet・Arrow IPC）とJSONでのエクスポート
+
+日次の推定結果を型付きの列（列名は詳細CSVの英字変数名 en_names と同じ）として出力し、
+BIツールなど下流の処理がCSVを解析し直さずにそのまま読み込めるようにする。
+サマリー指標はファイルのメタデータ（キー 'causal_impact_summary'）にJSONとして埋め込み、
+単独の小さなJSONとしても出力できる。
+
+pyarrow は任意の依存パッケージで、インストールされていない場合は
+Parquet・Arrow形式を利用できない（JSONは利用可能）。
+"""
+
+import io
+import json
+
+from utils_result import get_report_values
+
+# 日次の推定結果の列（詳細CSVの英字変数名と同じ）
+INFERENCE_COLUMNS = [
+    'date', 'y', 'preds', 'preds_lower', 'preds_upper',
+    'point_effects', 'point_effects_lower', 'point_effects_upper',
+    'post_cum_y', 'post_cum_pred', 'post_cum_effects', 'post_period'
+]
+
+SUMMARY_METADATA_KEY = b'causal_impact_summary'
+
+COLUMNAR_FORMATS = {
+    'parquet': {'label': 'Parquet', 'extension': 'parquet', 'mime': 'application/vnd.apache.parquet'},
+    'arrow': {'label': 'Arrow IPC', 'extension': 'arrow', 'mime': 'application/vnd.apache.arrow.file'},
+    'json': {'label': 'JSON（サマリー指標）', 'extension': 'json', 'mime': 'application/json'}
+}
+
+
+def is_columnar_export_available():
+    """
+    Parquet・Arrow形式で出力できるかどうか（pyarrow がインストールされているか）を判定
+
+    Returns:
+    --------
+    bool
+    """
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _to_float(value):
+    return None if value is None else float(value)
+
+
+def build_summary_dict(result, confidence_level=95, analysis_info=None):
+    """
+    サマリー指標を辞書として作成する関数
+
+    Parameters:
+    -----------
+    result : AnalysisResult
+        分析結果オブジェクト
+    confidence_level : int
+        信頼水準（%）
+    analysis_info : dict, optional
+        分析情報（treatment_name, control_name, analysis_type, freq_option 等）
+
+    Returns:
+    --------
+    dict : {'analysis', 'confidence_level', 'p_value', 'n_obs', 'n_post', 'post_start', 'post_end', 'metrics'}
+        metrics は {指標名: {'average': 平均値, 'cumulative': 累積値}}（相対効果は比率）
+    """
+    import pandas as pd
+
+    analysis_info = analysis_info or {}
+    post_dates = pd.to_datetime(pd.Series(result.dates)[result.post_mask])
+    values = get_report_values(result) or {}
+
+    return {
+        'analysis': {
+            key: str(analysis_info[key])
+            for key in ('treatment_name', 'control_name', 'analysis_type', 'freq_option')
+            if analysis_info.get(key) is not None
+        },
+        'confidence_level': int(confidence_level),
+        'p_value': _to_float(result.p_value),
+        'n_obs': int(len(result.dates)),
+        'n_post': int(result.n_post),
+        'post_start': post_dates.min().strftime('%Y-%m-%d') if len(post_dates) else None,
+        'post_end': post_dates.max().strftime('%Y-%m-%d') if len(post_dates) else None,
+        'metrics': {
+            name: {'average': _to_float(average), 'cumulative': _to_float(cumulative)}
+            for name, (average, cumulative) in values.items()
+        }
+    }
+
+
+def _summary_json(result, confidence_level, analysis_info):
+    summary = build_summary_dict(result, confidence_level, analysis_info)
+    return json.dumps(summary, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def build_inference_table(result, confidence_level=95, analysis_info=None):
+    """
+    日次の推定結果を型付きの pyarrow.Table として作成する関数
+
+    日付は date32、推定値は float64、介入期間フラグは int8（1＝介入期間、0＝介入前期間）。
+    サマリー指標はスキーマのメタデータにJSONとして格納する。
+
+    Returns:
+    --------
+    pyarrow.Table
+    """
+    import pandas as pd
+    import pyarrow as pa
+
+    frame = result.to_frame()[INFERENCE_COLUMNS]
+    frame = frame.assign(date=pd.to_datetime(frame['date']).dt.date)
+    schema = pa.schema(
+        [pa.field('date', pa.date32())]
+        + [pa.field(name, pa.float64()) for name in INFERENCE_COLUMNS[1:-1]]
+        + [pa.field('post_period', pa.int8())],
+        metadata={SUMMARY_METADATA_KEY: _summary_json(result, confidence_level, analysis_info)}
+    )
+    return pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+
+
+def build_columnar_export(result, analysis_info, fmt, confidence_level=95):
+    """
+    分析結果を Parquet・Arrow IPC・JSON 形式で出力する関数
+
+    Parameters:
+    -----------
+    result : AnalysisResult
+        分析結果オブジェクト
+    analysis_info : dict
+        分析情報（treatment_name, analysis_type, period_start, period_end 等）
+    fmt : str
+        'parquet'（日次の推定結果）, 'arrow'（同）, 'json'（サマリー指標のみ）
+    confidence_level : int
+        信頼水準（%）
+
+    Returns:
+    --------
+    data, filename : bytes, str
+        ファイルの内容とファイル名
+    """
+    if fmt not in COLUMNAR_FORMATS:
+        raise ValueError(f"未対応の出力形式です: {fmt}")
+
+    period_start = analysis_info.get('period_start')
+    period_end = analysis_info.get('period_end')
+    treatment_name = analysis_info.get('treatment_name', '分析対象')
+    analysis_type_short = "SingleGroup" if "単群推定" in analysis_info.get('analysis_type', '') else "TwoGroup"
+    kind = 'summary' if fmt == 'json' else 'detail'
+    filename = (f"causal_impact_{kind}_{treatment_name}_{period_start.strftime('%Y%m%d')}_{period_end.strftime('%Y%m%d')}"
+                f"_{analysis_type_short}.{COLUMNAR_FORMATS[fmt]['extension']}")
+
+    if fmt == 'json':
+        return _summary_json(result, confidence_level, analysis_info), filename
+
+    table = build_inference_table(result, confidence_level, analysis_info)
+    buffer = io.BytesIO()
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(table, buffer)
+    else:
+        import pyarrow as pa
+        with pa.ipc.new_file(buffer, table.schema) as writer:
+            writer.write_table(table)
+    return buffer.getvalue(), filename
@@ -0,0 +1,163 @@
+"""
+CSVの逐次出力
+
+データフレームを一定行数ごとにCSVへ変換し、bytesの断片として順に一時ファイルへ書き込む。
+全体を1つの文字列（またはメモリ上のバッファ）にまとめる場合と異なり、出力中に保持するのは1断片分だけで済むため、
+長期間の日次データでもメモリ使用量が一定になる。
+作成したファイルは CsvFile としてメモし、ユーザーがダウンロードを要求した再実行でだけファイルから読み出す
+（st.download_button が読み込むため、ダウンロード時のメモリ使用量は圧縮後のファイルサイズ分になる）。
+gzip・zip形式での圧縮出力にも対応する（STEP3で選択）。
+"""
+
+import gzip
+import os
+import tempfile
+import zipfile
+
+from config.constants import CSV_EXPORT_SETTINGS
+
+CSV_MIMES = {
+    None: 'text/csv',
+    'gzip': 'application/gzip',
+    'zip': 'application/zip'
+}
+
+
+def iter_csv_chunks(df, header_rows=(), footer_lines=(), chunk_rows=None, encoding='utf-8-sig'):
+    """
+    データフレームをCSVのbytesの断片として順に返すジェネレーター
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        出力するデータ（列名・インデックスは出力しない）
+    header_rows : list of list of str
+        先頭に出力するヘッダー行（日本語項目名・英字変数名など）
+    footer_lines : list of str
+        末尾に出力する注釈の行
+    chunk_rows : int, optional
+        一度にCSVへ変換する行数（省略時は CSV_EXPORT_SETTINGS の値）
+    encoding : str
+        文字コード（utf-8-sig の場合、BOMは先頭に1回だけ出力）
+
+    Yields:
+    -------
+    bytes : CSVの断片
+    """
+    chunk_rows = chunk_rows or CSV_EXPORT_SETTINGS['chunk_rows']
+    body_encoding = 'utf-8' if encoding == 'utf-8-sig' else encoding
+
+    yield ''.join(','.join(row) + '\n' for row in header_rows).encode(encoding)
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=False).encode(body_encoding)
+    if footer_lines:
+        yield ''.join(line + '\n' for line in footer_lines).encode(body_encoding)
+
+
+def write_csv(chunks, fileobj, compression=None, arcname='data.csv'):
+    """
+    CSVの断片を順にファイルへ書き込む関数
+
+    Parameters:
+    -----------
+    chunks : iterable of bytes
+        iter_csv_chunks で作成したCSVの断片
+    fileobj : file-like
+        書き込み先（バイナリモード）
+    compression : str or None
+        圧縮形式（None, 'gzip', 'zip'）
+    arcname : str
+        zip形式の場合のzip内のファイル名
+    """
+    if compression is None:
+        for chunk in chunks:
+            fileobj.write(chunk)
+    elif compression == 'gzip':
+        with gzip.GzipFile(fileobj=fileobj, mode='wb', mtime=0,
+                           compresslevel=CSV_EXPORT_SETTINGS['compresslevel']) as gzip_file:
+            for chunk in chunks:
+                gzip_file.write(chunk)
+    elif compression == 'zip':
+        with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_DEFLATED,
+                             compresslevel=CSV_EXPORT_SETTINGS['compresslevel']) as zip_file:
+            with zip_file.open(arcname, 'w', force_zip64=True) as member:
+                for chunk in chunks:
+                    member.write(chunk)
+    else:
+        raise ValueError(f"未対応の圧縮形式です: {compression}")
+
+
+def get_compressed_filename(filename, compression=None):
+    """
+    圧縮形式に応じたファイル名を返す（gzip: ○○.csv.gz、zip: ○○.zip）
+    """
+    if compression == 'gzip':
+        return f"{filename}.gz"
+    if compression == 'zip':
+        return f"{os.path.splitext(filename)[0]}.zip"
+    return filename
+
+
+class CsvFile:
+    """
+    作成したCSVファイル（一時ファイル）
+
+    ExportManager でメモされ、メモから破棄されて参照がなくなった時点で一時ファイルを削除する。
+    len() はファイルサイズを返す（ExportManager のメモリ上限の計算に使用）。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.size = os.path.getsize(path)
+
+    def __len__(self):
+        return self.size
+
+    def open(self):
+        """
+        ファイルを読み出し用に開く（ダウンロードボタンを表示するときに開き、読み終えたら閉じる）
+        """
+        return open(self.path, 'rb')
+
+    def getvalue(self):
+        """
+        ファイルの内容をbytesで返す（data URI での配布など互換用）
+        """
+        with self.open() as f:
+            return f.read()
+
+    def __del__(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def build_csv_file(chunks, filename, compression=None):
+    """
+    CSVの断片を一時ファイルへ順に書き込み、ダウンロード用のファイルを作成する関数
+
+    Parameters:
+    -----------
+    chunks : iterable of bytes
+        iter_csv_chunks で作成したCSVの断片
+    filename : str
+        CSVのファイル名
+    compression : str or None
+        圧縮形式（None, 'gzip', 'zip'）
+
+    Returns:
+    --------
+    data, filename : CsvFile, str
+        作成したファイルと（圧縮形式に応じた）ファイル名
+    """
+    if compression not in CSV_MIMES:
+        raise ValueError(f"未対応の圧縮形式です: {compression}")
+    with tempfile.NamedTemporaryFile(prefix='causal_impact_', suffix='.csv', delete=False) as f:
+        try:
+            write_csv(chunks, f, compression, arcname=filename)
+        except Exception:
+            f.close()
+            os.remove(f.name)
+            raise
+    return CsvFile(f.name), get_compressed_filename(filename, compression)
@@ -0,0 +1,122 @@
+"""
+ダウンロード用ファイルの受け渡し
+
+CSV・PDF・HTMLの作成関数（utils_step3.build_comprehensive_pdf など）はファイルの内容をbytesで返し、
+画面では st.download_button にそのまま渡す。st.download_button はデータをStreamlitサーバーの
+メディアファイルとして配信するため、base64のdata URIをHTMLに埋め込む場合と比べて
+転送量が約3/4になり、メモリ上にもbase64文字列の複製を持たずに済む。
+CSVは一時ファイル（utils_csv.CsvFile）として作成し、ユーザーがボタンを押した再実行でだけファイルを読み出して渡す
+（st.download_button は渡したファイルを読み込んでメモリに保持するため、再実行ごとに読み込まない）。
+"""
+
+import base64
+
+CSV_MIME = 'text/csv'
+PDF_MIME = 'application/pdf'
+HTML_MIME = 'text/html'
+
+
+def to_data_uri(data, mime):
+    """
+    ファイルの内容をbase64のdata URIに変換する関数（<a href> で配布する場合の互換用）
+
+    Parameters:
+    -----------
+    data : bytes
+        ファイルの内容
+    mime : str
+        MIMEタイプ
+
+    Returns:
+    --------
+    str : data URI
+    """
+    charset = ';charset=utf-8-sig' if mime == CSV_MIME else ''
+    return f'data:{mime}{charset};base64,{base64.b64encode(data).decode()}'
+
+
+def render_download_button(label, data, filename, mime, key, help=None):
+    """
+    ファイルの内容をダウンロードボタンとして表示する関数
+
+    Parameters:
+    -----------
+    label : str
+        ボタンの表示名
+    data : bytes, file-like or CsvFile
+        ファイルの内容（CsvFile の場合はファイルを開いて渡す）
+    filename : str
+        ダウンロード時のファイル名
+    mime : str
+        MIMEタイプ
+    key : str
+        ウィジェットのキー
+    help : str, optional
+        ボタンのヘルプ表示
+
+    Returns:
+    --------
+    bool : ボタンがクリックされた場合True
+    """
+    import streamlit as st
+
+    if hasattr(data, 'open'):
+        with data.open() as f:
+            return render_download_button(label, f, filename, mime, key, help=help)
+
+    return st.download_button(
+        label=label,
+        data=data,
+        file_name=filename,
+        mime=mime,
+        key=key,
+        help=help,
+        type="primary",
+        use_container_width=True
+    )
+
+
+def render_lazy_download_button(label, mime, key, export_key, builder, help=None):
+    """
+    ボタンが押されたときにだけファイルを作成してダウンロードボタンを表示する関数
+
+    作成したファイルは ExportManager にメモされるため、以降の再実行（ウィジェット操作など）では
+    ファイルを作り直さずにそのままダウンロードボタンを表示する。
+    一時ファイル（CsvFile）の場合は、メモ済みでもボタンが押された再実行でだけダウンロードボタンを表示し、
+    ウィジェット操作による再実行のたびにファイル全体をメモリに読み込まないようにする。
+
+    Parameters:
+    -----------
+    label : str
+        ボタンの表示名
+    mime : str
+        MIMEタイプ
+    key : str
+        ウィジェットのキー
+    export_key : tuple or None
+        ExportManager.make_key で作成したメモのキー（Noneの場合はメモしない）
+    builder : callable
+        引数なしで呼び出し、(data, filename) を返す関数（data は bytes または CsvFile）
+    help : str, optional
+        ボタンのヘルプ表示
+
+    Returns:
+    --------
+    bool : ダウンロードボタンがクリックされた場合True
+    """
+    import streamlit as st
+    from utils_export import get_export_manager
+
+    manager = get_export_manager()
+    artifact = manager.get(export_key)
+    if artifact is None:
+        if not st.button(f"{label}を作成する", key=f"{key}_build", help=help, use_container_width=True):
+            return False
+        with st.spinner(f"{label}を作成中..."):
+            artifact = manager.get_or_build(export_key, builder)
+    elif hasattr(artifact[0], 'open'):
+        if not st.button(f"{label}を準備する", key=f"{key}_build", help=help, use_container_width=True):
+            return False
+
+    data, filename = artifact
+    return render_download_button(label, data, filename, mime, key, help=help)
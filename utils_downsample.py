@@ -0,0 +1,124 @@
+"""
+グラフ用の時系列の間引き
+
+ブラウザに送る点数を減らすため、見た目の形（山・谷）を保ったまま代表点を選ぶ。
+
+- lttb_indices: LTTB（Largest-Triangle-Three-Buckets）。指定した点数で形が最も近くなる点を選ぶ
+- minmax_indices: 区間ごとの最小値・最大値。ピーク（最大値・最小値）を必ず残す
+"""
+
+import numpy as np
+
+
+def lttb_indices(x, y, n_out):
+    """
+    LTTBで残す点の位置を選ぶ関数
+
+    先頭と末尾の点は常に残し、残りを n_out − 2 個の区間に分けて、各区間から
+    前に選んだ点・次の区間の平均点と作る三角形の面積が最大になる点を1つずつ選ぶ。
+    欠損値（NaN）は0とみなして選ぶ（選ばれた点の値はNaNのままなので、グラフ上は途切れる）。
+
+    Parameters:
+    -----------
+    x : array-like
+        横軸の値（昇順の数値。日付の場合は数値に変換したもの）
+    y : array-like
+        縦軸の値
+    n_out : int
+        残す点の数（3未満、またはデータ件数以上の場合は間引かない）
+
+    Returns:
+    --------
+    numpy.ndarray : 残す点の位置（昇順）
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    y = np.where(np.isfinite(y), y, 0.0)
+
+    # 先頭・末尾を除いた点を n_out − 2 個の区間に分ける（edges[i]〜edges[i + 1] が i 番目の区間）
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    selected = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+
+        area = np.abs((x[selected] - next_x) * (y[start:end] - y[selected])
+                      - (x[selected] - x[start:end]) * (next_y - y[selected]))
+        selected = start + int(np.argmax(area))
+        indices[i + 1] = selected
+    return indices
+
+
+def select_indices(x, y, max_points, keep=None):
+    """
+    グラフに描画する点の位置を選ぶ関数（max_points 以下の場合は全件）
+
+    Parameters:
+    -----------
+    x : array-like
+        横軸の値（昇順の数値）
+    y : array-like
+        間引きの基準にする系列の値
+    max_points : int or None
+        描画する点数の上限（Noneの場合は間引かない）
+    keep : iterable of int, optional
+        必ず残す点の位置（介入開始日など）
+
+    Returns:
+    --------
+    numpy.ndarray : 残す点の位置（昇順）
+    """
+    if max_points is None or len(y) <= max_points:
+        return np.arange(len(y))
+    indices = lttb_indices(x, y, max_points)
+    if keep is not None:
+        indices = np.union1d(indices, np.asarray(list(keep), dtype=np.int64))
+    return indices
+
+
+def minmax_indices(y, n_buckets):
+    """
+    区間ごとの最小値・最大値の点を残す関数（山・谷を必ず残す間引き）
+
+    データを n_buckets 個の区間に分け、各区間の最小値と最大値の点を残す（先頭・末尾の点も残す）。
+    表示幅1ピクセルあたり1区間とすれば、描画結果は全件を描いた場合とほぼ同じになる。
+
+    Parameters:
+    -----------
+    y : array-like
+        縦軸の値（欠損値（NaN）は選ばない。区間内がすべて欠損値の場合は区間の先頭を残す）
+    n_buckets : int
+        区間の数（1未満、または残す点数がデータ件数以上になる場合は間引かない）
+
+    Returns:
+    --------
+    numpy.ndarray : 残す点の位置（昇順）
+    """
+    n = len(y)
+    if n_buckets < 1 or 2 * n_buckets + 2 >= n:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    finite = np.isfinite(y)
+    low = np.where(finite, y, np.inf)
+    high = np.where(finite, y, -np.inf)
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+
+    indices = [0, n - 1]
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        indices.append(start + int(np.argmin(low[start:end])))
+        indices.append(start + int(np.argmax(high[start:end])))
+    return np.unique(np.asarray(indices, dtype=np.int64))
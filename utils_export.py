@@ -0,0 +1,127 @@
+"""
+エクスポート（ダウンロード用ファイル）の管理
+
+PDF・CSVはダウンロード用の作成ボタンが押されたときにだけ作成し、作成したbytesを
+(分析結果のハッシュ値, 形式, 言語, 信頼水準) をキーとしてサーバー全体でメモする。
+STEP3のウィジェット操作による再実行ではメモを返すだけで、PDFを作り直さない。
+メモの合計サイズが上限（EXPORT_CACHE_SETTINGS）を超えた場合は、最も長く使われていないものから破棄する（utils_cache.ByteLRU）。
+"""
+
+import hashlib
+
+from config.constants import EXPORT_CACHE_SETTINGS
+from utils_cache import ByteLRU, shared_resource
+
+
+class ExportManager:
+    """
+    作成済みのエクスポートファイルをメモリ上限付きでメモするクラス（LRU）
+
+    (data, filename) の組を ByteLRU にメモする（サイズは data の大きさで数える）。
+    """
+
+    def __init__(self, max_bytes, max_entries):
+        self._cache = ByteLRU(max_bytes, max_entries, size_of=lambda entry: len(entry[0]))
+
+    @staticmethod
+    def make_key(result, fmt, lang, confidence_level, context=None):
+        """
+        メモのキーを作成する
+
+        Parameters:
+        -----------
+        result : AnalysisResult or None
+            分析結果オブジェクト（Noneの場合はメモしない）
+        fmt : str
+            ファイル形式（'pdf', 'csv' など）
+        lang : str
+            言語（'ja' / 'en'）
+        confidence_level : int
+            信頼水準（%）
+        context : dict, optional
+            ファイルの内容・ファイル名に影響するその他の情報（分析対象名・期間など）
+
+        Returns:
+        --------
+        tuple or None
+        """
+        if result is None:
+            return None
+        context_digest = hashlib.sha1(repr(sorted((context or {}).items())).encode('utf-8')).hexdigest()[:16]
+        return (result.fingerprint(), fmt, lang, confidence_level, context_digest)
+
+    def get(self, key):
+        """
+        メモしたファイルを返す
+
+        Returns:
+        --------
+        tuple or None : (data, filename)。メモがない場合はNone
+        """
+        return self._cache.get(key)
+
+    def put(self, key, data, filename):
+        """
+        ファイルをメモする（上限を超える場合は古いものから破棄）
+        """
+        self._cache.put(key, (data, filename))
+
+    def get_or_build(self, key, builder):
+        """
+        メモしたファイルを返し、なければ作成してメモする
+
+        同じキーの作成が同時に要求された場合は、1回だけ作成して結果を共有する。
+
+        Parameters:
+        -----------
+        key : tuple or None
+            make_key で作成したキー（Noneの場合はメモせずに作成する）
+        builder : callable
+            引数なしで呼び出し、(data, filename) を返す関数
+
+        Returns:
+        --------
+        tuple : (data, filename)
+        """
+        return self._cache.get_or_build(key, builder)
+
+    def clear(self):
+        """
+        メモをすべて破棄する
+        """
+        self._cache.clear()
+
+    def get_status(self):
+        """
+        メモの状態を返す
+
+        Returns:
+        --------
+        dict : {'entries', 'total_bytes', 'max_bytes', 'hits', 'misses'}
+        """
+        return self._cache.get_status()
+
+
+def _create_export_manager():
+    """
+    エクスポート管理オブジェクトを作成する（サーバー全体で1つだけ）
+    """
+    return ExportManager(EXPORT_CACHE_SETTINGS['max_bytes'], EXPORT_CACHE_SETTINGS['max_entries'])
+
+
+get_export_manager = shared_resource(_create_export_manager)
+
+
+def get_export_language():
+    """
+    PDFの出力言語を返す（日本語フォントが利用できない環境では英語）
+
+    Returns:
+    --------
+    str : 'ja' または 'en'
+    """
+    try:
+        from config.font_config import is_japanese_font_available
+        return 'ja' if is_japanese_font_available() else 'en'
+    except Exception:
+        return 'en'
@@ -0,0 +1,257 @@
+"""
+matplotlibのグラフ（Figure）の管理
+
+ci.plot() や plt.subplots() で作成したグラフは pyplot のグラフ一覧（グローバル）に登録され、
+plt.close() を呼ぶまで解放されない。長時間動くサーバーでは、分析のたびにグラフが溜まり続ける。
+
+- 作成したグラフは pyplot から切り離し（adopt）、通常のオブジェクトとして扱う
+- 分析直後に画面表示用のPNG・PDF埋め込み用のPDFへ1回だけ描画し（render）、グラフ自体は解放する
+  （同じ分析結果を描画済みの場合は、描画済みグラフのメモ（utils_chart_cache）を使用）
+- セッションには描画済みのファイル内容（RenderedFigure）だけを保持する
+- 管理中のグラフ数・作成数・解放数などのカウンターを get_status() で確認できる
+"""
+
+import io
+import sys
+import threading
+import weakref
+
+from config.constants import FIGURE_RENDER_SETTINGS
+
+
+class RenderedFigure:
+    """
+    描画済みのグラフ（形式ごとのファイル内容）
+
+    Attributes:
+    -----------
+    width, height : float
+        グラフのサイズ（インチ）
+    """
+
+    __slots__ = ('_data', 'width', 'height')
+
+    def __init__(self, data, width, height):
+        self._data = dict(data)
+        self.width = width
+        self.height = height
+
+    @property
+    def formats(self):
+        return tuple(self._data)
+
+    @property
+    def nbytes(self):
+        return sum(len(data) for data in self._data.values())
+
+    def get(self, fmt):
+        """
+        指定した形式のファイル内容を返す（描画していない形式の場合はNone）
+        """
+        return self._data.get(fmt)
+
+    @property
+    def png(self):
+        return self._data.get('png')
+
+    @property
+    def pdf(self):
+        return self._data.get('pdf')
+
+
+class FigureManager:
+    """
+    グラフの作成・描画・解放を管理し、カウンターを記録するクラス
+    """
+
+    def __init__(self):
+        self._live = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._adopted = 0
+        self._rendered = 0
+        self._released = 0
+
+    def create(self, figsize=None, dpi=None, **kwargs):
+        """
+        pyplot に登録しないグラフを作成する
+
+        Parameters:
+        -----------
+        figsize : tuple, optional
+            グラフのサイズ（インチ）
+        dpi : int, optional
+            解像度
+        **kwargs :
+            matplotlib.figure.Figure の引数
+
+        Returns:
+        --------
+        matplotlib.figure.Figure
+        """
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=figsize, dpi=dpi, **kwargs)
+        with self._lock:
+            self._created += 1
+            self._live.add(fig)
+        return fig
+
+    def adopt(self, fig):
+        """
+        pyplot で作成したグラフを pyplot のグラフ一覧から切り離して管理する
+
+        切り離した後も savefig などはそのまま使用できる。ワーカープロセスから受け取る場合も、
+        pickle 後に pyplot へ再登録されなくなる。
+
+        Parameters:
+        -----------
+        fig : matplotlib.figure.Figure
+            グラフ
+
+        Returns:
+        --------
+        matplotlib.figure.Figure : 引数と同じグラフ
+        """
+        pyplot = sys.modules.get('matplotlib.pyplot')
+        if pyplot is not None:
+            pyplot.close(fig)
+        with self._lock:
+            if fig not in self._live:
+                self._adopted += 1
+                self._live.add(fig)
+        return fig
+
+    def release(self, fig):
+        """
+        グラフを解放する（描画要素を削除し、管理対象から外す）
+
+        Parameters:
+        -----------
+        fig : matplotlib.figure.Figure
+            グラフ
+        """
+        pyplot = sys.modules.get('matplotlib.pyplot')
+        if pyplot is not None:
+            pyplot.close(fig)
+        fig.clear()
+        with self._lock:
+            self._live.discard(fig)
+            self._released += 1
+
+    def render(self, fig, formats=None, png_dpi=None, release=True, result=None):
+        """
+        グラフを指定した形式のファイル内容に1回だけ描画する
+
+        分析結果オブジェクトを指定した場合は描画済みグラフのメモ（utils_chart_cache）を参照し、
+        メモがある形式は描画しない（全形式のメモがある場合はmatplotlibを使わない）。
+
+        Parameters:
+        -----------
+        fig : matplotlib.figure.Figure
+            グラフ
+        formats : tuple of str, optional
+            描画する形式（Noneの場合は FIGURE_RENDER_SETTINGS['formats']）
+        png_dpi : int, optional
+            PNGの解像度（Noneの場合は FIGURE_RENDER_SETTINGS['png_dpi']）
+        release : bool
+            描画後にグラフを解放する場合True
+        result : AnalysisResult, optional
+            グラフの元になった分析結果（メモのキーに使用。Noneの場合はメモしない）
+
+        Returns:
+        --------
+        RenderedFigure
+        """
+        formats = formats or FIGURE_RENDER_SETTINGS['formats']
+        png_dpi = png_dpi or FIGURE_RENDER_SETTINGS['png_dpi']
+        self.adopt(fig)
+
+        data = {}
+        try:
+            width, height = (float(value) for value in fig.get_size_inches())
+            cache, labels = None, None
+            if result is not None:
+                from utils_chart_cache import get_chart_cache, get_chart_labels
+                cache, labels = get_chart_cache(), get_chart_labels()
+
+            rendered = False
+            for fmt in formats:
+                dpi = png_dpi if fmt == 'png' else None
+                key = cache.make_key(result, fmt, (width, height), dpi, labels) if cache is not None else None
+                data[fmt] = cache.get(key) if cache is not None else None
+                if data[fmt] is not None:
+                    continue
+
+                buffer = io.BytesIO()
+                if fmt == 'png':
+                    fig.savefig(buffer, format='png', dpi=png_dpi, bbox_inches='tight')
+                else:
+                    fig.savefig(buffer, format=fmt)
+                data[fmt] = buffer.getvalue()
+                rendered = True
+                if cache is not None:
+                    cache.put(key, data[fmt])
+        finally:
+            if release:
+                self.release(fig)
+
+        if rendered:
+            with self._lock:
+                self._rendered += 1
+        return RenderedFigure(data, width, height)
+
+    def get_status(self):
+        """
+        カウンターを返す
+
+        Returns:
+        --------
+        dict : {'live', 'created', 'adopted', 'rendered', 'released', 'pyplot_open'}
+            live は管理中（未解放）のグラフ数、pyplot_open は pyplot に登録されているグラフ数
+        """
+        pyplot = sys.modules.get('matplotlib.pyplot')
+        with self._lock:
+            return {
+                'live': len(self._live),
+                'created': self._created,
+                'adopted': self._adopted,
+                'rendered': self._rendered,
+                'released': self._released,
+                'pyplot_open': len(pyplot.get_fignums()) if pyplot is not None else 0
+            }
+
+
+_FIGURE_MANAGER = None
+_FIGURE_MANAGER_LOCK = threading.Lock()
+
+
+def get_figure_manager():
+    """
+    プロセス内で共有するグラフ管理オブジェクトを返す
+    """
+    global _FIGURE_MANAGER
+    with _FIGURE_MANAGER_LOCK:
+        if _FIGURE_MANAGER is None:
+            _FIGURE_MANAGER = FigureManager()
+        return _FIGURE_MANAGER
+
+
+def render_analysis_figure(fig, result=None):
+    """
+    分析結果のグラフを描画済みのファイル内容に変換してグラフを解放する関数（セッションへの保存用）
+
+    Parameters:
+    -----------
+    fig : matplotlib.figure.Figure or RenderedFigure or None
+        分析結果のグラフ（描画済みの場合はそのまま返す）
+    result : AnalysisResult, optional
+        グラフの元になった分析結果（指定した場合は描画済みグラフのメモを使用）
+
+    Returns:
+    --------
+    RenderedFigure or None
+    """
+    if fig is None or isinstance(fig, RenderedFigure):
+        return fig
+    return get_figure_manager().render(fig, result=result)
@@ -0,0 +1,146 @@
+"""
+HTMLレポート作成モジュール
+
+STEP3のサマリー表・詳細レポートと、Plotlyのインタラクティブなグラフ（拡大・値の確認が可能）を
+1つのHTMLファイルにまとめる。ブラウザだけで閲覧でき、共有先にPythonやアプリは不要。
+
+- グラフは画面表示と同じ図の定義（utils_result_chart）を使用し、分析結果の配列から直接作成する
+- 点数が多い場合は LTTB で間引いた点だけを埋め込む（HTML_REPORT_SETTINGS['max_points']）
+- plotly.js はファイルに埋め込み（オフラインでも表示可能）、本体はプロセス内で1回だけ読み込む
+"""
+
+import html
+import json
+
+import pandas as pd
+
+from config.constants import HTML_REPORT_SETTINGS
+from utils_report import generate_report
+from utils_result import build_model_summary_rows, get_effect_summary
+from utils_result_chart import build_result_figure_dict
+
+# plotly.js 本体（初回のHTML作成時に読み込む）
+_PLOTLY_JS = None
+
+_HTML_STYLE = """
+body { font-family: 'Hiragino Sans', 'Yu Gothic', 'Meiryo', 'Noto Sans CJK JP', sans-serif; color: #222;
+       max-width: 1080px; margin: 24px auto; padding: 0 16px; line-height: 1.6; }
+h1 { font-size: 1.5em; text-align: center; }
+h2 { font-size: 1.15em; margin-top: 1.6em; border-bottom: 2px solid #d62728; }
+p { margin: 0.2em 0; }
+table.summary { border-collapse: collapse; margin: 0.6em 0; }
+table.summary th, table.summary td { border: 1px solid #999; padding: 4px 12px; text-align: center; }
+table.summary th { background: #d6eaf8; }
+.note { color: #666; background: #f8f9fa; padding: 10px; border-radius: 4px; font-size: 0.95em; }
+"""
+
+
+def _get_plotly_js_tag(inline):
+    global _PLOTLY_JS
+    if not inline:
+        from plotly.offline import get_plotlyjs_version
+        return f'<script src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js" charset="utf-8"></script>'
+    if _PLOTLY_JS is None:
+        from plotly.offline import get_plotlyjs
+        _PLOTLY_JS = get_plotlyjs()
+    return f'<script type="text/javascript">{_PLOTLY_JS}</script>'
+
+
+def _summary_table_html(summary_df, result, content, confidence_level):
+    if summary_df is None or summary_df.empty:
+        header = [content['table_indicator'], content['table_avg_analysis_period'],
+                  content['table_total_analysis_period']]
+        summary_df = pd.DataFrame(build_model_summary_rows(result, content, confidence_level), columns=header)
+    return summary_df.to_html(index=False, border=0, classes='summary', escape=True)
+
+
+def build_html_report(result, analysis_info, summary_df=None, confidence_level=95, is_single_group=True,
+                      max_points=None, inline_plotlyjs=None):
+    """
+    分析結果のHTMLレポート（サマリー表・インタラクティブなグラフ・詳細レポート）の内容（bytes）を作成する関数
+
+    Parameters:
+    -----------
+    result : AnalysisResult
+        分析結果オブジェクト
+    analysis_info : dict
+        分析情報（treatment_name, control_name, period_start, period_end, freq_option）
+    summary_df : pandas.DataFrame or None
+        STEP3で表示したサマリー表（Noneの場合は分析結果から作成）
+    confidence_level : int
+        信頼水準（%）
+    is_single_group : bool
+        単群推定の場合True、二群比較の場合False
+    max_points : int or None
+        グラフ1系列あたりの点数の上限（Noneの場合は HTML_REPORT_SETTINGS['max_points']）
+    inline_plotlyjs : bool or None
+        plotly.js をファイルに埋め込む場合True、CDNから読み込む場合False
+        （Noneの場合は HTML_REPORT_SETTINGS['inline_plotlyjs']）
+
+    Returns:
+    --------
+    tuple : (HTMLの内容（bytes）, ファイル名)
+    """
+    from config.graph_config import get_graph_labels
+    from config.pdf_templates import format_analysis_info_section, get_pdf_comment_message, get_pdf_content
+
+    if max_points is None:
+        max_points = HTML_REPORT_SETTINGS['max_points']
+    if inline_plotlyjs is None:
+        inline_plotlyjs = HTML_REPORT_SETTINGS['inline_plotlyjs']
+
+    # HTMLはブラウザのフォントで表示するため、常に日本語の文面を使用
+    content = get_pdf_content(True)
+    labels = get_graph_labels(True)
+    title = content['title_single_group'] if is_single_group else content['title_two_group']
+    explanation = content['graph_explanation_single_group' if is_single_group else 'graph_explanation_two_group']
+
+    parts = [
+        '<!DOCTYPE html>',
+        '<html lang="ja"><head><meta charset="utf-8">',
+        '<meta name="viewport" content="width=device-width, initial-scale=1">',
+        f'<title>{html.escape(title)}</title>',
+        f'<style>{_HTML_STYLE}</style>',
+        _get_plotly_js_tag(inline_plotlyjs),
+        '</head><body>',
+        f'<h1>{html.escape(title)}</h1>',
+        f"<h2>{html.escape(content['section_analysis_info'])}</h2>"
+    ]
+    info_lines = format_analysis_info_section(content, analysis_info, result.n_post, confidence_level, is_single_group)
+    parts += [f'<p>{html.escape(line)}</p>' for line in info_lines]
+
+    parts.append(f"<h2>{html.escape(content['section_summary'])}</h2>")
+    parts.append(_summary_table_html(summary_df, result, content, confidence_level))
+    relative_effect, p_value, is_significant = get_effect_summary(result)
+    if relative_effect is not None and p_value is not None:
+        comment = get_pdf_comment_message(relative_effect, p_value, is_significant, use_japanese=True)
+        parts.append(f'<p>{html.escape(comment)}</p>')
+
+    figure = build_result_figure_dict(result, labels, max_points)
+    figure_json = json.dumps(figure, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+    parts += [
+        f"<h2>{html.escape(content['section_graph'])}</h2>",
+        '<div id="result-chart"></div>',
+        f'<p class="note">{html.escape(explanation)}</p>',
+        '<script type="text/javascript">',
+        f'var figure = {figure_json};',
+        "Plotly.newPlot('result-chart', figure.data, figure.layout, {responsive: true, displaylogo: false});",
+        '</script>'
+    ]
+
+    paragraphs = generate_report(result, confidence_level, use_japanese=True)
+    if paragraphs:
+        paragraphs = paragraphs.split('\n\n')
+        parts.append(f'<h2>{html.escape(paragraphs[0])}</h2>')
+        parts += [f'<p>{html.escape(paragraph)}</p>' for paragraph in paragraphs[1:]]
+
+    parts.append('</body></html>')
+    html_bytes = '\n'.join(parts).encode('utf-8')
+
+    # ファイル名生成（包括的PDFレポートと同じ形式）
+    treatment_name = analysis_info.get('treatment_name', '分析対象')
+    period_start = analysis_info.get('period_start')
+    period_end = analysis_info.get('period_end')
+    analysis_type_short = "SingleGroup" if is_single_group else "TwoGroup"
+    filename = f"causal_impact_report_{treatment_name}_{period_start.strftime('%Y%m%d')}_{period_end.strftime('%Y%m%d')}_{analysis_type_short}.html"
+    return html_bytes, filename
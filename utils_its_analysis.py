@@ -1,17 +1,23 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.linear_model import LinearRegression
-import statsmodels.api as sm
-from scipy import stats
 import warnings
 import matplotlib
 matplotlib.use('Agg')
 
+# statsmodels・scipyは分析実行時まで読み込まない
+from utils_lazy_import import lazy_import
+sm = lazy_import('statsmodels.api')
+stats = lazy_import('scipy.stats')
+
 warnings.filterwarnings('ignore')
 
-def run_interrupted_time_series_analysis(data, intervention_date, confidence_level=0.95):
+def newey_west_maxlags(n_obs):
+    """
+    Newey-West（HAC）標準誤差のラグ数の目安 floor(4*(n/100)^(2/9)) を返す関数
+    """
+    return int(np.floor(4 * (n_obs / 100) ** (2 / 9)))
+
+def run_interrupted_time_series_analysis(data, intervention_date, confidence_level=0.95, cov_type='nonrobust', maxlags=None):
     """
     中断時系列分析（Interrupted Time Series, ITS）を実行する関数
     
@@ -23,6 +29,13 @@ def run_interrupted_time_series_analysis(data, intervention_date, confidence_lev
         介入日
     confidence_level : float
         信頼水準（デフォルト：0.95）
+    cov_type : str
+        標準誤差の種類
+        - 'nonrobust': 通常のOLS標準誤差
+        - 'HAC': Newey-West（自己相関・不均一分散に頑健な標準誤差）
+        - 'AR1': AR(1)誤差を仮定した一般化最小二乗推定（反復Prais-Winsten型）
+    maxlags : int or None
+        HACのラグ数（Noneの場合は Newey-West の目安 floor(4*(n/100)^(2/9))）
         
     Returns:
     --------
@@ -53,7 +66,14 @@ def run_interrupted_time_series_analysis(data, intervention_date, confidence_lev
     y = df['value']
     
     # 回帰分析を実行
-    model = sm.OLS(y, X).fit()
+    if cov_type == 'HAC':
+        if maxlags is None:
+            maxlags = newey_west_maxlags(len(df))
+        model = sm.OLS(y, X).fit(cov_type='HAC', cov_kwds={'maxlags': maxlags})
+    elif cov_type == 'AR1':
+        model = sm.GLSAR(y, X, rho=1).iterative_fit(maxiter=10)
+    else:
+        model = sm.OLS(y, X).fit()
     
     # 結果の解釈
     interpretation = interpret_its_results(model, confidence_level)
@@ -101,6 +121,14 @@ def interpret_its_results(model, confidence_level=0.95):
     # 信頼区間を取得
     conf_int = model.conf_int(alpha=alpha)
     
+    # 誤差構造に応じた注意書き
+    if model.model.__class__.__name__ == 'GLSAR':
+        autocorrelation_note = f"AR(1)誤差（ρ = {model.model.rho[0]:.3f}）を考慮したITSモデルです。季節性は考慮していません"
+    elif getattr(model, 'cov_type', 'nonrobust') == 'HAC':
+        autocorrelation_note = "標準誤差はNewey-West（HAC）により自己相関を補正済みです。季節性は考慮していません"
+    else:
+        autocorrelation_note = "この分析は自己相関や季節性を考慮していない基本的なITSモデルです"
+    
     interpretation = f"""
     ## 中断時系列分析（ITS）結果
 
@@ -131,7 +159,7 @@ def interpret_its_results(model, confidence_level=0.95):
     - 統計的有意: p < {alpha:.3f}
 
     ### 注意事項
-    - この分析は自己相関や季節性を考慮していない基本的なITSモデルです
+    - {autocorrelation_note}
     - より高度な分析には、ARIMA成分や季節性調整が推奨されます
     - 外部要因や他の共変量の影響を考慮することも重要です
     """
@@ -157,7 +185,10 @@ def create_its_plot(df, model, intervention_date, intervention_idx):
     --------
     matplotlib.figure.Figure : プロット
     """
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
+    # pyplot を使わずに作成（pyplot のグラフ一覧に溜まらないように）
+    from utils_figure import get_figure_manager
+    fig = get_figure_manager().create(figsize=(12, 10))
+    ax1, ax2 = fig.subplots(2, 1)
     
     # 予測値を計算
     X = df[['time', 'intervention', 'time_since_intervention']]
@@ -189,7 +220,7 @@ def create_its_plot(df, model, intervention_date, intervention_idx):
     ax2.set_ylabel('残差')
     ax2.grid(True, alpha=0.3)
     
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 def validate_its_data(data, min_pre_period=10, min_post_period=5):
@@ -235,11 +266,23 @@ def suggest_its_intervention_point(data, min_pre_ratio=0.5):
         
     Returns:
     --------
-    datetime : 推奨介入日
+    datetime : 推奨介入日（水準の変化点。検出できない場合は全体の60%地点）
     """
     total_points = len(data)
     min_pre_points = int(total_points * min_pre_ratio)
     
+    # 介入前期間の最低比率を満たす最上位の変化点を優先
+    try:
+        from utils_changepoint import suggest_change_point_index
+        value_column = data.columns[1] if len(data.columns) > 1 else None
+        change_date, _, _ = suggest_change_point_index(
+            data, min_pre_ratio=min_pre_ratio, date_column=data.columns[0], value_column=value_column
+        )
+        if change_date is not None:
+            return change_date
+    except Exception as e:
+        print(f"変化点検出エラー（60%地点を使用）: {str(e)}")
+    
     # 推奨介入ポイントは全体の60%地点
     suggested_index = max(min_pre_points, int(total_points * 0.6))
     suggested_date = data.iloc[suggested_index, 0]
@@ -291,4 +334,428 @@ def create_its_summary_dataframe(model, confidence_level=0.95):
         '統計的有意性': 'モデル全体の有意性'
     })
     
-    return pd.DataFrame(summary_data) 
\ No newline at end of file
+    return pd.DataFrame(summary_data) 
+
+
+def scan_its_intervention_dates(data, min_pre_points=10, min_post_points=5, confidence_level=0.95):
+    """
+    全ての介入日候補についてITSモデルを一括推定する関数
+
+    候補ごとに statsmodels で再推定する代わりに、1, t, t², y, t·y の後方累積和から
+    各候補の正規方程式（4×4）を閉形式で組み立て、まとめて解く。
+    計算量はデータ数に対して線形で、長期の日次データでも全候補を一度に評価できる。
+    値の水準・トレンドが大きい場合の桁落ちを避けるため、t は中心化して n で割った尺度とし、
+    y は全期間の直線（切片・トレンド）を除いた残差で累積和を作る（説明変数に切片・トレンドを含むため、
+    水準変化・傾き変化の推定値と残差平方和は変わらない）。
+
+    Parameters:
+    -----------
+    data : pandas.DataFrame
+        時系列データ（日付と値の列を含む）
+    min_pre_points : int
+        介入前期間の最低データ数
+    min_post_points : int
+        介入後期間の最低データ数
+    confidence_level : float
+        信頼水準（デフォルト：0.95）
+
+    Returns:
+    --------
+    pandas.DataFrame : 介入日候補ごとの推定結果
+        - date / index: 介入日とその位置
+        - level_change / level_se / level_p: 即座の効果（水準変化）と標準誤差・p値
+        - slope_change / slope_se / slope_p: 長期的効果（傾き変化）と標準誤差・p値
+        - level_ci_lower / level_ci_upper / slope_ci_lower / slope_ci_upper: 信頼区間
+        - sse / r_squared: 残差平方和と決定係数
+    """
+    df = data.copy()
+    df.columns = ['date', 'value']
+    df['date'] = pd.to_datetime(df['date'])
+    df = df.sort_values('date').reset_index(drop=True)
+
+    y = df['value'].astype(float).values
+    n = len(y)
+    n_params = 4
+    if n < min_pre_points + min_post_points or n <= n_params:
+        raise ValueError(f"データ数が不足しています（{n}件）")
+
+    t = (np.arange(n, dtype=float) - (n - 1) / 2) / n
+    sst = float(((y - y.mean()) ** 2).sum())
+    trend = np.column_stack([np.ones(n), t])
+    y = y - trend @ np.linalg.lstsq(trend, y, rcond=None)[0]
+
+    def suffix_sum(values):
+        # suffix[k] = values[k:] の合計（suffix[n] = 0）
+        return np.concatenate([np.cumsum(values[::-1])[::-1], [0.0]])
+
+    s1 = suffix_sum(np.ones(n))
+    st = suffix_sum(t)
+    stt = suffix_sum(t * t)
+    sy = suffix_sum(y)
+    sty = suffix_sum(t * y)
+
+    # 介入日候補 k（介入後期間の先頭位置）
+    k = np.arange(min_pre_points, n - min_post_points + 1)
+    kf = t[k]
+    m = s1[k]
+    tk = st[k]
+    ttk = stt[k]
+    yk = sy[k]
+    tyk = sty[k]
+
+    # 説明変数: [1, t, D, (t-k)·D]（Dは介入ダミー）
+    xtx = np.empty((len(k), n_params, n_params))
+    xtx[:, 0, 0] = n
+    xtx[:, 0, 1] = st[0]
+    xtx[:, 0, 2] = m
+    xtx[:, 0, 3] = tk - kf * m
+    xtx[:, 1, 1] = stt[0]
+    xtx[:, 1, 2] = tk
+    xtx[:, 1, 3] = ttk - kf * tk
+    xtx[:, 2, 2] = m
+    xtx[:, 2, 3] = tk - kf * m
+    xtx[:, 3, 3] = ttk - 2 * kf * tk + kf * kf * m
+    lower = np.tril_indices(n_params, -1)
+    xtx[:, lower[0], lower[1]] = xtx[:, lower[1], lower[0]]
+
+    xty = np.column_stack([
+        np.full(len(k), sy[0]),
+        np.full(len(k), sty[0]),
+        yk,
+        tyk - kf * yk
+    ])
+
+    xtx_inv = np.linalg.pinv(xtx)
+    beta = np.einsum('kij,kj->ki', xtx_inv, xty)
+
+    # 残差平方和: y'y - β'X'y
+    yty = float(y @ y)
+    sse = np.maximum(yty - np.einsum('ki,ki->k', beta, xty), 0.0)
+    dof = n - n_params
+    sigma2 = sse / dof
+    se = np.sqrt(np.maximum(sigma2[:, None] * np.diagonal(xtx_inv, axis1=1, axis2=2), 0.0))
+    # 傾きの係数を元の時間単位（1データ点あたり）に戻す
+    beta[:, [1, 3]] /= n
+    se[:, [1, 3]] /= n
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_values = beta / se
+    p_values = 2 * stats.t.sf(np.abs(t_values), dof)
+    t_critical = stats.t.ppf(1 - (1 - confidence_level) / 2, dof)
+
+    return pd.DataFrame({
+        'date': df['date'].values[k],
+        'index': k,
+        'level_change': beta[:, 2],
+        'level_se': se[:, 2],
+        'level_p': p_values[:, 2],
+        'level_ci_lower': beta[:, 2] - t_critical * se[:, 2],
+        'level_ci_upper': beta[:, 2] + t_critical * se[:, 2],
+        'slope_change': beta[:, 3],
+        'slope_se': se[:, 3],
+        'slope_p': p_values[:, 3],
+        'slope_ci_lower': beta[:, 3] - t_critical * se[:, 3],
+        'slope_ci_upper': beta[:, 3] + t_critical * se[:, 3],
+        'sse': sse,
+        'r_squared': 1 - sse / sst if sst > 0 else np.nan
+    })
+
+def find_best_its_intervention_date(data, min_pre_points=10, min_post_points=5):
+    """
+    残差平方和が最小となる介入日を返す関数
+
+    Parameters:
+    -----------
+    data : pandas.DataFrame
+        時系列データ（日付と値の列を含む）
+    min_pre_points : int
+        介入前期間の最低データ数
+    min_post_points : int
+        介入後期間の最低データ数
+
+    Returns:
+    --------
+    tuple: (datetime, pandas.Series) 推奨介入日とその推定結果
+    """
+    profile = scan_its_intervention_dates(data, min_pre_points, min_post_points)
+    best = profile.loc[profile['sse'].idxmin()]
+    return best['date'], best
+
+# ITSモデルの係数名（create_its_summary_dataframe と同じ並び・表示名）
+ITS_PARAM_NAMES = ['const', 'time', 'intervention', 'time_since_intervention']
+ITS_PARAM_LABELS = {
+    'const': 'ベースライン水準',
+    'time': '介入前トレンド',
+    'intervention': '介入による即座の効果',
+    'time_since_intervention': '介入による長期的効果'
+}
+
+def _build_its_design(dates, intervention_date):
+    """
+    ITSモデルの説明変数行列 [1, time, intervention, time_since_intervention] を作成する
+
+    Returns:
+    --------
+    numpy.ndarray : (n, 4) の説明変数行列
+    """
+    dates = pd.to_datetime(pd.Index(dates))
+    after = np.asarray(dates >= pd.to_datetime(intervention_date))
+    intervention_idx = int(np.argmax(after)) if after.any() else len(dates)
+    time = np.arange(len(dates), dtype=float)
+    return np.column_stack([
+        np.ones(len(dates)),
+        time,
+        after.astype(float),
+        np.maximum(0, time - intervention_idx)
+    ])
+
+def _newey_west_meat(X, resid, maxlags):
+    """
+    全系列分のNewey-West（Bartlettカーネル）スコア共分散を一括計算する
+
+    x_t x_{t-l}' を (n-l, k*k) に展開しておき、残差積 u_t u_{t-l} との行列積で
+    全系列のラグl自己共分散をまとめて求める（系列ごとのループなし）。
+
+    Returns:
+    --------
+    numpy.ndarray : (系列数, k, k) の配列
+    """
+    n, k = X.shape
+    m = resid.shape[1]
+    outer = (X[:, :, None] * X[:, None, :]).reshape(n, k * k)
+    meat = ((resid ** 2).T @ outer).reshape(m, k, k)
+    for lag in range(1, maxlags + 1):
+        weight = 1 - lag / (maxlags + 1)
+        lagged_outer = (X[lag:, :, None] * X[:-lag, None, :]).reshape(n - lag, k * k)
+        gamma = ((resid[lag:] * resid[:-lag]).T @ lagged_outer).reshape(m, k, k)
+        meat += weight * (gamma + gamma.transpose(0, 2, 1))
+    return meat
+
+def _fit_batched_ar1(X, Y, maxiter=10, rtol=1e-4):
+    """
+    全系列のAR(1)誤差付き回帰を反復推定する（statsmodels GLSAR.iterative_fit と同じ手順）
+
+    変換後の説明変数 x_t - ρ x_{t-1} は系列ごとに異なるが、正規方程式は
+    共通の行列積と系列ごとのスカラー ρ の多項式で表せるため、全系列を一括で解ける。
+    係数の相対変化が rtol 未満になった系列は、GLSARと同じくその時点の ρ で打ち切る。
+
+    Returns:
+    --------
+    tuple: (params, xtx_inv, whitened_resid, rho)
+    """
+    n, k = X.shape
+    X_cur, X_lag = X[1:], X[:-1]
+    Y_cur, Y_lag = Y[1:], Y[:-1]
+    A0 = X_cur.T @ X_cur
+    A1 = X_cur.T @ X_lag
+    A2 = X_lag.T @ X_lag
+    B_cc = (X_cur.T @ Y_cur).T
+    B_lc = (X_lag.T @ Y_cur).T
+    B_cl = (X_cur.T @ Y_lag).T
+    B_ll = (X_lag.T @ Y_lag).T
+
+    def solve(rho):
+        r = rho[:, None, None]
+        xtx = A0[None] - r * (A1 + A1.T)[None] + r ** 2 * A2[None]
+        xty = B_cc - rho[:, None] * (B_lc + B_cl) + rho[:, None] ** 2 * B_ll
+        xtx_inv = np.linalg.pinv(xtx)
+        return np.einsum('mij,mj->mi', xtx_inv, xty), xtx_inv
+
+    rho = np.zeros(Y.shape[1])
+    active = np.ones(Y.shape[1], dtype=bool)
+    last = None
+    for i in range(maxiter - 1):
+        params, _ = solve(rho)
+        if i > 0:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                change = np.max(np.abs(last - params) / np.abs(last), axis=1)
+            active &= ~(change < rtol)
+            if not active.any():
+                break
+        last = params
+
+        # 元の尺度の残差からYule-Walker法でρを更新（収束した系列は更新しない）
+        resid = Y - X @ params.T
+        centered = resid - resid.mean(axis=0)
+        new_rho = ((centered[1:] * centered[:-1]).sum(axis=0) / (n - 1)) / ((centered ** 2).sum(axis=0) / n)
+        rho = np.where(active, new_rho, rho)
+
+    params, xtx_inv = solve(rho)
+    resid = Y - X @ params.T
+    whitened_resid = resid[1:] - rho[None, :] * resid[:-1]
+    return params, xtx_inv, whitened_resid, rho
+
+def _its_critical_value(confidence_level, cov_type, dof):
+    """
+    信頼区間の臨界値（HACの場合は正規分布、それ以外はt分布）
+    """
+    if cov_type == 'HAC':
+        return stats.norm.ppf(1 - (1 - confidence_level) / 2)
+    return stats.t.ppf(1 - (1 - confidence_level) / 2, dof)
+
+
+def run_batched_its_analysis(data, intervention_date, confidence_level=0.95, cov_type='nonrobust', maxlags=None):
+    """
+    日付軸を共有する複数系列のITSモデルを一括推定する関数
+
+    説明変数行列は全系列で共通のため、(X'X)^-1 を1回だけ計算し、
+    全系列の係数・標準誤差・p値・信頼区間を行列演算でまとめて求める。
+    statsmodelsのモデル・サマリーオブジェクトは生成しない。
+
+    Parameters:
+    -----------
+    data : pandas.DataFrame
+        1列目が日付、2列目以降が各系列の値（ワイド形式）
+    intervention_date : datetime
+        介入日
+    confidence_level : float
+        信頼水準（デフォルト：0.95）
+    cov_type : str
+        標準誤差の種類（run_interrupted_time_series_analysis と同じ）
+        - 'nonrobust': 通常のOLS標準誤差
+        - 'HAC': Newey-West標準誤差（p値・信頼区間は正規近似）
+        - 'AR1': AR(1)誤差を仮定した反復推定
+    maxlags : int or None
+        HACのラグ数（Noneの場合は Newey-West の目安）
+
+    Returns:
+    --------
+    dict : 推定結果（各配列の行は系列、列は ITS_PARAM_NAMES の順）
+        - series_names: 系列名のリスト
+        - params / bse / tvalues / pvalues: (系列数, 4) の配列
+        - conf_int_lower / conf_int_upper: (系列数, 4) の配列
+        - rsquared / rsquared_adj / f_pvalue: (系列数,) の配列
+        - nobs / df_resid: 観測数と残差自由度
+        - rho: AR(1)係数（cov_type='AR1' の場合のみ）
+    """
+    df = data.copy()
+    date_col = df.columns[0]
+    df[date_col] = pd.to_datetime(df[date_col])
+    df = df.sort_values(date_col).reset_index(drop=True)
+
+    series_names = list(df.columns[1:])
+    Y = df[series_names].astype(float).values
+    X = _build_its_design(df[date_col], intervention_date)
+    n, n_params = X.shape
+    dof = n - n_params
+    if cov_type == 'AR1':
+        dof -= 1
+    if dof <= 0:
+        raise ValueError(f"データ数が不足しています（{n}件）")
+
+    rho = None
+    if cov_type == 'AR1':
+        params, xtx_inv, resid, rho = _fit_batched_ar1(X, Y)
+        sigma2 = (resid ** 2).sum(axis=0) / dof
+        cov = sigma2[:, None, None] * xtx_inv
+    else:
+        # 全系列共通の (X'X)^-1 と一括の係数推定
+        xtx_inv = np.linalg.pinv(X.T @ X)
+        params = (xtx_inv @ (X.T @ Y)).T
+        resid = Y - X @ params.T
+        sigma2 = (resid ** 2).sum(axis=0) / dof
+        if cov_type == 'HAC':
+            if maxlags is None:
+                maxlags = newey_west_maxlags(n)
+            meat = _newey_west_meat(X, resid, maxlags)
+            cov = np.einsum('ij,mjk,kl->mil', xtx_inv, meat, xtx_inv)
+        else:
+            cov = sigma2[:, None, None] * xtx_inv[None]
+
+    sse = (resid ** 2).sum(axis=0)
+    bse = np.sqrt(np.maximum(np.diagonal(cov, axis1=1, axis2=2), 0.0))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tvalues = params / bse
+    if cov_type == 'HAC':
+        # statsmodelsのロバスト標準誤差と同様に正規近似
+        pvalues = 2 * stats.norm.sf(np.abs(tvalues))
+    else:
+        pvalues = 2 * stats.t.sf(np.abs(tvalues), dof)
+    critical = _its_critical_value(confidence_level, cov_type, dof)
+
+    # モデル適合度（定数項以外の3変数についてのWald型F検定）
+    # AR(1)の場合は変換後（白色化後）の系列で評価（statsmodels GLSARと同じ）
+    Y_fit = Y[1:] - rho[None, :] * Y[:-1] if cov_type == 'AR1' else Y
+    sst = ((Y_fit - Y_fit.mean(axis=0)) ** 2).sum(axis=0)
+    slope_params = params[:, 1:]
+    slope_cov = cov[:, 1:, 1:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsquared = 1 - sse / sst
+        rsquared_adj = 1 - (1 - rsquared) * (len(Y_fit) - 1) / dof
+        f_value = np.einsum('mi,mi->m', slope_params,
+                            np.linalg.solve(slope_cov, slope_params[:, :, None])[:, :, 0]) / (n_params - 1)
+    f_pvalue = stats.f.sf(f_value, n_params - 1, dof)
+
+    result = {
+        'series_names': series_names,
+        'params': params,
+        'bse': bse,
+        'tvalues': tvalues,
+        'pvalues': pvalues,
+        'conf_int_lower': params - critical * bse,
+        'conf_int_upper': params + critical * bse,
+        'rsquared': rsquared,
+        'rsquared_adj': rsquared_adj,
+        'f_pvalue': f_pvalue,
+        'nobs': n,
+        'df_resid': dof,
+        'confidence_level': confidence_level,
+        'cov_type': cov_type
+    }
+    if rho is not None:
+        result['rho'] = rho
+    return result
+
+def create_batched_its_summary_dataframe(batch_result, series, confidence_level=None):
+    """
+    一括推定結果から1系列分のサマリーDataFrameを作成する関数
+    （create_its_summary_dataframe と同じ形式）
+
+    Parameters:
+    -----------
+    batch_result : dict
+        run_batched_its_analysis の戻り値
+    series : int or str
+        系列の位置または系列名
+    confidence_level : float or None
+        信頼水準（Noneの場合は推定時の値。推定時と異なる場合は係数と標準誤差から信頼区間を計算し直す）
+
+    Returns:
+    --------
+    pandas.DataFrame : サマリーDataFrame
+    """
+    if confidence_level is None:
+        confidence_level = batch_result['confidence_level']
+    alpha = 1 - confidence_level
+    i = series if isinstance(series, (int, np.integer)) else batch_result['series_names'].index(series)
+
+    if confidence_level == batch_result['confidence_level']:
+        conf_int_lower = batch_result['conf_int_lower'][i]
+        conf_int_upper = batch_result['conf_int_upper'][i]
+    else:
+        critical = _its_critical_value(confidence_level, batch_result['cov_type'], batch_result['df_resid'])
+        conf_int_lower = batch_result['params'][i] - critical * batch_result['bse'][i]
+        conf_int_upper = batch_result['params'][i] + critical * batch_result['bse'][i]
+
+    ci_label = f'{confidence_level*100:.0f}% 信頼区間'
+    summary_data = []
+    for j, param in enumerate(ITS_PARAM_NAMES):
+        p_value = batch_result['pvalues'][i, j]
+        summary_data.append({
+            '効果': ITS_PARAM_LABELS[param],
+            '係数': f"{batch_result['params'][i, j]:.4f}",
+            ci_label: f"[{conf_int_lower[j]:.4f}, {conf_int_upper[j]:.4f}]",
+            'p値': f"{p_value:.4f}",
+            '統計的有意性': '有意' if p_value < alpha else '非有意'
+        })
+
+    summary_data.append({
+        '効果': 'モデル適合度',
+        '係数': f"R² = {batch_result['rsquared'][i]:.4f}",
+        ci_label: f"調整済みR² = {batch_result['rsquared_adj'][i]:.4f}",
+        'p値': f"{batch_result['f_pvalue'][i]:.4f}",
+        '統計的有意性': 'モデル全体の有意性'
+    })
+
+    return pd.DataFrame(summary_data)
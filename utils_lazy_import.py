@@ -0,0 +1,138 @@
+"""
+遅延インポートユーティリティ
+
+plotly・reportlab・statsmodels・causalimpact など読み込みに時間のかかるライブラリを、
+初めて属性にアクセスした時点で読み込む。STEP1だけを操作するユーザーは
+分析・出力用ライブラリの読み込みコストを払わずに済み、Streamlitの起動が速くなる。
+読み込みにかかった時間は記録され、起動時レポートとして出力できる。
+"""
+
+import importlib
+import sys
+import time
+import types
+
+# 読み込み記録（モジュール名 → 読み込み時間［秒］・契機）
+_IMPORT_RECORDS = {}
+
+# 起動時レポートを出力済みかどうか（Streamlitの再実行ごとに出力しないため）
+_STARTUP_REPORTED = False
+
+
+class LazyModule(types.ModuleType):
+    """
+    初回の属性アクセス時に実体のモジュールを読み込むプロキシ
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            module = timed_import(self.__name__, trigger='初回使用')
+            self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = '読み込み済み' if self.__dict__['_lazy_module'] is not None else '未読み込み'
+        return f"<LazyModule '{self.__name__}' ({state})>"
+
+
+def timed_import(module_name, trigger='起動時'):
+    """
+    モジュールを読み込み、読み込み時間を記録する関数
+
+    Parameters:
+    -----------
+    module_name : str
+        モジュール名（例: 'plotly.graph_objects'）
+    trigger : str
+        読み込みの契機（レポート表示用）
+
+    Returns:
+    --------
+    module : 読み込んだモジュール
+    """
+    already_loaded = module_name in sys.modules
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    elapsed = time.perf_counter() - start
+    if not already_loaded and module_name not in _IMPORT_RECORDS:
+        _IMPORT_RECORDS[module_name] = {'seconds': elapsed, 'trigger': trigger}
+    return module
+
+
+def lazy_import(module_name):
+    """
+    遅延読み込みモジュールを返す関数
+
+    既に読み込み済みの場合は実体のモジュールをそのまま返す。
+
+    Parameters:
+    -----------
+    module_name : str
+        モジュール名
+
+    Returns:
+    --------
+    module or LazyModule
+    """
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    return LazyModule(module_name)
+
+
+def is_loaded(module_name):
+    """
+    モジュールが読み込み済みかどうかを返す関数
+    """
+    return module_name in sys.modules
+
+
+def get_import_report():
+    """
+    記録済みのモジュール読み込み時間を、時間の長い順に返す関数
+
+    Returns:
+    --------
+    list of dict : [{'module': str, 'seconds': float, 'trigger': str}, ...]
+    """
+    records = [
+        {'module': name, 'seconds': record['seconds'], 'trigger': record['trigger']}
+        for name, record in _IMPORT_RECORDS.items()
+    ]
+    return sorted(records, key=lambda r: r['seconds'], reverse=True)
+
+
+def print_startup_report(startup_seconds):
+    """
+    起動時間とモジュール読み込み時間のレポートをコンソールに出力する関数（プロセスごとに1回）
+
+    Parameters:
+    -----------
+    startup_seconds : float
+        アプリのモジュール読み込み開始から完了までの時間（秒）
+    """
+    global _STARTUP_REPORTED
+    if _STARTUP_REPORTED:
+        return
+    _STARTUP_REPORTED = True
+
+    print(f"起動時インポート完了: {startup_seconds:.3f}秒")
+    for record in get_import_report():
+        print(f"  {record['module']}: {record['seconds']:.3f}秒（{record['trigger']}）")
+
+    deferred = [name for name in (
+        'plotly.graph_objects', 'plotly.subplots', 'reportlab', 'causalimpact',
+        'statsmodels.api', 'scipy.stats'
+    ) if not is_loaded(name)]
+    if deferred:
+        print(f"  遅延読み込み（未読み込み）: {', '.join(deferred)}")
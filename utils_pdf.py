@@ -0,0 +1,350 @@
+"""
+PDFレポート作成の共通処理
+
+二群比較・単群推定の包括的PDFレポートで共通して使う部品をまとめる。
+"""
+
+import copy
+import hashlib
+import io
+import os
+import string
+import threading
+from collections import OrderedDict
+
+import matplotlib
+
+from config.constants import FONT_SUBSET_DIR, FONT_SUBSET_CACHE_LIMIT, FONT_SUBSET_MEMORY_LIMIT
+from utils_figure import RenderedFigure
+
+# 文字集合ごとのサブセットフォント（(元フォント名, 文字集合のハッシュ値) → 登録したフォント名）
+# 使われた順に並べ、FONT_SUBSET_MEMORY_LIMIT を超えた古いものは reportlab の登録を解除する（LRU）
+_SUBSET_FONTS = OrderedDict()
+_SUBSET_LOCK = threading.Lock()
+# 作成中のサブセットごとのロック（_SUBSET_LOCK は辞書の参照・更新の間だけ保持する）
+_SUBSET_BUILD_LOCKS = {}
+
+
+def build_pdf_bytes_flowable(pdf_bytes, width, height):
+    """
+    PDFの内容（bytes）の1ページ目をreportlabのフォームXObjectとして埋め込むFlowableを作成する関数（pdfrw使用）
+
+    Parameters:
+    -----------
+    pdf_bytes : bytes
+        matplotlibなどで作成したPDFの内容
+    width, height : float
+        PDF上の表示サイズ（ポイント）
+
+    Returns:
+    --------
+    reportlab の Flowable
+    """
+    from pdfrw import PdfReader
+    from pdfrw.buildxobj import pagexobj
+    from pdfrw.toreportlab import makerl
+    from reportlab.platypus import Flowable
+
+    page = pagexobj(PdfReader(io.BytesIO(pdf_bytes)).pages[0])
+    x0, y0, x1, y1 = [float(v) for v in page.BBox]
+
+    class PdfFigure(Flowable):
+        def wrap(self, available_width, available_height):
+            return width, height
+
+        def draw(self):
+            canvas = self.canv
+            canvas.saveState()
+            canvas.scale(width / (x1 - x0), height / (y1 - y0))
+            canvas.translate(-x0, -y0)
+            canvas.doForm(makerl(canvas, page))
+            canvas.restoreState()
+
+    return PdfFigure()
+
+
+def _pdf_figure_flowable(fig, width, height):
+    """
+    matplotlibのPDF出力をreportlabのフォームXObjectとして埋め込むFlowableを作成する（pdfrw使用）
+    """
+    # pdfrw がない場合はPDF出力を作成せずに次の方式へ
+    import pdfrw  # noqa: F401
+
+    pdf_buffer = io.BytesIO()
+    fig.savefig(pdf_buffer, format='pdf')
+    return build_pdf_bytes_flowable(pdf_buffer.getvalue(), width, height)
+
+
+def _svg_figure_flowable(fig, width, height):
+    """
+    matplotlibのSVG出力をreportlabの図形（Drawing）に変換する（svglib使用）
+    """
+    from svglib.svglib import svg2rlg
+
+    svg_buffer = io.BytesIO()
+    # 文字はパスとして出力（PDF側のフォント登録に依存せず日本語も表示される）
+    with matplotlib.rc_context({'svg.fonttype': 'path'}):
+        fig.savefig(svg_buffer, format='svg')
+    svg_buffer.seek(0)
+
+    drawing = svg2rlg(svg_buffer)
+    if drawing is None or drawing.width <= 0 or drawing.height <= 0:
+        raise ValueError("SVGを図形に変換できません")
+    drawing.scale(width / drawing.width, height / drawing.height)
+    drawing.width = width
+    drawing.height = height
+    return drawing
+
+
+def _rendered_figure_flowable(rendered, width, height):
+    """
+    描画済みのグラフ（RenderedFigure）をmatplotlibを使わずに埋め込むFlowableを作成する
+    """
+    if rendered.pdf is not None:
+        try:
+            return build_pdf_bytes_flowable(rendered.pdf, width, height)
+        except ImportError:
+            pass
+        except Exception as e:
+            print(f"グラフをベクター形式で埋め込めません（描画済みPDF）: {str(e)}")
+    if rendered.png is None:
+        raise ValueError("埋め込み可能な形式で描画されていません")
+
+    from reportlab.platypus import Image
+    return Image(io.BytesIO(rendered.png), width=width, height=height)
+
+
+def build_figure_flowable(fig, width=420, height=280, dpi=150):
+    """
+    matplotlibのグラフをPDFに埋め込むFlowableを作成する関数
+
+    グラフはベクター形式で埋め込む（拡大しても劣化せず、PNG画像より作成が速くファイルも小さい）。
+    pdfrw が利用できる場合はmatplotlibのPDF出力をそのまま、利用できない場合は svglib で
+    SVGを変換して埋め込み、いずれも利用できない場合や変換に失敗した場合はPNG画像として埋め込む。
+
+    Parameters:
+    -----------
+    fig : matplotlib.figure.Figure or RenderedFigure
+        グラフ（レイアウト調整済み）。描画済みの場合はそのPDF（pdfrw がない場合はPNG）を埋め込む
+    width, height : float
+        PDF上の表示サイズ（ポイント）
+    dpi : int
+        PNG画像で埋め込む場合の解像度
+
+    Returns:
+    --------
+    reportlab の Flowable
+    """
+    if isinstance(fig, RenderedFigure):
+        return _rendered_figure_flowable(fig, width, height)
+
+    for build_vector_flowable in (_pdf_figure_flowable, _svg_figure_flowable):
+        try:
+            return build_vector_flowable(fig, width, height)
+        except ImportError:
+            continue
+        except Exception as e:
+            print(f"グラフをベクター形式で埋め込めません（{build_vector_flowable.__name__}）: {str(e)}")
+
+    from reportlab.platypus import Image
+
+    img_buffer = io.BytesIO()
+    fig.savefig(img_buffer, format='png', dpi=dpi, bbox_inches='tight')
+    img_buffer.seek(0)
+    return Image(img_buffer, width=width, height=height)
+
+
+def _prune_subset_fonts():
+    # 保存しているサブセットフォントが上限を超えた場合、古いものから削除
+    try:
+        paths = [os.path.join(FONT_SUBSET_DIR, name) for name in os.listdir(FONT_SUBSET_DIR)]
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:max(0, len(paths) - FONT_SUBSET_CACHE_LIMIT)]:
+            os.remove(path)
+    except OSError:
+        pass
+
+
+def _write_subset_font(font_path, characters, subset_path, ps_name):
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    # 必要なグリフだけを読み込む（CJKフォント全体を展開しない）
+    font = TTFont(font_path, fontNumber=0, lazy=True)
+    options = subset.Options()
+    options.notdef_outline = True
+    options.hinting = False
+    options.layout_features = []
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes={ord(c) for c in characters})
+    subsetter.subset(font)
+    # reportlab はPostScript名が同じフォントを同一視するため、サブセットごとに固有の名前にする
+    for record in font['name'].names:
+        if record.nameID == 6:
+            record.string = ps_name
+
+    os.makedirs(FONT_SUBSET_DIR, exist_ok=True)
+    tmp_path = f"{subset_path}.{os.getpid()}.tmp"
+    font.save(tmp_path)
+    os.replace(tmp_path, subset_path)
+    _prune_subset_fonts()
+
+
+def get_subset_font(font_name, texts):
+    """
+    レポートで使う文字だけを含むサブセットフォントを作成・登録し、そのフォント名を返す関数
+
+    CJKフォントは数万グリフを含むため、PDFごとに必要な文字だけのフォントを使うと
+    フォントの読み込み・埋め込みが速くなる。サブセットは文字集合ごとにメモリと
+    ディスク（FONT_SUBSET_DIR）にキャッシュし、同じ文字集合では作成済みのものを再利用する。
+    英数字・記号は常に含めるため、数値だけが異なるレポートでは同じサブセットになる。
+
+    Parameters:
+    -----------
+    font_name : str
+        登録済みのフォント名
+    texts : list of str
+        レポートに含まれる文字列
+
+    Returns:
+    --------
+    str : サブセットフォントのフォント名（ビルトインフォントの場合は font_name のまま）
+    """
+    from config.font_config import get_font_path, register_font, unregister_font
+
+    font_path = get_font_path(font_name)
+    if font_path is None:
+        return font_name
+
+    characters = set(string.printable.strip()) | {' '}
+    for text in texts:
+        characters.update(c for c in text if c.isprintable())
+
+    stat = os.stat(font_path)
+    digest = hashlib.sha1(
+        f"subset-v2:{font_path}:{stat.st_size}:{int(stat.st_mtime)}:{''.join(sorted(characters))}".encode('utf-8')
+    ).hexdigest()[:16]
+    key = (font_name, digest)
+
+    with _SUBSET_LOCK:
+        subset_name = _SUBSET_FONTS.get(key)
+        if subset_name is not None:
+            _SUBSET_FONTS.move_to_end(key)
+            return subset_name
+        build_lock = _SUBSET_BUILD_LOCKS.setdefault(key, threading.Lock())
+
+    # サブセットの作成は文字集合ごとのロックで行う（異なる文字集合のPDF作成を待たせない）
+    with build_lock:
+        with _SUBSET_LOCK:
+            subset_name = _SUBSET_FONTS.get(key)
+        if subset_name is None:
+            subset_path = os.path.join(FONT_SUBSET_DIR, f"{font_name}-{digest}.ttf")
+            if os.path.exists(subset_path):
+                os.utime(subset_path)
+            else:
+                _write_subset_font(font_path, characters, subset_path, f"CausalImpactSubset-{digest}")
+
+            subset_name = f"{font_name}-{digest[:8]}"
+            register_font(subset_name, subset_path)
+            evicted = []
+            with _SUBSET_LOCK:
+                _SUBSET_FONTS[key] = subset_name
+                while len(_SUBSET_FONTS) > FONT_SUBSET_MEMORY_LIMIT:
+                    evicted.append(_SUBSET_FONTS.popitem(last=False)[1])
+            # 長く使われていないサブセットはフォントの解析結果をメモリから解放する（ファイルはディスクに残す）
+            for name in evicted:
+                unregister_font(name)
+    with _SUBSET_LOCK:
+        _SUBSET_BUILD_LOCKS.pop(key, None)
+    return subset_name
+
+
+def apply_subset_font(story, font_name):
+    """
+    PDFの内容（story）の段落・表を、使用する文字だけのサブセットフォントに切り替える関数
+
+    段落は作成時にフォントが確定するため、サブセットフォントのスタイルで作り直す。
+    表は複製し、font_name を使うセルとセル内の段落・入れ子の表だけをサブセットフォントに切り替える（元の表は変更しない）。
+    サブセットを作成できない場合（fontTools がない場合など）は元の内容をそのまま返す。
+
+    Parameters:
+    -----------
+    story : list
+        reportlab の Flowable のリスト
+    font_name : str
+        段落・表に設定したフォント名
+
+    Returns:
+    --------
+    list : サブセットフォントに切り替えた Flowable のリスト
+    """
+    texts = []
+    _collect_texts(story, texts)
+
+    try:
+        subset_name = get_subset_font(font_name, texts)
+    except Exception as e:
+        print(f"サブセットフォントを作成できません（元のフォントを使用）: {str(e)}")
+        return story
+    if subset_name == font_name:
+        return story
+
+    return _subset_flowables(story, font_name, subset_name, {})
+
+
+def _collect_texts(value, texts):
+    # 段落・表のセル（文字列・段落・入れ子の表・Flowableのリスト）の文字列を集める
+    from reportlab.platypus import Paragraph, Table
+
+    if isinstance(value, Paragraph):
+        texts.append(value.text)
+    elif isinstance(value, Table):
+        for row in value._cellvalues:
+            for cell in row:
+                _collect_texts(cell, texts)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _collect_texts(item, texts)
+    elif isinstance(value, str):
+        texts.append(value)
+    elif isinstance(value, (int, float)):
+        texts.append(str(value))
+
+
+def _subset_flowables(value, font_name, subset_name, subset_styles):
+    # 段落・表（セル内の段落・入れ子の表を含む）を、font_name の部分だけサブセットフォントに切り替えた複製にする
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.platypus import Paragraph, Table
+
+    if isinstance(value, Paragraph) and value.style.fontName == font_name:
+        style = subset_styles.get(id(value.style))
+        if style is None:
+            style = ParagraphStyle(value.style.name, parent=value.style, fontName=subset_name)
+            subset_styles[id(value.style)] = style
+        return Paragraph(value.text, style)
+    if isinstance(value, Table):
+        return _subset_table(value, font_name, subset_name, subset_styles)
+    if isinstance(value, (list, tuple)):
+        return type(value)(_subset_flowables(item, font_name, subset_name, subset_styles) for item in value)
+    return value
+
+
+def _subset_table(table, font_name, subset_name, subset_styles):
+    # 呼び出し元の表は変更せず、font_name を使うセルのスタイル・セル内の段落だけを置き換えた複製を返す
+    copied_styles = {}
+
+    def subset_style(cell_style):
+        if cell_style.fontname != font_name:
+            return cell_style
+        copied = copied_styles.get(id(cell_style))
+        if copied is None:
+            copied = cell_style.copy()
+            copied.fontname = subset_name
+            copied_styles[id(cell_style)] = copied
+        return copied
+
+    subset = copy.copy(table)
+    subset._cellStyles = [[subset_style(cell_style) for cell_style in row] for row in table._cellStyles]
+    subset._cellvalues = [[_subset_flowables(cell, font_name, subset_name, subset_styles) for cell in row]
+                          for row in table._cellvalues]
+    return subset
@@ -0,0 +1,301 @@
+"""
+検出力（Power）・最小検出効果（MDE）シミュレーション
+
+STEP1で作成したデータセットに対して、介入期間へ合成効果を注入したモンテカルロ
+シミュレーションを行い、設定した介入前／介入期間で効果を検出できるかを事前に評価する。
+
+高速化のポイント
+- 反事実モデルは介入前期間のみで推定する線形回帰（定数項・トレンド・対照群）とし、
+  全シミュレーション分を1回の正規方程式でまとめて解く（説明変数行列は共通）
+- 注入する効果は介入期間のみに加わるため、介入前期間で推定する係数には影響しない。
+  そのため効果量ごとの再推定は不要で、累積効果に効果量分を加算するだけで済む
+- シミュレーション数が多い場合はチャンクに分割して共有ワーカープールで並列実行する
+"""
+
+import numpy as np
+import pandas as pd
+
+# デフォルトの効果量（相対リフト）
+DEFAULT_EFFECT_SIZES = (0.0, 0.01, 0.02, 0.03, 0.05, 0.1)
+
+
+def _prepare_design(dataset, pre_period, post_period):
+    """
+    データセットから介入前／介入期間の説明変数行列と目的変数を作成する
+
+    Parameters:
+    -----------
+    dataset : pandas.DataFrame
+        STEP1で作成したデータセット（'ymd'列 + 処置群列 [+ 対照群列]）
+    pre_period : list
+        介入前期間 [start_date, end_date]
+    post_period : list
+        介入期間 [start_date, end_date]
+
+    Returns:
+    --------
+    tuple: (X_pre, y_pre, X_post, y_post)
+    """
+    df = dataset.copy()
+    df['ymd'] = pd.to_datetime(df['ymd'])
+    df = df.sort_values('ymd').reset_index(drop=True)
+
+    value_columns = [col for col in df.columns if col != 'ymd']
+    if len(value_columns) == 0:
+        raise ValueError("データセットに処置群データが見つかりません")
+
+    treatment_col = value_columns[0]
+    control_cols = value_columns[1:]
+
+    pre_mask = ((df['ymd'] >= pd.to_datetime(pre_period[0])) & (df['ymd'] <= pd.to_datetime(pre_period[1]))).values
+    post_mask = ((df['ymd'] >= pd.to_datetime(post_period[0])) & (df['ymd'] <= pd.to_datetime(post_period[1]))).values
+
+    # 説明変数: 定数項・時間トレンド・対照群（二群比較の場合）
+    time_index = np.arange(len(df), dtype=float)
+    columns = [np.ones(len(df)), time_index]
+    for col in control_cols:
+        columns.append(df[col].astype(float).values)
+    X = np.column_stack(columns)
+    y = df[treatment_col].astype(float).values
+
+    return X[pre_mask], y[pre_mask], X[post_mask], y[post_mask]
+
+
+def _block_bootstrap(residuals, n_obs, n_simulations, block_size, rng):
+    """
+    移動ブロックブートストラップで残差系列を生成する（自己相関を保持）
+
+    Returns:
+    --------
+    numpy.ndarray : (n_obs, n_simulations) の残差行列
+    """
+    block_size = max(1, min(int(block_size), len(residuals)))
+    n_blocks = int(np.ceil(n_obs / block_size))
+    max_start = len(residuals) - block_size + 1
+    starts = rng.integers(0, max_start, size=(n_blocks, n_simulations))
+    offsets = np.arange(block_size)
+    # (n_blocks, block_size, n_simulations) → (n_blocks * block_size, n_simulations)
+    index = (starts[:, None, :] + offsets[None, :, None]).reshape(-1, n_simulations)
+    return residuals[index[:n_obs]]
+
+
+def _simulate_chunk(args):
+    """
+    シミュレーション1チャンク分を実行する（プロセスプールから呼ばれるためモジュール関数）
+
+    全シミュレーションの介入前期間を1回の正規方程式で同時に推定し、
+    介入期間の累積効果のz統計量を効果量ごとに算出する。
+
+    Returns:
+    --------
+    tuple: (detections, estimated_effects)
+        detections : (n_effects,) 検出回数
+        estimated_effects : (n_effects,) 推定相対効果の合計
+    """
+    (X_pre, X_post, fitted_pre, fitted_post, residuals,
+     effect_sizes, n_simulations, alpha, block_size, seed) = args
+    from scipy import stats
+
+    rng = np.random.default_rng(seed)
+    n_pre = len(fitted_pre)
+    n_post = len(fitted_post)
+    n_params = X_pre.shape[1]
+
+    # 合成系列（効果注入前）: 推定値 + ブートストラップ残差
+    noise = _block_bootstrap(residuals, n_pre + n_post, n_simulations, block_size, rng)
+    Y_pre = fitted_pre[:, None] + noise[:n_pre]
+    Y_post = fitted_post[:, None] + noise[n_pre:]
+
+    # 全シミュレーションを一括推定（X_preは共通なので分解は1回）
+    xtx_inv = np.linalg.pinv(X_pre.T @ X_pre)
+    beta = xtx_inv @ (X_pre.T @ Y_pre)
+    resid_pre = Y_pre - X_pre @ beta
+    dof = max(n_pre - n_params, 1)
+    sigma2 = (resid_pre ** 2).sum(axis=0) / dof
+
+    # AR(1)による分散膨張係数（累積和の分散を自己相関で補正）
+    rho = (resid_pre[1:] * resid_pre[:-1]).sum(axis=0) / np.maximum((resid_pre ** 2).sum(axis=0), 1e-12)
+    rho = np.clip(rho, -0.95, 0.95)
+    inflation = (1 + rho) / (1 - rho)
+
+    # 累積予測値の分散: 観測ノイズ + 係数推定の不確実性
+    # （係数の推定誤差も自己相関のある残差から生じるため、両方に分散膨張係数を掛ける）
+    post_sum_x = X_post.sum(axis=0)
+    param_var = float(post_sum_x @ xtx_inv @ post_sum_x)
+    cum_se = np.sqrt(sigma2 * inflation * (n_post + param_var))
+
+    cum_pred = post_sum_x @ beta
+    cum_effect_base = Y_post.sum(axis=0) - cum_pred
+    counterfactual_sum = fitted_post.sum()
+
+    critical = stats.norm.ppf(1 - alpha / 2)
+    detections = np.zeros(len(effect_sizes))
+    estimated_effects = np.zeros(len(effect_sizes))
+    for i, effect in enumerate(effect_sizes):
+        # 介入期間のみへの注入なので推定係数は不変、累積効果に加算するだけ
+        cum_effect = cum_effect_base + effect * counterfactual_sum
+        z = cum_effect / np.maximum(cum_se, 1e-12)
+        if effect > 0:
+            detected = z > critical
+        elif effect < 0:
+            detected = z < -critical
+        else:
+            detected = np.abs(z) > critical
+        detections[i] = detected.sum()
+        estimated_effects[i] = (cum_effect / np.where(cum_pred != 0, cum_pred, np.nan)).sum()
+
+    return detections, estimated_effects
+
+
+def parse_effect_sizes(text):
+    """
+    画面で入力された効果量（%、カンマ区切り）を相対効果のリストに変換する関数
+
+    偽陽性率を算出するため0%を必ず含め、重複を除いて昇順に並べる。
+    全角のカンマ・読点、%記号も受け付ける。
+
+    Parameters:
+    -----------
+    text : str
+        効果量の入力（例: "1, 2, 3, 5, 10"）
+
+    Returns:
+    --------
+    list of float : 相対効果（0.03 = +3%）
+
+    Raises:
+    -------
+    ValueError : 数値として解釈できない値が含まれる場合（メッセージに該当する値を含む）
+    """
+    normalized = text.replace('，', ',').replace('、', ',').replace('％', '%')
+    values, invalid = [], []
+    for token in normalized.split(','):
+        token = token.strip().rstrip('%').strip()
+        if not token:
+            continue
+        try:
+            value = float(token)
+        except ValueError:
+            invalid.append(token)
+            continue
+        if not np.isfinite(value):
+            invalid.append(token)
+            continue
+        values.append(value / 100)
+    if invalid:
+        raise ValueError(f"効果量に数値以外の値が含まれています: {', '.join(invalid)}"
+                         "（例: 1, 2, 3, 5, 10）")
+    return sorted({0.0, *values})
+
+
+def run_power_simulation(dataset, pre_period, post_period, effect_sizes=DEFAULT_EFFECT_SIZES,
+                         n_simulations=1000, alpha=0.05, block_size=7, use_worker_pool=False,
+                         chunk_size=250, random_state=None):
+    """
+    モンテカルロ法で効果量ごとの検出率（検出力）を算出する関数
+
+    Parameters:
+    -----------
+    dataset : pandas.DataFrame
+        STEP1で作成したデータセット（'ymd'列 + 処置群列 [+ 対照群列]）
+    pre_period : list
+        介入前期間 [start_date, end_date]
+    post_period : list
+        介入期間 [start_date, end_date]
+    effect_sizes : sequence of float
+        注入する相対効果（0.03 = +3%）。0を含めると偽陽性率も算出される
+    n_simulations : int
+        効果量あたりのシミュレーション回数
+    alpha : float
+        有意水準（デフォルト：0.05）
+    block_size : int
+        ブロックブートストラップのブロック長（日次データでは週周期の7を推奨）
+    use_worker_pool : bool
+        チャンクを共有ワーカープール（utils_worker_pool）で並列実行する場合True
+        （Falseの場合は同一プロセスで逐次実行）
+    chunk_size : int
+        1タスクあたりのシミュレーション数
+    random_state : int or None
+        乱数シード
+
+    Returns:
+    --------
+    pandas.DataFrame : 効果量ごとの検出率
+        - 効果量: 注入した相対効果（%）
+        - 検出率: 有意と判定された割合
+        - 平均推定相対効果: 推定された相対効果の平均（%）
+        - シミュレーション回数
+    """
+    X_pre, y_pre, X_post, y_post = _prepare_design(dataset, pre_period, post_period)
+    n_params = X_pre.shape[1]
+
+    if len(y_pre) <= n_params + 2:
+        raise ValueError(f"介入前期間のデータが不足しています（{len(y_pre)}件）。シミュレーションには{n_params + 3}件以上が必要です")
+    if len(y_post) == 0:
+        raise ValueError("介入期間のデータがありません")
+
+    # 実データの介入前期間でベースラインモデルを推定
+    beta, _, _, _ = np.linalg.lstsq(X_pre, y_pre, rcond=None)
+    fitted_pre = X_pre @ beta
+    fitted_post = X_post @ beta
+    residuals = y_pre - fitted_pre
+
+    effect_sizes = np.asarray(list(effect_sizes), dtype=float)
+
+    # チャンク分割（チャンクごとに独立した乱数系列を割り当て）
+    chunk_size = max(1, int(chunk_size))
+    chunk_counts = [min(chunk_size, n_simulations - start) for start in range(0, n_simulations, chunk_size)]
+    seeds = np.random.SeedSequence(random_state).spawn(len(chunk_counts))
+    tasks = [
+        (X_pre, X_post, fitted_pre, fitted_post, residuals,
+         effect_sizes, count, alpha, block_size, seed)
+        for count, seed in zip(chunk_counts, seeds)
+    ]
+
+    if use_worker_pool and len(tasks) > 1:
+        from utils_worker_pool import map_in_pool
+        chunk_results = map_in_pool(_simulate_chunk, tasks)
+    else:
+        chunk_results = [_simulate_chunk(task) for task in tasks]
+
+    detections = np.sum([result[0] for result in chunk_results], axis=0)
+    estimated_effects = np.sum([result[1] for result in chunk_results], axis=0)
+
+    return pd.DataFrame({
+        '効果量': effect_sizes * 100,
+        '検出率': detections / n_simulations,
+        '平均推定相対効果': estimated_effects / n_simulations * 100,
+        'シミュレーション回数': n_simulations
+    })
+
+
+def estimate_minimum_detectable_effect(power_df, target_power=0.8):
+    """
+    検出率テーブルから最小検出効果（MDE）を線形補間で推定する関数
+
+    Parameters:
+    -----------
+    power_df : pandas.DataFrame
+        run_power_simulationの戻り値
+    target_power : float
+        目標とする検出力（デフォルト：0.8）
+
+    Returns:
+    --------
+    float or None : 最小検出効果（%）。範囲内で目標に達しない場合はNone
+    """
+    df = power_df[power_df['効果量'] > 0].sort_values('効果量')
+    effects = df['効果量'].values
+    powers = df['検出率'].values
+
+    for i, power in enumerate(powers):
+        if power >= target_power:
+            if i == 0:
+                return float(effects[0])
+            # 直前の効果量との間を線形補間
+            prev_effect, prev_power = effects[i - 1], powers[i - 1]
+            if power == prev_power:
+                return float(effects[i])
+            ratio = (target_power - prev_power) / (power - prev_power)
+            return float(prev_effect + ratio * (effects[i] - prev_effect))
+    return None
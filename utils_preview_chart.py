@@ -0,0 +1,204 @@
+"""
+STEP1の時系列プロット（データセットのプレビュー）の作成
+
+全期間の全データをそのままブラウザに送ると、データ件数が多い場合に画面の再実行のたびに
+データセット全体が送られ、表示が重くなる。
+
+- グラフの表示幅から点数の上限を決め、区間ごとの最小値・最大値を残して間引く（山・谷は必ず表示される）
+- 作成したグラフの定義（JSON）を (データセットのハッシュ値, グラフの種類, 点数の上限, 系列名) を
+  キーとしてサーバー全体でメモし、同じデータセットの再表示ではグラフを作り直さない
+- 点数が上限以下の場合は間引かず、従来どおり全件を表示する
+"""
+
+import hashlib
+
+import numpy as np
+
+from config.constants import PREVIEW_CHART_SETTINGS
+from utils_downsample import minmax_indices
+from utils_cache import ByteLRU, shared_resource
+
+_HOVER_TEMPLATE = '日付: %{x|%Y-%m-%d}<br>数量: %{y}<extra></extra>'
+_TREATMENT_COLOR = "#1976d2"
+_CONTROL_COLOR = "#ef5350"
+
+
+def get_dataset_version(dataset):
+    """
+    データセットの内容のハッシュ値（プレビューのメモのキーに使用）
+
+    Parameters:
+    -----------
+    dataset : pandas.DataFrame
+        'ymd' 列と数量の列を持つデータセット
+
+    Returns:
+    --------
+    str : 16桁の16進数文字列
+    """
+    digest = hashlib.sha1()
+    digest.update(repr(list(dataset.columns)).encode('utf-8'))
+    for column in dataset.columns:
+        values = dataset[column].to_numpy()
+        if column == 'ymd':
+            values = values.astype('datetime64[ns]').view(np.int64)
+        else:
+            values = values.astype(np.float64)
+        digest.update(np.ascontiguousarray(values).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def get_preview_point_budget(chart_width=None):
+    """
+    グラフの表示幅（ピクセル）から1系列あたりの点数の上限を決める関数
+
+    Parameters:
+    -----------
+    chart_width : int, optional
+        グラフの表示幅（Noneの場合は PREVIEW_CHART_SETTINGS['chart_width']）
+
+    Returns:
+    --------
+    int : 1系列あたりの点数の上限
+    """
+    settings = PREVIEW_CHART_SETTINGS
+    if chart_width is None:
+        chart_width = settings['chart_width']
+    budget = int(chart_width * settings['points_per_pixel'])
+    return max(settings['min_points'], min(settings['max_points'], budget))
+
+
+def _preview_trace(dates, values, name, color, max_points, markers):
+    import plotly.graph_objects as go
+
+    values = np.asarray(values, dtype=np.float64)
+    # 1区間から最小値・最大値の2点を残すため、区間数は点数の上限の半分
+    indices = minmax_indices(values, max_points // 2)
+    downsampled = len(indices) < len(values)
+    # 間引いた場合はマーカーを表示しない（マーカーが実際の観測点と誤解されないように）
+    mode = 'lines+markers' if markers and not downsampled else 'lines'
+    return go.Scatter(
+        x=dates[indices],
+        y=values[indices],
+        name=name,
+        line=dict(color=color, width=2),
+        mode=mode,
+        marker=dict(size=4),
+        hovertemplate=_HOVER_TEMPLATE
+    )
+
+
+def _build_two_group_figure(dataset, treatment_col, control_col, treatment_label, control_label, max_points):
+    from plotly.subplots import make_subplots
+
+    dates = dataset['ymd'].to_numpy()
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+
+    # 処置群・対照群のトレース追加
+    fig.add_trace(_preview_trace(dates, dataset[treatment_col], treatment_label, _TREATMENT_COLOR,
+                                 max_points, markers=True), secondary_y=False)
+    fig.add_trace(_preview_trace(dates, dataset[control_col], control_label, _CONTROL_COLOR,
+                                 max_points, markers=True), secondary_y=True)
+
+    # X軸の設定
+    fig.update_xaxes(title_text="日付", type="date", tickformat="%Y-%m", showgrid=True, tickangle=-30)
+
+    # 左Y軸（処置群）・右Y軸（対照群）の設定
+    fig.update_yaxes(title_text="処置群の数量", secondary_y=False,
+                     title_font=dict(color=_TREATMENT_COLOR), tickfont=dict(color=_TREATMENT_COLOR))
+    fig.update_yaxes(title_text="対照群の数量", secondary_y=True,
+                     title_font=dict(color=_CONTROL_COLOR), tickfont=dict(color=_CONTROL_COLOR))
+
+    # レイアウトの設定（凡例を中央に配置、range sliderを追加）
+    fig.update_layout(
+        height=500,
+        hovermode='x unified',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+        xaxis_rangeslider_visible=True,
+        dragmode="zoom"
+    )
+    return fig
+
+
+def _build_single_group_figure(dataset, treatment_col, treatment_label, max_points):
+    import plotly.graph_objects as go
+
+    dates = dataset['ymd'].to_numpy()
+    fig = go.Figure()
+    fig.add_trace(_preview_trace(dates, dataset[treatment_col], treatment_label, _TREATMENT_COLOR,
+                                 max_points, markers=False))
+
+    # レイアウトの設定（凡例表示、range slider追加）
+    fig.update_layout(
+        showlegend=True,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+        hovermode="x unified",
+        plot_bgcolor='white',
+        margin=dict(t=50, l=60, r=60, b=60),
+        height=500,
+        autosize=True,
+        xaxis_rangeslider_visible=True,
+        dragmode="zoom"
+    )
+
+    # X軸・Y軸の設定（左軸ラベルを青文字で明示）
+    fig.update_xaxes(title_text="日付", type="date", tickformat="%Y-%m", showgrid=True, tickangle=-30)
+    fig.update_yaxes(title_text="処置群の数量", title_font=dict(color=_TREATMENT_COLOR),
+                     tickfont=dict(color=_TREATMENT_COLOR), showgrid=True)
+    return fig
+
+
+def build_preview_figure(dataset, treatment_col, treatment_label, control_col=None, control_label=None,
+                         dataset_version=None, chart_width=None):
+    """
+    STEP1の時系列プロット（Plotly）を作成する関数（間引き・メモ付き）
+
+    Parameters:
+    -----------
+    dataset : pandas.DataFrame
+        'ymd' 列と数量の列を持つデータセット
+    treatment_col : str
+        処置群の列名
+    treatment_label : str
+        処置群の凡例名
+    control_col : str, optional
+        対照群の列名（Noneの場合は単群推定のグラフ）
+    control_label : str, optional
+        対照群の凡例名
+    dataset_version : str, optional
+        データセットのハッシュ値（Noneの場合は get_dataset_version で計算）
+    chart_width : int, optional
+        グラフの表示幅（ピクセル。Noneの場合は PREVIEW_CHART_SETTINGS['chart_width']）
+
+    Returns:
+    --------
+    plotly.graph_objects.Figure
+    """
+    import plotly.io as pio
+
+    max_points = get_preview_point_budget(chart_width)
+    if dataset_version is None:
+        dataset_version = get_dataset_version(dataset)
+    kind = 'single' if control_col is None else 'two_group'
+    key = (dataset_version, kind, max_points, treatment_col, treatment_label, control_col, control_label)
+
+    def build():
+        if control_col is None:
+            fig = _build_single_group_figure(dataset, treatment_col, treatment_label, max_points)
+        else:
+            fig = _build_two_group_figure(dataset, treatment_col, control_col, treatment_label, control_label,
+                                          max_points)
+        return fig.to_json()
+
+    figure_json = get_preview_cache().get_or_build(key, build)
+    return pio.from_json(figure_json, skip_invalid=True)
+
+
+def _create_preview_cache():
+    """
+    時系列プロットのメモを作成する（サーバー全体で1つだけ）
+    """
+    return ByteLRU(PREVIEW_CHART_SETTINGS['cache_max_bytes'], PREVIEW_CHART_SETTINGS['cache_max_entries'])
+
+
+get_preview_cache = shared_resource(_create_preview_cache)
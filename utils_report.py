@@ -0,0 +1,162 @@
+"""
+詳細レポート生成モジュール
+
+分析結果オブジェクト（utils_result.AnalysisResult）の数値から、詳細レポートの文面を
+テンプレート（config.pdf_templates の文面カタログ）に差し込んで直接作成する。
+英語レポートを生成してから正規表現で日本語に置き換える必要がなく、
+言語を追加する場合もテンプレートを追加するだけで済む。
+"""
+
+from utils_cache import ByteLRU
+from utils_result import get_report_values
+
+# 生成結果のメモ（(結果のハッシュ値, 信頼水準, 言語) → レポート文字列）
+# 全セッションのスレッドから参照するためロック付き
+_REPORT_CACHE_SIZE = 64
+_REPORT_CACHE_MAX_CHARS = 4 * 1024 * 1024
+_REPORT_CACHE = ByteLRU(_REPORT_CACHE_MAX_CHARS, _REPORT_CACHE_SIZE)
+
+
+def _fmt(value):
+    # CausalImpactの英語レポートと同じ小数点以下2桁の丸め
+    return str(round(float(value), 2))
+
+
+def _interval(lower, upper):
+    lower, upper = sorted([lower, upper])
+    return _fmt(lower), _fmt(upper)
+
+
+def _get_templates(use_japanese):
+    try:
+        from config.pdf_templates import get_report_templates
+        return get_report_templates(use_japanese)
+    except ImportError:
+        from config.app_templates import get_app_report_templates
+        return get_app_report_templates()
+
+
+def build_report_paragraphs(result, confidence_level=95, use_japanese=True):
+    """
+    詳細レポートを段落のリストとして作成する関数
+
+    段落の構成と条件分岐（有意性・効果の向き）は CausalImpact の英語レポートと同じ。
+
+    Parameters:
+    -----------
+    result : AnalysisResult
+        分析結果オブジェクト
+    confidence_level : int
+        信頼水準（%）
+    use_japanese : bool
+        日本語版の場合True、英語版の場合False
+
+    Returns:
+    --------
+    list of str or None
+        段落のリスト（先頭はタイトル）。数値が取得できない場合はNone
+    """
+    values = get_report_values(result)
+    p_value = result.p_value
+    if not values or p_value is None:
+        return None
+
+    templates = _get_templates(use_japanese)
+    avg = {name: pair[0] for name, pair in values.items()}
+    cum = {name: pair[1] for name, pair in values.items()}
+
+    # 相対効果の信頼区間が0をまたがない場合に有意と判定（英語レポートと同じ基準）
+    detected_sig = not (avg['rel_effect_lower'] < 0 and avg['rel_effect_upper'] > 0)
+    positive_sig = avg['rel_effect'] > 0
+    contrast_suffix = '_contrast' if detected_sig else ''
+
+    paragraphs = [templates['report_title'].format()]
+
+    # 段落1: 介入期間の平均値と予測値の比較
+    predicted_lower, predicted_upper = _fmt(avg['predicted_lower']), _fmt(avg['predicted_upper'])
+    abs_effect_lower, abs_effect_upper = _interval(avg['abs_effect_lower'], avg['abs_effect_upper'])
+    paragraphs.append(templates['report_average'].format(
+        actual=_fmt(avg['actual']),
+        counterfactual_intro=templates['report_average_intro' + contrast_suffix],
+        predicted=_fmt(avg['predicted']),
+        predicted_lower=predicted_lower,
+        predicted_upper=predicted_upper,
+        abs_effect=_fmt(avg['abs_effect']),
+        abs_effect_lower=abs_effect_lower,
+        abs_effect_upper=abs_effect_upper,
+        confidence_level=confidence_level
+    ))
+
+    # 段落2: 介入期間の合計値
+    predicted_lower, predicted_upper = _interval(cum['predicted_lower'], cum['predicted_upper'])
+    paragraphs.append(templates['report_cumulative'].format(
+        actual=_fmt(cum['actual']),
+        counterfactual_intro=templates['report_cumulative_intro' + contrast_suffix],
+        predicted=_fmt(cum['predicted']),
+        predicted_lower=predicted_lower,
+        predicted_upper=predicted_upper,
+        confidence_level=confidence_level
+    ))
+
+    # 段落3: 相対効果
+    rel_bounds = sorted([round(avg['rel_effect_lower'] * 100, 2), round(avg['rel_effect_upper'] * 100, 2)])
+    relative_key = 'report_relative_increase' if positive_sig else 'report_relative_decrease'
+    paragraphs.append(templates[relative_key].format(
+        rel_effect=_fmt(avg['rel_effect'] * 100),
+        rel_effect_lower=rel_bounds[0],
+        rel_effect_upper=rel_bounds[1],
+        confidence_level=confidence_level
+    ))
+
+    # 段落4: 有意性と効果の向きに応じた解釈
+    interpretation_key = {
+        (True, True): 'report_positive_significant',
+        (True, False): 'report_negative_significant',
+        (False, True): 'report_positive_not_significant',
+        (False, False): 'report_negative_not_significant'
+    }[(detected_sig, positive_sig)]
+    paragraphs.append(templates[interpretation_key].format(abs_effect=_fmt(avg['abs_effect'])))
+
+    # 段落5: 有意でない場合の補足
+    if not detected_sig:
+        paragraphs.append(templates['report_not_significant_note'])
+
+    # 段落6: p値（有意水準は 1 − 信頼水準）
+    if p_value < 1 - confidence_level / 100:
+        paragraphs.append(templates['report_p_significant'].format(p_value=_fmt(p_value)))
+    else:
+        paragraphs.append(templates['report_p_not_significant'].format(p_percent=_fmt(p_value * 100)))
+
+    return paragraphs
+
+
+def generate_report(result, confidence_level=95, use_japanese=True):
+    """
+    分析結果から詳細レポートを作成する関数（同じ結果・条件では1回だけ作成して再利用）
+
+    Parameters:
+    -----------
+    result : AnalysisResult
+        分析結果オブジェクト
+    confidence_level : int
+        信頼水準（%）
+    use_japanese : bool
+        日本語版の場合True、英語版の場合False
+
+    Returns:
+    --------
+    str or None
+        段落を空行で区切ったレポート。数値が取得できない場合はNone
+    """
+    key = (result.fingerprint(), confidence_level, use_japanese)
+    report = _REPORT_CACHE.get(key)
+    if report is not None:
+        return report
+
+    paragraphs = build_report_paragraphs(result, confidence_level, use_japanese)
+    if paragraphs is None:
+        return None
+
+    report = '\n\n'.join(paragraphs)
+    _REPORT_CACHE.put(key, report)
+    return report
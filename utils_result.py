@@ -0,0 +1,480 @@
+"""
+分析結果オブジェクト
+
+CausalImpactの推定結果（ci.inferences / ci.summary_data / ci.p_value）から、
+STEP3の表・メッセージ・グラフ・出力で使う数値を1回だけ取り出して保持する。
+各関数が ci.inferences をコピーして列名を揃え、介入期間を抽出し直す処理を省き、
+全ての表示・出力で同じ数値を参照する。
+"""
+
+import hashlib
+import numpy as np
+import pandas as pd
+
+# ci.inferences の列（pycausalimpactの出力名）
+INFERENCE_COLUMNS = [
+    'preds', 'preds_lower', 'preds_upper',
+    'point_effects', 'point_effects_lower', 'point_effects_upper'
+]
+
+# ci.summary_data の行名の表記ゆれを統一
+_SUMMARY_KEY_ALIASES = {
+    'abseffect': 'abs_effect',
+    'abseffect_lower': 'abs_effect_lower',
+    'abseffect_upper': 'abs_effect_upper',
+    'releffect': 'rel_effect',
+    'releffect_lower': 'rel_effect_lower',
+    'releffect_upper': 'rel_effect_upper',
+    'prediction': 'predicted'
+}
+
+
+class AnalysisResult:
+    """
+    1回の分析結果を配列で保持する軽量オブジェクト
+
+    Attributes:
+    -----------
+    dates : numpy.ndarray (datetime64)
+        日付
+    actual, preds, preds_lower, preds_upper : numpy.ndarray
+        実測値・予測値・予測値の信頼区間
+    point_effects, point_effects_lower, point_effects_upper : numpy.ndarray
+        効果（実測値－予測値）とその信頼区間
+    post_mask : numpy.ndarray (bool)
+        介入期間フラグ
+    post_cum_actual, post_cum_preds, post_cum_effects : numpy.ndarray
+        介入期間の累積値（介入前期間はNaN）
+    p_value : float or None
+        事後確率（p値）
+    summary_values : dict
+        ci.summary_data の値 {行名: (平均値, 累積値)}
+    post_stats : dict
+        介入期間の集計値（平均・累積・標準偏差・相対効果など）
+    alpha : float
+        モデル推定時の有意水準（ci.alpha。信頼区間はこの水準で計算されている）
+    """
+
+    __slots__ = (
+        'dates', 'actual', 'preds', 'preds_lower', 'preds_upper',
+        'point_effects', 'point_effects_lower', 'point_effects_upper',
+        'post_mask', 'post_cum_actual', 'post_cum_preds', 'post_cum_effects',
+        'p_value', 'summary_values', 'post_stats', 'alpha', '_fingerprint'
+    )
+
+    def __init__(self, dates, actual, preds, preds_lower, preds_upper,
+                 point_effects, point_effects_lower, point_effects_upper,
+                 post_mask, p_value=None, summary_values=None, alpha=0.05):
+        self.dates = dates
+        self.actual = actual
+        self.preds = preds
+        self.preds_lower = preds_lower
+        self.preds_upper = preds_upper
+        self.point_effects = point_effects
+        self.point_effects_lower = point_effects_lower
+        self.point_effects_upper = point_effects_upper
+        self.post_mask = post_mask
+        self.p_value = p_value
+        self.summary_values = summary_values or {}
+        self.alpha = float(alpha)
+        self._fingerprint = None
+
+        # 介入期間の累積値（介入前期間はNaN）
+        self.post_cum_actual = self._post_cumsum(actual)
+        self.post_cum_preds = self._post_cumsum(preds)
+        self.post_cum_effects = self._post_cumsum(point_effects)
+        self.post_stats = self._compute_post_stats()
+
+    def _post_cumsum(self, values):
+        cumulative = np.full(len(values), np.nan)
+        cumulative[self.post_mask] = np.cumsum(values[self.post_mask])
+        return cumulative
+
+    def _compute_post_stats(self):
+        mask = self.post_mask
+        n_post = int(mask.sum())
+        stats = {'n_post': n_post}
+        if n_post == 0:
+            return stats
+
+        def std(values):
+            # pandasの Series.std() と同じ不偏標準偏差（1件の場合はNaN）
+            return float(np.std(values, ddof=1)) if len(values) > 1 else float('nan')
+
+        for name in ('actual', 'preds', 'preds_lower', 'preds_upper',
+                     'point_effects', 'point_effects_lower', 'point_effects_upper'):
+            values = getattr(self, name)[mask]
+            stats[f'{name}_avg'] = float(np.mean(values))
+            stats[f'{name}_cum'] = float(np.sum(values))
+        stats['preds_std'] = std(self.preds[mask])
+        stats['point_effects_std'] = std(self.point_effects[mask])
+
+        # 相対効果（累積効果÷累積予測値）とその信頼区間
+        total_pred = stats['preds_cum']
+        if total_pred != 0:
+            stats['rel_effect'] = stats['point_effects_cum'] / total_pred * 100
+            stats['rel_effect_lower'] = stats['point_effects_lower_cum'] / total_pred * 100
+            stats['rel_effect_upper'] = stats['point_effects_upper_cum'] / total_pred * 100
+        else:
+            stats['rel_effect'] = stats['rel_effect_lower'] = stats['rel_effect_upper'] = 0.0
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rel_daily = self.point_effects[mask] / self.preds[mask] * 100
+        rel_daily = rel_daily[np.isfinite(rel_daily)]
+        stats['rel_effect_std'] = std(rel_daily) if len(rel_daily) > 0 else 0.0
+
+        # 累積効果の信頼区間が0をまたがないか
+        lower, upper = stats['point_effects_lower_cum'], stats['point_effects_upper_cum']
+        stats['ci_excludes_zero'] = bool((lower > 0 and upper > 0) or (lower < 0 and upper < 0))
+        return stats
+
+    @property
+    def n_obs(self):
+        return len(self.dates)
+
+    @property
+    def n_post(self):
+        return self.post_stats['n_post']
+
+    @property
+    def model_confidence_level(self):
+        """
+        モデル推定時の信頼水準（%）。信頼区間から標準偏差を求める場合はこの値を使う
+        """
+        return (1 - self.alpha) * 100
+
+    def fingerprint(self):
+        """
+        結果内容のハッシュ値（キャッシュのキーに使用）
+
+        Returns:
+        --------
+        str : 16桁の16進数文字列
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha1()
+            digest.update(np.asarray(self.dates, dtype='datetime64[ns]').view(np.int64).tobytes())
+            for name in ('actual', 'preds', 'preds_lower', 'preds_upper',
+                         'point_effects', 'point_effects_lower', 'point_effects_upper'):
+                digest.update(np.ascontiguousarray(getattr(self, name), dtype=np.float64).tobytes())
+            digest.update(self.post_mask.tobytes())
+            digest.update(repr(self.p_value).encode())
+            digest.update(repr(self.alpha).encode())
+            digest.update(repr(sorted(self.summary_values.items())).encode())
+            self._fingerprint = digest.hexdigest()[:16]
+        return self._fingerprint
+
+    def get_summary_value(self, key):
+        """
+        ci.summary_data の値を (平均値, 累積値) で返す（存在しない場合はNone）
+        """
+        return self.summary_values.get(key)
+
+    def to_frame(self):
+        """
+        日次の推定結果をDataFrameで返す（列名はpycausalimpactの出力名）
+        """
+        return pd.DataFrame({
+            'date': self.dates,
+            'y': self.actual,
+            'preds': self.preds,
+            'preds_lower': self.preds_lower,
+            'preds_upper': self.preds_upper,
+            'point_effects': self.point_effects,
+            'point_effects_lower': self.point_effects_lower,
+            'point_effects_upper': self.point_effects_upper,
+            'post_cum_y': self.post_cum_actual,
+            'post_cum_pred': self.post_cum_preds,
+            'post_cum_effects': self.post_cum_effects,
+            'post_period': self.post_mask.astype(int)
+        })
+
+
+def _extract_summary_values(ci):
+    summary_values = {}
+    summary_data = getattr(ci, 'summary_data', None)
+    if summary_data is None:
+        return summary_values
+    for index_name in summary_data.index:
+        key = str(index_name).strip().lower().replace(' ', '_')
+        key = _SUMMARY_KEY_ALIASES.get(key, key)
+        row = summary_data.loc[index_name]
+        try:
+            avg_val = row['Average'] if 'Average' in summary_data.columns else row.iloc[0]
+            cum_val = row['Cumulative'] if 'Cumulative' in summary_data.columns else row.iloc[1]
+            summary_values[key] = (float(avg_val), float(cum_val))
+        except Exception:
+            continue
+    return summary_values
+
+
+def extract_analysis_result(ci, post_period=None):
+    """
+    CausalImpactオブジェクトから分析結果オブジェクトを作成する関数
+
+    Parameters:
+    -----------
+    ci : CausalImpact
+        分析結果オブジェクト
+    post_period : tuple or None
+        介入期間 (開始日, 終了日)。Noneの場合は ci.post_period、それもなければ全期間
+
+    Returns:
+    --------
+    AnalysisResult
+    """
+    inferences = getattr(ci, 'inferences', None)
+    if inferences is None:
+        raise ValueError("CausalImpactオブジェクトから分析結果を取得できません")
+
+    columns = {}
+    for name in INFERENCE_COLUMNS:
+        source = name if name in inferences.columns else name.replace('preds', 'predicted')
+        if source in inferences.columns:
+            columns[name] = inferences[source].to_numpy(dtype=float)
+        else:
+            columns[name] = np.full(len(inferences), np.nan)
+
+    if 'y' in inferences.columns:
+        actual = inferences['y'].to_numpy(dtype=float)
+    else:
+        actual = columns['preds'] + columns['point_effects']
+
+    dates = pd.to_datetime(inferences.index).values
+
+    if post_period is None and getattr(ci, 'post_period', None) is not None:
+        post_period = (ci.post_period[0], ci.post_period[-1])
+
+    if post_period is not None:
+        post_start = np.datetime64(pd.to_datetime(post_period[0]))
+        post_end = np.datetime64(pd.to_datetime(post_period[1]))
+        post_mask = (dates >= post_start) & (dates <= post_end)
+    else:
+        post_mask = np.ones(len(dates), dtype=bool)
+
+    p_value = getattr(ci, 'p_value', None)
+    alpha = getattr(ci, 'alpha', None)
+    return AnalysisResult(
+        dates=dates,
+        actual=actual,
+        post_mask=post_mask,
+        p_value=float(p_value) if p_value is not None else None,
+        summary_values=_extract_summary_values(ci),
+        alpha=float(alpha) if alpha is not None else 0.05,
+        **columns
+    )
+
+
+def get_analysis_result(ci, post_period=None):
+    """
+    分析結果オブジェクトを返す関数（同じ ci・介入期間では1回だけ作成して再利用）
+
+    Parameters:
+    -----------
+    ci : CausalImpact
+        分析結果オブジェクト
+    post_period : tuple or None
+        介入期間 (開始日, 終了日)（STEP2で設定した期間を呼び出し側で指定する。Noneの場合は ci.post_period）
+
+    Returns:
+    --------
+    AnalysisResult
+    """
+    if isinstance(ci, AnalysisResult):
+        return ci
+    if post_period is None and getattr(ci, 'post_period', None) is not None:
+        post_period = (ci.post_period[0], ci.post_period[-1])
+    cache_key = None
+    if post_period is not None:
+        cache_key = (str(pd.to_datetime(post_period[0]).date()), str(pd.to_datetime(post_period[1]).date()))
+
+    cache = getattr(ci, '_analysis_result_cache', None)
+    if cache is None:
+        cache = {}
+        try:
+            ci._analysis_result_cache = cache
+        except AttributeError:
+            pass
+    if cache_key not in cache:
+        cache[cache_key] = extract_analysis_result(ci, post_period)
+    return cache[cache_key]
+
+
+# ci.summary() / ci.summary(output='report') に表示される指標
+REPORT_VALUE_NAMES = [
+    'actual', 'predicted', 'predicted_lower', 'predicted_upper',
+    'abs_effect', 'abs_effect_lower', 'abs_effect_upper',
+    'rel_effect', 'rel_effect_lower', 'rel_effect_upper'
+]
+
+
+def get_p_value(ci):
+    """
+    CausalImpactオブジェクトのp値（事後確率）を返す関数（取得できない場合はNone）
+    """
+    if isinstance(ci, AnalysisResult):
+        return ci.p_value
+    p_value = getattr(ci, 'p_value', None)
+    try:
+        return float(p_value) if p_value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def get_report_values(result):
+    """
+    ci.summary() / ci.summary(output='report') に表示される数値を構造化して返す関数
+
+    テキストを生成して正規表現で読み取る代わりに、推定結果の値を直接参照する。
+    ci.summary_data がない場合は日次の推定結果（介入期間）から集計する。
+
+    Parameters:
+    -----------
+    result : AnalysisResult
+        分析結果オブジェクト
+
+    Returns:
+    --------
+    dict : {指標名: (平均値, 累積値)}（相対効果は比率。例: 0.05 = 5%）
+        介入期間のデータがない場合は空のdict
+    """
+    values = result.summary_values
+    if all(name in values for name in REPORT_VALUE_NAMES):
+        return {name: values[name] for name in REPORT_VALUE_NAMES}
+
+    stats = result.post_stats
+    if stats['n_post'] == 0:
+        return {}
+
+    report_values = {}
+    for name, source in (('actual', 'actual'), ('predicted', 'preds'),
+                         ('predicted_lower', 'preds_lower'), ('predicted_upper', 'preds_upper'),
+                         ('abs_effect', 'point_effects'), ('abs_effect_lower', 'point_effects_lower'),
+                         ('abs_effect_upper', 'point_effects_upper')):
+        report_values[name] = (stats[f'{source}_avg'], stats[f'{source}_cum'])
+    # 相対効果は平均値・累積値とも「効果÷予測値」で同じ値になる
+    for name in ('rel_effect', 'rel_effect_lower', 'rel_effect_upper'):
+        report_values[name] = (stats[name] / 100, stats[name] / 100)
+    return report_values
+
+
+def get_report_sd(lower, upper, confidence_level=95):
+    """
+    信頼区間の幅から標準偏差を求める関数（ci.summary() の (s.d.) 表示と同じ計算）
+
+    confidence_level には表示用の信頼水準ではなく、信頼区間を計算したモデルの信頼水準
+    （AnalysisResult.model_confidence_level）を指定する。
+    """
+    from scipy.stats import norm
+    z_score = norm.ppf(1 - (1 - confidence_level / 100) / 2)
+    return (max(lower, upper) - min(lower, upper)) / (2 * z_score)
+
+
+def build_model_summary_rows(result, content, confidence_level=95):
+    """
+    ci.summary_data の値（ない場合は介入期間の日次推定結果）からサマリーテーブルの行を作成する関数
+    （実測値・予測値・予測値信頼区間・絶対効果・相対効果・p値）
+
+    Parameters:
+    -----------
+    result : AnalysisResult
+        分析結果オブジェクト
+    content : dict
+        表示ラベル（config.app_templates / config.pdf_templates）
+    confidence_level : int
+        信頼水準（%）
+
+    Returns:
+    --------
+    list : [[指標, 平均値, 累積値], ...]
+    """
+    rows = []
+    values = get_report_values(result)
+    if not values:
+        return rows
+
+    avg_val, cum_val = values['actual']
+    rows.append([content['table_actual'], f"{avg_val:.1f}", f"{cum_val:.1f}"])
+
+    avg_val, cum_val = values['predicted']
+    rows.append([content['table_predicted'], f"{avg_val:.1f}", f"{cum_val:.1f}"])
+
+    lower_avg, lower_cum = values['predicted_lower']
+    upper_avg, upper_cum = values['predicted_upper']
+    ci_label = content['table_predicted_ci'].format(confidence_level)
+    rows.append([ci_label, f"[{lower_avg:.1f}, {upper_avg:.1f}]", f"[{lower_cum:.1f}, {upper_cum:.1f}]"])
+
+    avg_val, cum_val = values['abs_effect']
+    rows.append([content['table_absolute_effect'], f"{avg_val:.1f}", f"{cum_val:.1f}"])
+
+    # %変換
+    rel_pct = values['rel_effect'][0] * 100
+    rows.append([content['table_relative_effect'], f"{rel_pct:.1f}%", f"{rel_pct:.1f}%"])
+
+    if result.p_value is not None:
+        rows.append([content['table_p_value'], f"{result.p_value:.4f}", f"{result.p_value:.4f}"])
+
+    return rows
+
+
+def build_inference_summary_rows(result, confidence_level=95):
+    """
+    日次の推定結果（介入期間）からサマリーテーブルの行を作成する関数
+    （標準偏差・絶対効果と相対効果の信頼区間を含む詳細版、日本語表記）
+
+    Parameters:
+    -----------
+    result : AnalysisResult
+        分析結果オブジェクト
+    confidence_level : int
+        信頼水準（%）
+
+    Returns:
+    --------
+    list : [[指標, 平均値, 累積値], ...]
+    """
+    stats = result.post_stats
+    if stats['n_post'] == 0:
+        return []
+
+    rows = [
+        ['実測値', f"{stats['actual_avg']:.1f}", f"{stats['actual_cum']:,.1f}"],
+        ['予測値（標準偏差）',
+         f"{stats['preds_avg']:.1f} ({stats['preds_std']:.1f})",
+         f"{stats['preds_cum']:,.1f} ({stats['preds_std']:.1f})"],
+        [f'予測値 {confidence_level}% 信頼区間',
+         f"[{stats['preds_lower_avg']:.1f}, {stats['preds_upper_avg']:.1f}]",
+         f"[{stats['preds_lower_cum']:,.1f}, {stats['preds_upper_cum']:,.1f}]"],
+        ['絶対効果（標準偏差）',
+         f"{stats['point_effects_avg']:.1f} ({stats['point_effects_std']:.1f})",
+         f"{stats['point_effects_cum']:,.1f} ({stats['point_effects_std']:.1f})"],
+        [f'絶対効果 {confidence_level}% 信頼区間',
+         f"[{stats['point_effects_lower_avg']:.1f}, {stats['point_effects_upper_avg']:.1f}]",
+         f"[{stats['point_effects_lower_cum']:,.1f}, {stats['point_effects_upper_cum']:,.1f}]"],
+        ['相対効果（標準偏差）',
+         f"{stats['rel_effect']:.1f}% ({stats['rel_effect_std']:.1f}%)",
+         f"{stats['rel_effect']:.1f}% ({stats['rel_effect_std']:.1f}%)"]
+    ]
+    rel_ci_str = f"[{stats['rel_effect_lower']:.1f}%, {stats['rel_effect_upper']:.1f}%]"
+    rows.append([f'相対効果 {confidence_level}% 信頼区間', rel_ci_str, rel_ci_str])
+
+    if result.p_value is not None:
+        rows.append(['p値', f"{result.p_value:.4f}", f"{result.p_value:.4f}"])
+    return rows
+
+
+def get_effect_summary(result):
+    """
+    サマリーメッセージ用の相対効果・p値・有意性を返す関数
+
+    Returns:
+    --------
+    tuple: (relative_effect, p_value, is_significant)
+        relative_effect : 相対効果（%）。介入期間のデータがない場合はNone
+        is_significant : 累積効果の信頼区間が0をまたがない、またはp < 0.05
+    """
+    stats = result.post_stats
+    if stats['n_post'] == 0:
+        return None, result.p_value, False
+    is_significant = stats['ci_excludes_zero'] or (result.p_value is not None and result.p_value < 0.05)
+    return stats['rel_effect'], result.p_value, is_significant
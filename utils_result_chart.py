@@ -0,0 +1,195 @@
+"""
+分析結果のインタラクティブなグラフ（Plotly）
+
+STEP3の3段グラフ（実測値 vs 予測値・時点効果・累積効果）を分析結果の配列から直接作成する。
+画面表示・HTMLレポートの両方で使用する。
+
+- plotly.py の Figure を経由せず、plotly.js にそのまま渡せる図の定義（dict）を作成する
+  （値は base64 の型付き配列として渡し、数値を文字列で並べるより小さく速い）
+- 画面表示では WebGL（scattergl）で描画し、点数が多くてもブラウザが重くならないようにする
+- 1系列あたりの点数が上限を超える場合は LTTB で間引いた点だけをブラウザに送る
+- 期間を指定した場合（拡大表示）は、その期間の点だけを送る（期間内が上限以下なら全件）
+"""
+
+import base64
+
+import numpy as np
+
+from config.constants import RESULT_CHART_SETTINGS
+from utils_downsample import select_indices
+
+_CONFIDENCE_BAND_COLOR = 'rgba(31, 119, 180, 0.2)'
+
+
+def _typed_array(values):
+    # plotly.js の型付き配列（base64）形式
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    return {'dtype': 'f8', 'bdata': base64.b64encode(values.tobytes()).decode('ascii')}
+
+
+def _post_cumsum(values, post_mask):
+    cumulative = np.full(len(values), np.nan)
+    cumulative[post_mask] = np.cumsum(values[post_mask])
+    return cumulative
+
+
+def _panel_traces(x, indices, center, lower, upper, name, yaxis, labels, trace_type, actual=None):
+    # 信頼区間（上限→下限の順に描き、下限を上限まで塗りつぶす）と中心線
+    x = _typed_array(x[indices])
+    traces = [
+        {'type': trace_type, 'x': x, 'y': _typed_array(upper[indices]), 'yaxis': yaxis,
+         'mode': 'lines', 'line': {'width': 0}, 'hoverinfo': 'skip', 'showlegend': False},
+        {'type': trace_type, 'x': x, 'y': _typed_array(lower[indices]), 'yaxis': yaxis,
+         'mode': 'lines', 'line': {'width': 0}, 'fill': 'tonexty', 'fillcolor': _CONFIDENCE_BAND_COLOR,
+         'hoverinfo': 'skip', 'name': labels['confidence_interval'], 'showlegend': yaxis == 'y',
+         'legendgroup': 'ci'},
+        {'type': trace_type, 'x': x, 'y': _typed_array(center[indices]), 'yaxis': yaxis,
+         'mode': 'lines', 'line': {'color': '#1f77b4', 'dash': 'dash', 'width': 1.5},
+         'name': name, 'showlegend': yaxis == 'y'}
+    ]
+    if actual is not None:
+        traces.append({'type': trace_type, 'x': x, 'y': _typed_array(actual[indices]), 'yaxis': yaxis,
+                       'mode': 'lines', 'line': {'color': 'black', 'width': 1.5}, 'name': labels['actual']})
+    return traces
+
+
+def get_window_bounds(dates, x_range=None):
+    """
+    指定期間に含まれる点の範囲（開始位置, 終了位置）を返す関数
+
+    線が表示範囲の端で途切れないよう、期間の前後1点ずつを含める。
+
+    Parameters:
+    -----------
+    dates : array-like
+        日付（昇順）
+    x_range : tuple or None
+        表示期間 (開始日, 終了日)（Noneの場合は全期間）
+
+    Returns:
+    --------
+    tuple : (開始位置, 終了位置)（終了位置は含まない）
+    """
+    n = len(dates)
+    if x_range is None:
+        return 0, n
+    dates = np.asarray(dates, dtype='datetime64[ns]')
+    start = np.datetime64(x_range[0], 'ns')
+    end = np.datetime64(x_range[1], 'ns')
+    lo = int(np.searchsorted(dates, start, side='left'))
+    hi = int(np.searchsorted(dates, end, side='right'))
+    return max(lo - 1, 0), min(hi + 1, n)
+
+
+def build_result_figure_dict(result, labels, max_points=None, x_range=None, webgl=False, height=760):
+    """
+    分析結果の3段グラフ（実測値 vs 予測値・時点効果・累積効果）をPlotlyの図の定義（dict）として作成する関数
+
+    Parameters:
+    -----------
+    result : AnalysisResult
+        分析結果オブジェクト
+    labels : dict
+        グラフのラベル（config.graph_config.get_graph_labels）
+    max_points : int or None
+        1系列あたりの点数の上限（超える場合はLTTBで間引く。Noneの場合は全件）
+    x_range : tuple or None
+        表示期間 (開始日, 終了日)（指定した場合はその期間の点だけを使い、横軸をその期間に合わせる）
+    webgl : bool
+        WebGL（scattergl）で描画する場合True、SVG（scatter）で描画する場合False
+    height : int
+        グラフの高さ（ピクセル）
+
+    Returns:
+    --------
+    dict : {'data', 'layout'}（plotly.js の Plotly.newPlot・st.plotly_chart にそのまま渡せる形式）
+    """
+    trace_type = 'scattergl' if webgl else 'scatter'
+    lo, hi = get_window_bounds(result.dates, x_range)
+    dates = np.asarray(result.dates, dtype='datetime64[ms]')
+    x = dates.astype(np.int64).astype(np.float64)[lo:hi]
+    post_mask = result.post_mask
+    post_positions = np.flatnonzero(post_mask)
+
+    # 累積効果は全期間で計算してから表示期間を切り出す
+    cum_effects = _post_cumsum(result.point_effects, post_mask)[lo:hi]
+    cum_lower = _post_cumsum(result.point_effects_lower, post_mask)[lo:hi]
+    cum_upper = _post_cumsum(result.point_effects_upper, post_mask)[lo:hi]
+
+    keep = None
+    if len(post_positions) and lo < post_positions[0] < hi:
+        # 介入開始日の前後の点は間引かない
+        keep = [post_positions[0] - 1 - lo, post_positions[0] - lo]
+
+    def window(values):
+        return np.asarray(values)[lo:hi]
+
+    actual = window(result.actual)
+    point_effects = window(result.point_effects)
+    data = []
+    data += _panel_traces(x, select_indices(x, actual, max_points, keep),
+                          window(result.preds), window(result.preds_lower), window(result.preds_upper),
+                          labels['predicted'], 'y', labels, trace_type, actual=actual)
+    data += _panel_traces(x, select_indices(x, point_effects, max_points, keep),
+                          point_effects, window(result.point_effects_lower), window(result.point_effects_upper),
+                          labels['point_effects'], 'y2', labels, trace_type)
+    data += _panel_traces(x, select_indices(x, cum_effects, max_points, keep),
+                          cum_effects, cum_lower, cum_upper, labels['cumulative_effects'], 'y3', labels, trace_type)
+
+    domains = {'yaxis': [0.70, 1.0], 'yaxis2': [0.36, 0.64], 'yaxis3': [0.0, 0.30]}
+    titles = {'yaxis': labels['actual_vs_predicted'], 'yaxis2': labels['point_effects'],
+              'yaxis3': labels['cumulative_effects']}
+    layout = {
+        'height': height,
+        'margin': {'l': 60, 'r': 20, 't': 40, 'b': 40},
+        'hovermode': 'x unified',
+        'plot_bgcolor': 'white',
+        'legend': {'orientation': 'h', 'x': 0, 'y': 1.06},
+        'xaxis': {'type': 'date', 'anchor': 'y3', 'showgrid': True, 'gridcolor': '#eee'},
+        'annotations': [],
+        'shapes': []
+    }
+    if x_range is not None:
+        layout['xaxis']['range'] = [str(np.datetime64(value, 'D')) for value in x_range]
+    for axis, domain in domains.items():
+        layout[axis] = {'domain': domain, 'showgrid': True, 'gridcolor': '#eee', 'zeroline': axis != 'yaxis',
+                        'zerolinecolor': '#999'}
+        layout['annotations'].append({'text': titles[axis], 'xref': 'paper', 'yref': 'paper', 'x': 0,
+                                      'y': domain[1], 'xanchor': 'left', 'yanchor': 'bottom',
+                                      'showarrow': False, 'font': {'size': 13}})
+    if len(post_positions):
+        intervention = str(dates[post_positions[0]].astype('datetime64[D]'))
+        layout['shapes'].append({'type': 'line', 'xref': 'x', 'yref': 'paper', 'x0': intervention,
+                                 'x1': intervention, 'y0': 0, 'y1': 1,
+                                 'line': {'color': 'gray', 'dash': 'dot', 'width': 1}})
+    return {'data': data, 'layout': layout}
+
+
+def build_interactive_result_chart(result, x_range=None, max_points=None):
+    """
+    STEP3の画面表示用のインタラクティブなグラフ（WebGL）を作成する関数
+
+    全期間の表示では LTTB で間引いた点を送り、表示期間を指定した場合は
+    その期間の点だけを送る（期間内の点数が上限以下の場合は全件）。
+
+    Parameters:
+    -----------
+    result : AnalysisResult
+        分析結果オブジェクト
+    x_range : tuple or None
+        表示期間 (開始日, 終了日)（Noneの場合は全期間）
+    max_points : int or None
+        1系列あたりの点数の上限（Noneの場合は RESULT_CHART_SETTINGS['max_points']）
+
+    Returns:
+    --------
+    dict : {'data', 'layout'}（st.plotly_chart にそのまま渡せる形式）
+    """
+    from config.graph_config import get_graph_labels
+
+    if max_points is None:
+        max_points = RESULT_CHART_SETTINGS['max_points']
+    # ブラウザのフォントで表示するため、アプリ画面と同じく常に日本語のラベルを使用
+    labels = get_graph_labels(True)
+    return build_result_figure_dict(result, labels, max_points=max_points, x_range=x_range,
+                                    webgl=RESULT_CHART_SETTINGS['webgl'], height=RESULT_CHART_SETTINGS['height'])
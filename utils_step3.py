@@ -1,13 +1,17 @@
 import matplotlib.pyplot as plt
 import pandas as pd
-import re
 import io
-import base64
-from causalimpact import CausalImpact
 import matplotlib
 matplotlib.use('Agg')  # バックエンドを明示的に指定（サーバー環境対応）
+from utils_pdf import build_figure_flowable, apply_subset_font
+from utils_download import to_data_uri, CSV_MIME, PDF_MIME
+from utils_csv import iter_csv_chunks, build_csv_file
+from utils_figure import RenderedFigure, get_figure_manager
+from utils_result import get_analysis_result, get_report_values, get_report_sd, build_model_summary_rows, build_inference_summary_rows, get_effect_summary
 
 def run_causal_impact_analysis(data, pre_period, post_period):
+    # causalimpact（statsmodels依存）は読み込みが重いため分析実行時に読み込む
+    from causalimpact import CausalImpact
     ci = CausalImpact(data, pre_period, post_period)
     summary = ci.summary()
     report = ci.summary(output='report')
@@ -65,100 +69,77 @@ def run_causal_impact_analysis(data, pre_period, post_period):
     # レイアウトを調整（単群推定と同様）
     plt.tight_layout()
     
+    # pyplot のグラフ一覧から切り離す（分析のたびにグラフが溜まらないように）
+    fig = get_figure_manager().adopt(fig)
+    
     return ci, summary, report, fig
 
-def build_summary_dataframe(summary, alpha_percent):
+def build_summary_dataframe(ci, alpha_percent, result=None):
     """
     CausalImpactの分析結果サマリーをデータフレームにまとめる関数
-    相対効果と相対効果の信頼区間、p値については、平均値の欄にのみ表示し、累積値には「同左」と表示する
-    """
-    lines = [l for l in summary.split('\n') if l.strip()]
-    data_lines = []
-    
-    # p値を抽出（Posterior tail-area probability p:行から）
-    p_value = None
-    for line in lines:
-        if 'Posterior tail-area probability p:' in line:
-            p_match = re.search(r'p:\s+([0-9.]+)', line)
-            if p_match:
-                p_value = float(p_match.group(1))
-                break
-    
-    # サマリーデータを抽出・整形
-    for line in lines[1:]:
-        parts = re.split(r'\s{2,}', line.strip())
-        if len(parts) == 3:
-            item_name = parts[0]
-            avg_value = parts[1]
-            cum_value = parts[2]
-            
-            # 相対効果に関連する行を識別するための条件を強化
-            is_relative_effect = (
-                '相対効果' in item_name or 
-                'relative effect' in item_name.lower() or 
-                'relative' in item_name.lower() and 'effect' in item_name.lower() or
-                '%' in avg_value and '%' in cum_value  # 百分率表記（%）を含む行も相対効果として処理
-            )
-            
-            # 相対効果関連の行と認識された場合
-            if is_relative_effect:
-                # 平均値をそのまま表示し、累積値を「同左」に置き換え
-                data_lines.append([avg_value, '同左'])
-                print(f"相対効果行として処理: {item_name} → 平均値: {avg_value}, 累積値: 同左")
-            else:
-                data_lines.append([avg_value, cum_value])
+    相対効果と相対効果の信頼区間、p値については、平均値の欄と同じ値を累積値の欄にも表示する
     
-    df_summary = pd.DataFrame(data_lines, columns=['分析期間の平均値','分析期間の累積値'])
+    ci.summary() のテキストを解析せず、推定結果の値から ci.summary() と同じ指標
+    （標準偏差はモデルの信頼水準で計算された信頼区間の幅から算出）を作成する。
     
-    # インデックス名の設定（既存と同じ）
-    japanese_index = [
-        '実測値',
-        '予測値 (標準偏差)',
-        f'予測値 {alpha_percent}% 信頼区間',
-        '絶対効果 (標準偏差)',
-        f'絶対効果 {alpha_percent}% 信頼区間',
-        '相対効果 (標準偏差)',
-        f'相対効果 {alpha_percent}% 信頼区間'
-    ]
-    
-    # インデックス名を設定（データフレームの行数に合わせて切り詰める）
-    if len(df_summary) <= len(japanese_index):
-        df_summary.index = japanese_index[:len(df_summary)]
-    else:
-        # データフレームの行数が多い場合は警告を出力
-        print(f"警告: データフレームの行数({len(df_summary)})がインデックス名の数({len(japanese_index)})より多いです")
-        # 不足分は元のインデックスを使用
-        df_summary.index = japanese_index + [f"行{i+1}" for i in range(len(japanese_index), len(df_summary))]
-    
-    # 行ごとのインデックス名とデータを確認
-    for idx, row in df_summary.iterrows():
-        print(f"行: {idx}, 平均値: {row['分析期間の平均値']}, 累積値: {row['分析期間の累積値']}")
-    
-    # 相対効果と相対効果の信頼区間行を確実に適切な値に設定
-    for idx in df_summary.index:
-        if '相対効果' in idx:
-            # 視認性向上のため、平均値欄の内容を累積値欄にもコピー
-            avg_value = df_summary.at[idx, '分析期間の平均値']
-            df_summary.at[idx, '分析期間の累積値'] = avg_value
-            print(f"相対効果関連の行を修正: {idx} → 累積値: {avg_value}")
-    
-    # p値がある場合は新しい行として追加
-    if p_value is not None:
-        # 小数点以下4桁までの文字列にフォーマット
-        p_value_str = f"{p_value:.4f}"
-        # 視認性向上のため、両欄に同じ値を表示
-        df_summary.loc['p値 (事後確率)'] = [p_value_str, p_value_str]
-        print(f"p値を追加: 平均値: {p_value_str}, 累積値: {p_value_str}")
-    
-    # データフレームを戻す前に最終的な形を確認
-    print("最終的なデータフレーム:")
-    print(df_summary)
-    
-    return df_summary
+    Parameters:
+    -----------
+    ci : CausalImpact
+        分析結果オブジェクト
+    alpha_percent : int
+        信頼水準（%）
+    result : AnalysisResult, optional
+        分析結果オブジェクト（省略時は ci から作成）
+        
+    Returns:
+    --------
+    pandas.DataFrame
+        分析結果サマリー（列：分析期間の平均値・分析期間の累積値）
+    """
+    if result is None:
+        result = get_analysis_result(ci)
+    values = get_report_values(result)
+    # 標準偏差は信頼区間を計算したモデルの信頼水準から求める（表示用の信頼水準 alpha_percent は使わない）
+    model_level = result.model_confidence_level
+    
+    def fmt(value):
+        # ci.summary() と同じ小数点以下2桁の丸め
+        return str(round(float(value), 2))
+    
+    def fmt_pct(value):
+        return f"{fmt(value * 100)}%"
+    
+    rows = {}
+    if values:
+        for column, position in (('分析期間の平均値', 0), ('分析期間の累積値', 1)):
+            pred_sd = get_report_sd(values['predicted_lower'][position], values['predicted_upper'][position], model_level)
+            abs_sd = get_report_sd(values['abs_effect_lower'][position], values['abs_effect_upper'][position], model_level)
+            abs_bounds = sorted([values['abs_effect_lower'][position], values['abs_effect_upper'][position]])
+            rows.setdefault('実測値', []).append(fmt(values['actual'][position]))
+            rows.setdefault('予測値 (標準偏差)', []).append(f"{fmt(values['predicted'][position])} ({fmt(pred_sd)})")
+            rows.setdefault(f'予測値 {alpha_percent}% 信頼区間', []).append(
+                f"[{fmt(values['predicted_lower'][position])}, {fmt(values['predicted_upper'][position])}]")
+            rows.setdefault('絶対効果 (標準偏差)', []).append(f"{fmt(values['abs_effect'][position])} ({fmt(abs_sd)})")
+            rows.setdefault(f'絶対効果 {alpha_percent}% 信頼区間', []).append(f"[{fmt(abs_bounds[0])}, {fmt(abs_bounds[1])}]")
+        
+        # 相対効果は視認性向上のため平均値欄の内容を累積値欄にも表示
+        rel_sd = get_report_sd(values['rel_effect_lower'][0], values['rel_effect_upper'][0], model_level)
+        rel_bounds = sorted([values['rel_effect_lower'][0], values['rel_effect_upper'][0]])
+        rel_str = f"{fmt_pct(values['rel_effect'][0])} ({fmt_pct(rel_sd)})"
+        rel_ci_str = f"[{fmt_pct(rel_bounds[0])}, {fmt_pct(rel_bounds[1])}]"
+        rows['相対効果 (標準偏差)'] = [rel_str, rel_str]
+        rows[f'相対効果 {alpha_percent}% 信頼区間'] = [rel_ci_str, rel_ci_str]
+    
+    # p値がある場合は新しい行として追加（両欄に同じ値を表示）
+    if result.p_value is not None:
+        p_value_str = f"{result.p_value:.4f}"
+        rows['p値 (事後確率)'] = [p_value_str, p_value_str]
+    
+    return pd.DataFrame.from_dict(rows, orient='index', columns=['分析期間の平均値', '分析期間の累積値'])
 
-def get_summary_csv_download_link(df_summary, treatment_name, period_start, period_end, alpha_percent):
+def build_summary_csv(df_summary, treatment_name, period_start, period_end, alpha_percent):
     """
-    分析結果サマリーをCSVとしてダウンロードするためのリンクを生成する関数
+    分析結果サマリーのCSVファイルの内容（bytes）を作成する関数
     
     Parameters:
     -----------
@@ -175,8 +156,8 @@ def get_summary_csv_download_link(df_summary, treatment_name, period_start, peri
         
     Returns:
     --------
-    str
-        ダウンロードリンクのHTML
+    data, filename : bytes, str
+        ファイルの内容とファイル名
     """
     # CSVに追加するヘッダー情報（メタデータ）を作成
     header_info = pd.DataFrame([
@@ -202,26 +183,31 @@ def get_summary_csv_download_link(df_summary, treatment_name, period_start, peri
     # サマリーを書き込み（ヘッダーは既に書き込み済みなので書き込まない）
     df_summary_reset.to_csv(csv_buffer, index=False, encoding='utf-8-sig', mode='a')
     
-    # バッファの内容をbase64エンコード
-    csv_string = csv_buffer.getvalue()
-    csv_base64 = base64.b64encode(csv_string.encode('utf-8-sig')).decode()
+    # UTF-8 with BOMのbytesに変換
+    csv_bytes = csv_buffer.getvalue().encode('utf-8-sig')
     
     # ファイル名の設定
     filename = f"causal_impact_summary_{treatment_name}_{period_start.strftime('%Y%m%d')}_{period_end.strftime('%Y%m%d')}.csv"
     
-    # ダウンロードリンクの生成
-    href = f'data:text/csv;charset=utf-8-sig;base64,{csv_base64}'
+    return csv_bytes, filename
+
+def get_summary_csv_download_link(df_summary, treatment_name, period_start, period_end, alpha_percent):
+    """
+    分析結果サマリーのCSVをbase64のdata URIとして返す関数（互換用）
     
-    return href, filename
+    画面では build_summary_csv の内容を st.download_button に直接渡す。
+    """
+    data, filename = build_summary_csv(df_summary, treatment_name, period_start, period_end, alpha_percent)
+    return to_data_uri(data, CSV_MIME), filename
 
-def get_figure_pdf_download_link(fig, treatment_name, period_start, period_end):
+def build_figure_pdf(fig, treatment_name, period_start, period_end):
     """
-    分析結果グラフをPDFとしてダウンロードするためのリンクを生成する関数
+    分析結果グラフのPDFファイルの内容（bytes）を作成する関数
     
     Parameters:
     -----------
-    fig : matplotlib.figure.Figure
-        run_causal_impact_analysis関数で生成した分析結果グラフ
+    fig : matplotlib.figure.Figure or RenderedFigure
+        run_causal_impact_analysis関数で生成した分析結果グラフ（描画済みの場合はそのPDFを使用）
     treatment_name : str
         分析対象の名称
     period_start : datetime.date
@@ -231,33 +217,40 @@ def get_figure_pdf_download_link(fig, treatment_name, period_start, period_end):
         
     Returns:
     --------
-    str
-        ダウンロードリンクのHTML
+    data, filename : bytes, str
+        ファイルの内容とファイル名
     """
-    # PDFのバッファを用意
-    pdf_buffer = io.BytesIO()
-    
-    # タイトルを追加（文字化け防止のため削除）
-    # fig.suptitle(f"分析対象: {treatment_name}\n分析期間: {period_start.strftime('%Y-%m-%d')} ～ {period_end.strftime('%Y-%m-%d')}")
-    
-    # PDFとして保存
-    fig.savefig(pdf_buffer, format='pdf', bbox_inches='tight')
-    pdf_buffer.seek(0)
-    
-    # Base64エンコード
-    pdf_base64 = base64.b64encode(pdf_buffer.read()).decode()
+    if isinstance(fig, RenderedFigure) and fig.pdf is not None:
+        # 描画済みのPDFをそのまま使用
+        pdf_bytes = fig.pdf
+    else:
+        # PDFのバッファを用意
+        pdf_buffer = io.BytesIO()
+        
+        # タイトルを追加（文字化け防止のため削除）
+        # fig.suptitle(f"分析対象: {treatment_name}\n分析期間: {period_start.strftime('%Y-%m-%d')} ～ {period_end.strftime('%Y-%m-%d')}")
+        
+        # PDFとして保存
+        fig.savefig(pdf_buffer, format='pdf', bbox_inches='tight')
+        pdf_bytes = pdf_buffer.getvalue()
     
     # ファイル名の設定
     filename = f"causal_impact_graph_{treatment_name}_{period_start.strftime('%Y%m%d')}_{period_end.strftime('%Y%m%d')}.pdf"
     
-    # ダウンロードリンクの生成
-    href = f'data:application/pdf;base64,{pdf_base64}'
+    return pdf_bytes, filename
+
+def get_figure_pdf_download_link(fig, treatment_name, period_start, period_end):
+    """
+    分析結果グラフのPDFをbase64のdata URIとして返す関数（互換用）
     
-    return href, filename
+    画面では build_figure_pdf の内容を st.download_button に直接渡す。
+    """
+    data, filename = build_figure_pdf(fig, treatment_name, period_start, period_end)
+    return to_data_uri(data, PDF_MIME), filename
 
-def get_detail_csv_download_link(ci, period, treatment_name):
+def build_detail_csv(ci, period, treatment_name, compression=None):
     """
-    CausalImpactの詳細データ（予測値・実測値・効果・累積値など）をCSVとしてダウンロードするためのリンクを生成する関数
+    CausalImpactの詳細データ（予測値・実測値・効果・累積値など）のCSVファイルを作成する関数
     
     Parameters:
     -----------
@@ -266,11 +259,13 @@ def get_detail_csv_download_link(ci, period, treatment_name):
         'pre_start', 'pre_end', 'post_start', 'post_end' を含む分析期間情報
     treatment_name : str
         分析対象の名称
+    compression : str or None
+        圧縮形式（None, 'gzip', 'zip'）
     
     Returns:
     --------
-    href, filename : str, str
-        ダウンロードリンクのHTML, ファイル名
+    data, filename : CsvFile, str
+        作成したファイルとファイル名
     """
     import numpy as np
     df = ci.inferences.copy()
@@ -387,23 +382,25 @@ def get_detail_csv_download_link(ci, period, treatment_name):
         # 日付変換に失敗した場合は文字列として出力
         output_df['日付'] = output_df['日付'].astype(str)
 
-    # 1行目: 日本語名, 2行目: 英字名, 3行目以降: データ
-    import io, base64
-    csv_buffer = io.StringIO()
-    # ヘッダー2行
-    csv_buffer.write(','.join(jp_names) + '\n')
-    csv_buffer.write(','.join(en_names) + '\n')
-    # データ
-    output_df.to_csv(csv_buffer, index=False, header=False, encoding='utf-8-sig')
-    # 注釈を末尾に追加
-    csv_buffer.write('\n※I～O列の累積値は、介入期間のみ出力しています（介入期間外はゼロまたは空欄）。\n')
-    csv_string = csv_buffer.getvalue()
-    csv_base64 = base64.b64encode(csv_string.encode('utf-8-sig')).decode()
+    # 1行目: 日本語名, 2行目: 英字名, 3行目以降: データ（一定行数ごとに出力）, 末尾: 注釈
+    chunks = iter_csv_chunks(
+        output_df,
+        header_rows=[jp_names, en_names],
+        footer_lines=['', '※I～O列の累積値は、介入期間のみ出力しています（介入期間外はゼロまたは空欄）。']
+    )
     filename = f"causal_impact_detail_{treatment_name}_{post_start.strftime('%Y%m%d')}_{post_end.strftime('%Y%m%d')}.csv"
-    href = f'data:text/csv;charset=utf-8-sig;base64,{csv_base64}'
-    return href, filename
+    return build_csv_file(chunks, filename, compression)
+
+def get_detail_csv_download_link(ci, period, treatment_name):
+    """
+    詳細データのCSVをbase64のdata URIとして返す関数（互換用）
+    
+    画面では build_detail_csv の内容を st.download_button に直接渡す。
+    """
+    data, filename = build_detail_csv(ci, period, treatment_name)
+    return to_data_uri(data.getvalue(), CSV_MIME), filename
 
-def build_app_summary_table(ci, confidence_level=95):
+def build_app_summary_table(ci, confidence_level=95, result=None):
     """
     アプリ画面表示用の日本語固定サマリーテーブル生成関数
     PDF出力とは独立してアプリ画面では常に日本語表記
@@ -414,6 +411,8 @@ def build_app_summary_table(ci, confidence_level=95):
         分析結果オブジェクト
     confidence_level : int
         信頼水準（%）、デフォルト95%
+    result : AnalysisResult, optional
+        分析結果オブジェクト（省略時は ci から作成）
         
     Returns:
     --------
@@ -423,7 +422,6 @@ def build_app_summary_table(ci, confidence_level=95):
     try:
         import pandas as pd
         import numpy as np
-        import re
         
         # アプリ画面用日本語固定コンテンツ
         try:
@@ -443,184 +441,12 @@ def build_app_summary_table(ci, confidence_level=95):
                 'table_total_analysis_period': '分析期間の累積値'
             }
         
-        # CausalImpactのsummary_dataから直接取得（より確実）
-        if hasattr(ci, 'summary_data') and ci.summary_data is not None:
-            summary_data = ci.summary_data
-            results_data = []
-            
-            # p値の取得
-            p_value = None
-            if hasattr(ci, 'p_value'):
-                p_value = ci.p_value
-            else:
-                # summary()テキストからp値を抽出
-                try:
-                    summary_text = str(ci.summary())
-                    p_match = re.search(r'Posterior tail-area probability p:\s+([0-9.]+)', summary_text)
-                    if p_match:
-                        p_value = float(p_match.group(1))
-                except:
-                    pass
-            
-            # 項目を順番に処理（日本語固定）
-            
-            # 1. 実測値
-            for index_name in summary_data.index:
-                if 'actual' in str(index_name).lower():
-                    avg_val = summary_data.loc[index_name, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[index_name].iloc[0]
-                    cum_val = summary_data.loc[index_name, 'Cumulative'] if 'Cumulative' in summary_data.columns else summary_data.loc[index_name].iloc[1]
-                    results_data.append([content['table_actual'], f"{avg_val:.1f}", f"{cum_val:.1f}"])
-                    break
-            
-            # 2. 予測値
-            for index_name in summary_data.index:
-                if ('predicted' in str(index_name).lower() or 'prediction' in str(index_name).lower()) and 'lower' not in str(index_name).lower() and 'upper' not in str(index_name).lower():
-                    avg_val = summary_data.loc[index_name, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[index_name].iloc[0]
-                    cum_val = summary_data.loc[index_name, 'Cumulative'] if 'Cumulative' in summary_data.columns else summary_data.loc[index_name].iloc[1]
-                    results_data.append([content['table_predicted'], f"{avg_val:.1f}", f"{cum_val:.1f}"])
-                    break
-            
-            # 3. 予測値信頼区間（予測値のすぐ下に配置）
-            pred_lower = None
-            pred_upper = None
-            for index_name in summary_data.index:
-                if 'predicted' in str(index_name).lower() and 'lower' in str(index_name).lower():
-                    pred_lower = index_name
-                elif 'predicted' in str(index_name).lower() and 'upper' in str(index_name).lower():
-                    pred_upper = index_name
-            
-            if pred_lower and pred_upper:
-                lower_avg = summary_data.loc[pred_lower, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[pred_lower].iloc[0]
-                upper_avg = summary_data.loc[pred_upper, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[pred_upper].iloc[0]
-                lower_cum = summary_data.loc[pred_lower, 'Cumulative'] if 'Cumulative' in summary_data.columns else summary_data.loc[pred_lower].iloc[1]
-                upper_cum = summary_data.loc[pred_upper, 'Cumulative'] if 'Cumulative' in summary_data.columns else summary_data.loc[pred_upper].iloc[1]
-                ci_label = content['table_predicted_ci'].format(confidence_level)
-                results_data.append([ci_label, f"[{lower_avg:.1f}, {upper_avg:.1f}]", f"[{lower_cum:.1f}, {upper_cum:.1f}]"])
-            
-            # 4. 絶対効果
-            for index_name in summary_data.index:
-                if ('abseffect' in str(index_name).lower() or 'abs_effect' in str(index_name).lower() or 'absolute' in str(index_name).lower()) and 'lower' not in str(index_name).lower() and 'upper' not in str(index_name).lower():
-                    avg_val = summary_data.loc[index_name, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[index_name].iloc[0]
-                    cum_val = summary_data.loc[index_name, 'Cumulative'] if 'Cumulative' in summary_data.columns else summary_data.loc[index_name].iloc[1]
-                    results_data.append([content['table_absolute_effect'], f"{avg_val:.1f}", f"{cum_val:.1f}"])
-                    break
-            
-            # 5. 相対効果
-            for index_name in summary_data.index:
-                if ('releffect' in str(index_name).lower() or 'rel_effect' in str(index_name).lower() or 'relative' in str(index_name).lower()) and 'lower' not in str(index_name).lower() and 'upper' not in str(index_name).lower():
-                    avg_val = summary_data.loc[index_name, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[index_name].iloc[0]
-                    # %変換
-                    rel_pct = avg_val * 100 if abs(avg_val) < 10 else avg_val
-                    results_data.append([content['table_relative_effect'], f"{rel_pct:.1f}%", f"{rel_pct:.1f}%"])
-                    break
-            
-            # 6. p値
-            if p_value is not None:
-                results_data.append([content['table_p_value'], f"{p_value:.4f}", f"{p_value:.4f}"])
-            
-            # DataFrameを作成（日本語固定）
-            columns = [
-                content['table_indicator'],
-                content['table_avg_analysis_period'], 
-                content['table_total_analysis_period']
-            ]
-            df_result = pd.DataFrame(results_data, columns=columns)
-            
-            return df_result
-        
-        else:
-            # フォールバック：テキスト解析（日本語固定）
-            return build_app_text_based_summary_table(ci, confidence_level)
-        
-    except Exception as e:
-        print(f"Error in build_app_summary_table: {e}")
-        # エラーの場合は日本語固定フォールバックを使用
-        return build_app_guaranteed_japanese_table(ci, confidence_level)
-
-def build_app_text_based_summary_table(ci, confidence_level=95):
-    """
-    アプリ画面用：CausalImpactのテキスト出力を解析して日本語固定テーブルを生成
-    """
-    try:
-        import pandas as pd
-        import re
-        
-        # アプリ画面用日本語固定コンテンツ
-        try:
-            from config.app_templates import get_app_content
-            content = get_app_content()
-        except:
-            content = {
-                'table_actual': '実測値',
-                'table_predicted': '予測値',
-                'table_predicted_ci': f'予測値 {confidence_level}% 信頼区間',
-                'table_absolute_effect': '絶対効果',
-                'table_relative_effect': '相対効果',
-                'table_p_value': 'p値',
-                'table_indicator': '指標',
-                'table_avg_analysis_period': '分析期間の平均値',
-                'table_total_analysis_period': '分析期間の累積値'
-            }
-        
-        # CausalImpactのsummary()を取得
-        summary_text = str(ci.summary())
-        lines = [l for l in summary_text.split('\n') if l.strip()]
-        
-        results_data = []
-        
-        # p値を抽出
-        p_value = None
-        for line in lines:
-            if 'Posterior tail-area probability p:' in line:
-                p_match = re.search(r'p:\s+([0-9.]+)', line)
-                if p_match:
-                    p_value = float(p_match.group(1))
-                    break
-        
-        # テキスト解析で日本語固定変換
-        for line in lines[1:]:  # ヘッダー行をスキップ
-            if not line.strip():
-                continue
-                
-            parts = re.split(r'\s{2,}', line.strip())
-            if len(parts) >= 2:
-                item_name = parts[0]
-                avg_value = parts[1] if len(parts) > 1 else ""
-                cum_value = parts[2] if len(parts) > 2 else avg_value
-                
-                # 日本語固定変換辞書
-                translation_dict = {
-                    'Actual': content['table_actual'],
-                    'Predicted': content['table_predicted'],
-                    'AbsEffect': content['table_absolute_effect'],
-                    'RelEffect': content['table_relative_effect']
-                }
-                
-                translated_name = translation_dict.get(item_name, item_name)
-                
-                # 相対効果の%変換
-                if 'rel' in translated_name.lower() or '相対効果' in translated_name or 'relative' in translated_name.lower():
-                    if '[' in avg_value and ']' in avg_value and '%' not in avg_value:
-                        # 信頼区間の%変換
-                        matches = re.findall(r'[-+]?[0-9]*\.?[0-9]+', avg_value)
-                        if len(matches) >= 2:
-                            lower = float(matches[0]) * 100
-                            upper = float(matches[1]) * 100
-                            avg_value = f"[{lower:.1f}%, {upper:.1f}%]"
-                            cum_value = avg_value
-                    elif '%' not in avg_value:
-                        try:
-                            rel_val = float(avg_value) * 100
-                            avg_value = f"{rel_val:.1f}%"
-                            cum_value = avg_value
-                        except:
-                            pass
-                
-                results_data.append([translated_name, avg_value, cum_value])
-        
-        # p値を追加
-        if p_value is not None:
-            results_data.append([content['table_p_value'], f"{p_value:.4f}", f"{p_value:.4f}"])
+        # 分析結果オブジェクト（ci.summary_data の値、ない場合は日次の推定結果）から作成
+        if result is None:
+            result = get_analysis_result(ci)
+        results_data = build_model_summary_rows(result, content, confidence_level)
+        if not results_data:
+            return build_app_guaranteed_japanese_table(ci, confidence_level)
         
         # DataFrameを作成（日本語固定）
         columns = [
@@ -633,7 +459,8 @@ def build_app_text_based_summary_table(ci, confidence_level=95):
         return df_result
         
     except Exception as e:
-        print(f"Error in build_app_text_based_summary_table: {e}")
+        print(f"Error in build_app_summary_table: {e}")
+        # エラーの場合は日本語固定フォールバックを使用
         return build_app_guaranteed_japanese_table(ci, confidence_level)
 
 def build_app_guaranteed_japanese_table(ci, confidence_level=95):
@@ -661,7 +488,7 @@ def build_app_guaranteed_japanese_table(ci, confidence_level=95):
         print(f"Error in build_app_guaranteed_japanese_table: {e}")
         return None
 
-def build_unified_summary_table(ci, confidence_level=95):
+def build_unified_summary_table(ci, confidence_level=95, result=None):
     """
     CausalImpactのsummary()出力を直接使用して統一した分析結果テーブルを生成する関数（多言語対応）
     詳細レポート、分析結果概要、CSV出力で同じ数値を使用して一貫性を保つ
@@ -673,6 +500,8 @@ def build_unified_summary_table(ci, confidence_level=95):
         分析結果オブジェクト
     confidence_level : int
         信頼水準（%）、デフォルト95%
+    result : AnalysisResult, optional
+        分析結果オブジェクト（省略時は ci から作成）
         
     Returns:
     --------
@@ -682,130 +511,6 @@ def build_unified_summary_table(ci, confidence_level=95):
     try:
         import pandas as pd
         import numpy as np
-        import re
-        
-        # 多言語対応コンテンツの取得
-        try:
-            from config.pdf_templates import get_pdf_content
-            from config.font_config import is_japanese_font_available
-            use_japanese = is_japanese_font_available()
-            content = get_pdf_content(use_japanese)
-        except:
-            # フォールバック（日本語）
-            content = {
-                'table_actual': '実測値',
-                'table_predicted': '予測値',
-                'table_predicted_ci': f'予測値 {confidence_level}% 信頼区間',
-                'table_absolute_effect': '絶対効果',
-                'table_relative_effect': '相対効果',
-                'table_p_value': 'p値',
-                'table_indicator': '指標',
-                'table_avg_analysis_period': '分析期間の平均値',
-                'table_total_analysis_period': '分析期間の累積値'
-            }
-            use_japanese = True
-        
-        # CausalImpactのsummary_dataから直接取得（より確実）
-        if hasattr(ci, 'summary_data') and ci.summary_data is not None:
-            summary_data = ci.summary_data
-            results_data = []
-            
-            # p値の取得
-            p_value = None
-            if hasattr(ci, 'p_value'):
-                p_value = ci.p_value
-            else:
-                # summary()テキストからp値を抽出
-                try:
-                    summary_text = str(ci.summary())
-                    p_match = re.search(r'Posterior tail-area probability p:\s+([0-9.]+)', summary_text)
-                    if p_match:
-                        p_value = float(p_match.group(1))
-                except:
-                    pass
-            
-            # 項目を順番に処理（多言語対応）
-            
-            # 1. 実測値
-            for index_name in summary_data.index:
-                if 'actual' in str(index_name).lower():
-                    avg_val = summary_data.loc[index_name, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[index_name].iloc[0]
-                    cum_val = summary_data.loc[index_name, 'Cumulative'] if 'Cumulative' in summary_data.columns else summary_data.loc[index_name].iloc[1]
-                    results_data.append([content['table_actual'], f"{avg_val:.1f}", f"{cum_val:.1f}"])
-                    break
-            
-            # 2. 予測値
-            for index_name in summary_data.index:
-                if ('predicted' in str(index_name).lower() or 'prediction' in str(index_name).lower()) and 'lower' not in str(index_name).lower() and 'upper' not in str(index_name).lower():
-                    avg_val = summary_data.loc[index_name, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[index_name].iloc[0]
-                    cum_val = summary_data.loc[index_name, 'Cumulative'] if 'Cumulative' in summary_data.columns else summary_data.loc[index_name].iloc[1]
-                    results_data.append([content['table_predicted'], f"{avg_val:.1f}", f"{cum_val:.1f}"])
-                    break
-            
-            # 3. 予測値信頼区間（予測値のすぐ下に配置）
-            pred_lower = None
-            pred_upper = None
-            for index_name in summary_data.index:
-                if 'predicted' in str(index_name).lower() and 'lower' in str(index_name).lower():
-                    pred_lower = index_name
-                elif 'predicted' in str(index_name).lower() and 'upper' in str(index_name).lower():
-                    pred_upper = index_name
-            
-            if pred_lower and pred_upper:
-                lower_avg = summary_data.loc[pred_lower, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[pred_lower].iloc[0]
-                upper_avg = summary_data.loc[pred_upper, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[pred_upper].iloc[0]
-                lower_cum = summary_data.loc[pred_lower, 'Cumulative'] if 'Cumulative' in summary_data.columns else summary_data.loc[pred_lower].iloc[1]
-                upper_cum = summary_data.loc[pred_upper, 'Cumulative'] if 'Cumulative' in summary_data.columns else summary_data.loc[pred_upper].iloc[1]
-                ci_label = content['table_predicted_ci'].format(confidence_level)
-                results_data.append([ci_label, f"[{lower_avg:.1f}, {upper_avg:.1f}]", f"[{lower_cum:.1f}, {upper_cum:.1f}]"])
-            
-            # 4. 絶対効果
-            for index_name in summary_data.index:
-                if ('abseffect' in str(index_name).lower() or 'abs_effect' in str(index_name).lower() or 'absolute' in str(index_name).lower()) and 'lower' not in str(index_name).lower() and 'upper' not in str(index_name).lower():
-                    avg_val = summary_data.loc[index_name, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[index_name].iloc[0]
-                    cum_val = summary_data.loc[index_name, 'Cumulative'] if 'Cumulative' in summary_data.columns else summary_data.loc[index_name].iloc[1]
-                    results_data.append([content['table_absolute_effect'], f"{avg_val:.1f}", f"{cum_val:.1f}"])
-                    break
-            
-            # 5. 相対効果
-            for index_name in summary_data.index:
-                if ('releffect' in str(index_name).lower() or 'rel_effect' in str(index_name).lower() or 'relative' in str(index_name).lower()) and 'lower' not in str(index_name).lower() and 'upper' not in str(index_name).lower():
-                    avg_val = summary_data.loc[index_name, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[index_name].iloc[0]
-                    # %変換
-                    rel_pct = avg_val * 100 if abs(avg_val) < 10 else avg_val
-                    results_data.append([content['table_relative_effect'], f"{rel_pct:.1f}%", f"{rel_pct:.1f}%"])
-                    break
-            
-            # 6. p値
-            if p_value is not None:
-                results_data.append([content['table_p_value'], f"{p_value:.4f}", f"{p_value:.4f}"])
-            
-            # DataFrameを作成（多言語対応）
-            columns = [
-                content['table_indicator'],
-                content['table_avg_analysis_period'], 
-                content['table_total_analysis_period']
-            ]
-            df_result = pd.DataFrame(results_data, columns=columns)
-            
-            return df_result
-        
-        else:
-            # フォールバック：テキスト解析
-            return build_two_group_text_based_summary_table(ci, confidence_level)
-        
-    except Exception as e:
-        print(f"Error in build_unified_summary_table: {e}")
-        # エラーの場合は二群比較用フォールバックを使用
-        return build_enhanced_summary_table_fallback(ci, confidence_level)
-
-def build_two_group_text_based_summary_table(ci, confidence_level=95):
-    """
-    二群比較のCausalImpactのテキスト出力を解析してテーブルを生成（多言語対応）
-    """
-    try:
-        import pandas as pd
-        import re
         
         # 多言語対応コンテンツの取得
         try:
@@ -828,74 +533,12 @@ def build_two_group_text_based_summary_table(ci, confidence_level=95):
             }
             use_japanese = True
         
-        # CausalImpactのsummary()を取得
-        summary_text = str(ci.summary())
-        lines = [l for l in summary_text.split('\n') if l.strip()]
-        
-        results_data = []
-        
-        # p値を抽出
-        p_value = None
-        for line in lines:
-            if 'Posterior tail-area probability p:' in line:
-                p_match = re.search(r'p:\s+([0-9.]+)', line)
-                if p_match:
-                    p_value = float(p_match.group(1))
-                    break
-        
-        # テキスト解析で多言語対応変換
-        for line in lines[1:]:  # ヘッダー行をスキップ
-            if not line.strip():
-                continue
-                
-            parts = re.split(r'\s{2,}', line.strip())
-            if len(parts) >= 2:
-                item_name = parts[0]
-                avg_value = parts[1] if len(parts) > 1 else ""
-                cum_value = parts[2] if len(parts) > 2 else avg_value
-                
-                # 多言語対応変換辞書
-                translation_dict = {
-                    'Actual': content['table_actual'],
-                    'Predicted': content['table_predicted'],
-                    'AbsEffect': content['table_absolute_effect'],
-                    'RelEffect': content['table_relative_effect']
-                }
-                
-                translated_name = translation_dict.get(item_name, item_name)
-                
-                # CI行の判定と変換
-                if '95% CI' in line or 'CI' in item_name:
-                    if 'Predicted' in line or 'predicted' in item_name.lower():
-                        translated_name = content['table_predicted_ci'].format(confidence_level)
-                    elif 'AbsEffect' in line or 'abs' in item_name.lower():
-                        translated_name = f"{content['table_absolute_effect']} {confidence_level}% {'信頼区間' if use_japanese else 'CI'}"
-                    elif 'RelEffect' in line or 'rel' in item_name.lower():
-                        translated_name = f"{content['table_relative_effect']} {confidence_level}% {'信頼区間' if use_japanese else 'CI'}"
-                
-                # 相対効果の%変換
-                if 'rel' in translated_name.lower() or '相対効果' in translated_name or 'relative' in translated_name.lower():
-                    if '[' in avg_value and ']' in avg_value and '%' not in avg_value:
-                        # 信頼区間の%変換
-                        matches = re.findall(r'[-+]?[0-9]*\.?[0-9]+', avg_value)
-                        if len(matches) >= 2:
-                            lower = float(matches[0]) * 100
-                            upper = float(matches[1]) * 100
-                            avg_value = f"[{lower:.1f}%, {upper:.1f}%]"
-                            cum_value = avg_value
-                    elif '%' not in avg_value:
-                        try:
-                            rel_val = float(avg_value) * 100
-                            avg_value = f"{rel_val:.1f}%"
-                            cum_value = avg_value
-                        except:
-                            pass
-                
-                results_data.append([translated_name, avg_value, cum_value])
-        
-        # p値を追加
-        if p_value is not None:
-            results_data.append([content['table_p_value'], f"{p_value:.4f}", f"{p_value:.4f}"])
+        # 分析結果オブジェクト（ci.summary_data の値、ない場合は日次の推定結果）から作成
+        if result is None:
+            result = get_analysis_result(ci)
+        results_data = build_model_summary_rows(result, content, confidence_level)
+        if not results_data:
+            return build_result_fallback_table(result, confidence_level)
         
         # DataFrameを作成（多言語対応）
         columns = [
@@ -908,10 +551,11 @@ def build_two_group_text_based_summary_table(ci, confidence_level=95):
         return df_result
         
     except Exception as e:
-        print(f"Error in build_two_group_text_based_summary_table: {e}")
-        return build_enhanced_summary_table_fallback(ci, confidence_level)
+        print(f"Error in build_unified_summary_table: {e}")
+        # エラーの場合は日次の推定結果から集計した表を使用
+        return build_result_fallback_table(result, confidence_level)
 
-def build_enhanced_summary_table(ci, confidence_level=95):
+def build_enhanced_summary_table(ci, confidence_level=95, result=None):
     """
     CausalImpactの分析結果を見やすい表形式で整理する関数（アプリ画面表示用）
     アプリ画面では常に日本語表記を使用
@@ -922,221 +566,41 @@ def build_enhanced_summary_table(ci, confidence_level=95):
         分析結果オブジェクト
     confidence_level : int
         信頼水準（%）、デフォルト95%
+    result : AnalysisResult, optional
+        分析結果オブジェクト（省略時は ci から作成）
         
     Returns:
     --------
     pandas.DataFrame
         整形された分析結果テーブル（日本語固定）
     """
+    try:
+        if result is None:
+            result = get_analysis_result(ci)
+    except Exception as e:
+        print(f"Analysis result extraction error: {e}")
+        result = None
+    
     try:
         # アプリ画面用の日本語固定関数を使用
-        app_result = build_app_summary_table(ci, confidence_level)
+        app_result = build_app_summary_table(ci, confidence_level, result=result)
         if app_result is not None and not app_result.empty:
             return app_result
     except Exception as e:
         print(f"App summary function error: {e}")
     
-    # 統一関数が失敗した場合でも日本語表記を保証する独自実装
-    try:
-        import pandas as pd
-        import numpy as np
-        
-        # CSVと同じデータソースを使用：ci.inferencesから直接計算
-        if hasattr(ci, 'inferences') and ci.inferences is not None:
-            df = ci.inferences.copy().reset_index()
-        elif hasattr(ci, 'data'):
-            df = ci.data.copy().reset_index()
-        else:
-            # 最後の手段として空のDataFrameを返す（英語表記を避ける）
-            return pd.DataFrame(columns=['指標', '分析期間の平均値', '分析期間の累積値'])
-        
-        # 日付列を統一
-        if 'index' in df.columns:
-            df = df.rename(columns={'index': 'date'})
-        elif df.index.name:
-            df = df.reset_index().rename(columns={df.index.name: 'date'})
-        
-        # 日付列が存在しない場合の対処
-        if 'date' not in df.columns:
-            if len(df.columns) > 0:
-                df = df.rename(columns={df.columns[0]: 'date'})
-            else:
-                return pd.DataFrame(columns=['指標', '分析期間の平均値', '分析期間の累積値'])
-        
-        # 列名マッピング（CSVと同じ）
-        column_mapping = {
-            'predicted': 'preds',
-            'predicted_lower': 'preds_lower', 
-            'predicted_upper': 'preds_upper',
-            'point_effects': 'point_effects',
-            'point_effects_lower': 'point_effects_lower',
-            'point_effects_upper': 'point_effects_upper'
-        }
-        
-        # 列名を統一
-        for old_name, new_name in column_mapping.items():
-            if old_name in df.columns:
-                df = df.rename(columns={old_name: new_name})
-        
-        # 実測値（y）の算出（予測値＋効果）
-        if 'y' not in df.columns:
-            if 'preds' in df.columns and 'point_effects' in df.columns:
-                df['y'] = df['preds'] + df['point_effects']
-            else:
-                # データが不足している場合は空のDataFrameを返す
-                return pd.DataFrame(columns=['指標', '分析期間の平均値', '分析期間の累積値'])
-        
-        # 介入期間のデータのみを抽出（累積値用）
-        analysis_period = None
-        try:
-            import streamlit as st
-            if hasattr(st, 'session_state') and 'analysis_period' in st.session_state:
-                analysis_period = st.session_state['analysis_period']
-        except:
-            pass
-        
-        if analysis_period and 'post_start' in analysis_period and 'post_end' in analysis_period:
-            post_start = pd.to_datetime(analysis_period['post_start'])
-            post_end = pd.to_datetime(analysis_period['post_end'])
-            mask_post = (pd.to_datetime(df['date']) >= post_start) & (pd.to_datetime(df['date']) <= post_end)
-            post_data = df[mask_post].copy()
-        else:
-            # 期間情報が取得できない場合は全データを使用
-            post_data = df.copy()
-        
-        if len(post_data) == 0:
-            return pd.DataFrame(columns=['指標', '分析期間の平均値', '分析期間の累積値'])
-        
-        # 各指標の平均値と累積値を計算（日本語表記で統一）
-        results_data = []
-        
-        # 実測値
-        if 'y' in post_data.columns:
-            actual_avg = post_data['y'].mean()
-            actual_cum = post_data['y'].sum()
-            results_data.append(['実測値', f"{actual_avg:.1f}", f"{actual_cum:,.1f}"])
-        
-        # 予測値（標準偏差）
-        if 'preds' in post_data.columns:
-            pred_avg = post_data['preds'].mean()
-            pred_cumsum = post_data['preds'].cumsum()
-            pred_cum = pred_cumsum.iloc[-1] if len(pred_cumsum) > 0 else 0
-            
-            # 標準偏差の計算
-            pred_std = post_data['preds'].std()
-            results_data.append(['予測値（標準偏差）', f"{pred_avg:.1f} ({pred_std:.1f})", f"{pred_cum:,.1f} ({pred_std:.1f})"])
-        
-        # 予測値信頼区間（動的%表示）
-        if 'preds_lower' in post_data.columns and 'preds_upper' in post_data.columns:
-            pred_lower_avg = post_data['preds_lower'].mean()
-            pred_upper_avg = post_data['preds_upper'].mean()
-            pred_lower_cumsum = post_data['preds_lower'].cumsum()
-            pred_upper_cumsum = post_data['preds_upper'].cumsum()
-            pred_lower_cum = pred_lower_cumsum.iloc[-1] if len(pred_lower_cumsum) > 0 else 0
-            pred_upper_cum = pred_upper_cumsum.iloc[-1] if len(pred_upper_cumsum) > 0 else 0
-            
-            avg_ci_str = f"[{pred_lower_avg:.1f}, {pred_upper_avg:.1f}]"
-            cum_ci_str = f"[{pred_lower_cum:,.1f}, {pred_upper_cum:,.1f}]"
-            results_data.append([f'予測値 {confidence_level}% 信頼区間', avg_ci_str, cum_ci_str])
-        
-        # 絶対効果（標準偏差）
-        if 'point_effects' in post_data.columns:
-            abs_avg = post_data['point_effects'].mean()
-            abs_cumsum = post_data['point_effects'].cumsum()
-            abs_cum = abs_cumsum.iloc[-1] if len(abs_cumsum) > 0 else 0
-            
-            # 標準偏差の計算
-            abs_std = post_data['point_effects'].std()
-            results_data.append(['絶対効果（標準偏差）', f"{abs_avg:.1f} ({abs_std:.1f})", f"{abs_cum:,.1f} ({abs_std:.1f})"])
-        
-        # 絶対効果信頼区間（動的%表示）
-        if 'point_effects_lower' in post_data.columns and 'point_effects_upper' in post_data.columns:
-            abs_lower_avg = post_data['point_effects_lower'].mean()
-            abs_upper_avg = post_data['point_effects_upper'].mean()
-            abs_lower_cumsum = post_data['point_effects_lower'].cumsum()
-            abs_upper_cumsum = post_data['point_effects_upper'].cumsum()
-            abs_lower_cum = abs_lower_cumsum.iloc[-1] if len(abs_lower_cumsum) > 0 else 0
-            abs_upper_cum = abs_upper_cumsum.iloc[-1] if len(abs_upper_cumsum) > 0 else 0
-            
-            avg_ci_str = f"[{abs_lower_avg:.1f}, {abs_upper_avg:.1f}]"
-            cum_ci_str = f"[{abs_lower_cum:,.1f}, {abs_upper_cum:,.1f}]"
-            abs_ci_label = f"{content['table_absolute_effect']} {confidence_level}% {'信頼区間' if use_japanese else 'CI'}"
-            results_data.append([abs_ci_label, avg_ci_str, cum_ci_str])
-        
-        # 相対効果（標準偏差）
-        if 'point_effects' in post_data.columns and 'preds' in post_data.columns:
-            total_abs_effect = post_data['point_effects'].sum()
-            total_pred = post_data['preds'].sum()
-            rel_unified = (total_abs_effect / total_pred * 100) if total_pred != 0 else 0
-            
-            # 標準偏差の計算（相対効果の）
-            rel_effects_pct = (post_data['point_effects'] / post_data['preds'] * 100).replace([np.inf, -np.inf], np.nan).dropna()
-            rel_std = rel_effects_pct.std() if len(rel_effects_pct) > 0 else 0
-            
-            results_data.append(['相対効果（標準偏差）', f"{rel_unified:.1f}% ({rel_std:.1f}%)", f"{rel_unified:.1f}% ({rel_std:.1f}%)"])
-        
-        # 相対効果信頼区間（動的%表示）
-        if ('point_effects_lower' in post_data.columns and 'point_effects_upper' in post_data.columns and 
-            'preds' in post_data.columns):
-            total_abs_lower = post_data['point_effects_lower'].sum()
-            total_abs_upper = post_data['point_effects_upper'].sum()
-            total_pred = post_data['preds'].sum()
-            rel_lower_unified = (total_abs_lower / total_pred * 100) if total_pred != 0 else 0
-            rel_upper_unified = (total_abs_upper / total_pred * 100) if total_pred != 0 else 0
-            
-            rel_ci_unified_str = f"[{rel_lower_unified:.1f}%, {rel_upper_unified:.1f}%]"
-            rel_ci_label = f"{content['table_relative_effect']} {confidence_level}% {'信頼区間' if use_japanese else 'CI'}"
-            results_data.append([rel_ci_label, rel_ci_unified_str, rel_ci_unified_str])
-        
-        # p値（事後確率）
-        if hasattr(ci, 'p_value') and ci.p_value is not None:
-            p_value = ci.p_value
-            results_data.append([content['table_p_value'], f"{p_value:.4f}", f"{p_value:.4f}"])
-        else:
-            # テキストサマリーからp値を抽出
-            try:
-                import re
-                summary_text = str(ci.summary())
-                p_match = re.search(r'Posterior tail-area probability p:\s+([0-9.]+)', summary_text)
-                if p_match:
-                    p_value = float(p_match.group(1))
-                    results_data.append([content['table_p_value'], f"{p_value:.4f}", f"{p_value:.4f}"])
-            except:
-                pass  # p値が取得できない場合はスキップ
-        
-        # DataFrameを作成（多言語対応）
-        try:
-            from config.pdf_templates import get_pdf_content
-            from config.font_config import is_japanese_font_available
-            use_japanese = is_japanese_font_available()
-            content = get_pdf_content(use_japanese)
-            
-            columns = [
-                content['table_indicator'],
-                content['table_avg_analysis_period'], 
-                content['table_total_analysis_period']
-            ]
-        except:
-            # フォールバック
-            columns = ['指標', '分析期間の平均値', '分析期間の累積値']
-        
-        df_result = pd.DataFrame(results_data, columns=columns)
-        
-        return df_result
-        
-    except Exception as e:
-        print(f"Error in build_enhanced_summary_table: {e}")
-        # 最終的なエラーの場合でも確実な日本語表記を返す
-        return build_enhanced_summary_table_fallback(ci, confidence_level)
+    # 統一関数が失敗した場合でも日本語表記を保証する
+    # （CSVと同じデータソース：介入期間の日次推定結果から集計）
+    return build_result_fallback_table(result, confidence_level)
 
-def build_enhanced_summary_table_fallback(ci, confidence_level=95):
+def build_result_fallback_table(result, confidence_level=95):
     """
-    CausalImpactの分析結果を見やすい表形式で整理する関数
-    CSVダウンロードと同じデータソース（ci.inferences）を使用して一貫性を保つ
+    分析結果オブジェクトの日次推定結果（介入期間）から集計したサマリーテーブルを返す関数（フォールバック用）
+    分析結果がない・集計できない場合は値を「---」とした日本語表記のテーブルを返す
     
     Parameters:
     -----------
-    ci : CausalImpact
+    result : AnalysisResult or None
         分析結果オブジェクト
     confidence_level : int
         信頼水準（%）、デフォルト95%
@@ -1144,210 +608,17 @@ def build_enhanced_summary_table_fallback(ci, confidence_level=95):
     Returns:
     --------
     pandas.DataFrame
-        整形された分析結果テーブル
     """
     try:
-        import pandas as pd
-        import numpy as np
-        
-        # CSVと同じデータソースを使用：ci.inferencesから直接計算
-        if hasattr(ci, 'inferences') and ci.inferences is not None:
-            df = ci.inferences.copy().reset_index()
-        elif hasattr(ci, 'data'):
-            df = ci.data.copy().reset_index()
-        else:
-            # フォールバック：既存の方法
-            return build_enhanced_summary_table_fallback(ci, confidence_level)
-        
-        # 日付列を統一
-        if 'index' in df.columns:
-            df = df.rename(columns={'index': 'date'})
-        elif df.index.name:
-            df = df.reset_index().rename(columns={df.index.name: 'date'})
-        
-        # 日付列が存在しない場合の対処
-        if 'date' not in df.columns:
-            if len(df.columns) > 0:
-                df = df.rename(columns={df.columns[0]: 'date'})
-            else:
-                return pd.DataFrame(columns=['指標', '分析期間の平均値', '分析期間の累積値'])
-        
-        # 列名マッピング（CSVと同じ）
-        column_mapping = {
-            'predicted': 'preds',
-            'predicted_lower': 'preds_lower', 
-            'predicted_upper': 'preds_upper',
-            'point_effects': 'point_effects',
-            'point_effects_lower': 'point_effects_lower',
-            'point_effects_upper': 'point_effects_upper'
-        }
-        
-        # 列名を統一
-        for old_name, new_name in column_mapping.items():
-            if old_name in df.columns:
-                df = df.rename(columns={old_name: new_name})
-        
-        # 実測値（y）の算出（予測値＋効果）
-        if 'y' not in df.columns:
-            if 'preds' in df.columns and 'point_effects' in df.columns:
-                df['y'] = df['preds'] + df['point_effects']
-            else:
-                # データが不足している場合はフォールバック
-                return build_enhanced_summary_table_fallback(ci, confidence_level)
-        
-        # 介入期間のデータのみを抽出（累積値用）
-        # セッション状態から期間情報を取得
-        analysis_period = None
-        try:
-            import streamlit as st
-            if hasattr(st, 'session_state') and 'analysis_period' in st.session_state:
-                analysis_period = st.session_state['analysis_period']
-        except:
-            pass
-        
-        if analysis_period and 'post_start' in analysis_period and 'post_end' in analysis_period:
-            post_start = pd.to_datetime(analysis_period['post_start'])
-            post_end = pd.to_datetime(analysis_period['post_end'])
-            mask_post = (pd.to_datetime(df['date']) >= post_start) & (pd.to_datetime(df['date']) <= post_end)
-            post_data = df[mask_post].copy()
-        else:
-            # 期間情報が取得できない場合は全データを使用
-            post_data = df.copy()
-        
-        if len(post_data) == 0:
-            return build_enhanced_summary_table_fallback(ci, confidence_level)
-        
-        # 多言語対応コンテンツの取得
-        try:
-            from config.pdf_templates import get_pdf_content
-            from config.font_config import is_japanese_font_available
-            use_japanese = is_japanese_font_available()
-            content = get_pdf_content(use_japanese)
-        except:
-            # フォールバック（日本語）
-            content = {
-                'table_actual': '実測値',
-                'table_predicted': '予測値',
-                'table_predicted_ci': f'予測値 {confidence_level}% 信頼区間',
-                'table_absolute_effect': '絶対効果',
-                'table_relative_effect': '相対効果',
-                'table_p_value': 'p値'
-            }
-        
-        # 各指標の平均値と累積値を計算
-        results_data = []
-        
-        # 実測値
-        if 'y' in post_data.columns:
-            actual_avg = post_data['y'].mean()
-            actual_cum = post_data['y'].sum()  # 実測値は期間合計
-            results_data.append([content['table_actual'], f"{actual_avg:.1f}", f"{actual_cum:,.1f}"])
-        
-        # 予測値（標準偏差を削除）
-        if 'preds' in post_data.columns:
-            pred_avg = post_data['preds'].mean()
-            # CSVと同じ累積計算：各日の累積値の最終値
-            pred_cumsum = post_data['preds'].cumsum()
-            pred_cum = pred_cumsum.iloc[-1] if len(pred_cumsum) > 0 else 0
-            
-            results_data.append([content['table_predicted'], f"{pred_avg:.1f}", f"{pred_cum:,.1f}"])
-        
-        # 予測値信頼区間
-        if 'preds_lower' in post_data.columns and 'preds_upper' in post_data.columns:
-            pred_lower_avg = post_data['preds_lower'].mean()
-            pred_upper_avg = post_data['preds_upper'].mean()
-            # CSVと同じ累積計算
-            pred_lower_cumsum = post_data['preds_lower'].cumsum()
-            pred_upper_cumsum = post_data['preds_upper'].cumsum()
-            pred_lower_cum = pred_lower_cumsum.iloc[-1] if len(pred_lower_cumsum) > 0 else 0
-            pred_upper_cum = pred_upper_cumsum.iloc[-1] if len(pred_upper_cumsum) > 0 else 0
-            
-            avg_ci_str = f"[{pred_lower_avg:.1f}, {pred_upper_avg:.1f}]"
-            cum_ci_str = f"[{pred_lower_cum:,.1f}, {pred_upper_cum:,.1f}]"
-            ci_label = content['table_predicted_ci'].format(confidence_level)
-            results_data.append([ci_label, avg_ci_str, cum_ci_str])
-        
-        # 絶対効果（標準偏差を削除）
-        if 'point_effects' in post_data.columns:
-            abs_avg = post_data['point_effects'].mean()
-            # CSVと同じ累積計算
-            abs_cumsum = post_data['point_effects'].cumsum()
-            abs_cum = abs_cumsum.iloc[-1] if len(abs_cumsum) > 0 else 0
-            
-            results_data.append([content['table_absolute_effect'], f"{abs_avg:.1f}", f"{abs_cum:,.1f}"])
-        
-        # 絶対効果信頼区間
-        if 'point_effects_lower' in post_data.columns and 'point_effects_upper' in post_data.columns:
-            abs_lower_avg = post_data['point_effects_lower'].mean()
-            abs_upper_avg = post_data['point_effects_upper'].mean()
-            # CSVと同じ累積計算
-            abs_lower_cumsum = post_data['point_effects_lower'].cumsum()
-            abs_upper_cumsum = post_data['point_effects_upper'].cumsum()
-            abs_lower_cum = abs_lower_cumsum.iloc[-1] if len(abs_lower_cumsum) > 0 else 0
-            abs_upper_cum = abs_upper_cumsum.iloc[-1] if len(abs_upper_cumsum) > 0 else 0
-            
-            avg_ci_str = f"[{abs_lower_avg:.1f}, {abs_upper_avg:.1f}]"
-            cum_ci_str = f"[{abs_lower_cum:,.1f}, {abs_upper_cum:,.1f}]"
-            abs_ci_label = f"{content['table_absolute_effect']} {confidence_level}% {'信頼区間' if use_japanese else 'CI'}"
-            results_data.append([abs_ci_label, avg_ci_str, cum_ci_str])
-        
-        # 相対効果（標準偏差を削除、明示的数値表示）
-        if 'point_effects' in post_data.columns and 'preds' in post_data.columns:
-            # 相対効果を統一した計算方法で算出：累積値ベース（総効果/総予測値）
-            total_abs_effect = post_data['point_effects'].sum()
-            total_pred = post_data['preds'].sum()
-            rel_unified = (total_abs_effect / total_pred * 100) if total_pred != 0 else 0
-            
-            # 平均値・累積値ともに同じ値を使用
-            results_data.append([content['table_relative_effect'], f"{rel_unified:.1f}%", f"{rel_unified:.1f}%"])
-        
-        # 相対効果信頼区間（明示的数値表示）
-        if ('point_effects_lower' in post_data.columns and 'point_effects_upper' in post_data.columns and 
-            'preds' in post_data.columns):
-            # 累積値ベースで統一した計算
-            total_abs_lower = post_data['point_effects_lower'].sum()
-            total_abs_upper = post_data['point_effects_upper'].sum()
-            total_pred = post_data['preds'].sum()
-            rel_lower_unified = (total_abs_lower / total_pred * 100) if total_pred != 0 else 0
-            rel_upper_unified = (total_abs_upper / total_pred * 100) if total_pred != 0 else 0
-            
-            # 平均値・累積値ともに同じ値を使用
-            rel_ci_unified_str = f"[{rel_lower_unified:.1f}%, {rel_upper_unified:.1f}%]"
-            rel_ci_label = f"{content['table_relative_effect']} {confidence_level}% {'信頼区間' if use_japanese else 'CI'}"
-            results_data.append([rel_ci_label, rel_ci_unified_str, rel_ci_unified_str])
-        
-        # p値（明示的数値表示）
-        if hasattr(ci, 'p_value') and ci.p_value is not None:
-            p_value = ci.p_value
-            results_data.append([content['table_p_value'], f"{p_value:.4f}", f"{p_value:.4f}"])
-        else:
-            # テキストサマリーからp値を抽出
-            try:
-                import re
-                summary_text = str(ci.summary())
-                p_match = re.search(r'Posterior tail-area probability p:\s+([0-9.]+)', summary_text)
-                if p_match:
-                    p_value = float(p_match.group(1))
-                    results_data.append([content['table_p_value'], f"{p_value:.4f}", f"{p_value:.4f}"])
-            except:
-                pass  # p値が取得できない場合はスキップ
-        
-        # DataFrameを作成（多言語対応）
-        columns = [
-            content['table_indicator'],
-            content['table_avg_analysis_period'], 
-            content['table_total_analysis_period']
-        ]
-        df_result = pd.DataFrame(results_data, columns=columns)
-        
-        return df_result
-        
+        if result is not None:
+            results_data = build_inference_summary_rows(result, confidence_level)
+            if results_data:
+                return pd.DataFrame(results_data, columns=['指標', '分析期間の平均値', '分析期間の累積値'])
     except Exception as e:
-        print(f"Error in build_enhanced_summary_table_fallback: {e}")
-        # エラーの場合は空のDataFrameを返す
-        return pd.DataFrame(columns=['指標', '分析期間の平均値', '分析期間の累積値'])
+        print(f"Error in build_result_fallback_table: {e}")
+    return build_app_guaranteed_japanese_table(None, confidence_level)
 
-def get_analysis_summary_message(ci, confidence_level=95):
+def get_analysis_summary_message(ci, confidence_level=95, result=None):
     """
     分析結果から相対効果と統計的有意性を判定してサマリーメッセージを生成する関数
     build_enhanced_summary_tableと同じデータソースと計算方法を使用して一貫性を保つ
@@ -1358,6 +629,8 @@ def get_analysis_summary_message(ci, confidence_level=95):
         分析結果オブジェクト
     confidence_level : int
         信頼水準（%）、デフォルト95%
+    result : AnalysisResult, optional
+        分析結果オブジェクト（省略時は ci から作成）
         
     Returns:
     --------
@@ -1365,191 +638,14 @@ def get_analysis_summary_message(ci, confidence_level=95):
         分析結果のサマリーメッセージ（生成できない場合はNone）
     """
     try:
-        import pandas as pd
-        import numpy as np
-        import re
-        
-        # build_enhanced_summary_tableと同じデータソースを使用
-        if hasattr(ci, 'inferences') and ci.inferences is not None:
-            df = ci.inferences.copy().reset_index()
-        elif hasattr(ci, 'data'):
-            df = ci.data.copy().reset_index()
-        else:
-            # フォールバック：既存の方法
-            return get_analysis_summary_message_fallback(ci, confidence_level)
-        
-        # 日付列を統一
-        if 'index' in df.columns:
-            df = df.rename(columns={'index': 'date'})
-        elif df.index.name:
-            df = df.reset_index().rename(columns={df.index.name: 'date'})
-        
-        if 'date' not in df.columns:
-            if len(df.columns) > 0:
-                df = df.rename(columns={df.columns[0]: 'date'})
-            else:
-                return get_analysis_summary_message_fallback(ci, confidence_level)
-        
-        # 列名マッピング（build_enhanced_summary_tableと同じ）
-        column_mapping = {
-            'predicted': 'preds',
-            'predicted_lower': 'preds_lower', 
-            'predicted_upper': 'preds_upper',
-            'point_effects': 'point_effects',
-            'point_effects_lower': 'point_effects_lower',
-            'point_effects_upper': 'point_effects_upper'
-        }
-        
-        for old_name, new_name in column_mapping.items():
-            if old_name in df.columns:
-                df = df.rename(columns={old_name: new_name})
-        
-        # 実測値（y）の算出
-        if 'y' not in df.columns:
-            if 'preds' in df.columns and 'point_effects' in df.columns:
-                df['y'] = df['preds'] + df['point_effects']
-            else:
-                return get_analysis_summary_message_fallback(ci, confidence_level)
+        if result is None:
+            result = get_analysis_result(ci)
         
-        # 介入期間のデータのみを抽出
-        analysis_period = None
-        try:
-            import streamlit as st
-            if hasattr(st, 'session_state') and 'analysis_period' in st.session_state:
-                analysis_period = st.session_state['analysis_period']
-        except:
-            pass
-        
-        if analysis_period and 'post_start' in analysis_period and 'post_end' in analysis_period:
-            post_start = pd.to_datetime(analysis_period['post_start'])
-            post_end = pd.to_datetime(analysis_period['post_end'])
-            mask_post = (pd.to_datetime(df['date']) >= post_start) & (pd.to_datetime(df['date']) <= post_end)
-            post_data = df[mask_post].copy()
-        else:
-            post_data = df.copy()
-        
-        if len(post_data) == 0:
-            return get_analysis_summary_message_fallback(ci, confidence_level)
-        
-        # build_enhanced_summary_tableと同じ方法で相対効果を計算（累積値を使用）
-        relative_effect = None
-        p_value = None
-        
-        if 'point_effects' in post_data.columns and 'preds' in post_data.columns:
-            # 統一した累積値ベースの計算（アプリ表示と完全に同じ方法）
-            total_abs_effect = post_data['point_effects'].sum()
-            total_pred = post_data['preds'].sum()
-            relative_effect = (total_abs_effect / total_pred * 100) if total_pred != 0 else 0
-        
-        # p値の取得
-        if hasattr(ci, 'p_value') and ci.p_value is not None:
-            p_value = ci.p_value
-        else:
-            # テキストサマリーからp値を抽出
-            try:
-                summary_text = str(ci.summary())
-                p_match = re.search(r'Posterior tail-area probability p:\s+([0-9.]+)', summary_text)
-                if p_match:
-                    p_value = float(p_match.group(1))
-            except:
-                pass
-        
-        # 統計的有意性の判定（信頼区間による）
-        is_significant = False
-        if ('point_effects_lower' in post_data.columns and 'point_effects_upper' in post_data.columns):
-            # 累積効果の信頼区間で判定
-            abs_lower_cumsum = post_data['point_effects_lower'].cumsum()
-            abs_upper_cumsum = post_data['point_effects_upper'].cumsum()
-            lower_bound = abs_lower_cumsum.iloc[-1] if len(abs_lower_cumsum) > 0 else 0
-            upper_bound = abs_upper_cumsum.iloc[-1] if len(abs_upper_cumsum) > 0 else 0
-            if (lower_bound > 0 and upper_bound > 0) or (lower_bound < 0 and upper_bound < 0):
-                is_significant = True
+        # 累積値ベースの相対効果と、信頼区間・p値による有意性判定
+        relative_effect, p_value, final_significance = get_effect_summary(result)
         
         # メッセージの生成
         if relative_effect is not None and p_value is not None:
-            # 統計的有意性の判定（p値による）
-            is_significant_by_p = p_value < 0.05
-            
-            # より確実な有意性判定（信頼区間とp値の両方を考慮）
-            final_significance = is_significant or is_significant_by_p
-            
-            if final_significance:
-                return f"相対効果は {relative_effect:+.1f}% で、統計的に有意です（p = {p_value:.3f}）。詳しくは「詳細レポート」を参照ください。"
-            else:
-                return f"相対効果は {relative_effect:+.1f}% ですが、統計的には有意ではありません（p = {p_value:.3f}）。詳しくは「詳細レポート」を参照ください。"
-        
-        return get_analysis_summary_message_fallback(ci, confidence_level)
-        
-    except Exception as e:
-        print(f"Error in get_analysis_summary_message: {e}")
-        return get_analysis_summary_message_fallback(ci, confidence_level)
-
-def get_analysis_summary_message_fallback(ci, confidence_level=95):
-    """
-    フォールバック用の分析結果サマリーメッセージ生成関数
-    """
-    try:
-        import re
-        
-        # 相対効果と有意性の取得
-        relative_effect = None
-        p_value = None
-        is_significant = False
-        
-        # 1. CausalImpactのsummary_dataから取得を試行
-        if hasattr(ci, 'summary_data') and ci.summary_data is not None:
-            if 'rel_effect' in ci.summary_data.index:
-                relative_effect = ci.summary_data.loc['rel_effect', 'average'] * 100
-            
-            # 統計的有意性の判定（信頼区間による）
-            if ('abs_effect_lower' in ci.summary_data.index and 
-                'abs_effect_upper' in ci.summary_data.index):
-                lower_bound = ci.summary_data.loc['abs_effect_lower', 'cumulative']
-                upper_bound = ci.summary_data.loc['abs_effect_upper', 'cumulative']
-                if (lower_bound > 0 and upper_bound > 0) or (lower_bound < 0 and upper_bound < 0):
-                    is_significant = True
-        
-        # 2. p値の取得
-        if hasattr(ci, 'p_value') and ci.p_value is not None:
-            p_value = ci.p_value
-        else:
-            # テキストサマリーからp値を抽出
-            summary_text = str(ci.summary())
-            p_match = re.search(r'Posterior tail-area probability p:\s+([0-9.]+)', summary_text)
-            if p_match:
-                p_value = float(p_match.group(1))
-        
-        # 3. フォールバック：テキストから相対効果も抽出
-        if relative_effect is None:
-            summary_text = str(ci.summary())
-            # 相対効果の行を探す（パーセンテージ形式）
-            for line in summary_text.split('\n'):
-                if 'RelEffect' in line or '相対効果' in line:
-                    # パーセンテージ値を抽出
-                    percent_match = re.search(r'([-+]?\d+\.?\d*)%', line)
-                    if percent_match:
-                        relative_effect = float(percent_match.group(1))
-                        break
-        
-        # さらなるフォールバック：DataFrame型のsummaryからの抽出
-        if relative_effect is None and hasattr(ci, 'summary'):
-            try:
-                summary_df = ci.summary
-                if hasattr(summary_df, 'loc') and 'RelEffect' in summary_df.index:
-                    rel_effect_val = summary_df.loc['RelEffect', 'Average']
-                    if not hasattr(rel_effect_val, '__iter__'):
-                        relative_effect = rel_effect_val * 100
-            except:
-                pass
-        
-        # 4. メッセージの生成
-        if relative_effect is not None and p_value is not None:
-            # 統計的有意性の判定（p値による）
-            is_significant_by_p = p_value < 0.05
-            
-            # より確実な有意性判定（信頼区間とp値の両方を考慮）
-            final_significance = is_significant or is_significant_by_p
-            
             if final_significance:
                 return f"相対効果は {relative_effect:+.1f}% で、統計的に有意です（p = {p_value:.3f}）。詳しくは「詳細レポート」を参照ください。"
             else:
@@ -1558,7 +654,7 @@ def get_analysis_summary_message_fallback(ci, confidence_level=95):
         return None
         
     except Exception as e:
-        print(f"Error in get_analysis_summary_message_fallback: {e}")
+        print(f"Error in get_analysis_summary_message: {e}")
         return None
 
 def get_metrics_explanation_table():
@@ -1613,14 +709,23 @@ def get_metrics_explanation_table():
 </div>
 """
 
-def get_comprehensive_pdf_download_link(ci, analysis_info, summary_df, fig, confidence_level=95):
+def build_comprehensive_pdf(ci, analysis_info, summary_df, fig, confidence_level=95, result=None):
     """
-    分析結果の包括的PDFレポートを生成してダウンロードリンクを返す関数
+    分析結果の包括的PDFレポートの内容（bytes）を作成する関数
     """
+    # 分析結果オブジェクト（介入期間はanalysis_infoの期間）
+    try:
+        if result is None:
+            period = (analysis_info.get('period_start'), analysis_info.get('period_end'))
+            result = get_analysis_result(ci, period if all(period) else None)
+    except Exception as e:
+        print(f"分析結果オブジェクトの作成でエラー: {e}")
+        result = None
+    
     try:
         # 統一関数によるサマリーテーブルで更新
         try:
-            unified_summary_df = build_unified_summary_table(ci, confidence_level)
+            unified_summary_df = build_unified_summary_table(ci, confidence_level, result=result)
             # インデックスをリセットして統一
             unified_summary_df = unified_summary_df.reset_index(drop=True)
             summary_df = unified_summary_df
@@ -1633,9 +738,8 @@ def get_comprehensive_pdf_download_link(ci, analysis_info, summary_df, fig, conf
     import pandas as pd
     import numpy as np
     import io
-    import base64
     from reportlab.lib.pagesizes import A4, letter
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.lib import colors
     from reportlab.lib.units import mm
@@ -1713,51 +817,11 @@ def get_comprehensive_pdf_download_link(ci, analysis_info, summary_df, fig, conf
     period_end = analysis_info.get('period_end')
     freq_option = analysis_info.get('freq_option', '')
     
-    # 介入期間の実際のデータ件数を算出
-    total_data_count = 0
-    try:
-        if hasattr(ci, 'inferences') and ci.inferences is not None:
-            df = ci.inferences.copy()
-            
-            # インデックスが日付の場合の処理
-            if df.index.name or 'date' in str(type(df.index)):
-                df = df.reset_index()
-                if 'index' in df.columns:
-                    df = df.rename(columns={'index': 'date'})
-                elif df.columns[0] not in ['date']:
-                    df = df.rename(columns={df.columns[0]: 'date'})
-            
-            # 日付列の処理
-            if 'date' in df.columns:
-                # 日付列をdatetime型に変換
-                df['date'] = pd.to_datetime(df['date'])
-                
-                # period_startとperiod_endもdatetime型に変換
-                if period_start and period_end:
-                    period_start_dt = pd.to_datetime(period_start)
-                    period_end_dt = pd.to_datetime(period_end)
-                    
-                    # 介入期間のデータをフィルタリング
-                    post_data = df[(df['date'] >= period_start_dt) & (df['date'] <= period_end_dt)]
-                    total_data_count = len(post_data)
-                else:
-                    total_data_count = len(df)
-            else:
-                # date列がない場合は全体の件数を使用
-                total_data_count = len(df)
-        else:
-            # CausalImpactオブジェクトのdataから取得を試行
-            if hasattr(ci, 'data') and ci.data is not None:
-                df = ci.data.copy()
-                if hasattr(df, 'index'):
-                    total_data_count = len(df)
-                else:
-                    total_data_count = len(summary_df) if summary_df is not None else 0
-            else:
-                # フォールバック: サマリーテーブルの行数を使用
-                total_data_count = len(summary_df) if summary_df is not None else 0
-    except Exception as e:
-        # エラー時のフォールバック: サマリーテーブルの行数を使用
+    # 介入期間の実際のデータ件数（分析結果オブジェクトの介入期間フラグから算出）
+    if result is not None:
+        total_data_count = result.n_post
+    else:
+        # フォールバック: サマリーテーブルの行数を使用
         total_data_count = len(summary_df) if summary_df is not None else 0
     
     # 分析条件を記載（テンプレート対応）
@@ -1808,31 +872,10 @@ def get_comprehensive_pdf_download_link(ci, analysis_info, summary_df, fig, conf
     
     # メッセージ（多言語対応）
     try:
-        # 相対効果とp値を取得
-        relative_effect = None
-        p_value = None
-        
-        # 相対効果の計算
-        if hasattr(ci, 'inferences') and ci.inferences is not None:
-            df = ci.inferences.copy().reset_index()
-            post_data = df[df['date'] >= period_start] if period_start else df
-            if 'point_effects' in post_data.columns and 'preds' in post_data.columns:
-                total_abs_effect = post_data['point_effects'].sum()
-                total_pred = post_data['preds'].sum()
-                relative_effect = (total_abs_effect / total_pred * 100) if total_pred != 0 else 0
-        
-        # p値の取得
-        if hasattr(ci, 'p_value') and ci.p_value is not None:
-            p_value = ci.p_value
-        else:
-            try:
-                import re
-                summary_text = str(ci.summary())
-                p_match = re.search(r'Posterior tail-area probability p:\s+([0-9.]+)', summary_text)
-                if p_match:
-                    p_value = float(p_match.group(1))
-            except:
-                pass
+        # 相対効果（累積値ベース）とp値を取得
+        relative_effect, p_value = None, None
+        if result is not None:
+            relative_effect, p_value, _ = get_effect_summary(result)
         
         # 多言語対応コメント生成
         if relative_effect is not None and p_value is not None:
@@ -1856,38 +899,37 @@ def get_comprehensive_pdf_download_link(ci, analysis_info, summary_df, fig, conf
     story.append(Spacer(1, 6))
     story.append(Paragraph(content['section_graph'], heading_style))
     
-    # グラフを画像として挿入
-    img_buffer = io.BytesIO()
-    fig.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-    img_buffer.seek(0)
-    
-    img = Image(img_buffer, width=420, height=280)
-    story.append(img)
+    # グラフを挿入（ベクター形式、利用できない場合はPNG画像）
+    story.append(build_figure_flowable(fig, width=420, height=280))
     story.append(Spacer(1, 4))
     
     # グラフの見方
     graph_explanation = f"　{content.get('graph_explanation_two_group', 'Graph explanation: Compare actual vs predicted data.')}"
     story.append(Paragraph(graph_explanation, normal_style))
     
-    # PDFを構築
+    # 使用する文字だけのサブセットフォントに切り替えてPDFを構築
+    story = apply_subset_font(story, font_name)
     doc.build(story)
-    pdf_buffer.seek(0)
-    
-    # Base64エンコード
-    pdf_base64 = base64.b64encode(pdf_buffer.read()).decode()
+    pdf_bytes = pdf_buffer.getvalue()
     
     # ファイル名生成
     analysis_type_short = "SingleGroup" if "単群推定" in analysis_info.get('analysis_type', '') else "TwoGroup"
     filename = f"causal_impact_report_{treatment_name}_{period_start.strftime('%Y%m%d')}_{period_end.strftime('%Y%m%d')}_{analysis_type_short}.pdf"
     
-    # ダウンロードリンク生成
-    href = f'data:application/pdf;base64,{pdf_base64}'
+    return pdf_bytes, filename
+
+def get_comprehensive_pdf_download_link(ci, analysis_info, summary_df, fig, confidence_level=95, result=None):
+    """
+    包括的PDFレポートをbase64のdata URIとして返す関数（互換用）
     
-    return href, filename
+    画面では build_comprehensive_pdf の内容を st.download_button に直接渡す。
+    """
+    data, filename = build_comprehensive_pdf(ci, analysis_info, summary_df, fig, confidence_level=confidence_level, result=result)
+    return to_data_uri(data, PDF_MIME), filename
 
-def get_comprehensive_csv_download_link(ci, analysis_info, confidence_level=95):
+def build_comprehensive_csv(ci, analysis_info, confidence_level=95, result=None, compression=None):
     """
-    予測値・実測値の詳細データをロングフォーマットCSVとしてダウンロードするリンクを生成する関数
+    予測値・実測値の詳細データのロングフォーマットCSVファイルを作成する関数
     （二群比較・単群推定の両分析タイプに対応）
     信頼区間の数値不一致を避けるため、ユーザー向けには8列のクリーンなフォーマットで提供
     
@@ -1899,40 +941,22 @@ def get_comprehensive_csv_download_link(ci, analysis_info, confidence_level=95):
         分析情報（treatment_name, analysis_type, period_start, period_end等）
     confidence_level : int
         信頼水準（95等）
+    result : AnalysisResult, optional
+        分析結果オブジェクト（省略時は ci から作成）
+    compression : str or None
+        圧縮形式（None, 'gzip', 'zip'）
         
     Returns:
     --------
-    href, filename : str, str
-        ダウンロードリンクのbase64データとファイル名
+    data, filename : CsvFile, str
+        作成したファイルとファイル名
     """
     import pandas as pd
     import numpy as np
-    import io
-    import base64
-    
-    # CausalImpactの結果データを取得
-    if hasattr(ci, 'inferences') and ci.inferences is not None:
-        df = ci.inferences.copy().reset_index()
-    elif hasattr(ci, 'data'):
-        # データがあるがinferencesがない場合の処理
-        df = ci.data.copy().reset_index()
-    else:
-        raise ValueError("CausalImpactオブジェクトから分析結果を取得できません")
     
-    # 日付列を統一
-    if 'index' in df.columns:
-        df = df.rename(columns={'index': 'date'})
-    elif df.index.name:
-        df = df.reset_index().rename(columns={df.index.name: 'date'})
-    
-    # 日付列が存在しない場合の対処
-    if 'date' not in df.columns:
-        # 最初の列を日付列として使用
-        if len(df.columns) > 0:
-            df = df.rename(columns={df.columns[0]: 'date'})
-        else:
-            # データフレームが空の場合は空のDataFrameを返す
-            raise ValueError("データフレームに列が存在しません")
+    # 期間情報
+    period_start = analysis_info.get('period_start')
+    period_end = analysis_info.get('period_end')
     
     # 8列の簡潔なフォーマット（信頼区間列を除去）
     jp_names = [
@@ -1945,61 +969,11 @@ def get_comprehensive_csv_download_link(ci, analysis_info, confidence_level=95):
         'post_cum_y', 'post_cum_pred', 'post_cum_effects', 'post_period'
     ]
     
-    # データフレームの列名マッピング（pycausalimpactの出力に対応）
-    column_mapping = {
-        'predicted': 'preds',
-        'point_effects': 'point_effects'
-    }
-    
-    # 列名を統一
-    for old_name, new_name in column_mapping.items():
-        if old_name in df.columns:
-            df = df.rename(columns={old_name: new_name})
-    
-    # 期間情報
-    period_start = analysis_info.get('period_start')
-    period_end = analysis_info.get('period_end')
-    
-    # 実測値（y）の算出（予測値＋効果）
-    if 'y' not in df.columns:
-        if 'preds' in df.columns and 'point_effects' in df.columns:
-            df['y'] = df['preds'] + df['point_effects']
-        else:
-            df['y'] = np.nan
-    
-    # 介入期間フラグを追加
-    if period_start and period_end:
-        post_start = pd.to_datetime(period_start)
-        post_end = pd.to_datetime(period_end)
-        mask_post = (pd.to_datetime(df['date']) >= post_start) & (pd.to_datetime(df['date']) <= post_end)
-        df['post_period'] = mask_post.astype(int)  # 1が介入期間、0が介入前期間
-        
-        # 介入期間のデータのみで累積値を計算
-        post_data = df[mask_post].copy()
-        if len(post_data) > 0:
-            # 累積値を正しく計算（各行で累積されていく）
-            post_data = post_data.reset_index(drop=True)
-            post_data['post_cum_y'] = post_data['y'].cumsum()
-            post_data['post_cum_pred'] = post_data['preds'].cumsum() if 'preds' in post_data.columns else np.nan
-            post_data['post_cum_effects'] = post_data['point_effects'].cumsum() if 'point_effects' in post_data.columns else np.nan
-            
-            # 元のデータフレームの該当箇所に累積値をセット
-            post_indices = df[mask_post].index
-            for i, idx in enumerate(post_indices):
-                if i < len(post_data):
-                    df.loc[idx, 'post_cum_y'] = post_data.iloc[i]['post_cum_y']
-                    df.loc[idx, 'post_cum_pred'] = post_data.iloc[i]['post_cum_pred']
-                    df.loc[idx, 'post_cum_effects'] = post_data.iloc[i]['post_cum_effects']
-    else:
-        df['post_period'] = 0
-    
-    # 不足している列を追加（NaNで初期化）
-    for en_name in en_names:
-        if en_name not in df.columns:
-            df[en_name] = np.nan
-    
-    # 出力用データフレームを作成（8列のみ）
-    output_df = df[en_names].copy()
+    # 分析結果オブジェクトから出力用データフレームを作成（8列のみ）
+    # 累積値は介入期間のみ、介入期間フラグは 1＝介入期間、0＝介入前期間
+    if result is None:
+        result = get_analysis_result(ci, (period_start, period_end) if period_start and period_end else None)
+    output_df = result.to_frame()[en_names]
     
     # 日付をYYYY/MM/DD形式に変換
     try:
@@ -2008,28 +982,20 @@ def get_comprehensive_csv_download_link(ci, analysis_info, confidence_level=95):
         # 日付変換に失敗した場合は文字列として出力
         output_df['date'] = output_df['date'].astype(str)
     
-    # CSVバッファを作成
-    csv_buffer = io.StringIO()
-    
-    # 1行目：日本語項目名
-    csv_buffer.write(','.join(jp_names) + '\n')
-    
-    # 2行目：英字変数名
-    csv_buffer.write(','.join(en_names) + '\n')
-    
-    # 3行目以降：実データ
-    output_df.to_csv(csv_buffer, index=False, header=False)
-    
-    # 注釈を追加（信頼区間の不一致について説明）
-    csv_buffer.write('\n')
-    csv_buffer.write('【CSV出力データについて】\n')
-    csv_buffer.write('※ 累積値は介入期間のみ出力されます（介入前期間はゼロまたは空欄になります）。\n')
-    csv_buffer.write('　 介入期間フラグ：1＝介入期間、0＝介入前期間\n')
-    csv_buffer.write('※ 統計的判断に必要な信頼区間の情報は、「詳細レポート」および「サマリー表」でご確認ください。\n')
+    # 1行目：日本語項目名、2行目：英字変数名、3行目以降：実データ（一定行数ごとに出力）
+    # 末尾に注釈を追加（信頼区間の不一致について説明）
+    chunks = iter_csv_chunks(
+        output_df,
+        header_rows=[jp_names, en_names],
+        footer_lines=[
+            '',
+            '【CSV出力データについて】',
+            '※ 累積値は介入期間のみ出力されます（介入前期間はゼロまたは空欄になります）。',
+            '　 介入期間フラグ：1＝介入期間、0＝介入前期間',
+            '※ 統計的判断に必要な信頼区間の情報は、「詳細レポート」および「サマリー表」でご確認ください。'
+        ]
+    )
 
-    # Base64エンコード
-    csv_string = csv_buffer.getvalue()
-    csv_base64 = base64.b64encode(csv_string.encode('utf-8-sig')).decode()
     
     # ファイル名生成
     treatment_name = analysis_info.get('treatment_name', '分析対象')
@@ -2038,7 +1004,13 @@ def get_comprehensive_csv_download_link(ci, analysis_info, confidence_level=95):
     
     filename = f"causal_impact_detail_{treatment_name}_{period_start.strftime('%Y%m%d')}_{period_end.strftime('%Y%m%d')}_{analysis_type_short}.csv"
     
-    # ダウンロードリンク生成
-    href = f'data:text/csv;charset=utf-8-sig;base64,{csv_base64}'
+    return build_csv_file(chunks, filename, compression)
+
+def get_comprehensive_csv_download_link(ci, analysis_info, confidence_level=95, result=None):
+    """
+    予測値・実測値の詳細データのCSVをbase64のdata URIとして返す関数（互換用）
     
-    return href, filename
\ No newline at end of file
+    画面では build_comprehensive_csv の内容を st.download_button に直接渡す。
+    """
+    data, filename = build_comprehensive_csv(ci, analysis_info, confidence_level=confidence_level, result=result)
+    return to_data_uri(data.getvalue(), CSV_MIME), filename
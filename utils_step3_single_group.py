@@ -1,12 +1,14 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-import re
 import io
-import base64
-from causalimpact import CausalImpact
 import matplotlib
 matplotlib.use('Agg')  # バックエンドを明示的に指定（サーバー環境対応）
+from utils_pdf import build_figure_flowable, apply_subset_font
+from utils_figure import get_figure_manager
+from utils_download import to_data_uri, CSV_MIME, PDF_MIME
+from utils_csv import iter_csv_chunks, build_csv_file
+from utils_result import get_analysis_result, get_p_value, get_report_values, build_model_summary_rows, build_inference_summary_rows, get_effect_summary
 
 def run_single_group_causal_impact_analysis(data, pre_period, post_period, nseasons=7, season_duration=1):
     """
@@ -54,7 +56,8 @@ def run_single_group_causal_impact_analysis(data, pre_period, post_period, nseas
             'dynamic.regression': True
         }
         
-        # Causal Impact分析を実行
+        # Causal Impact分析を実行（causalimpactは読み込みが重いため実行時に読み込む）
+        from causalimpact import CausalImpact
         ci = CausalImpact(analysis_data, pre_period, post_period, model_args=model_args)
         
         # サマリーとレポートを取得
@@ -114,6 +117,9 @@ def run_single_group_causal_impact_analysis(data, pre_period, post_period, nseas
         
         plt.tight_layout()
         
+        # pyplot のグラフ一覧から切り離す（分析のたびにグラフが溜まらないように）
+        fig = get_figure_manager().adopt(fig)
+        
         return ci, summary, report, fig
         
     except Exception as e:
@@ -190,7 +196,7 @@ def suggest_intervention_point(data, min_pre_period_ratio=0.6):
     Returns:
     --------
     suggested_date : datetime
-        推奨介入日
+        推奨介入日（水準の変化点。検出できない場合は全体の70%地点）
     pre_period_days : int
         介入前期間の日数
     post_period_days : int
@@ -200,14 +206,26 @@ def suggest_intervention_point(data, min_pre_period_ratio=0.6):
         total_days = len(data)
         min_pre_days = int(total_days * min_pre_period_ratio)
         
-        # 推奨介入ポイントは全体の70%地点
-        suggested_index = int(total_days * 0.7)
+        # 変化点検出で介入前期間の最低比率を満たす最上位の候補を推奨介入ポイントとする
+        suggested_date = None
+        try:
+            from utils_changepoint import suggest_change_point_index
+            change_date, change_index, _ = suggest_change_point_index(data, min_pre_ratio=min_pre_period_ratio)
+            if change_date is not None:
+                suggested_date = change_date
+                suggested_index = change_index
+        except Exception as e:
+            print(f"変化点検出エラー（70%地点を使用）: {str(e)}")
         
-        # データの第1列（日付列）を取得
-        if 'ymd' in data.columns:
-            suggested_date = data.iloc[suggested_index]['ymd']
-        else:
-            suggested_date = data.iloc[suggested_index, 0]
+        if suggested_date is None:
+            # 変化点が見つからない場合は全体の70%地点（介入前期間の最低比率は確保）
+            suggested_index = max(min_pre_days, int(total_days * 0.7))
+            
+            # データの第1列（日付列）を取得
+            if 'ymd' in data.columns:
+                suggested_date = data.iloc[suggested_index]['ymd']
+            else:
+                suggested_date = data.iloc[suggested_index, 0]
         
         # 日付型への変換を確実に行う
         if isinstance(suggested_date, str):
@@ -232,7 +250,7 @@ def suggest_intervention_point(data, min_pre_period_ratio=0.6):
         suggested_index = int(total_days * 0.7)
         return "エラー：推奨日計算失敗", suggested_index, total_days - suggested_index - 1
 
-def build_single_group_app_summary_table(ci, confidence_level=95):
+def build_single_group_app_summary_table(ci, confidence_level=95, result=None):
     """
     単群推定分析のアプリ画面表示用の日本語固定サマリーテーブル生成関数
     PDF出力とは独立してアプリ画面では常に日本語表記
@@ -243,6 +261,8 @@ def build_single_group_app_summary_table(ci, confidence_level=95):
         分析結果オブジェクト
     confidence_level : int
         信頼水準（%）、デフォルト95%
+    result : AnalysisResult, optional
+        分析結果オブジェクト（省略時は ci から作成）
         
     Returns:
     --------
@@ -252,7 +272,6 @@ def build_single_group_app_summary_table(ci, confidence_level=95):
     try:
         import pandas as pd
         import numpy as np
-        import re
         
         # アプリ画面用日本語固定コンテンツ
         try:
@@ -272,193 +291,12 @@ def build_single_group_app_summary_table(ci, confidence_level=95):
                 'table_p_value': 'p値'
             }
         
-        # CausalImpactのsummary_dataから直接取得（より確実）
-        if hasattr(ci, 'summary_data') and ci.summary_data is not None:
-            summary_data = ci.summary_data
-            results_data = []
-            
-            # p値の取得
-            p_value = None
-            if hasattr(ci, 'p_value'):
-                p_value = ci.p_value
-            else:
-                # summary()テキストからp値を抽出
-                try:
-                    summary_text = str(ci.summary())
-                    p_match = re.search(r'Posterior tail-area probability p:\s+([0-9.]+)', summary_text)
-                    if p_match:
-                        p_value = float(p_match.group(1))
-                except:
-                    pass
-            
-            # 項目を順番に処理（日本語固定）
-            
-            # 1. 実測値
-            for index_name in summary_data.index:
-                if 'actual' in str(index_name).lower():
-                    avg_val = summary_data.loc[index_name, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[index_name].iloc[0]
-                    cum_val = summary_data.loc[index_name, 'Cumulative'] if 'Cumulative' in summary_data.columns else summary_data.loc[index_name].iloc[1]
-                    results_data.append([content['table_actual'], f"{avg_val:.1f}", f"{cum_val:.1f}"])
-                    break
-            
-            # 2. 予測値
-            for index_name in summary_data.index:
-                if ('predicted' in str(index_name).lower() or 'prediction' in str(index_name).lower()) and 'lower' not in str(index_name).lower() and 'upper' not in str(index_name).lower():
-                    avg_val = summary_data.loc[index_name, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[index_name].iloc[0]
-                    cum_val = summary_data.loc[index_name, 'Cumulative'] if 'Cumulative' in summary_data.columns else summary_data.loc[index_name].iloc[1]
-                    results_data.append([content['table_predicted'], f"{avg_val:.1f}", f"{cum_val:.1f}"])
-                    break
-            
-            # 3. 予測値信頼区間（予測値のすぐ下に配置）
-            pred_lower = None
-            pred_upper = None
-            for index_name in summary_data.index:
-                if 'predicted' in str(index_name).lower() and 'lower' in str(index_name).lower():
-                    pred_lower = index_name
-                elif 'predicted' in str(index_name).lower() and 'upper' in str(index_name).lower():
-                    pred_upper = index_name
-            
-            if pred_lower and pred_upper:
-                lower_avg = summary_data.loc[pred_lower, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[pred_lower].iloc[0]
-                upper_avg = summary_data.loc[pred_upper, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[pred_upper].iloc[0]
-                lower_cum = summary_data.loc[pred_lower, 'Cumulative'] if 'Cumulative' in summary_data.columns else summary_data.loc[pred_lower].iloc[1]
-                upper_cum = summary_data.loc[pred_upper, 'Cumulative'] if 'Cumulative' in summary_data.columns else summary_data.loc[pred_upper].iloc[1]
-                ci_label = content['table_predicted_ci'].format(confidence_level)
-                results_data.append([ci_label, f"[{lower_avg:.1f}, {upper_avg:.1f}]", f"[{lower_cum:.1f}, {upper_cum:.1f}]"])
-            
-            # 4. 絶対効果
-            for index_name in summary_data.index:
-                if ('abseffect' in str(index_name).lower() or 'abs_effect' in str(index_name).lower() or 'absolute' in str(index_name).lower()) and 'lower' not in str(index_name).lower() and 'upper' not in str(index_name).lower():
-                    avg_val = summary_data.loc[index_name, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[index_name].iloc[0]
-                    cum_val = summary_data.loc[index_name, 'Cumulative'] if 'Cumulative' in summary_data.columns else summary_data.loc[index_name].iloc[1]
-                    results_data.append([content['table_absolute_effect'], f"{avg_val:.1f}", f"{cum_val:.1f}"])
-                    break
-            
-            # 5. 相対効果
-            for index_name in summary_data.index:
-                if ('releffect' in str(index_name).lower() or 'rel_effect' in str(index_name).lower() or 'relative' in str(index_name).lower()) and 'lower' not in str(index_name).lower() and 'upper' not in str(index_name).lower():
-                    avg_val = summary_data.loc[index_name, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[index_name].iloc[0]
-                    # %変換
-                    rel_pct = avg_val * 100 if abs(avg_val) < 10 else avg_val
-                    results_data.append([content['table_relative_effect'], f"{rel_pct:.1f}%", f"{rel_pct:.1f}%"])
-                    break
-            
-            # 6. p値
-            if p_value is not None:
-                results_data.append([content['table_p_value'], f"{p_value:.4f}", f"{p_value:.4f}"])
-            
-            # DataFrameを作成（日本語固定）
-            columns = [
-                content['table_indicator'],
-                content['table_avg_analysis_period'], 
-                content['table_total_analysis_period']
-            ]
-            df_result = pd.DataFrame(results_data, columns=columns)
-            
-            return df_result
-        
-        else:
-            # フォールバック：テキスト解析（日本語固定）
-            return build_single_group_app_text_based_summary_table(ci, confidence_level)
-        
-    except Exception as e:
-        print(f"Error in build_single_group_app_summary_table: {e}")
-        # エラーの場合は日本語固定フォールバックを使用
-        return build_single_group_guaranteed_japanese_table(ci, confidence_level)
-
-def build_single_group_app_text_based_summary_table(ci, confidence_level=95):
-    """
-    単群推定のアプリ画面用：CausalImpactのテキスト出力を解析して日本語固定テーブルを生成
-    """
-    try:
-        import pandas as pd
-        import re
-        
-        # アプリ画面用日本語固定コンテンツ
-        try:
-            from config.app_templates import get_app_content
-            content = get_app_content()
-        except:
-            content = {
-                'table_indicator': '指標',
-                'table_avg_analysis_period': '分析期間の平均値',
-                'table_total_analysis_period': '分析期間の累積値',
-                'table_actual': '実測値',
-                'table_predicted': '予測値',
-                'table_predicted_ci': f'予測値 {confidence_level}% 信頼区間',
-                'table_absolute_effect': '絶対効果',
-                'table_relative_effect': '相対効果',
-                'table_p_value': 'p値'
-            }
-        
-        # CausalImpactのsummary()を取得
-        summary_text = str(ci.summary())
-        lines = [l for l in summary_text.split('\n') if l.strip()]
-        
-        results_data = []
-        
-        # p値を抽出
-        p_value = None
-        for line in lines:
-            if 'Posterior tail-area probability p:' in line:
-                p_match = re.search(r'p:\s+([0-9.]+)', line)
-                if p_match:
-                    p_value = float(p_match.group(1))
-                    break
-        
-        # テキスト解析で日本語固定変換
-        for line in lines[1:]:  # ヘッダー行をスキップ
-            if not line.strip():
-                continue
-                
-            parts = re.split(r'\s{2,}', line.strip())
-            if len(parts) >= 2:
-                item_name = parts[0]
-                avg_value = parts[1] if len(parts) > 1 else ""
-                cum_value = parts[2] if len(parts) > 2 else avg_value
-                
-                # 日本語固定変換辞書
-                translation_dict = {
-                    'Actual': content['table_actual'],
-                    'Predicted': content['table_predicted'],
-                    'AbsEffect': content['table_absolute_effect'],
-                    'RelEffect': content['table_relative_effect']
-                }
-                
-                jp_name = translation_dict.get(item_name, item_name)
-                
-                # CI行の判定と変換
-                if '95% CI' in line or 'CI' in item_name:
-                    if 'Predicted' in line or 'predicted' in item_name.lower():
-                        jp_name = content['table_predicted_ci'].format(confidence_level)
-                    elif 'AbsEffect' in line or 'abs' in item_name.lower():
-                        jp_name = f"{content['table_absolute_effect']} {confidence_level}% 信頼区間"
-                    elif 'RelEffect' in line or 'rel' in item_name.lower():
-                        jp_name = f"{content['table_relative_effect']} {confidence_level}% 信頼区間"
-                
-                # 相対効果の%変換
-                if 'rel' in jp_name.lower() or '相対効果' in jp_name:
-                    if '[' in avg_value and ']' in avg_value and '%' not in avg_value:
-                        # 信頼区間の%変換
-                        matches = re.findall(r'[-+]?[0-9]*\.?[0-9]+', avg_value)
-                        if len(matches) >= 2:
-                            lower = float(matches[0]) * 100
-                            upper = float(matches[1]) * 100
-                            avg_value = f"[{lower:.1f}%, {upper:.1f}%]"
-                            cum_value = avg_value
-                    elif '%' not in avg_value:
-                        try:
-                            rel_val = float(avg_value) * 100
-                            avg_value = f"{rel_val:.1f}%"
-                            cum_value = avg_value
-                        except:
-                            pass
-                
-                results_data.append([jp_name, avg_value, cum_value])
-        
-        # p値を追加
-        if p_value is not None:
-            results_data.append([content['table_p_value'], f"{p_value:.4f}", f"{p_value:.4f}"])
+        # 分析結果オブジェクト（ci.summary_data の値、ない場合は日次の推定結果）から作成
+        if result is None:
+            result = get_analysis_result(ci)
+        results_data = build_model_summary_rows(result, content, confidence_level)
+        if not results_data:
+            return build_single_group_guaranteed_japanese_table(ci, confidence_level)
         
         # DataFrameを作成（日本語固定）
         columns = [
@@ -471,10 +309,11 @@ def build_single_group_app_text_based_summary_table(ci, confidence_level=95):
         return df_result
         
     except Exception as e:
-        print(f"Error in build_single_group_app_text_based_summary_table: {e}")
+        print(f"Error in build_single_group_app_summary_table: {e}")
+        # エラーの場合は日本語固定フォールバックを使用
         return build_single_group_guaranteed_japanese_table(ci, confidence_level)
 
-def build_single_group_unified_summary_table(ci, confidence_level=95):
+def build_single_group_unified_summary_table(ci, confidence_level=95, result=None):
     """
     単群推定分析のCausalImpactのsummary()出力を直接使用して統一した分析結果テーブルを生成する関数
     詳細レポート、分析結果概要、CSV出力で同じ数値を使用して一貫性を保つ
@@ -486,6 +325,8 @@ def build_single_group_unified_summary_table(ci, confidence_level=95):
         分析結果オブジェクト
     confidence_level : int
         信頼水準（%）、デフォルト95%
+    result : AnalysisResult, optional
+        分析結果オブジェクト（省略時は ci から作成）
         
     Returns:
     --------
@@ -495,7 +336,6 @@ def build_single_group_unified_summary_table(ci, confidence_level=95):
     try:
         import pandas as pd
         import numpy as np
-        import re
         
         # 多言語対応コンテンツの取得
         try:
@@ -518,184 +358,26 @@ def build_single_group_unified_summary_table(ci, confidence_level=95):
             }
             use_japanese = True
         
-        # CausalImpactのsummary_dataから直接取得（より確実）
-        if hasattr(ci, 'summary_data') and ci.summary_data is not None:
-            summary_data = ci.summary_data
-            results_data = []
-            
-            # p値の取得
-            p_value = None
-            if hasattr(ci, 'p_value'):
-                p_value = ci.p_value
-            else:
-                # summary()テキストからp値を抽出
-                try:
-                    summary_text = str(ci.summary())
-                    p_match = re.search(r'Posterior tail-area probability p:\s+([0-9.]+)', summary_text)
-                    if p_match:
-                        p_value = float(p_match.group(1))
-                except:
-                    pass
-            
-            # 項目を順番に処理（シンプルな構成）
-            
-            # 1. 実測値
-            for index_name in summary_data.index:
-                if 'actual' in str(index_name).lower():
-                    avg_val = summary_data.loc[index_name, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[index_name].iloc[0]
-                    cum_val = summary_data.loc[index_name, 'Cumulative'] if 'Cumulative' in summary_data.columns else summary_data.loc[index_name].iloc[1]
-                    results_data.append([content['table_actual'], f"{avg_val:.1f}", f"{cum_val:.1f}"])
-                    break
-            
-            # 2. 予測値
-            for index_name in summary_data.index:
-                if ('predicted' in str(index_name).lower() or 'prediction' in str(index_name).lower()) and 'lower' not in str(index_name).lower() and 'upper' not in str(index_name).lower():
-                    avg_val = summary_data.loc[index_name, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[index_name].iloc[0]
-                    cum_val = summary_data.loc[index_name, 'Cumulative'] if 'Cumulative' in summary_data.columns else summary_data.loc[index_name].iloc[1]
-                    results_data.append([content['table_predicted'], f"{avg_val:.1f}", f"{cum_val:.1f}"])
-                    break
-            
-            # 3. 予測値信頼区間（予測値のすぐ下に配置）
-            pred_lower = None
-            pred_upper = None
-            for index_name in summary_data.index:
-                if 'predicted' in str(index_name).lower() and 'lower' in str(index_name).lower():
-                    pred_lower = index_name
-                elif 'predicted' in str(index_name).lower() and 'upper' in str(index_name).lower():
-                    pred_upper = index_name
-            
-            if pred_lower and pred_upper:
-                lower_avg = summary_data.loc[pred_lower, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[pred_lower].iloc[0]
-                upper_avg = summary_data.loc[pred_upper, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[pred_upper].iloc[0]
-                lower_cum = summary_data.loc[pred_lower, 'Cumulative'] if 'Cumulative' in summary_data.columns else summary_data.loc[pred_lower].iloc[1]
-                upper_cum = summary_data.loc[pred_upper, 'Cumulative'] if 'Cumulative' in summary_data.columns else summary_data.loc[pred_upper].iloc[1]
-                ci_label = content['table_predicted_ci'].format(confidence_level)
-                results_data.append([ci_label, f"[{lower_avg:.1f}, {upper_avg:.1f}]", f"[{lower_cum:.1f}, {upper_cum:.1f}]"])
-            
-            # 4. 絶対効果
-            for index_name in summary_data.index:
-                if ('abseffect' in str(index_name).lower() or 'abs_effect' in str(index_name).lower() or 'absolute' in str(index_name).lower()) and 'lower' not in str(index_name).lower() and 'upper' not in str(index_name).lower():
-                    avg_val = summary_data.loc[index_name, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[index_name].iloc[0]
-                    cum_val = summary_data.loc[index_name, 'Cumulative'] if 'Cumulative' in summary_data.columns else summary_data.loc[index_name].iloc[1]
-                    results_data.append([content['table_absolute_effect'], f"{avg_val:.1f}", f"{cum_val:.1f}"])
-                    break
-            
-            # 5. 相対効果
-            for index_name in summary_data.index:
-                if ('releffect' in str(index_name).lower() or 'rel_effect' in str(index_name).lower() or 'relative' in str(index_name).lower()) and 'lower' not in str(index_name).lower() and 'upper' not in str(index_name).lower():
-                    avg_val = summary_data.loc[index_name, 'Average'] if 'Average' in summary_data.columns else summary_data.loc[index_name].iloc[0]
-                    # %変換
-                    rel_pct = avg_val * 100 if abs(avg_val) < 10 else avg_val
-                    results_data.append([content['table_relative_effect'], f"{rel_pct:.1f}%", f"{rel_pct:.1f}%"])
-                    break
-            
-            # 6. p値
-            if p_value is not None:
-                results_data.append([content['table_p_value'], f"{p_value:.4f}", f"{p_value:.4f}"])
-            
-            # DataFrameを作成（多言語対応）
-            columns = [
-                content['table_indicator'],
-                content['table_avg_analysis_period'], 
-                content['table_total_analysis_period']
-            ]
-            df_result = pd.DataFrame(results_data, columns=columns)
-            
-            return df_result
+        # 分析結果オブジェクト（ci.summary_data の値、ない場合は日次の推定結果）から作成
+        if result is None:
+            result = get_analysis_result(ci)
+        results_data = build_model_summary_rows(result, content, confidence_level)
+        if not results_data:
+            return build_single_group_guaranteed_japanese_table(ci, confidence_level)
         
-        else:
-            # フォールバック：テキスト解析
-            return build_single_group_text_based_summary_table(ci, confidence_level)
-        
-    except Exception as e:
-        print(f"Error in build_single_group_unified_summary_table: {e}")
-        # エラーの場合は確実な日本語表記のフォールバックを使用
-        return build_single_group_guaranteed_japanese_table(ci, confidence_level)
-
-def build_single_group_text_based_summary_table(ci, confidence_level=95):
-    """
-    CausalImpactのテキスト出力を解析して日本語表記のテーブルを生成
-    """
-    try:
-        import pandas as pd
-        import re
-        
-        # CausalImpactのsummary()を取得
-        summary_text = str(ci.summary())
-        lines = [l for l in summary_text.split('\n') if l.strip()]
-        
-        results_data = []
-        
-        # p値を抽出
-        p_value = None
-        for line in lines:
-            if 'Posterior tail-area probability p:' in line:
-                p_match = re.search(r'p:\s+([0-9.]+)', line)
-                if p_match:
-                    p_value = float(p_match.group(1))
-                    break
-        
-        # テキスト解析で確実な日本語化
-        for line in lines[1:]:  # ヘッダー行をスキップ
-            if not line.strip():
-                continue
-                
-            parts = re.split(r'\s{2,}', line.strip())
-            if len(parts) >= 2:
-                item_name = parts[0]
-                avg_value = parts[1] if len(parts) > 1 else ""
-                cum_value = parts[2] if len(parts) > 2 else avg_value
-                
-                # 完全な英語→日本語変換辞書
-                translation_dict = {
-                    'Actual': '実測値',
-                    'Predicted': '予測値（標準偏差）',
-                    'AbsEffect': '絶対効果（標準偏差）',
-                    'RelEffect': '相対効果（標準偏差）'
-                }
-                
-                jp_name = translation_dict.get(item_name, item_name)
-                
-                # CI行の判定と変換
-                if '95% CI' in line or 'CI' in item_name:
-                    if 'Predicted' in line or 'predicted' in item_name.lower():
-                        jp_name = f'予測値 {confidence_level}% 信頼区間'
-                    elif 'AbsEffect' in line or 'abs' in item_name.lower():
-                        jp_name = f'絶対効果 {confidence_level}% 信頼区間'
-                    elif 'RelEffect' in line or 'rel' in item_name.lower():
-                        jp_name = f'相対効果 {confidence_level}% 信頼区間'
-                
-                # 相対効果の%変換
-                if 'rel' in jp_name.lower() or '相対効果' in jp_name:
-                    if '[' in avg_value and ']' in avg_value and '%' not in avg_value:
-                        # 信頼区間の%変換
-                        matches = re.findall(r'[-+]?[0-9]*\.?[0-9]+', avg_value)
-                        if len(matches) >= 2:
-                            lower = float(matches[0]) * 100
-                            upper = float(matches[1]) * 100
-                            avg_value = f"[{lower:.1f}%, {upper:.1f}%]"
-                            cum_value = avg_value
-                    elif '%' not in avg_value:
-                        try:
-                            rel_val = float(avg_value) * 100
-                            avg_value = f"{rel_val:.1f}%"
-                            cum_value = avg_value
-                        except:
-                            pass
-                
-                results_data.append([jp_name, avg_value, cum_value])
-        
-        # p値を追加
-        if p_value is not None:
-            results_data.append(['p値', f"{p_value:.4f}", f"{p_value:.4f}"])
-        
-        # DataFrameを作成
-        df_result = pd.DataFrame(results_data, columns=['指標', '分析期間の平均値', '分析期間の累積値'])
+        # DataFrameを作成（多言語対応）
+        columns = [
+            content['table_indicator'],
+            content['table_avg_analysis_period'], 
+            content['table_total_analysis_period']
+        ]
+        df_result = pd.DataFrame(results_data, columns=columns)
         
         return df_result
         
     except Exception as e:
-        print(f"Error in build_single_group_text_based_summary_table: {e}")
+        print(f"Error in build_single_group_unified_summary_table: {e}")
+        # エラーの場合は確実な日本語表記のフォールバックを使用
         return build_single_group_guaranteed_japanese_table(ci, confidence_level)
 
 def build_single_group_guaranteed_japanese_table(ci, confidence_level=95):
@@ -724,7 +406,7 @@ def build_single_group_guaranteed_japanese_table(ci, confidence_level=95):
         # 最終フォールバック
         return pd.DataFrame(columns=['指標', '分析期間の平均値', '分析期間の累積値'])
 
-def build_single_group_summary_dataframe(ci, alpha_percent):
+def build_single_group_summary_dataframe(ci, alpha_percent, result=None):
     """
     単群推定の分析結果を見やすい表形式で整理する関数（アプリ画面表示用）
     アプリ画面では常に日本語表記を使用
@@ -735,261 +417,37 @@ def build_single_group_summary_dataframe(ci, alpha_percent):
         分析結果オブジェクト
     alpha_percent : int
         信頼水準（%）、95等を想定
+    result : AnalysisResult, optional
+        分析結果オブジェクト（省略時は ci から作成）
         
     Returns:
     --------
     pandas.DataFrame
         整形された分析結果テーブル（日本語固定）
     """
+    try:
+        if result is None:
+            result = get_analysis_result(ci)
+    except Exception as e:
+        print(f"Analysis result extraction error: {e}")
+        result = None
+    
     try:
         # アプリ画面用の日本語固定関数を使用
-        app_result = build_single_group_app_summary_table(ci, alpha_percent)
+        app_result = build_single_group_app_summary_table(ci, alpha_percent, result=result)
         if app_result is not None and not app_result.empty:
             return app_result
     except Exception as e:
         print(f"Single group app summary function error: {e}")
     
     # 統一関数が失敗した場合でも日本語表記を保証する独自実装
+    # （介入期間の日次推定結果から集計）
     try:
-        import pandas as pd
-        import numpy as np
-        
-        # CausalImpactのsummary()から数値を取得
-        summary_text = str(ci.summary())
-        lines = [l for l in summary_text.split('\n') if l.strip()]
-        
-        results_data = []
-        
-        # データの解析
-        actual_avg = None
-        pred_avg = None
-        pred_sd = None
-        pred_ci_lower = None
-        pred_ci_upper = None
-        abs_avg = None
-        abs_sd = None
-        abs_ci_lower = None
-        abs_ci_upper = None
-        rel_avg = None
-        rel_sd = None
-        rel_ci_lower = None
-        rel_ci_upper = None
-        p_value = None
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            if 'Actual' in line:
-                parts = line.split()
-                if len(parts) >= 2:
-                    try:
-                        actual_avg = float(parts[1])
-                    except:
-                        pass
-                        
-            elif 'Predicted' in line:
-                parts = line.split()
-                if len(parts) >= 4:
-                    try:
-                        pred_avg = float(parts[1])
-                        if '(' in parts[2] and ')' in parts[3]:
-                            pred_sd_str = parts[2].replace('(', '') + parts[3].replace(')', '')
-                            pred_sd = float(pred_sd_str)
-                    except:
-                        pass
-                if len(parts) >= 6:
-                    try:
-                        ci_str = ' '.join(parts[4:6])
-                        ci_str = ci_str.replace('[', '').replace(']', '').replace(',', '')
-                        ci_parts = ci_str.split()
-                        if len(ci_parts) >= 2:
-                            pred_ci_lower = float(ci_parts[0])
-                            pred_ci_upper = float(ci_parts[1])
-                    except:
-                        pass
-                        
-            elif 'AbsEffect' in line:
-                parts = line.split()
-                if len(parts) >= 4:
-                    try:
-                        abs_avg = float(parts[1])
-                        if '(' in parts[2] and ')' in parts[3]:
-                            abs_sd_str = parts[2].replace('(', '') + parts[3].replace(')', '')
-                            abs_sd = float(abs_sd_str)
-                    except:
-                        pass
-                if len(parts) >= 6:
-                    try:
-                        ci_str = ' '.join(parts[4:6])
-                        ci_str = ci_str.replace('[', '').replace(']', '').replace(',', '')
-                        ci_parts = ci_str.split()
-                        if len(ci_parts) >= 2:
-                            abs_ci_lower = float(ci_parts[0])
-                            abs_ci_upper = float(ci_parts[1])
-                    except:
-                        pass
-                        
-            elif 'RelEffect' in line:
-                parts = line.split()
-                if len(parts) >= 4:
-                    try:
-                        rel_str = parts[1].replace('%', '')
-                        rel_avg = float(rel_str)
-                        if '(' in parts[2] and ')' in parts[3]:
-                            rel_sd_str = parts[2].replace('(', '').replace('%', '') + parts[3].replace(')', '').replace('%', '')
-                            rel_sd = float(rel_sd_str)
-                    except:
-                        pass
-                if len(parts) >= 6:
-                    try:
-                        ci_str = ' '.join(parts[4:6])
-                        ci_str = ci_str.replace('[', '').replace(']', '').replace(',', '').replace('%', '')
-                        ci_parts = ci_str.split()
-                        if len(ci_parts) >= 2:
-                            rel_ci_lower = float(ci_parts[0])
-                            rel_ci_upper = float(ci_parts[1])
-                    except:
-                        pass
-                        
-            elif 'Posterior tail-area probability p:' in line:
-                import re
-                p_match = re.search(r'p:\s+([0-9.]+)', line)
-                if p_match:
-                    try:
-                        p_value = float(p_match.group(1))
-                    except:
-                        pass
-        
-        # 累積値の計算（実際のデータから）
-        try:
-            if hasattr(ci, 'inferences') and ci.inferences is not None:
-                df = ci.inferences.copy().reset_index()
-                
-                # 日付列を統一
-                if 'index' in df.columns:
-                    df = df.rename(columns={'index': 'date'})
-                
-                # 列名マッピング
-                column_mapping = {
-                    'predicted': 'preds',
-                    'point_effects': 'point_effects'
-                }
-                
-                for old_name, new_name in column_mapping.items():
-                    if old_name in df.columns:
-                        df = df.rename(columns={old_name: new_name})
-                
-                # 介入期間のデータのみを抽出
-                analysis_period = None
-                try:
-                    import streamlit as st
-                    if hasattr(st, 'session_state') and 'analysis_period' in st.session_state:
-                        analysis_period = st.session_state['analysis_period']
-                except:
-                    pass
-                
-                if analysis_period and 'post_start' in analysis_period and 'post_end' in analysis_period:
-                    post_start = pd.to_datetime(analysis_period['post_start'])
-                    post_end = pd.to_datetime(analysis_period['post_end'])
-                    mask_post = (pd.to_datetime(df['date']) >= post_start) & (pd.to_datetime(df['date']) <= post_end)
-                    post_data = df[mask_post].copy()
-                else:
-                    post_data = df.copy()
-                
-                # 累積値計算
-                if 'preds' in post_data.columns and 'point_effects' in post_data.columns:
-                    # 実測値の累積
-                    y_values = post_data['preds'] + post_data['point_effects']
-                    actual_cum = y_values.sum()
-                    
-                    # 予測値の累積
-                    pred_cum = post_data['preds'].sum()
-                    
-                    # 絶対効果の累積
-                    abs_cum = post_data['point_effects'].sum()
-                    
-                    # 相対効果の累積
-                    rel_cum = (abs_cum / pred_cum * 100) if pred_cum != 0 else 0
-                else:
-                    actual_cum = actual_avg * len(post_data) if actual_avg and len(post_data) > 0 else None
-                    pred_cum = pred_avg * len(post_data) if pred_avg and len(post_data) > 0 else None
-                    abs_cum = abs_avg * len(post_data) if abs_avg and len(post_data) > 0 else None
-                    rel_cum = rel_avg
-        except:
-            # フォールバック：平均値×期間で累積値を推定
-            actual_cum = actual_avg
-            pred_cum = pred_avg
-            abs_cum = abs_avg
-            rel_cum = rel_avg
-        
-        # 結果データを日本語表記で構築
-        if actual_avg is not None:
-            if actual_cum is not None:
-                results_data.append(['実測値', f"{actual_avg:.1f}", f"{actual_cum:,.1f}"])
-            else:
-                results_data.append(['実測値', f"{actual_avg:.1f}", f"{actual_avg:.1f}"])
-        
-        if pred_avg is not None:
-            if pred_sd is not None:
-                if pred_cum is not None:
-                    results_data.append(['予測値（標準偏差）', f"{pred_avg:.1f} ({pred_sd:.1f})", f"{pred_cum:,.1f} ({pred_sd:.1f})"])
-                else:
-                    results_data.append(['予測値（標準偏差）', f"{pred_avg:.1f} ({pred_sd:.1f})", f"{pred_avg:.1f} ({pred_sd:.1f})"])
-            else:
-                if pred_cum is not None:
-                    results_data.append(['予測値（標準偏差）', f"{pred_avg:.1f}", f"{pred_cum:,.1f}"])
-                else:
-                    results_data.append(['予測値（標準偏差）', f"{pred_avg:.1f}", f"{pred_avg:.1f}"])
-        
-        if pred_ci_lower is not None and pred_ci_upper is not None:
-            ci_str = f"[{pred_ci_lower:.1f}, {pred_ci_upper:.1f}]"
-            if pred_cum is not None:
-                # 累積値の信頼区間も適切に計算（簡易的に平均値の信頼区間を使用）
-                results_data.append([f'予測値 {alpha_percent}% 信頼区間', ci_str, ci_str])
-            else:
-                results_data.append([f'予測値 {alpha_percent}% 信頼区間', ci_str, ci_str])
-        
-        if abs_avg is not None:
-            if abs_sd is not None:
-                if abs_cum is not None:
-                    results_data.append(['絶対効果（標準偏差）', f"{abs_avg:.1f} ({abs_sd:.1f})", f"{abs_cum:,.1f} ({abs_sd:.1f})"])
-                else:
-                    results_data.append(['絶対効果（標準偏差）', f"{abs_avg:.1f} ({abs_sd:.1f})", f"{abs_avg:.1f} ({abs_sd:.1f})"])
-            else:
-                if abs_cum is not None:
-                    results_data.append(['絶対効果（標準偏差）', f"{abs_avg:.1f}", f"{abs_cum:,.1f}"])
-                else:
-                    results_data.append(['絶対効果（標準偏差）', f"{abs_avg:.1f}", f"{abs_avg:.1f}"])
+        if result is None:
+            return build_single_group_guaranteed_japanese_table(ci, alpha_percent)
         
-        if abs_ci_lower is not None and abs_ci_upper is not None:
-            ci_str = f"[{abs_ci_lower:.1f}, {abs_ci_upper:.1f}]"
-            results_data.append([f'絶対効果 {alpha_percent}% 信頼区間', ci_str, ci_str])
-        
-        if rel_avg is not None:
-            if rel_sd is not None:
-                if rel_cum is not None:
-                    results_data.append(['相対効果（標準偏差）', f"{rel_avg:.1f}% ({rel_sd:.1f}%)", f"{rel_cum:.1f}% ({rel_sd:.1f}%)"])
-                else:
-                    results_data.append(['相対効果（標準偏差）', f"{rel_avg:.1f}% ({rel_sd:.1f}%)", f"{rel_avg:.1f}% ({rel_sd:.1f}%)"])
-            else:
-                if rel_cum is not None:
-                    results_data.append(['相対効果（標準偏差）', f"{rel_avg:.1f}%", f"{rel_cum:.1f}%"])
-                else:
-                    results_data.append(['相対効果（標準偏差）', f"{rel_avg:.1f}%", f"{rel_avg:.1f}%"])
-        
-        if rel_ci_lower is not None and rel_ci_upper is not None:
-            ci_str = f"[{rel_ci_lower:.1f}%, {rel_ci_upper:.1f}%]"
-            results_data.append([f'相対効果 {alpha_percent}% 信頼区間', ci_str, ci_str])
-        
-        if p_value is not None:
-            results_data.append(['p値', f"{p_value:.4f}", f"{p_value:.4f}"])
-        
-        # DataFrameを作成（日本語表記で統一）
-        df_result = pd.DataFrame(results_data, columns=['指標', '分析期間の平均値', '分析期間の累積値'])
-        
-        return df_result
+        results_data = build_inference_summary_rows(result, alpha_percent)
+        return pd.DataFrame(results_data, columns=['指標', '分析期間の平均値', '分析期間の累積値'])
         
     except Exception as e:
         print(f"Error in build_single_group_summary_dataframe: {e}")
@@ -1011,12 +469,13 @@ def get_single_group_interpretation(ci, alpha_level=0.05):
     --------
     str : 結果解釈テキスト
     """
-    summary_data = ci.summary_data
-    p_value = summary_data.loc['Posterior tail-area probability p:']['Posterior tail-area probability p:']
+    # 推定結果の値を直接参照（summary() のテキストは使用しない）
+    values = get_report_values(get_analysis_result(ci))
+    p_value = get_p_value(ci)
     
     # 効果の方向性を判定
-    avg_effect = summary_data.loc['Actual']['Average']
-    predicted_avg = summary_data.loc['Predicted']['Average'] 
+    avg_effect = values['actual'][0]
+    predicted_avg = values['predicted'][0]
     
     effect_direction = "正の効果" if avg_effect > predicted_avg else "負の効果"
     is_significant = p_value < alpha_level
@@ -1037,14 +496,23 @@ def get_single_group_interpretation(ci, alpha_level=0.05):
     
     return interpretation 
 
-def get_single_group_comprehensive_pdf_download_link(ci, analysis_info, summary_df, fig, confidence_level=95):
+def build_single_group_comprehensive_pdf(ci, analysis_info, summary_df, fig, confidence_level=95, result=None):
     """
-    単群推定の分析結果の包括的PDFレポートを生成してダウンロードリンクを返す関数
+    単群推定の分析結果の包括的PDFレポートの内容（bytes）を作成する関数
     """
+    # 分析結果オブジェクト（介入期間はanalysis_infoの期間）
+    try:
+        if result is None:
+            period = (analysis_info.get('period_start'), analysis_info.get('period_end'))
+            result = get_analysis_result(ci, period if all(period) else None)
+    except Exception as e:
+        print(f"分析結果オブジェクトの作成でエラー: {e}")
+        result = None
+    
     try:
         # 統一関数によるサマリーテーブルで更新
         try:
-            unified_summary_df = build_single_group_unified_summary_table(ci, confidence_level)
+            unified_summary_df = build_single_group_unified_summary_table(ci, confidence_level, result=result)
             # インデックスをリセットして統一
             unified_summary_df = unified_summary_df.reset_index(drop=True)
             summary_df = unified_summary_df
@@ -1057,9 +525,8 @@ def get_single_group_comprehensive_pdf_download_link(ci, analysis_info, summary_
     import pandas as pd
     import numpy as np
     import io
-    import base64
     from reportlab.lib.pagesizes import A4, letter
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.lib import colors
     from reportlab.lib.units import mm
@@ -1136,51 +603,11 @@ def get_single_group_comprehensive_pdf_download_link(ci, analysis_info, summary_
     period_end = analysis_info.get('period_end')
     freq_option = analysis_info.get('freq_option', '')
     
-    # 介入期間の実際のデータ件数を算出
-    total_data_count = 0
-    try:
-        if hasattr(ci, 'inferences') and ci.inferences is not None:
-            df = ci.inferences.copy()
-            
-            # インデックスが日付の場合の処理
-            if df.index.name or 'date' in str(type(df.index)):
-                df = df.reset_index()
-                if 'index' in df.columns:
-                    df = df.rename(columns={'index': 'date'})
-                elif df.columns[0] not in ['date']:
-                    df = df.rename(columns={df.columns[0]: 'date'})
-            
-            # 日付列の処理
-            if 'date' in df.columns:
-                # 日付列をdatetime型に変換
-                df['date'] = pd.to_datetime(df['date'])
-                
-                # period_startとperiod_endもdatetime型に変換
-                if period_start and period_end:
-                    period_start_dt = pd.to_datetime(period_start)
-                    period_end_dt = pd.to_datetime(period_end)
-                    
-                    # 介入期間のデータをフィルタリング
-                    post_data = df[(df['date'] >= period_start_dt) & (df['date'] <= period_end_dt)]
-                    total_data_count = len(post_data)
-                else:
-                    total_data_count = len(df)
-            else:
-                # date列がない場合は全体の件数を使用
-                total_data_count = len(df)
-        else:
-            # CausalImpactオブジェクトのdataから取得を試行
-            if hasattr(ci, 'data') and ci.data is not None:
-                df = ci.data.copy()
-                if hasattr(df, 'index'):
-                    total_data_count = len(df)
-                else:
-                    total_data_count = len(summary_df) if summary_df is not None else 0
-            else:
-                # フォールバック: サマリーテーブルの行数を使用
-                total_data_count = len(summary_df) if summary_df is not None else 0
-    except Exception as e:
-        # エラー時のフォールバック: サマリーテーブルの行数を使用
+    # 介入期間の実際のデータ件数（分析結果オブジェクトの介入期間フラグから算出）
+    if result is not None:
+        total_data_count = result.n_post
+    else:
+        # フォールバック: サマリーテーブルの行数を使用
         total_data_count = len(summary_df) if summary_df is not None else 0
     
     # 分析条件を記載（テンプレート対応）
@@ -1237,31 +664,10 @@ def get_single_group_comprehensive_pdf_download_link(ci, analysis_info, summary_
     
     # メッセージ（多言語対応）
     try:
-        # 相対効果とp値を取得
-        relative_effect = None
-        p_value = None
-        
-        # 相対効果の計算
-        if hasattr(ci, 'inferences') and ci.inferences is not None:
-            df = ci.inferences.copy().reset_index()
-            post_data = df[df['date'] >= period_start] if period_start else df
-            if 'point_effects' in post_data.columns and 'preds' in post_data.columns:
-                total_abs_effect = post_data['point_effects'].sum()
-                total_pred = post_data['preds'].sum()
-                relative_effect = (total_abs_effect / total_pred * 100) if total_pred != 0 else 0
-        
-        # p値の取得
-        if hasattr(ci, 'p_value') and ci.p_value is not None:
-            p_value = ci.p_value
-        else:
-            try:
-                import re
-                summary_text = str(ci.summary())
-                p_match = re.search(r'Posterior tail-area probability p:\s+([0-9.]+)', summary_text)
-                if p_match:
-                    p_value = float(p_match.group(1))
-            except:
-                pass
+        # 相対効果（累積値ベース）とp値を取得
+        relative_effect, p_value = None, None
+        if result is not None:
+            relative_effect, p_value, _ = get_effect_summary(result)
         
         # 多言語対応コメント生成
         if relative_effect is not None and p_value is not None:
@@ -1285,37 +691,36 @@ def get_single_group_comprehensive_pdf_download_link(ci, analysis_info, summary_
     story.append(Spacer(1, 6))
     story.append(Paragraph(content['section_graph'], heading_style))
     
-    # グラフを画像として挿入
-    img_buffer = io.BytesIO()
-    fig.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-    img_buffer.seek(0)
-    
-    img = Image(img_buffer, width=420, height=280)
-    story.append(img)
+    # グラフを挿入（ベクター形式、利用できない場合はPNG画像）
+    story.append(build_figure_flowable(fig, width=420, height=280))
     story.append(Spacer(1, 4))
     
     # グラフの見方（多言語対応）
     graph_explanation = f"　{content.get('graph_explanation_single_group', 'Graph explanation: Compare actual vs predicted data.')}"
     story.append(Paragraph(graph_explanation, normal_style))
     
-    # PDFを構築
+    # 使用する文字だけのサブセットフォントに切り替えてPDFを構築
+    story = apply_subset_font(story, font_name)
     doc.build(story)
-    pdf_buffer.seek(0)
-    
-    # Base64エンコード
-    pdf_base64 = base64.b64encode(pdf_buffer.read()).decode()
+    pdf_bytes = pdf_buffer.getvalue()
     
     # ファイル名生成
     filename = f"causal_impact_report_{treatment_name}_{period_start.strftime('%Y%m%d')}_{period_end.strftime('%Y%m%d')}_SingleGroup.pdf"
     
-    # ダウンロードリンク生成
-    href = f'data:application/pdf;base64,{pdf_base64}'
+    return pdf_bytes, filename
+
+def get_single_group_comprehensive_pdf_download_link(ci, analysis_info, summary_df, fig, confidence_level=95, result=None):
+    """
+    単群推定の包括的PDFレポートをbase64のdata URIとして返す関数（互換用）
     
-    return href, filename
+    画面では build_single_group_comprehensive_pdf の内容を st.download_button に直接渡す。
+    """
+    data, filename = build_single_group_comprehensive_pdf(ci, analysis_info, summary_df, fig, confidence_level=confidence_level, result=result)
+    return to_data_uri(data, PDF_MIME), filename
 
-def get_single_group_comprehensive_csv_download_link(ci, analysis_info, confidence_level=95):
+def build_single_group_comprehensive_csv(ci, analysis_info, confidence_level=95, result=None, compression=None):
     """
-    単群推定の予測値・実測値の詳細データをロングフォーマットCSVとしてダウンロードするリンクを生成する関数
+    単群推定の予測値・実測値の詳細データのロングフォーマットCSVファイルを作成する関数
     信頼区間の数値不一致を避けるため、ユーザー向けには8列のクリーンなフォーマットで提供
     
     Parameters:
@@ -1326,39 +731,22 @@ def get_single_group_comprehensive_csv_download_link(ci, analysis_info, confiden
         分析情報（treatment_name, period_start, period_end等）
     confidence_level : int
         信頼水準（95等）
+    result : AnalysisResult, optional
+        分析結果オブジェクト（省略時は ci から作成）
+    compression : str or None
+        圧縮形式（None, 'gzip', 'zip'）
         
     Returns:
     --------
-    href, filename : str, str
-        ダウンロードリンクのbase64データとファイル名
+    data, filename : CsvFile, str
+        作成したファイルとファイル名
     """
     import pandas as pd
     import numpy as np
-    import io
-    import base64
-    
-    # CausalImpactの結果データを取得
-    if hasattr(ci, 'inferences') and ci.inferences is not None:
-        df = ci.inferences.copy().reset_index()
-    elif hasattr(ci, 'data'):
-        df = ci.data.copy().reset_index()
-    else:
-        raise ValueError("CausalImpactオブジェクトから分析結果を取得できません")
     
-    # 日付列を統一
-    if 'index' in df.columns:
-        df = df.rename(columns={'index': 'date'})
-    elif df.index.name:
-        df = df.reset_index().rename(columns={df.index.name: 'date'})
-    
-    # 日付列が存在しない場合の対処
-    if 'date' not in df.columns:
-        # 最初の列を日付列として使用
-        if len(df.columns) > 0:
-            df = df.rename(columns={df.columns[0]: 'date'})
-        else:
-            # データフレームが空の場合は空のDataFrameを返す
-            raise ValueError("データフレームに列が存在しません")
+    # 期間情報
+    period_start = analysis_info.get('period_start')
+    period_end = analysis_info.get('period_end')
     
     # 8列の簡潔なフォーマット（信頼区間列を除去）
     jp_names = [
@@ -1371,61 +759,11 @@ def get_single_group_comprehensive_csv_download_link(ci, analysis_info, confiden
         'post_cum_y', 'post_cum_pred', 'post_cum_effects', 'post_period'
     ]
     
-    # データフレームの列名マッピング（pycausalimpactの出力に対応）
-    column_mapping = {
-        'predicted': 'preds',
-        'point_effects': 'point_effects'
-    }
-    
-    # 列名を統一
-    for old_name, new_name in column_mapping.items():
-        if old_name in df.columns:
-            df = df.rename(columns={old_name: new_name})
-    
-    # 期間情報
-    period_start = analysis_info.get('period_start')
-    period_end = analysis_info.get('period_end')
-    
-    # 実測値（y）の算出（予測値＋効果）
-    if 'y' not in df.columns:
-        if 'preds' in df.columns and 'point_effects' in df.columns:
-            df['y'] = df['preds'] + df['point_effects']
-        else:
-            df['y'] = np.nan
-    
-    # 介入期間フラグを追加
-    if period_start and period_end:
-        post_start = pd.to_datetime(period_start)
-        post_end = pd.to_datetime(period_end)
-        mask_post = (pd.to_datetime(df['date']) >= post_start) & (pd.to_datetime(df['date']) <= post_end)
-        df['post_period'] = mask_post.astype(int)  # 1が介入期間、0が介入前期間
-        
-        # 介入期間のデータのみで累積値を計算
-        post_data = df[mask_post].copy()
-        if len(post_data) > 0:
-            # 累積値を正しく計算（各行で累積されていく）
-            post_data = post_data.reset_index(drop=True)
-            post_data['post_cum_y'] = post_data['y'].cumsum()
-            post_data['post_cum_pred'] = post_data['preds'].cumsum() if 'preds' in post_data.columns else np.nan
-            post_data['post_cum_effects'] = post_data['point_effects'].cumsum() if 'point_effects' in post_data.columns else np.nan
-            
-            # 元のデータフレームの該当箇所に累積値をセット
-            post_indices = df[mask_post].index
-            for i, idx in enumerate(post_indices):
-                if i < len(post_data):
-                    df.loc[idx, 'post_cum_y'] = post_data.iloc[i]['post_cum_y']
-                    df.loc[idx, 'post_cum_pred'] = post_data.iloc[i]['post_cum_pred']
-                    df.loc[idx, 'post_cum_effects'] = post_data.iloc[i]['post_cum_effects']
-    else:
-        df['post_period'] = 0
-    
-    # 不足している列を追加（NaNで初期化）
-    for en_name in en_names:
-        if en_name not in df.columns:
-            df[en_name] = np.nan
-    
-    # 出力用データフレームを作成（8列のみ）
-    output_df = df[en_names].copy()
+    # 分析結果オブジェクトから出力用データフレームを作成（8列のみ）
+    # 累積値は介入期間のみ、介入期間フラグは 1＝介入期間、0＝介入前期間
+    if result is None:
+        result = get_analysis_result(ci, (period_start, period_end) if period_start and period_end else None)
+    output_df = result.to_frame()[en_names]
     
     # 日付をYYYY/MM/DD形式に変換
     try:
@@ -1434,39 +772,36 @@ def get_single_group_comprehensive_csv_download_link(ci, analysis_info, confiden
         # 日付変換に失敗した場合は文字列として出力
         output_df['date'] = output_df['date'].astype(str)
     
-    # CSVバッファを作成
-    csv_buffer = io.StringIO()
-    
-    # 1行目：日本語項目名
-    csv_buffer.write(','.join(jp_names) + '\n')
-    
-    # 2行目：英字変数名
-    csv_buffer.write(','.join(en_names) + '\n')
-    
-    # 3行目以降：実データ
-    output_df.to_csv(csv_buffer, index=False, header=False)
-    
-    # 注釈を追加（信頼区間の不一致について説明）
-    csv_buffer.write('\n')
-    csv_buffer.write('【CSV出力データについて】\n')
-    csv_buffer.write('※ 累積値は介入期間のみ出力されます（介入前期間はゼロまたは空欄になります）。\n')
-    csv_buffer.write('　 介入期間フラグ：1＝介入期間、0＝介入前期間\n')
-    csv_buffer.write('※ 統計的判断に必要な信頼区間の情報は、「詳細レポート」および「サマリー表」でご確認ください。\n')
-    
-    # Base64エンコード
-    csv_string = csv_buffer.getvalue()
-    csv_base64 = base64.b64encode(csv_string.encode('utf-8-sig')).decode()
+    # 1行目：日本語項目名、2行目：英字変数名、3行目以降：実データ（一定行数ごとに出力）
+    # 末尾に注釈を追加（信頼区間の不一致について説明）
+    chunks = iter_csv_chunks(
+        output_df,
+        header_rows=[jp_names, en_names],
+        footer_lines=[
+            '',
+            '【CSV出力データについて】',
+            '※ 累積値は介入期間のみ出力されます（介入前期間はゼロまたは空欄になります）。',
+            '　 介入期間フラグ：1＝介入期間、0＝介入前期間',
+            '※ 統計的判断に必要な信頼区間の情報は、「詳細レポート」および「サマリー表」でご確認ください。'
+        ]
+    )
     
     # ファイル名生成
     treatment_name = analysis_info.get('treatment_name', '分析対象')
     filename = f"causal_impact_detail_{treatment_name}_{period_start.strftime('%Y%m%d')}_{period_end.strftime('%Y%m%d')}_SingleGroup.csv"
     
-    # ダウンロードリンク生成
-    href = f'data:text/csv;charset=utf-8-sig;base64,{csv_base64}'
+    return build_csv_file(chunks, filename, compression)
+
+def get_single_group_comprehensive_csv_download_link(ci, analysis_info, confidence_level=95, result=None):
+    """
+    単群推定の予測値・実測値の詳細データのCSVをbase64のdata URIとして返す関数（互換用）
     
-    return href, filename
+    画面では build_single_group_comprehensive_csv の内容を st.download_button に直接渡す。
+    """
+    data, filename = build_single_group_comprehensive_csv(ci, analysis_info, confidence_level=confidence_level, result=result)
+    return to_data_uri(data.getvalue(), CSV_MIME), filename
 
-def get_single_group_analysis_summary_message(ci, confidence_level=95):
+def get_single_group_analysis_summary_message(ci, confidence_level=95, result=None):
     """
     単群推定の分析結果から相対効果と統計的有意性を判定してサマリーメッセージを生成する関数
     build_single_group_summary_dataframeと同じデータソースと計算方法を使用して一貫性を保つ
@@ -1477,6 +812,8 @@ def get_single_group_analysis_summary_message(ci, confidence_level=95):
         分析結果オブジェクト
     confidence_level : int
         信頼水準（%）、デフォルト95%
+    result : AnalysisResult, optional
+        分析結果オブジェクト（省略時は ci から作成）
         
     Returns:
     --------
@@ -1484,194 +821,21 @@ def get_single_group_analysis_summary_message(ci, confidence_level=95):
         分析結果のサマリーメッセージ（生成できない場合はNone）
     """
     try:
-        import pandas as pd
-        import numpy as np
-        import re
-        
-        # build_single_group_summary_dataframeと同じデータソースを使用
-        if hasattr(ci, 'inferences') and ci.inferences is not None:
-            df = ci.inferences.copy().reset_index()
-        elif hasattr(ci, 'data'):
-            df = ci.data.copy().reset_index()
-        else:
-            # フォールバック：既存の方法
-            return get_single_group_analysis_summary_message_fallback(ci, confidence_level)
-        
-        # 日付列を統一
-        if 'index' in df.columns:
-            df = df.rename(columns={'index': 'date'})
-        elif df.index.name:
-            df = df.reset_index().rename(columns={df.index.name: 'date'})
-        
-        if 'date' not in df.columns:
-            if len(df.columns) > 0:
-                df = df.rename(columns={df.columns[0]: 'date'})
-            else:
-                return get_single_group_analysis_summary_message_fallback(ci, confidence_level)
-        
-        # 列名マッピング（build_single_group_summary_dataframeと同じ）
-        column_mapping = {
-            'predicted': 'preds',
-            'point_effects': 'point_effects'
-        }
-        
-        for old_name, new_name in column_mapping.items():
-            if old_name in df.columns:
-                df = df.rename(columns={old_name: new_name})
-        
-        # 実測値（y）の算出
-        if 'y' not in df.columns:
-            if 'preds' in df.columns and 'point_effects' in df.columns:
-                df['y'] = df['preds'] + df['point_effects']
-            else:
-                df['y'] = np.nan
-        
-        # 介入期間のデータのみを抽出
-        analysis_period = None
-        try:
-            import streamlit as st
-            if hasattr(st, 'session_state') and 'analysis_period' in st.session_state:
-                analysis_period = st.session_state['analysis_period']
-        except:
-            pass
-        
-        if analysis_period and 'post_start' in analysis_period and 'post_end' in analysis_period:
-            post_start = pd.to_datetime(analysis_period['post_start'])
-            post_end = pd.to_datetime(analysis_period['post_end'])
-            mask_post = (pd.to_datetime(df['date']) >= post_start) & (pd.to_datetime(df['date']) <= post_end)
-            post_data = df[mask_post].copy()
-        else:
-            post_data = df.copy()
-        
-        if len(post_data) == 0:
-            return get_single_group_analysis_summary_message_fallback(ci, confidence_level)
-        
-        # build_single_group_summary_dataframeと同じ方法で相対効果を計算（累積値を使用）
-        relative_effect = None
-        p_value = None
-        
-        if 'point_effects' in post_data.columns and 'preds' in post_data.columns:
-            # 統一した累積値ベースの計算（アプリ表示と完全に同じ方法）
-            total_abs_effect = post_data['point_effects'].sum()
-            total_pred = post_data['preds'].sum()
-            relative_effect = (total_abs_effect / total_pred * 100) if total_pred != 0 else 0
-        
-        # p値の取得
-        if hasattr(ci, 'p_value') and ci.p_value is not None:
-            p_value = ci.p_value
-        else:
-            # テキストサマリーからp値を抽出
-            try:
-                summary_text = str(ci.summary())
-                p_match = re.search(r'Posterior tail-area probability p:\s+([0-9.]+)', summary_text)
-                if p_match:
-                    p_value = float(p_match.group(1))
-            except:
-                pass
+        if result is None:
+            result = get_analysis_result(ci)
         
-        # 統計的有意性の判定（信頼区間による）
-        is_significant = False
-        if ('point_effects_lower' in post_data.columns and 'point_effects_upper' in post_data.columns):
-            # 累積効果の信頼区間で判定
-            abs_lower_cumsum = post_data['point_effects_lower'].cumsum()
-            abs_upper_cumsum = post_data['point_effects_upper'].cumsum()
-            lower_bound = abs_lower_cumsum.iloc[-1] if len(abs_lower_cumsum) > 0 else 0
-            upper_bound = abs_upper_cumsum.iloc[-1] if len(abs_upper_cumsum) > 0 else 0
-            if (lower_bound > 0 and upper_bound > 0) or (lower_bound < 0 and upper_bound < 0):
-                is_significant = True
+        # 累積値ベースの相対効果と、信頼区間・p値による有意性判定
+        relative_effect, p_value, final_significance = get_effect_summary(result)
         
         # メッセージの生成
         if relative_effect is not None and p_value is not None:
-            # 統計的有意性の判定（p値による）
-            is_significant_by_p = p_value < 0.05
-            
-            # より確実な有意性判定（信頼区間とp値の両方を考慮）
-            final_significance = is_significant or is_significant_by_p
-            
             if final_significance:
                 return f"相対効果は {relative_effect:+.1f}% で、統計的に有意です（p = {p_value:.3f}）。詳しくは「詳細レポート」を参照ください。"
             else:
                 return f"相対効果は {relative_effect:+.1f}% ですが、統計的には有意ではありません（p = {p_value:.3f}）。詳しくは「詳細レポート」を参照ください。"
         
-        return get_single_group_analysis_summary_message_fallback(ci, confidence_level)
+        return None
         
     except Exception as e:
         print(f"Error in get_single_group_analysis_summary_message: {e}")
-        return get_single_group_analysis_summary_message_fallback(ci, confidence_level)
-
-def get_single_group_analysis_summary_message_fallback(ci, confidence_level=95):
-    """
-    フォールバック用の単群推定分析結果サマリーメッセージ生成関数
-    """
-    try:
-        import re
-        
-        # 相対効果と有意性の取得
-        relative_effect = None
-        p_value = None
-        is_significant = False
-        
-        # 1. CausalImpactのsummary_dataから取得を試行
-        if hasattr(ci, 'summary_data') and ci.summary_data is not None:
-            if 'rel_effect' in ci.summary_data.index:
-                relative_effect = ci.summary_data.loc['rel_effect', 'average'] * 100
-            
-            # 統計的有意性の判定（信頼区間による）
-            if ('abs_effect_lower' in ci.summary_data.index and 
-                'abs_effect_upper' in ci.summary_data.index):
-                lower_bound = ci.summary_data.loc['abs_effect_lower', 'cumulative']
-                upper_bound = ci.summary_data.loc['abs_effect_upper', 'cumulative']
-                if (lower_bound > 0 and upper_bound > 0) or (lower_bound < 0 and upper_bound < 0):
-                    is_significant = True
-        
-        # 2. p値の取得
-        if hasattr(ci, 'p_value') and ci.p_value is not None:
-            p_value = ci.p_value
-        else:
-            # テキストサマリーからp値を抽出
-            summary_text = str(ci.summary())
-            p_match = re.search(r'Posterior tail-area probability p:\s+([0-9.]+)', summary_text)
-            if p_match:
-                p_value = float(p_match.group(1))
-        
-        # 3. フォールバック：テキストから相対効果も抽出
-        if relative_effect is None:
-            summary_text = str(ci.summary())
-            # 相対効果の行を探す（パーセンテージ形式）
-            for line in summary_text.split('\n'):
-                if 'RelEffect' in line or '相対効果' in line:
-                    # パーセンテージ値を抽出
-                    percent_match = re.search(r'([-+]?\d+\.?\d*)%', line)
-                    if percent_match:
-                        relative_effect = float(percent_match.group(1))
-                        break
-        
-        # さらなるフォールバック：DataFrame型のsummaryからの抽出
-        if relative_effect is None and hasattr(ci, 'summary'):
-            try:
-                summary_df = ci.summary
-                if hasattr(summary_df, 'loc') and 'RelEffect' in summary_df.index:
-                    rel_effect_val = summary_df.loc['RelEffect', 'Average']
-                    if not hasattr(rel_effect_val, '__iter__'):
-                        relative_effect = rel_effect_val * 100
-            except:
-                pass
-        
-        # 4. メッセージの生成
-        if relative_effect is not None and p_value is not None:
-            # 統計的有意性の判定（p値による）
-            is_significant_by_p = p_value < 0.05
-            
-            # より確実な有意性判定（信頼区間とp値の両方を考慮）
-            final_significance = is_significant or is_significant_by_p
-            
-            if final_significance:
-                return f"相対効果は {relative_effect:+.1f}% で、統計的に有意です（p = {p_value:.3f}）。詳しくは「詳細レポート」を参照ください。"
-            else:
-                return f"相対効果は {relative_effect:+.1f}% ですが、統計的には有意ではありません（p = {p_value:.3f}）。詳しくは「詳細レポート」を参照ください。"
-        
         return None
-        
-    except Exception as e:
-        print(f"Error in get_single_group_analysis_summary_message_fallback: {e}")
-        return None 
\ No newline at end of file
@@ -0,0 +1,335 @@
+"""
+分析用ワーカープール
+
+サーバープロセスで1つだけ起動し、全セッションで共有するプロセスプール。
+ワーカーは起動時に causalimpact / statsmodels を読み込み、小さなモデルで一度推定して
+数値計算まわりを温めておくため、各セッションの初回分析で読み込みコストを払わずに済む。
+
+- 待機キューの上限（max_workers + max_queue_size）を超える投入は受け付けない
+- 1セッションが同時に投入できる分析数を制限し、特定ユーザーによる占有を防ぐ
+- 待機枠はワーカーでの実行が終わるまで確保する（タイムアウトした処理が動き続けても上限を超えない）
+- ワーカーは forkserver（Windows・macOSは spawn）で起動する（マルチスレッドのサーバーからの fork を避ける）
+- ワーカーが異常終了した場合はプールを再起動してエラーを返す（サーバープロセスでは再実行しない）
+- 検出力シミュレーション・一括レポートのグラフ作成など、分割できる処理も同じプールで実行する（map_in_pool）
+- プールが無効・起動できない場合は同一プロセスで実行する
+"""
+
+import multiprocessing
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+from config.constants import WORKER_POOL_SETTINGS
+from utils_cache import shared_resource
+
+
+def _warm_up_worker():
+    """
+    ワーカー起動時の初期化処理（分析ライブラリの読み込みと小規模な試行推定）
+    """
+    try:
+        import numpy as np
+        import pandas as pd
+        import matplotlib
+        matplotlib.use('Agg')
+        from causalimpact import CausalImpact
+
+        dates = pd.date_range('2024-01-01', periods=40)
+        values = 100 + np.random.default_rng(0).normal(0, 1, size=(40, 2)).cumsum(axis=0)
+        data = pd.DataFrame(values, index=dates, columns=['y', 'x'])
+        CausalImpact(data, [dates[0], dates[29]], [dates[30], dates[-1]])
+    except Exception as e:
+        print(f"ワーカーのウォームアップに失敗しました: {str(e)}")
+
+
+def _ping():
+    return True
+
+
+def _get_mp_context():
+    """
+    ワーカーの起動方式を返す（Linuxは forkserver、Windows・macOSは spawn）
+
+    Streamlitのサーバーはマルチスレッドのため、fork で起動すると他のスレッドが保持していた
+    ロックをワーカーが引き継いでデッドロックするおそれがある（Python 3.12以降は警告も出る）。
+    """
+    if sys.platform.startswith('linux') and 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+
+class AnalysisWorkerPool:
+    """
+    セッション間で共有する分析用プロセスプール
+    """
+
+    def __init__(self, max_workers, max_queue_size, max_jobs_per_session, queue_wait_seconds, timeout_seconds):
+        self.max_workers = max_workers
+        self.max_jobs_per_session = max_jobs_per_session
+        self.queue_wait_seconds = queue_wait_seconds
+        self.timeout_seconds = timeout_seconds
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue_size)
+        self._lock = threading.Lock()
+        self._session_jobs = {}
+        self._executor = None
+        self._start()
+
+    def _start(self):
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=_get_mp_context(),
+                                             initializer=_warm_up_worker)
+        # 全ワーカーを起動してウォームアップを開始させる
+        for _ in range(self.max_workers):
+            self._executor.submit(_ping)
+
+    def _restart(self, broken_executor):
+        # 複数セッションが同時に異常終了を検知しても、再起動は1回だけ行う
+        with self._lock:
+            if self._executor is not broken_executor:
+                return
+            print("ワーカープールが停止したため再起動します")
+            try:
+                broken_executor.shutdown(wait=False, cancel_futures=True)
+            except Exception:
+                pass
+            self._start()
+
+    def get_status(self):
+        """
+        プールの状態を返す
+
+        Returns:
+        --------
+        dict : {'max_workers', 'active_sessions', 'running_jobs'}
+        """
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'active_sessions': len(self._session_jobs),
+                'running_jobs': sum(self._session_jobs.values())
+            }
+
+    @contextmanager
+    def session_job(self, session_id):
+        """
+        セッションごとの同時実行数を数えるコンテキストマネージャー
+
+        上限（max_jobs_per_session）に達している場合は RuntimeError を送出する。
+        """
+        with self._lock:
+            if self._session_jobs.get(session_id, 0) >= self.max_jobs_per_session:
+                raise RuntimeError("このセッションでは既に分析を実行中です。完了してから再度実行してください")
+            self._session_jobs[session_id] = self._session_jobs.get(session_id, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._session_jobs[session_id] -= 1
+                if self._session_jobs[session_id] <= 0:
+                    del self._session_jobs[session_id]
+
+    def submit(self, func, *args, **kwargs):
+        """
+        関数をワーカーに投入し、Future を返す
+
+        待機枠（max_workers + max_queue_size）は投入時に確保し、ワーカーでの実行が終わるまで
+        （タイムアウト後も実行中の間は）解放しない。
+
+        Parameters:
+        -----------
+        func : callable
+            モジュールレベルで定義された関数
+        *args, **kwargs :
+            関数の引数
+
+        Returns:
+        --------
+        concurrent.futures.Future
+        """
+        if not self._slots.acquire(timeout=self.queue_wait_seconds):
+            raise RuntimeError("分析の待機数が上限に達しています。しばらく待ってから再度実行してください")
+        for _ in range(2):
+            with self._lock:
+                executor = self._executor
+            try:
+                future = executor.submit(func, *args, **kwargs)
+            except (BrokenProcessPool, RuntimeError):
+                # 停止済みのプールには投入できないため、再起動して1回だけ再投入する
+                self._restart(executor)
+                continue
+            future.add_done_callback(lambda _: self._slots.release())
+            return future
+        self._slots.release()
+        raise RuntimeError("分析用ワーカーを起動できませんでした。しばらく待ってから再度実行してください")
+
+    def result(self, future, timeout=None):
+        """
+        Future の結果を返す
+
+        タイムアウトした場合は RuntimeError を送出する（待機中なら取り消し、実行中なら完了まで待機枠を確保したまま）。
+        ワーカーが異常終了した場合はプールを再起動し、RuntimeError を送出する
+        （メモリ不足などで異常終了した処理をサーバープロセスで再実行しない）。
+        """
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise RuntimeError(f"処理が制限時間（{timeout}秒）内に完了しませんでした。データ量や期間を見直してください")
+        except BrokenProcessPool:
+            with self._lock:
+                executor = self._executor
+            self._restart(executor)
+            raise RuntimeError("分析用ワーカーが異常終了しました（メモリ不足の可能性があります）。"
+                               "データ量や期間を見直して再度実行してください")
+
+    def imap(self, func, iterable, max_in_flight=None):
+        """
+        各要素に関数を適用した結果を、入力の順に返すジェネレーター
+
+        投入済みで結果を受け取っていない件数は max_in_flight 件まで
+        （Noneの場合は max_workers）とし、受け取った分だけ次を投入する。
+
+        Parameters:
+        -----------
+        func : callable
+            モジュールレベルで定義された1引数の関数
+        iterable : iterable
+            関数の引数
+        max_in_flight : int, optional
+            同時に投入しておく件数の上限
+
+        Yields:
+        -------
+        各要素に対する関数の戻り値
+        """
+        max_in_flight = max(1, max_in_flight or self.max_workers)
+        pending = deque()
+        try:
+            for item in iterable:
+                pending.append(self.submit(func, item))
+                if len(pending) >= max_in_flight:
+                    yield self.result(pending.popleft(), self.timeout_seconds)
+            while pending:
+                yield self.result(pending.popleft(), self.timeout_seconds)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def run(self, session_id, func, *args, **kwargs):
+        """
+        分析関数をワーカーで実行し、結果を返す
+
+        Parameters:
+        -----------
+        session_id : str
+            投入元セッションのID
+        func : callable
+            モジュールレベルで定義された分析関数
+        *args, **kwargs :
+            分析関数の引数
+
+        Returns:
+        --------
+        分析関数の戻り値
+        """
+        with self.session_job(session_id):
+            future = self.submit(func, *args, **kwargs)
+            return self.result(future, self.timeout_seconds)
+
+
+def _create_worker_pool():
+    """
+    ワーカープールを起動する（サーバー全体で1つだけ。初回呼び出し時に起動）
+    """
+    settings = WORKER_POOL_SETTINGS
+    return AnalysisWorkerPool(
+        max_workers=settings['max_workers'],
+        max_queue_size=settings['max_queue_size'],
+        max_jobs_per_session=settings['max_jobs_per_session'],
+        queue_wait_seconds=settings['queue_wait_seconds'],
+        timeout_seconds=settings['timeout_seconds']
+    )
+
+
+get_worker_pool = shared_resource(_create_worker_pool)
+
+
+def get_session_id():
+    """
+    現在のStreamlitセッションIDを返す（取得できない場合は 'default'）
+    """
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        if ctx is not None:
+            return ctx.session_id
+    except Exception:
+        pass
+    return 'default'
+
+
+def run_analysis_in_pool(func, *args, **kwargs):
+    """
+    分析関数を共有ワーカープールで実行する関数
+
+    プールが無効・起動失敗の場合は同一プロセスで実行する。
+    キュー上限・セッション上限に達した場合、タイムアウト・ワーカーの異常終了の場合は RuntimeError を送出する。
+
+    Parameters:
+    -----------
+    func : callable
+        モジュールレベルで定義された分析関数（例: run_causal_impact_analysis）
+    *args, **kwargs :
+        分析関数の引数
+
+    Returns:
+    --------
+    分析関数の戻り値
+    """
+    pool = get_shared_worker_pool()
+    if pool is None:
+        return func(*args, **kwargs)
+    return pool.run(get_session_id(), func, *args, **kwargs)
+
+
+def map_in_pool(func, iterable, max_in_flight=None):
+    """
+    各要素に関数を適用した結果を、共有ワーカープールで計算してリストで返す関数（順序は入力と同じ）
+
+    1セッションの1処理として数え、分析と同じくCPUの上限・セッションごとの上限に従う。
+    プールが無効・起動失敗の場合は同一プロセスで順に実行する。
+
+    Parameters:
+    -----------
+    func : callable
+        モジュールレベルで定義された1引数の関数
+    iterable : iterable
+        関数の引数
+    max_in_flight : int, optional
+        同時に投入しておく件数の上限（Noneの場合はワーカー数）
+
+    Returns:
+    --------
+    list : 各要素に対する関数の戻り値
+    """
+    pool = get_shared_worker_pool()
+    if pool is None:
+        return [func(item) for item in iterable]
+    with pool.session_job(get_session_id()):
+        return list(pool.imap(func, iterable, max_in_flight))
+
+
+def get_shared_worker_pool():
+    """
+    共有ワーカープールを返す（無効・起動失敗の場合はNone）
+    """
+    if not WORKER_POOL_SETTINGS.get('enabled', True):
+        return None
+    try:
+        return get_worker_pool()
+    except Exception as e:
+        print(f"ワーカープールを起動できないため同一プロセスで実行します: {str(e)}")
+        return None